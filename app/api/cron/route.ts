@@ -3,6 +3,13 @@ import prisma from '@/lib/db';
 import { TradingMode } from '@/lib/types';
 import { createBroker } from '@/lib/trading';
 import { logAudit, AuditActions } from '@/lib/audit/logger';
+import { executeStrategy, getExecutorPool, EXECUTOR_TIMEOUT_MS } from '@/lib/strategies/executor';
+import { fetchMarketSnapshot, uniqueMarketIds } from '@/lib/strategies/market-snapshot';
+import { CronSchedule } from '@/lib/strategies/cron';
+
+// A RUNNING row older than this lost its run (the process died or the
+// update failed) and no longer blocks the strategy
+const STALE_RUN_MS = EXECUTOR_TIMEOUT_MS;
 
 // Cron endpoint for scheduled strategy execution
 // Protected by CRON_SECRET
@@ -21,7 +28,9 @@ export async function GET(request: NextRequest) {
             return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
         }
 
-        // Find all active strategies that should run
+        const now = new Date();
+
+        // Find all active scheduled strategies, with their latest run
         const activeStrategies = await prisma.strategy.findMany({
             where: {
                 isActive: true,
@@ -33,25 +42,84 @@ export async function GET(request: NextRequest) {
                         riskConfig: true,
                     },
                 },
+                runs: {
+                    orderBy: { createdAt: 'desc' },
+                    take: 1,
+                    select: { id: true, status: true, startedAt: true },
+                },
             },
         });
 
-        const results = [];
-
-        for (const strategy of activeStrategies) {
-            // Skip if kill switch is active
+        // When each strategy last ran from cron; its schedule is due if an
+        // occurrence has passed since then
+        const lastCronRuns = await prisma.strategyRun.groupBy({
+            by: ['strategyId'],
+            where: {
+                strategyId: { in: activeStrategies.map(s => s.id) },
+                trigger: 'CRON',
+            },
+            _max: { startedAt: true },
+        });
+        const lastCronRun = new Map(lastCronRuns.map(r => [r.strategyId, r._max.startedAt]));
+
+        const skipped: Array<{ strategyId: string; status: string; reason: string }> = [];
+        let notDue = 0;
+        const staleRunIds: string[] = [];
+        const dueStrategies = activeStrategies.filter((strategy) => {
+            const skip = (reason: string) => {
+                skipped.push({ strategyId: strategy.id, status: 'skipped', reason });
+                return false;
+            };
             if (strategy.user.riskConfig?.killSwitchActive) {
-                results.push({
-                    strategyId: strategy.id,
-                    status: 'skipped',
-                    reason: 'Kill switch active',
-                });
-                continue;
+                return skip('Kill switch active');
+            }
+            try {
+                // Never run from cron: due from its first occurrence after the last edit
+                const schedule = CronSchedule.parse(strategy.schedule!);
+                if (!schedule.isDue(lastCronRun.get(strategy.id) ?? strategy.updatedAt, now)) {
+                    notDue++;
+                    return false;
+                }
+            } catch (error) {
+                return skip(error instanceof Error ? error.message : 'Invalid schedule');
+            }
+            // Do not start a run while the previous one is still going
+            const latest = strategy.runs[0];
+            if (latest?.status === 'RUNNING') {
+                const started = latest.startedAt?.getTime() ?? 0;
+                if (now.getTime() - started < STALE_RUN_MS) {
+                    return skip('Previous run still in progress');
+                }
+                staleRunIds.push(latest.id);
             }
+            return true;
+        });
+
+        if (staleRunIds.length > 0) {
+            await prisma.strategyRun.updateMany({
+                where: { id: { in: staleRunIds }, status: 'RUNNING' },
+                data: {
+                    status: 'FAILED',
+                    completedAt: now,
+                    error: `Run did not finish within ${STALE_RUN_MS}ms`,
+                },
+            });
+        }
 
+        // Fetch every market watched by a due strategy once and share the
+        // snapshot across runs: requests scale with unique markets, not
+        // strategies x markets
+        const snapshot = await fetchMarketSnapshot(uniqueMarketIds(dueStrategies));
+
+        // Dispatch every due strategy at once; the executor pool hands runs
+        // to idle workers and queues the rest, so total time is bounded by
+        // pool throughput rather than the sum of run times.
+        const pool = getExecutorPool();
+        const runResults = await Promise.all(dueStrategies.map(async (strategy) => {
+            let run: { id: string; startedAt: Date | null } | undefined;
             try {
                 // Create run record
-                const run = await prisma.strategyRun.create({
+                run = await prisma.strategyRun.create({
                     data: {
                         strategyId: strategy.id,
                         mode: 'PAPER', // Cron runs default to PAPER
@@ -63,7 +131,19 @@ export async function GET(request: NextRequest) {
 
                 // Execute strategy
                 const broker = createBroker('PAPER' as TradingMode, strategy.userId);
-                const executionResult = await executeStrategy(strategy, broker);
+                const executionResult = await executeStrategy(
+                    {
+                        id: strategy.id,
+                        version: strategy.version,
+                        code: strategy.code,
+                        parameters: (strategy.parameters as Record<string, unknown>) || {},
+                        marketIds: strategy.marketIds,
+                    },
+                    broker,
+                    {},
+                    pool,
+                    snapshot
+                );
 
                 // Update run
                 await prisma.strategyRun.update({
@@ -77,20 +157,37 @@ export async function GET(request: NextRequest) {
                     },
                 });
 
-                results.push({
+                return {
                     strategyId: strategy.id,
                     runId: run.id,
                     status: 'completed',
                     metrics: executionResult.metrics,
-                });
+                };
             } catch (error) {
-                results.push({
+                const message = error instanceof Error ? error.message : 'Unknown error';
+                // Close the run so it does not block the strategy's next tick
+                if (run) {
+                    await prisma.strategyRun.update({
+                        where: { id: run.id },
+                        data: {
+                            status: 'FAILED',
+                            completedAt: new Date(),
+                            duration: Date.now() - run.startedAt!.getTime(),
+                            error: message,
+                        },
+                    }).catch((updateError) => {
+                        console.error(`Failed to mark run ${run!.id} as failed:`, updateError);
+                    });
+                }
+                return {
                     strategyId: strategy.id,
+                    runId: run?.id,
                     status: 'failed',
-                    error: error instanceof Error ? error.message : 'Unknown error',
-                });
+                    error: message,
+                };
             }
-        }
+        }));
+        const results = [...runResults, ...skipped];
 
         // Log cron execution
         await logAudit({
@@ -98,13 +195,18 @@ export async function GET(request: NextRequest) {
             action: AuditActions.CRON_EXECUTED,
             category: 'SYSTEM',
             details: {
-                strategiesProcessed: activeStrategies.length,
+                strategiesProcessed: dueStrategies.length,
+                strategiesNotDue: notDue,
+                marketsFetched: snapshot.requests,
+                marketFetchErrors: snapshot.errors,
                 results,
             },
         });
 
         return NextResponse.json({
-            processed: activeStrategies.length,
+            processed: dueStrategies.length,
+            notDue,
+            marketsFetched: snapshot.requests,
             results,
         });
     } catch (error) {
@@ -115,34 +217,3 @@ export async function GET(request: NextRequest) {
         );
     }
 }
-
-// Simplified strategy execution
-async function executeStrategy(
-    strategy: { code: string; parameters: any; marketIds: string[] },
-    broker: ReturnType<typeof createBroker>
-): Promise<{ metrics: Record<string, number>; logs: string }> {
-    const logs: string[] = [];
-    logs.push(`[${new Date().toISOString()}] Cron: Strategy execution started`);
-
-    const canTrade = await broker.canTrade();
-    if (!canTrade.allowed) {
-        logs.push(`[${new Date().toISOString()}] Trading not allowed: ${canTrade.reason}`);
-        return { metrics: { ordersPlaced: 0 }, logs: logs.join('\n') };
-    }
-
-    const positions = await broker.getPositions();
-    const balance = await broker.getBalance();
-
-    logs.push(`[${new Date().toISOString()}] Positions: ${positions.length}`);
-    logs.push(`[${new Date().toISOString()}] Balance: $${balance.available.toFixed(2)}`);
-    logs.push(`[${new Date().toISOString()}] Cron: Strategy execution completed`);
-
-    return {
-        metrics: {
-            ordersPlaced: 0,
-            positionsOpen: positions.length,
-            balanceAvailable: balance.available,
-        },
-        logs: logs.join('\n'),
-    };
-}
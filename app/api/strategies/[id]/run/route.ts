@@ -4,6 +4,7 @@ import prisma from '@/lib/db';
 import { TradingMode } from '@/lib/types';
 import { createBroker } from '@/lib/trading';
 import { logStrategyRun } from '@/lib/audit/logger';
+import { executeStrategy } from '@/lib/strategies/executor';
 
 // POST - Run strategy
 export async function POST(
@@ -63,17 +64,20 @@ export async function POST(
         );
 
         try {
-            // Execute strategy (simplified - in production would call Python runtime)
+            // Execute strategy in the Python executor
             const broker = createBroker(mode, session.user.id);
-
-            // Parse and execute strategy code
-            // This is a simplified version - actual implementation would use Python
             const strategyParams = (strategy.parameters as Record<string, unknown>) || {};
-            const result = await executeStrategy(strategy.code, broker, {
-                ...strategyParams,
-                ...runParameters,
-                marketIds: strategy.marketIds,
-            });
+            const result = await executeStrategy(
+                {
+                    id: strategy.id,
+                    version: strategy.version,
+                    code: strategy.code,
+                    parameters: strategyParams,
+                    marketIds: strategy.marketIds,
+                },
+                broker,
+                runParameters
+            );
 
             // Update run record
             await prisma.strategyRun.update({
@@ -132,56 +136,3 @@ export async function POST(
         );
     }
 }
-
-// Simplified strategy execution (placeholder for Python runtime)
-async function executeStrategy(
-    code: string,
-    broker: ReturnType<typeof createBroker>,
-    parameters: Record<string, unknown>
-): Promise<{
-    metrics: Record<string, number>;
-    logs: string;
-    ordersPlaced: number;
-}> {
-    // This is a placeholder - actual implementation would:
-    // 1. Call Python serverless function with the strategy code
-    // 2. Pass market data and broker interface
-    // 3. Execute strategy and collect results
-
-    const logs: string[] = [];
-    logs.push(`[${new Date().toISOString()}] Strategy execution started`);
-    logs.push(`[${new Date().toISOString()}] Parameters: ${JSON.stringify(parameters)}`);
-    logs.push(`[${new Date().toISOString()}] Mode: ${broker.mode}`);
-
-    // Simulate strategy execution
-    const canTrade = await broker.canTrade();
-    if (!canTrade.allowed) {
-        logs.push(`[${new Date().toISOString()}] Trading not allowed: ${canTrade.reason}`);
-        return {
-            metrics: { ordersPlaced: 0, pnl: 0 },
-            logs: logs.join('\n'),
-            ordersPlaced: 0,
-        };
-    }
-
-    // Get positions
-    const positions = await broker.getPositions();
-    logs.push(`[${new Date().toISOString()}] Current positions: ${positions.length}`);
-
-    // Get balance
-    const balance = await broker.getBalance();
-    logs.push(`[${new Date().toISOString()}] Available balance: $${balance.available.toFixed(2)}`);
-
-    logs.push(`[${new Date().toISOString()}] Strategy execution completed`);
-
-    return {
-        metrics: {
-            ordersPlaced: 0,
-            positionsOpen: positions.length,
-            balanceAvailable: balance.available,
-            balanceTotal: balance.total,
-        },
-        logs: logs.join('\n'),
-        ordersPlaced: 0,
-    };
-}
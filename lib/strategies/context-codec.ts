@@ -0,0 +1,132 @@
+import type { StrategyContext } from './executor';
+
+// ============================================================================
+// Layout (python_strategies/executor/codec.py)
+// ============================================================================
+
+/**
+ * Binary strategy context: fixed-layout little-endian records for market
+ * data and positions plus a string table for ids, so the Python executor
+ * can read them as NumPy views instead of parsing a JSON dict per market.
+ *
+ *   header      40 bytes
+ *   markets     56-byte records, sorted by market id (UTF-8 bytes)
+ *   positions   48-byte records
+ *   offsets     uint32 x (strings + 1), padded to 8 bytes
+ *   strings     UTF-8 string table, padded to 8 bytes
+ *   extra       UTF-8 JSON: parameters, risk, orderbooks
+ */
+const MAGIC = 'PTCX';
+const VERSION = 1;
+const HEADER_SIZE = 40;
+const MARKET_SIZE = 56;
+const POSITION_SIZE = 48;
+// TradingMode, in this order on both sides
+const MODES = ['PAPER', 'LIVE', 'SHADOW'];
+
+export class CodecError extends Error {
+    constructor(message: string) {
+        super(message);
+        this.name = 'CodecError';
+    }
+}
+
+function pad8(size: number): number {
+    return (size + 7) & ~7;
+}
+
+function optional(value: number | undefined | null): number {
+    return value === undefined || value === null ? NaN : value;
+}
+
+// ============================================================================
+// Encoding
+// ============================================================================
+
+/**
+ * Encode a strategy context in the binary layout read by the executor's
+ * decode_context()
+ */
+export function encodeContext(context: StrategyContext): Buffer {
+    const mode = MODES.indexOf(context.mode);
+    if (mode < 0) {
+        throw new CodecError(`Unknown trading mode: ${context.mode}`);
+    }
+
+    const strings: Buffer[] = [];
+    const index = new Map<string, number>();
+    const intern = (value: string | undefined | null): number => {
+        const key = value || '';
+        let i = index.get(key);
+        if (i === undefined) {
+            i = strings.length;
+            index.set(key, i);
+            strings.push(Buffer.from(key, 'utf8'));
+        }
+        return i;
+    };
+
+    // Market ids first, byte-sorted, so record i's id is string i and the
+    // decoder can binary search them
+    const marketIds = Object.keys(context.market_data)
+        .map(id => ({ id, raw: Buffer.from(id, 'utf8') }))
+        .sort((a, b) => Buffer.compare(a.raw, b.raw));
+    for (const { id, raw } of marketIds) {
+        index.set(id, strings.length);
+        strings.push(raw);
+    }
+
+    const markets = Buffer.alloc(marketIds.length * MARKET_SIZE);
+    marketIds.forEach(({ id }, row) => {
+        const m = context.market_data[id];
+        const at = row * MARKET_SIZE;
+        markets.writeUInt32LE(row, at);
+        markets.writeUInt32LE(intern(m.token_id), at + 4);
+        markets.writeDoubleLE(m.bid, at + 8);
+        markets.writeDoubleLE(m.ask, at + 16);
+        markets.writeDoubleLE(m.midpoint, at + 24);
+        markets.writeDoubleLE(m.spread, at + 32);
+        markets.writeDoubleLE(m.volume || 0, at + 40);
+        markets.writeDoubleLE(optional(m.last_price), at + 48);
+    });
+
+    const positions = Buffer.alloc(context.positions.length * POSITION_SIZE);
+    context.positions.forEach((p, row) => {
+        const at = row * POSITION_SIZE;
+        positions.writeUInt32LE(intern(p.market_id), at);
+        positions.writeUInt32LE(intern(p.token_id), at + 4);
+        positions.writeDoubleLE(p.size, at + 8);
+        positions.writeDoubleLE(p.avg_entry_price, at + 16);
+        positions.writeDoubleLE(optional(p.current_price), at + 24);
+        positions.writeDoubleLE(p.realized_pnl || 0, at + 32);
+        positions.writeDoubleLE(p.unrealized_pnl || 0, at + 40);
+    });
+
+    const offsets = Buffer.alloc(pad8((strings.length + 1) * 4));
+    let offset = 0;
+    strings.forEach((s, i) => {
+        offset += s.length;
+        offsets.writeUInt32LE(offset, (i + 1) * 4);
+    });
+    const table = Buffer.alloc(pad8(offset));
+    Buffer.concat(strings).copy(table);
+
+    const extra: Record<string, unknown> = {};
+    if (context.parameters) extra.parameters = context.parameters;
+    if (context.risk) extra.risk = context.risk;
+    if (context.orderbooks) extra.orderbooks = context.orderbooks;
+    const extraBytes = Object.keys(extra).length ? Buffer.from(JSON.stringify(extra), 'utf8') : Buffer.alloc(0);
+
+    const header = Buffer.alloc(HEADER_SIZE);
+    header.write(MAGIC, 0, 'latin1');
+    header.writeUInt16LE(VERSION, 4);
+    header.writeUInt16LE(mode, 6);
+    header.writeUInt32LE(marketIds.length, 8);
+    header.writeUInt32LE(context.positions.length, 12);
+    header.writeUInt32LE(strings.length, 16);
+    header.writeUInt32LE(offset, 20);
+    header.writeUInt32LE(extraBytes.length, 24);
+    header.writeDoubleLE(context.balance, 32);
+
+    return Buffer.concat([header, markets, positions, offsets, table, extraBytes]);
+}
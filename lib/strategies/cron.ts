@@ -0,0 +1,174 @@
+/**
+ * Cron schedules for strategies
+ *
+ * Parses the five-field expressions accepted by strategySchema (minute,
+ * hour, day of month, month, day of week; UTC), with the same rules as
+ * python_strategies/executor/scheduler.py: lists, ranges, steps, 0/7 for
+ * Sunday, and either day field matching when both are restricted.
+ * Parsed schedules are cached per expression, since many strategies
+ * share a few schedules.
+ */
+
+// ============================================================================
+// Parsing
+// ============================================================================
+
+// (low, high) per field: minute, hour, day of month, month, day of week
+const FIELD_RANGES: ReadonlyArray<readonly [number, number]> = [[0, 59], [0, 23], [1, 31], [1, 12], [0, 7]];
+const FIELD_NAMES = ['minute', 'hour', 'day of month', 'month', 'day of week'];
+
+// No valid time within this many field advances means the expression can never fire
+const MAX_ADVANCES = 10000;
+const MAX_CACHED = 1024;
+
+const MINUTE_MS = 60 * 1000;
+
+export class CronError extends Error {
+    constructor(message: string) {
+        super(message);
+        this.name = 'CronError';
+    }
+}
+
+const isDigits = (text: string) => /^\d+$/.test(text);
+
+function parseField(text: string, index: number): number[] {
+    const [low, high] = FIELD_RANGES[index];
+    const name = FIELD_NAMES[index];
+    const values = new Set<number>();
+    for (const part of text.split(',')) {
+        const [base, stepText] = part.split('/', 2);
+        let step = 1;
+        if (stepText !== undefined) {
+            if (!isDigits(stepText) || parseInt(stepText, 10) === 0) {
+                throw new CronError(`Invalid step in ${name} field: '${part}'`);
+            }
+            step = parseInt(stepText, 10);
+        }
+
+        let start: number;
+        let end: number;
+        if (base === '*') {
+            [start, end] = [low, high];
+        } else if (base.includes('-')) {
+            const [a, b] = base.split('-', 2);
+            if (!isDigits(a) || !isDigits(b)) {
+                throw new CronError(`Invalid range in ${name} field: '${part}'`);
+            }
+            [start, end] = [parseInt(a, 10), parseInt(b, 10)];
+        } else if (isDigits(base)) {
+            start = parseInt(base, 10);
+            // "5/15" means from 5 to the end of the range in steps of 15
+            end = stepText !== undefined ? high : start;
+        } else {
+            throw new CronError(`Invalid ${name} field: '${part}'`);
+        }
+
+        if (start < low || end > high || start > end) {
+            throw new CronError(`${name} out of range ${low}-${high}: '${part}'`);
+        }
+        for (let value = start; value <= end; value += step) {
+            values.add(value);
+        }
+    }
+
+    if (index === 4 && values.delete(7)) {
+        values.add(0); // 7 and 0 are both Sunday
+    }
+    return Array.from(values).sort((a, b) => a - b);
+}
+
+// ============================================================================
+// Schedule
+// ============================================================================
+
+export class CronSchedule {
+    readonly minutes: number[];
+    readonly hours: number[];
+    readonly days: number[];
+    readonly months: number[];
+    readonly weekdays: number[];
+    private readonly anyDay: boolean;
+    private readonly anyWeekday: boolean;
+
+    private static cache = new Map<string, CronSchedule>();
+
+    constructor(readonly expression: string) {
+        const fields = expression.trim().split(/\s+/);
+        if (fields.length !== 5) {
+            throw new CronError(`Expected 5 fields in cron expression, got ${fields.length}: '${expression}'`);
+        }
+        [this.minutes, this.hours, this.days, this.months, this.weekdays] = fields.map(parseField);
+        this.anyDay = fields[2] === '*';
+        this.anyWeekday = fields[4] === '*';
+    }
+
+    /**
+     * Parse (and cache) an expression; throws CronError if it is invalid
+     */
+    static parse(expression: string): CronSchedule {
+        const normalized = expression.trim().split(/\s+/).join(' ');
+        let schedule = CronSchedule.cache.get(normalized);
+        if (!schedule) {
+            schedule = new CronSchedule(normalized);
+            if (CronSchedule.cache.size >= MAX_CACHED) {
+                CronSchedule.cache.clear();
+            }
+            CronSchedule.cache.set(normalized, schedule);
+        }
+        return schedule;
+    }
+
+    private dayMatches(t: Date): boolean {
+        const inDays = this.days.includes(t.getUTCDate());
+        const inWeekdays = this.weekdays.includes(t.getUTCDay());
+        // As in cron: if both fields are restricted, either may match
+        if (this.anyDay) return inWeekdays;
+        if (this.anyWeekday) return inDays;
+        return inDays || inWeekdays;
+    }
+
+    matches(t: Date): boolean {
+        return this.minutes.includes(t.getUTCMinutes())
+            && this.hours.includes(t.getUTCHours())
+            && this.months.includes(t.getUTCMonth() + 1)
+            && this.dayMatches(t);
+    }
+
+    /**
+     * First matching minute strictly after `after`
+     */
+    nextAfter(after: Date): Date {
+        let t = new Date(Math.floor(after.getTime() / MINUTE_MS) * MINUTE_MS + MINUTE_MS);
+        for (let i = 0; i < MAX_ADVANCES; i++) {
+            const [year, month, day, hour] = [t.getUTCFullYear(), t.getUTCMonth(), t.getUTCDate(), t.getUTCHours()];
+            if (!this.months.includes(month + 1)) {
+                t = new Date(Date.UTC(year, month + 1, 1));
+                continue;
+            }
+            if (!this.dayMatches(t)) {
+                t = new Date(Date.UTC(year, month, day + 1));
+                continue;
+            }
+            if (!this.hours.includes(hour)) {
+                t = new Date(Date.UTC(year, month, day, hour + 1));
+                continue;
+            }
+            const minute = this.minutes.find(m => m >= t.getUTCMinutes());
+            if (minute === undefined) {
+                t = new Date(Date.UTC(year, month, day, hour + 1));
+                continue;
+            }
+            return new Date(Date.UTC(year, month, day, hour, minute));
+        }
+        throw new CronError(`Cron expression never fires: '${this.expression}'`);
+    }
+
+    /**
+     * Whether an occurrence falls after `lastRun` and at or before `now`.
+     * Occurrences missed between cron ticks collapse into one run.
+     */
+    isDue(lastRun: Date, now: Date = new Date()): boolean {
+        return this.nextAfter(lastRun).getTime() <= now.getTime();
+    }
+}
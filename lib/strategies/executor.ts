@@ -0,0 +1,639 @@
+import { spawn, ChildProcessWithoutNullStreams } from 'child_process';
+import path from 'path';
+import { OrderSide, OrderType, TradingMode } from '@/lib/types';
+import { Broker, MarketState, PositionInfo } from '@/lib/trading/types';
+import { createClient } from '@/lib/polymarket/client';
+import prisma from '@/lib/db';
+import { OrderBook } from '@/lib/polymarket/types';
+import type { MarketSnapshot } from './market-snapshot';
+import { encodeContext } from './context-codec';
+
+// ============================================================================
+// Types
+// ============================================================================
+
+export interface ExecutorConfig {
+    pythonPath: string;
+    strategiesDir: string;
+    timeoutMs: number;
+    maxStrategies: number;
+    maxMemoryMb: number;
+    /** Send run contexts in the binary layout (context-codec.ts) instead of JSON */
+    binaryContext: boolean;
+}
+
+export interface ExecutorPoolConfig extends ExecutorConfig {
+    size: number;
+}
+
+export interface StrategyDefinition {
+    id: string;
+    version: number;
+    code: string;
+    parameters: Record<string, unknown>;
+}
+
+export interface StrategyContext {
+    mode: TradingMode;
+    positions: Array<{
+        market_id: string;
+        token_id: string;
+        size: number;
+        avg_entry_price: number;
+        current_price?: number;
+        realized_pnl: number;
+        unrealized_pnl: number;
+    }>;
+    balance: number;
+    market_data: Record<string, {
+        market_id: string;
+        token_id: string;
+        bid: number;
+        ask: number;
+        midpoint: number;
+        spread: number;
+        volume: number;
+        last_price?: number;
+    }>;
+    orderbooks?: Record<string, OrderBook>;
+    risk?: RiskSnapshot;
+    parameters: Record<string, unknown>;
+}
+
+/** RiskConfig limits plus the state they are checked against (executor/risk.py) */
+export interface RiskSnapshot {
+    max_orders_per_minute: number;
+    max_daily_loss: number;
+    max_position_size: number;
+    max_total_exposure: number;
+    kill_switch_active: boolean;
+    kill_switch_reason: string | null;
+    orders_last_minute: number;
+    today_pnl: number;
+}
+
+export interface ProposedOrder {
+    market_id: string;
+    token_id: string;
+    side: OrderSide;
+    type: OrderType;
+    size: number;
+    price?: number | null;
+}
+
+export interface ExecutorRunResult {
+    strategy_id: string;
+    version: number;
+    cold_start: boolean;
+    reinitialized: boolean;
+    evicted: string[];
+    recycle: boolean;
+    books_changed: Record<string, number>;
+    proposed: ProposedOrder[];
+    approved: ProposedOrder[];
+    rejected: Array<{ order: ProposedOrder; reason: string }>;
+    logs: string[];
+    timings: Record<string, number>;
+}
+
+interface ExecutorResponse {
+    id: number | null;
+    ok: boolean;
+    result?: unknown;
+    error?: string;
+    error_type?: string;
+}
+
+export class ExecutorError extends Error {
+    constructor(message: string, public readonly errorType?: string) {
+        super(message);
+        this.name = 'ExecutorError';
+    }
+}
+
+/** Longest a single executor request may take (the documented 60s strategy limit) */
+export const EXECUTOR_TIMEOUT_MS = 60000;
+
+const DEFAULT_CONFIG: ExecutorConfig = {
+    pythonPath: process.env.PYTHON_EXECUTABLE || 'python3',
+    strategiesDir: path.join(process.cwd(), 'python_strategies'),
+    timeoutMs: EXECUTOR_TIMEOUT_MS,
+    maxStrategies: parseInt(process.env.EXECUTOR_MAX_STRATEGIES || '64'),
+    maxMemoryMb: parseInt(process.env.EXECUTOR_MAX_MEMORY_MB || '512'),
+    binaryContext: process.env.EXECUTOR_BINARY_CONTEXT !== 'false',
+};
+
+/** Length-prefix bit marking a frame whose JSON is followed by binary data */
+const ATTACHMENT_FLAG = 0x80000000;
+
+const DEFAULT_POOL_SIZE = parseInt(process.env.EXECUTOR_POOL_SIZE || '4');
+
+/**
+ * Anything that can execute a strategy cycle (a single executor or a pool)
+ */
+export interface StrategyRunner {
+    run(strategy: StrategyDefinition, context: StrategyContext): Promise<ExecutorRunResult>;
+}
+
+// ============================================================================
+// Python Executor Process
+// ============================================================================
+
+/**
+ * Long-lived Python executor process
+ * Speaks length-prefixed JSON frames over stdin/stdout (see
+ * python_strategies/executor/protocol.py) and keeps strategies warm
+ * between runs. Run contexts go as a binary attachment unless
+ * `binaryContext` is off.
+ */
+export class PythonExecutor implements StrategyRunner {
+    private config: ExecutorConfig;
+    private process: ChildProcessWithoutNullStreams | null = null;
+    private buffer: Buffer = Buffer.alloc(0);
+    private nextId = 1;
+    private pending = new Map<number, {
+        resolve: (value: unknown) => void;
+        reject: (error: Error) => void;
+        timer: ReturnType<typeof setTimeout>;
+    }>();
+
+    constructor(config: Partial<ExecutorConfig> = {}) {
+        this.config = { ...DEFAULT_CONFIG, ...config };
+    }
+
+    /**
+     * Whether the executor process is currently running
+     */
+    get isRunning(): boolean {
+        return this.process !== null;
+    }
+
+    private ensureProcess(): ChildProcessWithoutNullStreams {
+        if (this.process) {
+            return this.process;
+        }
+
+        const args = [
+            '-m', 'executor',
+            '--max-strategies', String(this.config.maxStrategies),
+            '--max-memory-mb', String(this.config.maxMemoryMb),
+        ];
+        const child = spawn(this.config.pythonPath, args, {
+            cwd: this.config.strategiesDir,
+            env: { ...process.env, PYTHONUNBUFFERED: '1' },
+            stdio: ['pipe', 'pipe', 'pipe'],
+        });
+
+        child.stdout.on('data', (chunk: Buffer) => this.onData(chunk));
+        child.stderr.on('data', (chunk: Buffer) => {
+            console.error('[Executor]', chunk.toString().trimEnd());
+        });
+        child.on('exit', (code) => this.onExit(child, code));
+        child.on('error', (error) => this.onExit(child, null, error));
+
+        this.process = child;
+        this.buffer = Buffer.alloc(0);
+        return child;
+    }
+
+    private onData(chunk: Buffer): void {
+        this.buffer = Buffer.concat([this.buffer, chunk]);
+
+        while (this.buffer.length >= 4) {
+            const length = this.buffer.readUInt32BE(0);
+            if (this.buffer.length < 4 + length) {
+                break;
+            }
+
+            const payload = this.buffer.subarray(4, 4 + length).toString('utf8');
+            this.buffer = this.buffer.subarray(4 + length);
+            this.onMessage(JSON.parse(payload) as ExecutorResponse);
+        }
+    }
+
+    private onMessage(message: ExecutorResponse): void {
+        if (message.id === null) {
+            console.error('[Executor] Protocol error:', message.error);
+            return;
+        }
+
+        const entry = this.pending.get(message.id);
+        if (!entry) {
+            return;
+        }
+
+        clearTimeout(entry.timer);
+        this.pending.delete(message.id);
+
+        if (message.ok) {
+            entry.resolve(message.result);
+        } else {
+            entry.reject(new ExecutorError(message.error || 'Executor error', message.error_type));
+        }
+    }
+
+    private onExit(child: ChildProcessWithoutNullStreams, code: number | null, error?: Error): void {
+        // Ignore exits from a process that was already replaced
+        if (this.process !== child) {
+            return;
+        }
+        this.process = null;
+        this.rejectPending(error?.message || `Executor exited with code ${code}`);
+    }
+
+    private rejectPending(reason: string): void {
+        for (const [id, entry] of this.pending.entries()) {
+            clearTimeout(entry.timer);
+            entry.reject(new ExecutorError(reason));
+            this.pending.delete(id);
+        }
+    }
+
+    /**
+     * Send a request to the executor and wait for its response
+     */
+    request<T>(type: string, payload: Record<string, unknown> = {}, attachment?: Buffer): Promise<T> {
+        const child = this.ensureProcess();
+        const id = this.nextId++;
+        let body = Buffer.from(JSON.stringify({ id, type, ...payload }), 'utf8');
+        const header = Buffer.alloc(4);
+        if (attachment) {
+            // [JSON length][JSON][attachment], flagged in the frame length
+            const jsonLength = Buffer.alloc(4);
+            jsonLength.writeUInt32BE(body.length, 0);
+            body = Buffer.concat([jsonLength, body, attachment]);
+            header.writeUInt32BE((body.length | ATTACHMENT_FLAG) >>> 0, 0);
+        } else {
+            header.writeUInt32BE(body.length, 0);
+        }
+
+        return new Promise<T>((resolve, reject) => {
+            const timer = setTimeout(() => {
+                this.pending.delete(id);
+                reject(new ExecutorError(`Executor request timed out after ${this.config.timeoutMs}ms`, 'Timeout'));
+                // A timed-out strategy may be stuck; restart on next request
+                this.shutdown(true);
+            }, this.config.timeoutMs);
+
+            this.pending.set(id, {
+                resolve: resolve as (value: unknown) => void,
+                reject,
+                timer,
+            });
+            child.stdin.write(Buffer.concat([header, body]));
+        });
+    }
+
+    /**
+     * Run one strategy cycle, loading the strategy if this process has
+     * not seen this version yet
+     */
+    async run(strategy: StrategyDefinition, context: StrategyContext): Promise<ExecutorRunResult> {
+        const payload = {
+            strategy_id: strategy.id,
+            strategy: {
+                version: strategy.version,
+                code: strategy.code,
+                config: strategy.parameters,
+            },
+        };
+        if (this.config.binaryContext) {
+            return this.request<ExecutorRunResult>('run', payload, encodeContext(context));
+        }
+        return this.request<ExecutorRunResult>('run', { ...payload, context });
+    }
+
+    /**
+     * Stop the executor process
+     */
+    shutdown(force: boolean = false): void {
+        if (!this.process) {
+            return;
+        }
+        if (force) {
+            this.process.kill('SIGKILL');
+            this.rejectPending('Executor was restarted');
+        } else {
+            this.process.stdin.end();
+        }
+        this.process = null;
+    }
+}
+
+// ============================================================================
+// Executor Pool
+// ============================================================================
+
+function cacheKey(strategy: { id: string; version: number }): string {
+    return `${strategy.id}@${strategy.version}`;
+}
+
+/**
+ * Pool of warm Python executor processes
+ * Runs are dispatched to idle workers, preferring a worker that already
+ * has the strategy version compiled so each version is only compiled on
+ * as few workers as possible. Workers that report they are over their
+ * memory cap are restarted after their run.
+ */
+export class ExecutorPool implements StrategyRunner {
+    private workers: PythonExecutor[];
+    private idle: PythonExecutor[];
+    private cached = new Map<PythonExecutor, Set<string>>();
+    private waiting: Array<{ key: string; resolve: (worker: PythonExecutor) => void }> = [];
+
+    constructor(config: Partial<ExecutorPoolConfig> = {}) {
+        const size = Math.max(1, config.size ?? DEFAULT_POOL_SIZE);
+        this.workers = Array.from({ length: size }, () => new PythonExecutor(config));
+        this.idle = [...this.workers];
+        this.workers.forEach(w => this.cached.set(w, new Set()));
+    }
+
+    get size(): number {
+        return this.workers.length;
+    }
+
+    get idleCount(): number {
+        return this.idle.length;
+    }
+
+    private acquire(key: string): Promise<PythonExecutor> {
+        if (this.idle.length === 0) {
+            return new Promise(resolve => this.waiting.push({ key, resolve }));
+        }
+
+        const index = this.idle.findIndex(w => this.cached.get(w)!.has(key));
+        const [worker] = this.idle.splice(index >= 0 ? index : 0, 1);
+        return Promise.resolve(worker);
+    }
+
+    private release(worker: PythonExecutor): void {
+        if (this.waiting.length === 0) {
+            this.idle.push(worker);
+            return;
+        }
+
+        // Hand the worker to a waiter that has its strategy cached there, if any
+        const cached = this.cached.get(worker)!;
+        const index = this.waiting.findIndex(w => cached.has(w.key));
+        const [next] = this.waiting.splice(index >= 0 ? index : 0, 1);
+        next.resolve(worker);
+    }
+
+    async run(strategy: StrategyDefinition, context: StrategyContext): Promise<ExecutorRunResult> {
+        const key = cacheKey(strategy);
+        const worker = await this.acquire(key);
+        const cached = this.cached.get(worker)!;
+
+        try {
+            const result = await worker.run(strategy, context);
+            cached.add(key);
+            result.evicted.forEach(k => cached.delete(k));
+
+            if (result.recycle) {
+                worker.shutdown();
+                cached.clear();
+            }
+            return result;
+        } catch (error) {
+            // The worker restarts lazily and comes back with an empty cache
+            if (!worker.isRunning) {
+                cached.clear();
+            }
+            throw error;
+        } finally {
+            this.release(worker);
+        }
+    }
+
+    /**
+     * Stop every worker process
+     */
+    shutdown(): void {
+        this.workers.forEach(w => w.shutdown());
+        this.cached.forEach(c => c.clear());
+    }
+}
+
+// Keep one warm pool per server instance
+let sharedPool: ExecutorPool | null = null;
+
+export function getExecutorPool(): ExecutorPool {
+    if (!sharedPool) {
+        sharedPool = new ExecutorPool();
+    }
+    return sharedPool;
+}
+
+// ============================================================================
+// Strategy Execution
+// ============================================================================
+
+function toContextPosition(p: PositionInfo): StrategyContext['positions'][number] {
+    return {
+        market_id: p.marketId,
+        token_id: p.tokenId,
+        size: p.size,
+        avg_entry_price: p.avgEntryPrice,
+        current_price: p.currentPrice,
+        realized_pnl: p.realizedPnl,
+        unrealized_pnl: p.unrealizedPnl,
+    };
+}
+
+function toContextMarket(marketId: string, m: MarketState): StrategyContext['market_data'][string] {
+    return {
+        market_id: m.marketId || marketId,
+        token_id: m.tokenId,
+        bid: m.bid,
+        ask: m.ask,
+        midpoint: m.midpoint,
+        spread: m.spread,
+        volume: m.volume,
+        last_price: m.lastPrice,
+    };
+}
+
+/**
+ * Snapshot the user's risk limits once per run so the executor can check
+ * the whole batch of proposed orders without a round trip per order
+ */
+export async function buildRiskSnapshot(broker: Broker): Promise<RiskSnapshot | undefined> {
+    const today = new Date();
+    today.setHours(0, 0, 0, 0);
+
+    const [riskConfig, ordersLastMinute, todayOrders] = await Promise.all([
+        prisma.riskConfig.findUnique({ where: { userId: broker.userId } }),
+        prisma.order.count({
+            where: {
+                userId: broker.userId,
+                mode: broker.mode,
+                createdAt: { gte: new Date(Date.now() - 60000) },
+            },
+        }),
+        prisma.order.findMany({
+            where: {
+                userId: broker.userId,
+                mode: broker.mode,
+                status: 'FILLED',
+                filledAt: { gte: today },
+            },
+            select: { side: true, filledSize: true, filledPrice: true, fees: true },
+        }),
+    ]);
+
+    if (!riskConfig) {
+        return undefined;
+    }
+
+    const todayPnl = todayOrders.reduce((sum, o) => {
+        const value = o.filledSize * (o.filledPrice || 0);
+        return o.side === 'SELL' ? sum + value - o.fees : sum - value - o.fees;
+    }, 0);
+
+    return {
+        max_orders_per_minute: riskConfig.maxOrdersPerMinute,
+        max_daily_loss: riskConfig.maxDailyLoss,
+        max_position_size: riskConfig.maxPositionSize,
+        max_total_exposure: riskConfig.maxTotalExposure,
+        kill_switch_active: riskConfig.killSwitchActive,
+        kill_switch_reason: riskConfig.killSwitchReason,
+        orders_last_minute: ordersLastMinute,
+        today_pnl: todayPnl,
+    };
+}
+
+/**
+ * Build the strategy context from broker state. Markets present in a
+ * shared snapshot (cron fan-out) are taken from it instead of fetched.
+ */
+export async function buildContext(
+    broker: Broker,
+    marketIds: string[],
+    parameters: Record<string, unknown>,
+    snapshot?: MarketSnapshot
+): Promise<StrategyContext> {
+    // Markets covered by a shared snapshot are not fetched again, including
+    // ones whose shared fetch failed (they are left out of the context)
+    const missing = snapshot
+        ? marketIds.filter(id => !(id in snapshot.marketData) && !(id in snapshot.errors))
+        : marketIds;
+    const polymarket = createClient();
+    const [positions, balance, marketStates, books, risk] = await Promise.all([
+        broker.getPositions(),
+        broker.getBalance(),
+        Promise.all(missing.map(id => broker.getMarketState(id))),
+        // Full-depth books for sdk.MarketData.orderbook; a failed fetch
+        // just leaves that market without a book
+        Promise.all(missing.map(id => polymarket.getOrderBook(id).catch(() => null))),
+        buildRiskSnapshot(broker),
+    ]);
+
+    const marketData: StrategyContext['market_data'] = {};
+    const orderbooks: Record<string, OrderBook> = {};
+    if (snapshot) {
+        for (const id of marketIds) {
+            const market = snapshot.marketData[id];
+            if (market) {
+                marketData[id] = market;
+                orderbooks[id] = snapshot.orderbooks[id];
+            }
+        }
+    }
+    missing.forEach((id, i) => {
+        marketData[id] = toContextMarket(id, marketStates[i]);
+        const book = books[i];
+        if (book) {
+            orderbooks[id] = book;
+        }
+    });
+
+    return {
+        mode: broker.mode,
+        positions: positions.map(toContextPosition),
+        balance: balance.available,
+        market_data: marketData,
+        orderbooks,
+        risk,
+        parameters: { market_ids: marketIds, ...parameters },
+    };
+}
+
+/**
+ * Execute a strategy through the Python executor and submit the
+ * approved orders to the broker
+ */
+export async function executeStrategy(
+    strategy: StrategyDefinition & { marketIds: string[] },
+    broker: Broker,
+    runParameters: Record<string, unknown> = {},
+    executor: StrategyRunner = getExecutorPool(),
+    snapshot?: MarketSnapshot
+): Promise<{
+    metrics: Record<string, number>;
+    logs: string;
+    ordersPlaced: number;
+}> {
+    const logs: string[] = [];
+    const log = (message: string) => logs.push(`[${new Date().toISOString()}] ${message}`);
+
+    log('Strategy execution started');
+    log(`Mode: ${broker.mode}`);
+
+    const canTrade = await broker.canTrade();
+    if (!canTrade.allowed) {
+        log(`Trading not allowed: ${canTrade.reason}`);
+        return {
+            metrics: { ordersPlaced: 0, pnl: 0 },
+            logs: logs.join('\n'),
+            ordersPlaced: 0,
+        };
+    }
+
+    const parameters = { ...strategy.parameters, ...runParameters };
+    const context = await buildContext(broker, strategy.marketIds, parameters, snapshot);
+    log(`Context: ${context.positions.length} positions, ${Object.keys(context.market_data).length} markets, balance $${context.balance.toFixed(2)}`);
+
+    const result = await executor.run({ ...strategy, parameters }, context);
+    result.logs.forEach(line => log(line));
+    result.rejected.forEach(r => log(`Order rejected: ${r.reason}`));
+
+    let ordersPlaced = 0;
+    let ordersFailed = 0;
+    for (const order of result.approved) {
+        const placed = await broker.placeOrder({
+            marketId: order.market_id,
+            tokenId: order.token_id,
+            side: order.side,
+            type: order.type,
+            size: order.size,
+            price: order.price ?? undefined,
+        });
+        if (placed.success) {
+            ordersPlaced++;
+        } else {
+            ordersFailed++;
+            log(`Order failed: ${placed.error}`);
+        }
+    }
+
+    const timings = Object.entries(result.timings)
+        .map(([phase, ms]) => `${phase}=${ms.toFixed(2)}ms`)
+        .join(' ');
+    const start = result.cold_start ? ' (cold start)' : result.reinitialized ? ' (reinitialized)' : '';
+    log(`Executor timings: ${timings}${start}`);
+    log('Strategy execution completed');
+
+    return {
+        metrics: {
+            ordersProposed: result.proposed.length,
+            ordersRejected: result.rejected.length,
+            ordersPlaced,
+            ordersFailed,
+            positionsOpen: context.positions.length,
+            balanceAvailable: context.balance,
+            executorMs: result.timings.total ?? 0,
+        },
+        logs: logs.join('\n'),
+        ordersPlaced,
+    };
+}
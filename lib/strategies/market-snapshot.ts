@@ -0,0 +1,122 @@
+import { createClient, PolymarketClient } from '@/lib/polymarket/client';
+import { OrderBook } from '@/lib/polymarket/types';
+import type { StrategyContext } from './executor';
+
+// ============================================================================
+// Types
+// ============================================================================
+
+export type ContextMarket = StrategyContext['market_data'][string];
+
+/**
+ * Market data fetched once per cron tick and shared by every strategy run
+ * in it. Entries are frozen: strategies receive references to the same
+ * objects, so none of them may mutate what another one reads.
+ */
+export interface MarketSnapshot {
+    fetchedAt: Date;
+    marketData: Readonly<Record<string, Readonly<ContextMarket>>>;
+    orderbooks: Readonly<Record<string, Readonly<OrderBook>>>;
+    /** Markets whose book could not be fetched or has an empty side, with the reason */
+    errors: Readonly<Record<string, string>>;
+    /** Number of CLOB requests made to build the snapshot */
+    requests: number;
+}
+
+const DEFAULT_CONCURRENCY = 16;
+
+// ============================================================================
+// Snapshot
+// ============================================================================
+
+/**
+ * Context market entry derived from a full book, so one /book request
+ * covers bid, ask, midpoint and spread. An empty side is NaN, as are the
+ * midpoint and spread, so the binary context codec writes it as NaN and
+ * MarketStateBatch hides the market instead of quoting it at 0 or 1.
+ */
+export function marketFromBook(tokenId: string, book: OrderBook): ContextMarket {
+    // Best levels by price rather than by position: the CLOB does not
+    // return the best level first on both sides
+    let bid = NaN;
+    for (const level of book.bids) {
+        const price = parseFloat(level.price);
+        if (parseFloat(level.size) > 0 && !(price <= bid)) bid = price;
+    }
+    let ask = NaN;
+    for (const level of book.asks) {
+        const price = parseFloat(level.price);
+        if (parseFloat(level.size) > 0 && !(price >= ask)) ask = price;
+    }
+    return {
+        market_id: tokenId,
+        token_id: tokenId,
+        bid,
+        ask,
+        midpoint: (bid + ask) / 2,
+        spread: ask - bid,
+        volume: 0,
+    };
+}
+
+/**
+ * Why a book cannot be quoted, or null when both sides have a level
+ */
+function emptySides(market: ContextMarket): string | null {
+    const empty = [Number.isNaN(market.bid) && 'bids', Number.isNaN(market.ask) && 'asks'].filter(Boolean);
+    return empty.length ? `Order book has no ${empty.join(' or ')}` : null;
+}
+
+/**
+ * Fetch each market's book once, at most `concurrency` requests at a time
+ */
+export async function fetchMarketSnapshot(
+    marketIds: Iterable<string>,
+    options: { client?: PolymarketClient; concurrency?: number } = {}
+): Promise<MarketSnapshot> {
+    const client = options.client ?? createClient();
+    const ids = [...new Set(marketIds)];
+    const concurrency = Math.max(1, options.concurrency ?? DEFAULT_CONCURRENCY);
+
+    const marketData: Record<string, Readonly<ContextMarket>> = {};
+    const orderbooks: Record<string, Readonly<OrderBook>> = {};
+    const errors: Record<string, string> = {};
+
+    let next = 0;
+    const worker = async () => {
+        while (next < ids.length) {
+            const id = ids[next++];
+            try {
+                const book = await client.getOrderBook(id);
+                orderbooks[id] = Object.freeze(book);
+                // Listed in errors rather than sent as NaN, which JSON turns into null
+                const market = marketFromBook(id, book);
+                const empty = emptySides(market);
+                if (empty) errors[id] = empty;
+                else marketData[id] = Object.freeze(market);
+            } catch (error) {
+                errors[id] = error instanceof Error ? error.message : 'Unknown error';
+            }
+        }
+    };
+    await Promise.all(Array.from({ length: Math.min(concurrency, ids.length) }, worker));
+
+    return Object.freeze({
+        fetchedAt: new Date(),
+        marketData: Object.freeze(marketData),
+        orderbooks: Object.freeze(orderbooks),
+        errors: Object.freeze(errors),
+        requests: ids.length,
+    });
+}
+
+/**
+ * Union of the market ids watched by a set of strategies
+ */
+export function uniqueMarketIds(strategies: Array<{ marketIds: string[] }>): string[] {
+    const ids = new Set<string>();
+    for (const strategy of strategies) {
+        for (const id of strategy.marketIds) ids.add(id);
+    }
+    return [...ids];
+}
@@ -1,4 +1,5 @@
 import { z } from 'zod';
+import { CronSchedule } from '@/lib/strategies/cron';
 
 // ============================================================================
 // Auth Schemas
@@ -51,6 +52,17 @@ export const strategySchema = z.object({
     marketIds: z.array(z.string()).optional(),
     schedule: z.string()
         .regex(/^(\*|[0-9,\-\/]+)\s+(\*|[0-9,\-\/]+)\s+(\*|[0-9,\-\/]+)\s+(\*|[0-9,\-\/]+)\s+(\*|[0-9,\-\/]+)$/, 'Invalid cron expression')
+        .superRefine((expression, ctx) => {
+            // Ranges, and schedules that can never fire (e.g. Feb 30)
+            try {
+                CronSchedule.parse(expression).nextAfter(new Date());
+            } catch (error) {
+                ctx.addIssue({
+                    code: 'custom',
+                    message: error instanceof Error ? error.message : 'Invalid cron expression',
+                });
+            }
+        })
         .optional()
         .nullable(),
     isActive: z.boolean().optional(),
@@ -0,0 +1 @@
+"""Benchmarks for the Python runtime (`python -m benchmarks.<name>`)"""
@@ -0,0 +1,68 @@
+"""
+Benchmark duplicate CLOB fetches when several strategies run at once.
+
+Each strategy watches `--markets` tokens drawn from a shared set of
+`--unique` tokens, and all of them fetch their books concurrently
+through one MarketFetcher against a local stub (benchmarks.runtime).
+Compares one request per caller with single-flight fetches, both as
+/book fan-out and as batched POST /books:
+
+    python -m benchmarks.client --strategies 8 --markets 50 --unique 100
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from collections import Counter
+
+from executor import HttpPool, MarketFetcher
+
+from .runtime import start_stub
+
+
+async def run(args: argparse.Namespace, coalesce: bool, multi_book: bool) -> None:
+    hits: Counter = Counter()
+    server, url = await start_stub(args.latency_ms / 1000, hits, multi_book)
+    rng = random.Random(7)
+    tokens = [str(10**20 + i) for i in range(args.unique)]
+    watched = [rng.sample(tokens, min(args.markets, args.unique)) for _ in range(args.strategies)]
+
+    async with HttpPool(max_per_host=args.concurrency) as pool:
+        fetcher = MarketFetcher(pool, url, args.concurrency)
+        fetcher.clob.coalesce = coalesce
+        started = time.perf_counter()
+        snapshots = await asyncio.gather(*(fetcher.fetch(ids) for ids in watched))
+        elapsed = (time.perf_counter() - started) * 1000
+
+    server.close()
+    await server.wait_closed()
+
+    books = {key: n for key, n in hits.items() if isinstance(key, tuple)}
+    requests = sum(n for key, n in hits.items() if isinstance(key, str))
+    errors = sum(len(s.errors) for s in snapshots)
+    mode = f"{'single-flight' if coalesce else 'per caller'}, {'batched' if multi_book else 'fan-out'}"
+    print(f"  {mode:24} {requests:9,} {sum(books.values()):7,} "
+          f"{sum(books.values()) - len(books):10,} {hits[None]:12,} {elapsed:9.1f} ms  ({errors} errors)")
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    print(f"{args.strategies} strategies x {args.markets} markets from {args.unique} unique, "
+          f"{args.latency_ms:g} ms per request")
+    print(f"  {'':24} {'requests':>9} {'books':>7} {'duplicate':>10} {'connections':>12} {'elapsed':>12}")
+    for coalesce, multi_book in ((False, False), (True, False), (True, True)):
+        await run(args, coalesce, multi_book)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.client")
+    parser.add_argument("--strategies", type=int, default=8)
+    parser.add_argument("--markets", type=int, default=50)
+    parser.add_argument("--unique", type=int, default=100)
+    parser.add_argument("--latency-ms", type=float, default=40.0)
+    parser.add_argument("--concurrency", type=int, default=16)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark receiving a run's context in the executor.
+
+Compares, per received frame:
+  json     json.loads of the context, then the executor's MarketState dicts
+  binary   decode_context(...).to_dict(): NumPy views plus a MarketStateBatch
+
+and, for each, reading every market's midpoint once, row by row (what
+an on_tick loop over market_data does) and, for the batch, as one column:
+
+    python -m benchmarks.context --markets 10000 --positions 100
+"""
+
+import argparse
+import json
+import time
+from typing import Any, Callable, Dict, Tuple
+
+from executor import decode_context, encode_context
+from executor.runner import _market_state
+
+
+def make_context(markets: int, positions: int) -> Dict[str, Any]:
+    ids = [f"0x{i:064x}" for i in range(markets)]
+    market_data = {
+        m: {"market_id": m, "token_id": str(10**76 + i), "bid": 0.40, "ask": 0.42, "midpoint": 0.41,
+            "spread": 0.02, "volume": 1000.0 + i, "last_price": 0.41 if i % 2 else None}
+        for i, m in enumerate(ids)
+    }
+    return {
+        "mode": "PAPER",
+        "balance": 10_000.0,
+        "market_data": market_data,
+        "positions": [
+            {"market_id": ids[i], "token_id": str(10**76 + i), "size": 10.0, "avg_entry_price": 0.40,
+             "current_price": 0.41, "realized_pnl": 0.0, "unrealized_pnl": 0.1}
+            for i in range(min(positions, markets))
+        ],
+        "parameters": {"market_ids": ids[:10]},
+    }
+
+
+def decoders(context: Dict[str, Any]) -> Dict[str, Tuple[int, Callable[[], Any]]]:
+    text = json.dumps(context, separators=(",", ":")).encode("utf-8")
+    blob = encode_context(context)
+
+    def from_json():
+        data = json.loads(text)
+        data["market_data"] = {m: _market_state(m, d) for m, d in data["market_data"].items()}
+        return data
+
+    return {
+        "json": (len(text), from_json),
+        "binary": (len(blob), lambda: decode_context(blob).to_dict()),
+    }
+
+
+def timed(fn: Callable[[], Any], repeat: int) -> Tuple[float, Any]:
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, (time.perf_counter() - started) * 1000)
+    return best, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--markets", type=int, default=10_000)
+    parser.add_argument("--positions", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    context = make_context(args.markets, args.positions)
+    print(f"context for {args.markets:,} markets, {args.positions:,} positions")
+    print(f"  {'':8} {'bytes':>10} {'decode':>10} {'read rows':>10} {'column':>10}")
+    for name, (size, decode) in decoders(context).items():
+        decode_ms, decoded = timed(decode, args.repeat)
+        market_data = decoded["market_data"]
+        read_ms, _ = timed(lambda: [m.midpoint for m in market_data.values()], args.repeat)
+        column = f"{timed(lambda: market_data.midpoint.sum(), args.repeat)[0]:8.3f}ms" if name == "binary" else "-"
+        print(f"  {name:8} {size:10,} {decode_ms:8.3f}ms {read_ms:8.3f}ms {column:>10}")
+
+
+if __name__ == "__main__":
+    main()
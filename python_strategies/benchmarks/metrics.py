@@ -0,0 +1,53 @@
+"""
+Benchmark calculate_metrics on synthetic fills and positions.
+
+    python -m benchmarks.metrics --fills 1000000
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from simulation.metrics import FILL_DTYPE, MS_PER_DAY, POSITION_DTYPE, calculate_metrics
+
+
+def synthetic(n_fills: int, n_positions: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    span = 365 * MS_PER_DAY
+
+    fills = np.empty(n_fills, dtype=FILL_DTYPE)
+    fills["timestamp"] = np.sort(rng.integers(0, span, n_fills))
+    fills["market"] = rng.integers(0, 500, n_fills)
+    fills["side"] = rng.choice([1, -1], n_fills)
+    fills["size"] = rng.uniform(1, 20, n_fills)
+    fills["price"] = rng.uniform(0.05, 0.95, n_fills)
+    fills["fee"] = fills["size"] * fills["price"] * 0.006
+
+    positions = np.zeros(n_positions, dtype=POSITION_DTYPE)
+    positions["opened_at"] = rng.integers(0, span, n_positions)
+    positions["closed_at"] = positions["opened_at"] + rng.integers(0, 5 * MS_PER_DAY, n_positions)
+    positions["realized_pnl"] = rng.normal(0, 5, n_positions)
+    return fills, positions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--fills", type=int, default=1_000_000)
+    parser.add_argument("--positions", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    fills, positions = synthetic(args.fills, args.positions)
+    timings = []
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        calculate_metrics(fills, positions)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    print(f"calculate_metrics: {args.fills:,} fills, {args.positions:,} positions")
+    print(f"  best {min(timings):.1f} ms, median {float(np.median(timings)):.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Benchmark request pacing against a rate-limited CLOB stub.
+
+The stub allows `--limit` requests per `--window-ms` window and answers
+the rest with 429 and a Retry-After for the end of the window. All
+requests are issued at once through ClobApi and compared:
+
+  retry      no limiter; 429s are retried after Retry-After (withRetry)
+  bucket     RateLimiter at 90% of the stub's sustainable rate
+  learned    RateLimiter configured at 3x that rate, learning from 429s
+
+    python -m benchmarks.ratelimit --requests 200 --limit 20 --window-ms 500
+"""
+
+import argparse
+import asyncio
+import time
+from typing import List, Optional, Tuple
+
+from executor import ClobApi, HttpPool, PolymarketError, RateLimiter
+
+
+async def start_limited_stub(limit: int, window: float) -> Tuple[asyncio.AbstractServer, str, List[int]]:
+    """Fixed-window limited /book stub; the list collects response statuses"""
+    statuses: List[int] = []
+    epoch = time.monotonic()
+    counts = {}
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                await reader.readuntil(b"\r\n\r\n")
+                elapsed = time.monotonic() - epoch
+                current = int(elapsed // window)
+                counts[current] = counts.get(current, 0) + 1
+                if counts[current] > limit:
+                    retry_after = (current + 1) * window - elapsed
+                    body = b'{"error": "rate limited"}'
+                    head = b"HTTP/1.1 429 Too Many Requests\r\nRetry-After: %.3f\r\n" % retry_after
+                    statuses.append(429)
+                else:
+                    body = b'{"bids": [], "asks": []}'
+                    head = b"HTTP/1.1 200 OK\r\n"
+                    statuses.append(200)
+                writer.write(head + b"Content-Length: %d\r\n\r\n%s" % (len(body), body))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, asyncio.CancelledError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    return server, f"http://127.0.0.1:{port}", statuses
+
+
+async def run(args: argparse.Namespace, mode: str, sustainable: float) -> None:
+    server, url, statuses = await start_limited_stub(args.limit, args.window_ms / 1000)
+    limiter: Optional[RateLimiter] = None
+    if mode != "retry":
+        # Configured just under the stub's limit, as DEFAULT_LIMITS sits under Polymarket's
+        rate = 0.9 * sustainable if mode == "bucket" else 3 * sustainable
+        limiter = RateLimiter({"books": (rate, args.limit / 2)}, recover_seconds=args.recover_seconds)
+
+    done: List[float] = []
+    async with HttpPool(max_per_host=args.concurrency) as pool:
+        clob = ClobApi(url, pool, max_retries=args.max_retries, coalesce=False, limiter=limiter)
+        started = time.perf_counter()
+
+        async def one(i: int) -> None:
+            try:
+                await clob.get_order_book(str(i))
+                done.append(time.perf_counter() - started)
+            except PolymarketError:
+                pass
+
+        await asyncio.gather(*(one(i) for i in range(args.requests)))
+        elapsed = time.perf_counter() - started
+
+    server.close()
+    await server.wait_closed()
+
+    done.sort()
+    stall = max((b - a for a, b in zip(done, done[1:])), default=0.0)
+    rate = f"{limiter.bucket('books').rate():7.1f}/s" if limiter else "-"
+    print(f"  {mode:8} {elapsed:8.2f} s {len(done) / elapsed:8.1f}/s {statuses.count(429):6} "
+          f"{stall * 1000:9.0f} ms {len(done):5}/{args.requests} {rate:>9}")
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    sustainable = args.limit / (args.window_ms / 1000)
+    print(f"{args.requests} requests, stub allows {args.limit} per {args.window_ms:g} ms ({sustainable:g}/s)")
+    print(f"  {'':8} {'elapsed':>10} {'rate':>10} {'429s':>6} {'max stall':>12} {'ok':>9} {'end rate':>9}")
+    for mode in ("retry", "bucket", "learned"):
+        await run(args, mode, sustainable)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.ratelimit")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--window-ms", type=float, default=500.0)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--max-retries", type=int, default=20)
+    parser.add_argument("--recover-seconds", type=float, default=5.0)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
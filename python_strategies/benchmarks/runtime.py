@@ -0,0 +1,124 @@
+"""
+Benchmark one strategy cycle's market data fetch against a local CLOB stub.
+
+The stub answers /book, POST /books and /midpoint after a fixed
+latency over keep-alive HTTP/1.1. Compares fetching markets one after
+another (as the broker loop does) with MarketFetcher's concurrent
+/book fan-out and its batched POST /books fetch:
+
+    python -m benchmarks.runtime --markets 50 --latency-ms 40
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from collections import Counter
+from typing import List, Optional, Tuple
+
+from executor import HttpPool, MarketFetcher
+
+
+def book_payload(token_id: str) -> dict:
+    return {
+        "market": f"0x{abs(hash(token_id)) % 16**8:08x}",
+        "asset_id": token_id,
+        "hash": token_id,
+        "bids": [{"price": f"{0.40 + i / 100:.2f}", "size": "100"} for i in range(5)],
+        "asks": [{"price": f"{0.50 + i / 100:.2f}", "size": "100"} for i in range(5)],
+    }
+
+
+async def start_stub(
+    latency: float,
+    hits: Optional[Counter] = None,
+    multi_book: bool = True,
+) -> Tuple[asyncio.AbstractServer, str]:
+    """
+    Local CLOB stub for /book, POST /books (404 unless `multi_book`) and
+    /midpoint. `hits` counts requests per target, books served per
+    ("book", token_id) and connections under None.
+    """
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        if hits is not None:
+            hits[None] += 1
+        try:
+            while True:
+                request = await reader.readuntil(b"\r\n\r\n")
+                target = request.split(b" ", 2)[1].decode()
+                length = 0
+                for line in request.split(b"\r\n"):
+                    if line.lower().startswith(b"content-length:"):
+                        length = int(line.split(b":", 1)[1])
+                payload = await reader.readexactly(length) if length else b""
+                if hits is not None:
+                    hits[target] += 1
+                await asyncio.sleep(latency)
+
+                status, tokens = b"200 OK", []
+                if target == "/books" and multi_book:
+                    tokens = [entry["token_id"] for entry in json.loads(payload)]
+                    body = json.dumps([book_payload(token_id) for token_id in tokens]).encode()
+                elif target.startswith("/book?"):
+                    tokens = [target.rsplit("=", 1)[-1]]
+                    body = json.dumps(book_payload(tokens[0])).encode()
+                elif target.startswith("/midpoint"):
+                    body = b'{"mid": "0.45"}'
+                else:
+                    status, body = b"404 Not Found", b'{"error": "not found"}'
+                if hits is not None:
+                    hits.update(("book", token_id) for token_id in tokens)
+                writer.write(b"HTTP/1.1 %s\r\nContent-Type: application/json\r\n"
+                             b"Content-Length: %d\r\n\r\n%s" % (status, len(body), body))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, asyncio.CancelledError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    return server, f"http://127.0.0.1:{port}"
+
+
+async def fetch_all(args: argparse.Namespace, ids: List[str], mode: str) -> None:
+    hits: Counter = Counter()
+    server, url = await start_stub(args.latency_ms / 1000, hits, multi_book=mode == "batched")
+
+    async with HttpPool(max_per_host=args.concurrency) as pool:
+        fetcher = MarketFetcher(pool, url, args.concurrency)
+        started = time.perf_counter()
+        if mode == "serial":
+            for token_id in ids:
+                await fetcher.fetch_market(token_id)
+            markets, errors = len(ids), 0
+        else:
+            snapshot = await fetcher.fetch(ids)
+            markets, errors = len(snapshot.market_data), len(snapshot.errors)
+        elapsed = (time.perf_counter() - started) * 1000
+
+    server.close()
+    await server.wait_closed()
+
+    requests = sum(n for target, n in hits.items() if isinstance(target, str))
+    print(f"  {mode:10} {elapsed:9.1f} ms  {requests:5} requests over {hits[None]} connections  "
+          f"({markets} markets, {errors} errors)")
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    ids = [str(10**20 + i) for i in range(args.markets)]
+    print(f"{args.markets} markets, {args.latency_ms:g} ms per request, concurrency {args.concurrency}")
+    for mode in ("serial", "fan-out", "batched"):
+        await fetch_all(args, ids, mode)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.runtime")
+    parser.add_argument("--markets", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=40.0)
+    parser.add_argument("--concurrency", type=int, default=16)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
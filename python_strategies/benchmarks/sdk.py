@@ -0,0 +1,85 @@
+"""
+Benchmark building strategy market data for many markets.
+
+Compares, per context build:
+  dicts      one dict per market (the executor/backtester context before batching)
+  dataclass  one MarketState per market with a per-instance __dict__
+  slots      one slotted MarketState per market
+  batch      one MarketStateBatch over NumPy columns, building its index
+  shared     the same, reusing an index built once for these markets
+             (as batches over an unchanged market set can)
+
+    python -m benchmarks.sdk --markets 5000
+"""
+
+import argparse
+import time
+import tracemalloc
+from dataclasses import fields, make_dataclass
+from typing import Any, Callable, Dict
+
+import numpy as np
+
+from sdk import MarketState, MarketStateBatch
+
+# MarketState as it was before slots, for comparison
+LegacyMarketState = make_dataclass("LegacyMarketState", [(f.name, f.type, f.default) for f in fields(MarketState)])
+
+
+def builders(n: int) -> Dict[str, Callable[[], Any]]:
+    rng = np.random.default_rng(0)
+    ids = [f"0x{i:064x}" for i in range(n)]
+    tokens = [str(10**20 + i) for i in range(n)]
+    bid = rng.uniform(0.05, 0.9, n)
+    ask = bid + 0.01
+    volume = rng.uniform(0, 1e6, n)
+    index = {m: i for i, m in enumerate(ids)}
+    bid_list, ask_list, volume_list = bid.tolist(), ask.tolist(), volume.tolist()
+
+    def rows():
+        return zip(ids, tokens, bid_list, ask_list, volume_list)
+
+    return {
+        "dicts": lambda: {
+            m: {"market_id": m, "token_id": t, "bid": b, "ask": a, "midpoint": (b + a) / 2,
+                "spread": a - b, "volume": v, "last_price": None}
+            for m, t, b, a, v in rows()
+        },
+        "dataclass": lambda: {m: LegacyMarketState(m, t, b, a, (b + a) / 2, a - b, v) for m, t, b, a, v in rows()},
+        "slots": lambda: {m: MarketState(m, t, b, a, (b + a) / 2, a - b, v) for m, t, b, a, v in rows()},
+        "batch": lambda: MarketStateBatch(ids, tokens, bid, ask, volume),
+        "shared": lambda: MarketStateBatch(ids, tokens, bid, ask, volume, index=index),
+    }
+
+
+def measure(build: Callable[[], Any], repeat: int):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        build()
+        timings.append((time.perf_counter() - started) * 1000)
+
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics("filename"))
+    tracemalloc.stop()
+    del result
+    return min(timings), current / 1024, blocks
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--markets", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"market data for {args.markets:,} markets")
+    print(f"  {'':10} {'time':>10} {'retained':>12} {'blocks':>8}")
+    for name, build in builders(args.markets).items():
+        ms, kib, blocks = measure(build, args.repeat)
+        print(f"  {name:10} {ms:8.3f}ms {kib:10.1f}KiB {blocks:8,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,8 @@
+"""
+pytest configuration for python_strategies.
+
+Its presence puts this directory on sys.path, so the tests import `sdk`,
+`executor` and `simulation` as the executor process does:
+
+    cd python_strategies && python -m pytest
+"""
@@ -21,11 +21,12 @@ _last_prices = {}
 
 def initialize(config: dict) -> None:
     """Initialize market maker strategy"""
-    global SPREAD_PERCENT, ORDER_SIZE, MAX_POSITION
+    global SPREAD_PERCENT, ORDER_SIZE, MAX_POSITION, REFRESH_THRESHOLD
     
     SPREAD_PERCENT = config.get('spread_percent', SPREAD_PERCENT)
     ORDER_SIZE = config.get('order_size', ORDER_SIZE)
     MAX_POSITION = config.get('max_position', MAX_POSITION)
+    REFRESH_THRESHOLD = config.get('refresh_threshold', REFRESH_THRESHOLD)
     
     log(f"Market Maker initialized: spread={SPREAD_PERCENT}, size={ORDER_SIZE}")
 
@@ -0,0 +1,101 @@
+"""
+Strategy Executor for PolyTrader
+
+Runs Python strategies written against the SDK in a long-lived process.
+Strategies are compiled once and kept warm; each run receives a context
+over a framed stdin/stdout channel and returns the proposed and
+risk-checked orders together with per-phase timings.
+
+Usage:
+    cd python_strategies && python -m executor [--max-strategies N] [--max-memory-mb MB]
+"""
+
+import importlib
+
+from .cache import StrategyCache
+from .codec import BinaryContext, CodecError, decode_context, encode_context
+from .loader import LoadedStrategy, StrategyLoadError, load_strategy, wrap_module
+from .protocol import ProtocolError, encode_frame, read_frame, write_frame
+from .risk import RiskEngine, RiskSnapshot
+from .runner import StrategyExecutor, StrategyNotLoadedError
+from .scheduler import CronError, CronSchedule, StrategyScheduler
+from .server import ExecutorServer
+
+# The network clients import asyncio, ssl and the HTTP stack, which the
+# stdin/stdout server never uses; they load on first access instead.
+_LAZY = {
+    "HttpError": "http",
+    "HttpPool": "http",
+    "MarketMetadataCache": "metadata",
+    "ClobApi": "polymarket",
+    "DataApi": "polymarket",
+    "GammaApi": "polymarket",
+    "OrderError": "polymarket",
+    "PolymarketClient": "polymarket",
+    "PolymarketError": "polymarket",
+    "RateLimitError": "polymarket",
+    "SingleFlight": "polymarket",
+    "RateLimiter": "ratelimit",
+    "TokenBucket": "ratelimit",
+    "AsyncStrategyRuntime": "runtime",
+    "MarketFetcher": "runtime",
+    "MarketSnapshot": "runtime",
+    "TokenIndex": "tokens",
+    "TokenInfo": "tokens",
+}
+
+
+def __getattr__(name: str):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
+
+
+__all__ = [
+    "AsyncStrategyRuntime",
+    "BinaryContext",
+    "ClobApi",
+    "CodecError",
+    "CronError",
+    "CronSchedule",
+    "DataApi",
+    "ExecutorServer",
+    "GammaApi",
+    "HttpError",
+    "HttpPool",
+    "LoadedStrategy",
+    "MarketFetcher",
+    "MarketMetadataCache",
+    "MarketSnapshot",
+    "OrderError",
+    "PolymarketClient",
+    "PolymarketError",
+    "ProtocolError",
+    "RateLimitError",
+    "RateLimiter",
+    "RiskEngine",
+    "RiskSnapshot",
+    "SingleFlight",
+    "StrategyCache",
+    "StrategyExecutor",
+    "StrategyLoadError",
+    "StrategyNotLoadedError",
+    "StrategyScheduler",
+    "TokenBucket",
+    "TokenIndex",
+    "TokenInfo",
+    "decode_context",
+    "encode_context",
+    "encode_frame",
+    "load_strategy",
+    "read_frame",
+    "wrap_module",
+    "write_frame",
+]
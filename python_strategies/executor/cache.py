@@ -0,0 +1,230 @@
+"""
+Compiled strategy cache for executor workers.
+
+Strategies are cached by (strategy_id, version), matching the
+StrategyVersion table, with LRU eviction bounded by an entry count and
+by the memory the cached strategies hold. That memory is the cache's
+own estimate per entry (module state and books, see estimate_size),
+not the process RSS: the interpreter, imported libraries and freed but
+unreturned heap would otherwise count against the cap and evict every
+strategy on every run.
+"""
+
+import os
+import sys
+import types
+from collections import OrderedDict, deque
+from typing import Dict, List, Optional, Tuple
+
+from .loader import LoadedStrategy
+
+CacheKey = Tuple[str, int]
+
+DEFAULT_MAX_ENTRIES = 64
+DEFAULT_MAX_MEMORY_MB = 512.0
+# Objects visited per size estimate; bounds its cost for very large state
+DEFAULT_SIZE_WALK_LIMIT = 100_000
+
+# Code and shared objects; they are not state a strategy accumulates
+_SHARED_TYPES = (
+    types.ModuleType, type, types.FunctionType, types.BuiltinFunctionType,
+    types.MethodType, types.CodeType, types.FrameType,
+)
+
+
+def current_rss_mb() -> Optional[float]:
+    """Resident set size of this process in MB (None if unavailable)"""
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        pass
+
+    try:
+        import resource
+        # Peak RSS: KB on Linux, bytes on macOS. Good enough as a fallback.
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if peak > 1 << 32 else peak / 1024
+    except (ImportError, OSError):
+        return None
+
+
+def estimate_size(loaded: LoadedStrategy, limit: int = DEFAULT_SIZE_WALK_LIMIT) -> int:
+    """
+    Approximate bytes held by a strategy: its module globals and cached
+    books, walked through containers and instance attributes. Modules,
+    classes and functions are skipped. NumPy arrays count their data
+    when they own it.
+    """
+    stack = [v for k, v in vars(loaded.module).items() if k != "__builtins__"]
+    stack.append(loaded.books)
+    seen = set()
+    total = 0
+    while stack and len(seen) < limit:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, _SHARED_TYPES):
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj, 0)
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+            stack.extend(obj)
+        elif not isinstance(obj, (str, bytes, int, float)):
+            if hasattr(obj, "__dict__"):
+                stack.append(vars(obj))
+            for cls in type(obj).__mro__:
+                slots = getattr(cls, "__slots__", ())
+                for name in (slots,) if isinstance(slots, str) else slots:
+                    value = getattr(obj, name, None)
+                    if value is not None:
+                        stack.append(value)
+    return total
+
+
+def format_key(key: CacheKey) -> str:
+    return f"{key[0]}@{key[1]}"
+
+
+class StrategyCache:
+    """
+    LRU cache of loaded strategies.
+    Loading a new version of a strategy drops its older versions.
+    Entry sizes are estimated on put() and again on update(), after a
+    run may have grown the strategy's state.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_memory_mb: Optional[float] = DEFAULT_MAX_MEMORY_MB,
+    ) -> None:
+        self.max_entries = max(1, max_entries)
+        self.max_memory_mb = max_memory_mb
+        self._entries: "OrderedDict[CacheKey, LoadedStrategy]" = OrderedDict()
+        self._latest: Dict[str, int] = {}
+        self._sizes: Dict[CacheKey, int] = {}
+        self.memory_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: CacheKey) -> bool:
+        return key in self._entries
+
+    def latest_version(self, strategy_id: str) -> Optional[int]:
+        return self._latest.get(strategy_id)
+
+    def peek(self, key: CacheKey) -> Optional[LoadedStrategy]:
+        """Look up a strategy without touching LRU order or stats"""
+        return self._entries.get(key)
+
+    def get(self, key: CacheKey) -> Optional[LoadedStrategy]:
+        """Look up a strategy and mark it as most recently used"""
+        loaded = self._entries.get(key)
+        if loaded is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return loaded
+
+    def put(self, loaded: LoadedStrategy, size: Optional[int] = None) -> List[str]:
+        """
+        Insert a loaded strategy and enforce the limits. `size` is its
+        estimate_size(), if already measured. Returns the keys that were
+        evicted.
+        """
+        key = (loaded.strategy_id, loaded.version)
+        stale = [k for k in self._entries if k[0] == loaded.strategy_id and k != key]
+        for k in stale:
+            self._drop(k)
+        evicted = [format_key(k) for k in stale]
+
+        self._entries[key] = loaded
+        self._entries.move_to_end(key)
+        self._latest[loaded.strategy_id] = loaded.version
+        self._resize(key, size)
+
+        evicted.extend(self.enforce_limits(keep=key))
+        return evicted
+
+    def update(self, key: CacheKey, size: Optional[int] = None) -> List[str]:
+        """
+        Re-estimate an entry's size (after a run) and enforce the limits,
+        keeping that entry. Returns the keys that were evicted.
+        """
+        if key not in self._entries:
+            return []
+        self._resize(key, size)
+        return self.enforce_limits(keep=key)
+
+    def remove(self, strategy_id: str) -> bool:
+        """Drop every cached version of a strategy"""
+        keys = [k for k in self._entries if k[0] == strategy_id]
+        for k in keys:
+            self._drop(k)
+        self._latest.pop(strategy_id, None)
+        return bool(keys)
+
+    def measure(self, loaded: LoadedStrategy) -> int:
+        """estimate_size() of a strategy, or 0 without a memory cap"""
+        return estimate_size(loaded) if self.max_memory_mb is not None else 0
+
+    def _resize(self, key: CacheKey, size: Optional[int]) -> None:
+        if size is None:
+            size = self.measure(self._entries[key])
+        self.memory_bytes += size - self._sizes.get(key, 0)
+        self._sizes[key] = size
+
+    def _drop(self, key: CacheKey) -> None:
+        del self._entries[key]
+        self.memory_bytes -= self._sizes.pop(key, 0)
+
+    def _evict_oldest(self) -> CacheKey:
+        key = next(iter(self._entries))
+        self._drop(key)
+        if self._latest.get(key[0]) == key[1]:
+            del self._latest[key[0]]
+        return key
+
+    @property
+    def memory_mb(self) -> float:
+        """Estimated memory held by the cached strategies"""
+        return self.memory_bytes / (1024 * 1024)
+
+    def enforce_limits(self, keep: Optional[CacheKey] = None) -> List[str]:
+        """Evict least recently used entries (other than `keep`) until within limits"""
+        evicted: List[str] = []
+
+        while len(self._entries) > self.max_entries:
+            evicted.append(format_key(self._evict_oldest()))
+
+        if self.max_memory_mb is not None:
+            while self.over_memory() and len(self._entries) > 1 and next(iter(self._entries)) != keep:
+                evicted.append(format_key(self._evict_oldest()))
+
+        return evicted
+
+    def over_memory(self) -> bool:
+        """
+        Whether the cached strategies hold more than the memory cap. After
+        enforce_limits() this means eviction could not get below it (the
+        kept entry alone is too large), so the worker should be recycled.
+        """
+        return self.max_memory_mb is not None and self.memory_mb > self.max_memory_mb
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "entries": [format_key(k) for k in self._entries],
+            "max_entries": self.max_entries,
+            "max_memory_mb": self.max_memory_mb,
+            "memory_mb": self.memory_mb,
+            "rss_mb": current_rss_mb(),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
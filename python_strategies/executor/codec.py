@@ -0,0 +1,389 @@
+"""
+Binary encoding of a run's Context.
+
+The JSON context costs a dict per market and per position on every run.
+The binary form keeps them as fixed-layout little-endian records that
+the decoder exposes as NumPy structured-array views over the received
+frame, without copying or building per-market objects:
+
+    header      HEADER (40 bytes)
+    markets     MARKET_DTYPE x markets, sorted by market_id (UTF-8 bytes)
+    positions   POSITION_DTYPE x positions
+    offsets     uint32 x (strings + 1), padded to 8 bytes
+    strings     UTF-8 string table, padded to 8 bytes
+    extra       UTF-8 JSON: parameters, risk, orderbooks
+
+Ids are indices into the string table. Market ids come first, in the
+same order as the market records, so looking a market up is a binary
+search over the table and strings are only decoded when read. Missing
+optional numbers (last_price, current_price) and empty book sides
+(bid, ask) are NaN.
+
+market_data decodes to a MarketStateBatch, which strategies index like
+the `market_data` dict; positions decode to dicts for PositionBook.
+lib/strategies/context-codec.ts writes the same layout.
+"""
+
+import json
+import struct
+from collections.abc import Mapping as MappingABC
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Union
+
+import numpy as np
+
+from sdk import MarketStateBatch
+
+MAGIC = b"PTCX"
+VERSION = 1
+
+# magic, version, mode, markets, positions, strings, string bytes, extra bytes, reserved, balance
+HEADER = struct.Struct("<4sHHIIIIIId")
+
+MODES = ("PAPER", "LIVE", "SHADOW")  # TradingMode, in this order on both sides
+
+MARKET_DTYPE = np.dtype([
+    ("market_id", "<u4"),
+    ("token_id", "<u4"),
+    ("bid", "<f8"),
+    ("ask", "<f8"),
+    ("midpoint", "<f8"),
+    ("spread", "<f8"),
+    ("volume", "<f8"),
+    ("last_price", "<f8"),
+])
+
+POSITION_DTYPE = np.dtype([
+    ("market_id", "<u4"),
+    ("token_id", "<u4"),
+    ("size", "<f8"),
+    ("avg_entry_price", "<f8"),
+    ("current_price", "<f8"),
+    ("realized_pnl", "<f8"),
+    ("unrealized_pnl", "<f8"),
+])
+
+POSITION_FIELDS = ("size", "avg_entry_price", "current_price", "realized_pnl", "unrealized_pnl")
+
+# Context keys carried as JSON after the records
+EXTRA_KEYS = ("parameters", "risk", "orderbooks")
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+# Binary searches cost about as much as decoding this many ids into a dict
+INDEX_AFTER_LOOKUPS = 256
+
+
+class CodecError(ValueError):
+    """Malformed binary context"""
+
+
+def _pad(size: int) -> int:
+    return (size + 7) & ~7
+
+
+# ----------------------------------------------------------------------
+# Decoding
+# ----------------------------------------------------------------------
+
+
+class StringTable(Sequence):
+    """Strings decoded on first access from an offsets + UTF-8 bytes table"""
+
+    __slots__ = ("_offsets", "_data", "_text", "_cache")
+
+    def __init__(self, offsets: memoryview, data: memoryview) -> None:
+        self._offsets = offsets
+        self._data = data
+        # Ids are normally ASCII: then one decode of the whole table lets
+        # byte offsets slice the text directly
+        self._text: Optional[str] = None
+        self._cache: Dict[int, str] = {}
+
+    def raw(self, i: int) -> bytes:
+        return bytes(self._data[self._offsets[i]:self._offsets[i + 1]])
+
+    def __getitem__(self, i: int) -> str:  # type: ignore[override]
+        text = self._text
+        if text is None:
+            text = self._text = bytes(self._data).decode("utf-8")
+        if len(text) == len(self._data):
+            return text[self._offsets[i]:self._offsets[i + 1]]
+        value = self._cache.get(i)
+        if value is None:
+            value = self._cache[i] = self.raw(i).decode("utf-8")
+        return value
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def find(self, value: str, lo: int, hi: int) -> Optional[int]:
+        """Index of `value` among the sorted strings [lo, hi), or None"""
+        key = value.encode("utf-8")
+        while lo < hi:
+            mid = (lo + hi) // 2
+            probe = self.raw(mid)
+            if probe < key:
+                lo = mid + 1
+            elif probe > key:
+                hi = mid
+            else:
+                return mid
+        return None
+
+
+class _IdColumn(Sequence):
+    """A record id column read through the string table"""
+
+    __slots__ = ("_strings", "_ids")
+
+    def __init__(self, strings: StringTable, ids: np.ndarray) -> None:
+        self._strings = strings
+        self._ids = ids
+
+    def __getitem__(self, i: int) -> str:  # type: ignore[override]
+        return self._strings[int(self._ids[i])]
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+
+class _MarketIndex(MappingABC):
+    """
+    market_id -> record row; rows equal string indices. Lookups binary
+    search the string table until there have been enough of them to pay
+    for decoding every id into a dict.
+    """
+
+    __slots__ = ("_strings", "_count", "_lookups", "_dict")
+
+    def __init__(self, strings: StringTable, count: int) -> None:
+        self._strings = strings
+        self._count = count
+        self._lookups = 0
+        self._dict: Optional[Dict[str, int]] = None
+
+    def get(self, market_id: Any, default: Any = None) -> Any:
+        if self._dict is not None:
+            return self._dict.get(market_id, default)
+        if not isinstance(market_id, str):
+            return default
+        self._lookups += 1
+        if self._lookups > INDEX_AFTER_LOOKUPS:
+            strings = self._strings
+            self._dict = {strings[i]: i for i in range(self._count)}
+            return self._dict.get(market_id, default)
+        i = self._strings.find(market_id, 0, self._count)
+        return default if i is None else i
+
+    def __getitem__(self, market_id: str) -> int:
+        i = self.get(market_id)
+        if i is None:
+            raise KeyError(market_id)
+        return i
+
+    def __iter__(self) -> Iterator[str]:
+        return (self._strings[i] for i in range(self._count))
+
+    def __len__(self) -> int:
+        return self._count
+
+
+class BinaryContext:
+    """
+    A decoded binary context. `markets` and `positions` are structured
+    array views into the frame.
+
+    Usage:
+        decoded = decode_context(frame)
+        decoded.markets["bid"]      # NumPy view, no copy
+        context = decoded.to_dict() # what StrategyExecutor.run expects
+    """
+
+    __slots__ = ("mode", "balance", "markets", "positions", "strings", "_extra", "_extra_bytes")
+
+    def __init__(
+        self,
+        mode: str,
+        balance: float,
+        markets: np.ndarray,
+        positions: np.ndarray,
+        strings: StringTable,
+        extra_bytes: memoryview,
+    ) -> None:
+        self.mode = mode
+        self.balance = balance
+        self.markets = markets
+        self.positions = positions
+        self.strings = strings
+        self._extra: Optional[Dict[str, Any]] = None
+        self._extra_bytes = extra_bytes
+
+    @property
+    def extra(self) -> Dict[str, Any]:
+        if self._extra is None:
+            self._extra = json.loads(bytes(self._extra_bytes)) if len(self._extra_bytes) else {}
+        return self._extra
+
+    def market_data(self) -> MarketStateBatch:
+        """The markets as a MarketStateBatch (a read-only market_id -> state mapping)"""
+        m = self.markets
+        return MarketStateBatch(
+            _IdColumn(self.strings, m["market_id"]),
+            _IdColumn(self.strings, m["token_id"]),
+            m["bid"],
+            m["ask"],
+            m["volume"],
+            m["last_price"],
+            index=_MarketIndex(self.strings, len(m)),
+            midpoint=m["midpoint"],
+            spread=m["spread"],
+        )
+
+    def position_dicts(self) -> List[Dict[str, Any]]:
+        """Positions as the context's dicts (current_price None when unknown)"""
+        strings = self.strings
+        rows = self.positions.tolist()
+        out: List[Dict[str, Any]] = []
+        for market_id, token_id, size, avg, current, realized, unrealized in rows:
+            out.append({
+                "market_id": strings[market_id],
+                "token_id": strings[token_id],
+                "size": size,
+                "avg_entry_price": avg,
+                "current_price": None if current != current else current,
+                "realized_pnl": realized,
+                "unrealized_pnl": unrealized,
+            })
+        return out
+
+    def to_dict(self) -> Dict[str, Any]:
+        extra = self.extra
+        return {
+            "mode": self.mode,
+            "balance": self.balance,
+            "market_data": self.market_data(),
+            "positions": self.position_dicts(),
+            "parameters": extra.get("parameters") or {},
+            "risk": extra.get("risk"),
+            "orderbooks": extra.get("orderbooks"),
+        }
+
+    def __repr__(self) -> str:
+        return f"BinaryContext({self.mode}, {len(self.markets)} markets, {len(self.positions)} positions)"
+
+
+def decode_context(buffer: Buffer) -> BinaryContext:
+    """Decode a binary context; arrays are views into `buffer`"""
+    view = memoryview(buffer).cast("B")
+    if len(view) < HEADER.size:
+        raise CodecError("Binary context shorter than its header")
+    (magic, version, mode, n_markets, n_positions, n_strings,
+     string_bytes, extra_bytes, _, balance) = HEADER.unpack_from(view)
+    if magic != MAGIC:
+        raise CodecError(f"Bad binary context magic: {magic!r}")
+    if version != VERSION:
+        raise CodecError(f"Unsupported binary context version: {version}")
+
+    offset = HEADER.size
+    markets_at = offset
+    offset += n_markets * MARKET_DTYPE.itemsize
+    positions_at = offset
+    offset += n_positions * POSITION_DTYPE.itemsize
+    offsets_at = offset
+    offset += _pad((n_strings + 1) * 4)
+    strings_at = offset
+    offset += _pad(string_bytes)
+    if offset + extra_bytes > len(view):
+        raise CodecError(f"Binary context truncated: need {offset + extra_bytes} bytes, got {len(view)}")
+    if n_strings < n_markets:
+        raise CodecError("String table does not cover the market ids")
+
+    markets = np.frombuffer(view, dtype=MARKET_DTYPE, count=n_markets, offset=markets_at)
+    positions = np.frombuffer(view, dtype=POSITION_DTYPE, count=n_positions, offset=positions_at)
+    offsets = view[offsets_at:offsets_at + (n_strings + 1) * 4].cast("I")
+    strings = StringTable(offsets, view[strings_at:strings_at + string_bytes])
+    if mode >= len(MODES):
+        raise CodecError(f"Unknown trading mode index: {mode}")
+    return BinaryContext(
+        MODES[mode],
+        balance,
+        markets,
+        positions,
+        strings,
+        view[offset:offset + extra_bytes],
+    )
+
+
+# ----------------------------------------------------------------------
+# Encoding
+# ----------------------------------------------------------------------
+
+
+def _number(value: Any) -> float:
+    return float("nan") if value is None else float(value)
+
+
+def encode_context(context: Mapping[str, Any]) -> bytes:
+    """Encode a JSON-shaped context (as built by lib/strategies/executor.ts)"""
+    market_data: Mapping[str, Mapping[str, Any]] = context.get("market_data") or {}
+    positions: Sequence[Mapping[str, Any]] = context.get("positions") or []
+
+    keyed = sorted(((k.encode("utf-8"), k) for k in market_data), key=lambda kv: kv[0])
+    strings: List[bytes] = [raw for raw, _ in keyed]
+    index: Dict[str, int] = {k: i for i, (_, k) in enumerate(keyed)}
+
+    def intern(value: Optional[str]) -> int:
+        value = value or ""
+        i = index.get(value)
+        if i is None:
+            i = index[value] = len(strings)
+            strings.append(value.encode("utf-8"))
+        return i
+
+    markets = np.zeros(len(keyed), dtype=MARKET_DTYPE)
+    for row, (_, market_id) in enumerate(keyed):
+        data = market_data[market_id]
+        bid, ask = _number(data.get("bid", 0.0)), _number(data.get("ask", 0.0))
+        markets[row] = (
+            row,
+            intern(data.get("token_id")),
+            bid,
+            ask,
+            _number(data.get("midpoint", (bid + ask) / 2)),
+            _number(data.get("spread", ask - bid)),
+            float(data.get("volume") or 0.0),
+            _number(data.get("last_price")),
+        )
+
+    records = np.zeros(len(positions), dtype=POSITION_DTYPE)
+    for row, p in enumerate(positions):
+        records[row] = (
+            intern(p.get("market_id")),
+            intern(p.get("token_id")),
+            *(_number(p.get(name)) if name == "current_price" else float(p.get(name) or 0.0)
+              for name in POSITION_FIELDS),
+        )
+
+    offsets = np.zeros(len(strings) + 1, dtype="<u4")
+    offsets[1:] = np.cumsum([len(s) for s in strings])
+    table = b"".join(strings)
+    extra = {k: context[k] for k in EXTRA_KEYS if context.get(k) is not None}
+    extra_bytes = json.dumps(extra, separators=(",", ":")).encode("utf-8") if extra else b""
+
+    mode = context.get("mode", "PAPER")
+    if mode not in MODES:
+        raise CodecError(f"Unknown trading mode: {mode!r}")
+    header = HEADER.pack(
+        MAGIC, VERSION, MODES.index(mode),
+        len(markets), len(records), len(strings), len(table), len(extra_bytes), 0,
+        float(context.get("balance") or 0.0),
+    )
+    offsets_bytes = offsets.tobytes()
+    return b"".join((
+        header,
+        markets.tobytes(),
+        records.tobytes(),
+        offsets_bytes, b"\0" * (_pad(len(offsets_bytes)) - len(offsets_bytes)),
+        table, b"\0" * (_pad(len(table)) - len(table)),
+        extra_bytes,
+    ))
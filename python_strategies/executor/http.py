@@ -0,0 +1,301 @@
+"""
+Asyncio HTTP/1.1 client with a keep-alive connection pool.
+
+Built on asyncio streams so the executor needs nothing beyond the
+standard library. Connections are kept open per origin and reused
+across requests; `max_per_host` caps how many are open (and therefore
+in flight) to one origin at a time. Responses are read by
+Content-Length, chunked transfer encoding or until close, and gzip
+bodies are decompressed.
+"""
+
+import asyncio
+import gzip
+import json
+import ssl
+import time
+from collections import deque
+from typing import Any, Deque, Dict, NamedTuple, Optional, Tuple
+from urllib.parse import urlsplit
+
+DEFAULT_MAX_PER_HOST = 10
+DEFAULT_TIMEOUT = 10.0
+DEFAULT_IDLE_TIMEOUT = 30.0
+USER_AGENT = "polytrader-executor"
+# Safe to send again if a reused connection drops before the response
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "DELETE"})
+
+Origin = Tuple[str, str, int]
+
+
+class HttpError(Exception):
+    """Non-2xx response"""
+
+    def __init__(self, status: int, url: str, body: bytes = b"", retry_after: Optional[float] = None) -> None:
+        super().__init__(f"HTTP {status} for {url}: {body[:200].decode('utf-8', 'replace')}")
+        self.status = status
+        self.url = url
+        self.body = body
+        self.retry_after = retry_after
+
+
+class HttpResponse(NamedTuple):
+    status: int
+    headers: Dict[str, str]
+    body: bytes
+
+    def json(self) -> Any:
+        return json.loads(self.body)
+
+
+class _Connection:
+    __slots__ = ("reader", "writer", "last_used")
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.reader = reader
+        self.writer = writer
+        self.last_used = time.monotonic()
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+def _origin(url: str) -> Tuple[Origin, str]:
+    parts = urlsplit(url)
+    scheme = parts.scheme or "http"
+    port = parts.port or (443 if scheme == "https" else 80)
+    target = parts.path or "/"
+    if parts.query:
+        target += "?" + parts.query
+    return (scheme, parts.hostname or "", port), target
+
+
+def _retry_after(headers: Dict[str, str]) -> Optional[float]:
+    value = headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+class HttpPool:
+    """
+    Pooled keep-alive HTTP client.
+
+    Usage:
+        async with HttpPool(max_per_host=16) as pool:
+            book = await pool.get_json("https://clob.polymarket.com/book?token_id=123")
+    """
+
+    def __init__(
+        self,
+        max_per_host: int = DEFAULT_MAX_PER_HOST,
+        timeout: float = DEFAULT_TIMEOUT,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> None:
+        self.max_per_host = max_per_host
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.headers = {"User-Agent": USER_AGENT, "Accept": "application/json", "Accept-Encoding": "gzip"}
+        self.headers.update(headers or {})
+        self._idle: Dict[Origin, Deque[_Connection]] = {}
+        self._slots: Dict[Origin, asyncio.Semaphore] = {}
+        self._ssl: Optional[ssl.SSLContext] = None
+        self.connections_opened = 0
+        self.requests_sent = 0
+
+    async def __aenter__(self) -> "HttpPool":
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self.close()
+
+    # ----------------------------------------------------------------------
+    # Connections
+    # ----------------------------------------------------------------------
+
+    def _slot(self, origin: Origin) -> asyncio.Semaphore:
+        slot = self._slots.get(origin)
+        if slot is None:
+            slot = self._slots[origin] = asyncio.Semaphore(self.max_per_host)
+        return slot
+
+    async def _connect(self, origin: Origin) -> _Connection:
+        scheme, host, port = origin
+        context = None
+        if scheme == "https":
+            if self._ssl is None:
+                self._ssl = ssl.create_default_context()
+            context = self._ssl
+        reader, writer = await asyncio.open_connection(host, port, ssl=context)
+        self.connections_opened += 1
+        return _Connection(reader, writer)
+
+    def _checkout(self, origin: Origin) -> Optional[_Connection]:
+        """Most recently used idle connection that is still fresh"""
+        idle = self._idle.get(origin)
+        now = time.monotonic()
+        while idle:
+            conn = idle.pop()
+            if now - conn.last_used < self.idle_timeout and not conn.reader.at_eof():
+                return conn
+            conn.close()
+        return None
+
+    def _checkin(self, origin: Origin, conn: _Connection) -> None:
+        conn.last_used = time.monotonic()
+        self._idle.setdefault(origin, deque()).append(conn)
+
+    async def close(self) -> None:
+        closing = []
+        for idle in self._idle.values():
+            while idle:
+                conn = idle.pop()
+                conn.close()
+                closing.append(conn.writer.wait_closed())
+        self._idle.clear()
+        await asyncio.gather(*closing, return_exceptions=True)
+
+    # ----------------------------------------------------------------------
+    # Requests
+    # ----------------------------------------------------------------------
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        body: Optional[bytes] = None,
+        headers: Optional[Dict[str, str]] = None,
+        idempotent: Optional[bool] = None,
+    ) -> HttpResponse:
+        """
+        Send a request and read the full response; raises HttpError on
+        non-2xx. If a reused keep-alive connection drops, the request is
+        sent again on a new one only when it is idempotent (by default
+        GET, HEAD and DELETE). Otherwise the connection error is raised,
+        since the server may already have acted on the request.
+        """
+        origin, target = _origin(url)
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+        async with self._slot(origin):
+            response, keep_alive, conn = await asyncio.wait_for(
+                self._exchange(origin, method, target, body, headers, idempotent),
+                self.timeout,
+            )
+            if keep_alive:
+                self._checkin(origin, conn)
+            else:
+                conn.close()
+
+        if not 200 <= response.status < 300:
+            raise HttpError(response.status, url, response.body, _retry_after(response.headers))
+        return response
+
+    async def _exchange(
+        self,
+        origin: Origin,
+        method: str,
+        target: str,
+        body: Optional[bytes],
+        headers: Optional[Dict[str, str]],
+        idempotent: bool,
+    ) -> Tuple[HttpResponse, bool, _Connection]:
+        conn = self._checkout(origin)
+        reused = conn is not None
+        if conn is None:
+            conn = await self._connect(origin)
+        try:
+            return await self._send(conn, origin, method, target, body, headers)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            conn.close()
+            if not reused or not idempotent:
+                raise
+        except BaseException:
+            # Includes cancellation by the timeout: the stream is mid-response
+            conn.close()
+            raise
+        # The server closed an idle keep-alive connection; retry once on a new one
+        conn = await self._connect(origin)
+        try:
+            return await self._send(conn, origin, method, target, body, headers)
+        except BaseException:
+            conn.close()
+            raise
+
+    async def _send(
+        self,
+        conn: _Connection,
+        origin: Origin,
+        method: str,
+        target: str,
+        body: Optional[bytes],
+        headers: Optional[Dict[str, str]],
+    ) -> Tuple[HttpResponse, bool, _Connection]:
+        scheme, host, port = origin
+        default_port = 443 if scheme == "https" else 80
+        lines = [f"{method} {target} HTTP/1.1", f"Host: {host}" if port == default_port else f"Host: {host}:{port}"]
+        merged = dict(self.headers)
+        merged.update(headers or {})
+        if body is not None:
+            merged["Content-Length"] = str(len(body))
+        lines.extend(f"{name}: {value}" for name, value in merged.items())
+        conn.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + (body or b""))
+        await conn.writer.drain()
+        self.requests_sent += 1
+
+        reader = conn.reader
+        status_line = await reader.readuntil(b"\r\n")
+        status = int(status_line.split(b" ", 2)[1])
+        response_headers: Dict[str, str] = {}
+        while True:
+            line = await reader.readuntil(b"\r\n")
+            if line == b"\r\n":
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            response_headers[name.strip().lower()] = value.strip()
+
+        keep_alive = response_headers.get("connection", "").lower() != "close"
+        if method == "HEAD" or status in (204, 304):
+            data = b""
+        elif response_headers.get("transfer-encoding", "").lower() == "chunked":
+            data = await self._read_chunked(reader)
+        elif "content-length" in response_headers:
+            data = await reader.readexactly(int(response_headers["content-length"]))
+        else:
+            data = await reader.read()
+            keep_alive = False
+
+        if response_headers.get("content-encoding", "").lower() == "gzip":
+            data = gzip.decompress(data)
+        return HttpResponse(status, response_headers, data), keep_alive, conn
+
+    @staticmethod
+    async def _read_chunked(reader: asyncio.StreamReader) -> bytes:
+        chunks = []
+        while True:
+            size_line = await reader.readuntil(b"\r\n")
+            size = int(size_line.split(b";", 1)[0], 16)
+            if size == 0:
+                # Trailers, up to the blank line
+                while await reader.readuntil(b"\r\n") != b"\r\n":
+                    pass
+                return b"".join(chunks)
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+
+    async def get(self, url: str, headers: Optional[Dict[str, str]] = None) -> HttpResponse:
+        return await self.request("GET", url, headers=headers)
+
+    async def get_json(self, url: str, headers: Optional[Dict[str, str]] = None) -> Any:
+        return (await self.get(url, headers)).json()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "connections_opened": self.connections_opened,
+            "requests_sent": self.requests_sent,
+            "idle": sum(len(idle) for idle in self._idle.values()),
+        }
@@ -0,0 +1,89 @@
+"""
+Strategy loading for the executor.
+
+Strategy code is compiled once into a standalone module object so that
+repeated runs reuse the same module globals instead of paying the
+compile and import cost on every invocation.
+"""
+
+import json
+import types
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
+
+from sdk import OrderBook
+
+REQUIRED_FUNCTIONS = ("propose_orders",)
+
+
+class StrategyLoadError(Exception):
+    """Raised when strategy code cannot be compiled or is missing hooks"""
+
+
+@dataclass
+class LoadedStrategy:
+    """A compiled strategy module and its resolved hooks"""
+    strategy_id: str
+    version: int
+    module: types.ModuleType
+    initialize: Optional[Callable[..., Any]]
+    on_tick: Optional[Callable[..., Any]]
+    propose_orders: Callable[..., Any]
+    risk_check: Optional[Callable[..., Any]]
+    on_book_update: Optional[Callable[..., Any]] = None
+    # config_key() of the config initialize() last ran with
+    config_key: str = ""
+    # Books as last seen by this strategy, so snapshots are diffed per strategy
+    books: Dict[str, OrderBook] = field(default_factory=dict)
+
+
+def config_key(config: Optional[Dict[str, Any]]) -> str:
+    """Stable key for a strategy config, independent of key order"""
+    return json.dumps(config or {}, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def _hook(module: types.ModuleType, name: str) -> Optional[Callable[..., Any]]:
+    """Return a callable attribute of the module, if present"""
+    value = getattr(module, name, None)
+    return value if callable(value) else None
+
+
+def wrap_module(module: types.ModuleType, strategy_id: str = "", version: int = 1) -> LoadedStrategy:
+    """Resolve the hooks of an already-imported strategy module"""
+    for name in REQUIRED_FUNCTIONS:
+        if _hook(module, name) is None:
+            raise StrategyLoadError(f"Strategy must define {name}()")
+
+    return LoadedStrategy(
+        strategy_id=strategy_id or module.__name__,
+        version=version,
+        module=module,
+        initialize=_hook(module, "initialize"),
+        on_tick=_hook(module, "on_tick"),
+        propose_orders=_hook(module, "propose_orders"),
+        risk_check=_hook(module, "risk_check"),
+        on_book_update=_hook(module, "on_book_update"),
+    )
+
+
+def load_strategy(strategy_id: str, version: int, code: str) -> LoadedStrategy:
+    """
+    Compile and execute strategy code in a fresh module namespace.
+    Raises StrategyLoadError if the code does not compile or does not
+    define the required hooks.
+    """
+    filename = f"<strategy:{strategy_id}@v{version}>"
+    try:
+        compiled = compile(code, filename, "exec")
+    except SyntaxError as e:
+        raise StrategyLoadError(f"Syntax error in strategy code: {e}") from e
+
+    module = types.ModuleType(f"strategy_{strategy_id}_v{version}")
+    module.__file__ = filename
+
+    try:
+        exec(compiled, module.__dict__)
+    except Exception as e:
+        raise StrategyLoadError(f"Strategy module failed to load: {e!r}") from e
+
+    return wrap_module(module, strategy_id, version)
@@ -0,0 +1,296 @@
+"""
+Gamma market metadata cache.
+
+Markets, events and categories change rarely, so they are served from
+memory. Markets are cached by condition id and also indexed by slug and
+CLOB token id, which makes token -> market a dict lookup. An entry is
+fresh for its kind's TTL. After that it is still served for up to
+`max_stale` seconds while one background request refreshes it
+(stale-while-revalidate). Entries are evicted least recently used past
+`max_entries`. The cache can be saved to a JSON snapshot and reloaded
+at startup, so a restarted worker begins warm.
+"""
+
+import asyncio
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .polymarket import GammaApi, market_condition_id, market_token_ids
+
+CacheKey = Tuple[str, str]
+
+SNAPSHOT_VERSION = 1
+DEFAULT_MAX_ENTRIES = 10_000
+DEFAULT_MAX_STALE = 24 * 3600.0
+DEFAULT_TTLS: Dict[str, float] = {
+    "market": 300.0,
+    "markets": 60.0,
+    "event": 600.0,
+    "events": 120.0,
+    "categories": 3600.0,
+}
+
+
+class _Entry:
+    __slots__ = ("value", "fetched_at")
+
+    def __init__(self, value: Any, fetched_at: float) -> None:
+        self.value = value
+        self.fetched_at = fetched_at
+
+
+class MarketMetadataCache:
+    """
+    TTL + stale-while-revalidate cache in front of GammaApi.
+
+    Cached values are shared between callers and must not be modified.
+
+    Usage:
+        async with MarketMetadataCache(gamma, path="gamma-cache.json") as cache:
+            market = await cache.get_market_by_token(token_id)
+            cache.market_id_for_token(token_id)  # no I/O once cached
+    """
+
+    def __init__(
+        self,
+        gamma: Optional[GammaApi] = None,
+        path: Optional[str] = None,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttls: Optional[Dict[str, float]] = None,
+        max_stale: float = DEFAULT_MAX_STALE,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._owns_gamma = gamma is None
+        self.gamma = gamma or GammaApi()
+        self.path = path
+        self.max_entries = max(1, max_entries)
+        self.ttls = dict(DEFAULT_TTLS)
+        self.ttls.update(ttls or {})
+        self.max_stale = max_stale
+        # Wall clock rather than monotonic so snapshot ages survive restarts
+        self.clock = clock
+        self._entries: "OrderedDict[CacheKey, _Entry]" = OrderedDict()
+        self._slugs: Dict[str, str] = {}
+        self._tokens: Dict[str, str] = {}
+        self._refreshing: Dict[CacheKey, "asyncio.Task[Any]"] = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refresh_errors = 0
+        self.last_error: Optional[str] = None
+        if path and os.path.exists(path):
+            self.load(path)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: CacheKey) -> bool:
+        return key in self._entries
+
+    async def __aenter__(self) -> "MarketMetadataCache":
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """Stop background refreshes, write the snapshot if `path` is set"""
+        for task in self._refreshing.values():
+            task.cancel()
+        await asyncio.gather(*self._refreshing.values(), return_exceptions=True)
+        self._refreshing.clear()
+        if self.path:
+            self.save(self.path)
+        if self._owns_gamma:
+            await self.gamma.close()
+
+    # ----------------------------------------------------------------------
+    # Entries
+    # ----------------------------------------------------------------------
+
+    def _put(self, key: CacheKey, value: Any, fetched_at: Optional[float] = None) -> None:
+        fetched_at = self.clock() if fetched_at is None else fetched_at
+        kind = key[0]
+        if kind == "market":
+            self._index(key[1], value)
+        elif kind == "markets":
+            # List queries also warm the single-market lookups
+            for market in value:
+                condition_id = market_condition_id(market)
+                if condition_id:
+                    self._put(("market", condition_id), market, fetched_at)
+        self._entries[key] = _Entry(value, fetched_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            old_key, old = self._entries.popitem(last=False)
+            if old_key[0] == "market":
+                self._unindex(old_key[1], old.value)
+
+    def _index(self, condition_id: str, market: Dict[str, Any]) -> None:
+        previous = self._entries.get(("market", condition_id))
+        if previous is not None:
+            self._unindex(condition_id, previous.value)
+        if market.get("slug"):
+            self._slugs[market["slug"]] = condition_id
+        for token_id in market_token_ids(market):
+            self._tokens[token_id] = condition_id
+
+    def _unindex(self, condition_id: str, market: Dict[str, Any]) -> None:
+        if self._slugs.get(market.get("slug")) == condition_id:
+            del self._slugs[market["slug"]]
+        for token_id in market_token_ids(market):
+            if self._tokens.get(token_id) == condition_id:
+                del self._tokens[token_id]
+
+    def invalidate(self, key: CacheKey) -> bool:
+        entry = self._entries.pop(key, None)
+        if entry is not None and key[0] == "market":
+            self._unindex(key[1], entry.value)
+        return entry is not None
+
+    async def _get(self, key: CacheKey, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            age = self.clock() - entry.fetched_at
+            ttl = self.ttls[key[0]]
+            if age < ttl:
+                self.hits += 1
+                return entry.value
+            if age < ttl + self.max_stale:
+                self.stale_hits += 1
+                self._revalidate(key, fetch)
+                return entry.value
+        self.misses += 1
+        value = await fetch()
+        self._put(key, value)
+        return value
+
+    def _revalidate(self, key: CacheKey, fetch: Callable[[], Awaitable[Any]]) -> None:
+        if key not in self._refreshing:
+            self._refreshing[key] = asyncio.ensure_future(self._refresh(key, fetch))
+
+    async def _refresh(self, key: CacheKey, fetch: Callable[[], Awaitable[Any]]) -> None:
+        try:
+            self._put(key, await fetch())
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            # Keep serving the stale value; the next stale hit tries again
+            self.refresh_errors += 1
+            self.last_error = f"{key[0]} {key[1]}: {exc}"
+        finally:
+            self._refreshing.pop(key, None)
+
+    # ----------------------------------------------------------------------
+    # Markets
+    # ----------------------------------------------------------------------
+
+    async def get_market(self, condition_id: str) -> Dict[str, Any]:
+        return await self._get(("market", condition_id), lambda: self.gamma.get_market(condition_id))
+
+    async def get_market_by_slug(self, slug: str) -> Dict[str, Any]:
+        condition_id = self._slugs.get(slug)
+        if condition_id is not None:
+            return await self.get_market(condition_id)
+        return await self._fetch_market(self.gamma.get_market_by_slug(slug))
+
+    async def get_market_by_token(self, token_id: str) -> Dict[str, Any]:
+        condition_id = self._tokens.get(token_id)
+        if condition_id is not None:
+            return await self.get_market(condition_id)
+        return await self._fetch_market(self.gamma.get_market_by_token(token_id))
+
+    async def _fetch_market(self, request: Awaitable[Dict[str, Any]]) -> Dict[str, Any]:
+        self.misses += 1
+        market = await request
+        condition_id = market_condition_id(market)
+        if condition_id:
+            self._put(("market", condition_id), market)
+        return market
+
+    async def get_markets(self, **filters: Any) -> List[Dict[str, Any]]:
+        """GammaApi.get_markets, cached per filter set"""
+        key = ("markets", json.dumps(filters, sort_keys=True))
+        return await self._get(key, lambda: self.gamma.get_markets(**filters))
+
+    def market_id_for_token(self, token_id: str) -> Optional[str]:
+        """Condition id of a cached token's market, without I/O"""
+        return self._tokens.get(token_id)
+
+    def peek_market(self, condition_id: str) -> Optional[Dict[str, Any]]:
+        """Cached market regardless of age, without I/O or LRU update"""
+        entry = self._entries.get(("market", condition_id))
+        return entry.value if entry is not None else None
+
+    # ----------------------------------------------------------------------
+    # Events and categories
+    # ----------------------------------------------------------------------
+
+    async def get_event(self, event_id: str) -> Dict[str, Any]:
+        return await self._get(("event", event_id), lambda: self.gamma.get_event(event_id))
+
+    async def get_events(self, **filters: Any) -> List[Dict[str, Any]]:
+        """GammaApi.get_events, cached per filter set"""
+        key = ("events", json.dumps(filters, sort_keys=True))
+        return await self._get(key, lambda: self.gamma.get_events(**filters))
+
+    async def get_categories(self) -> List[str]:
+        return await self._get(("categories", ""), self.gamma.get_categories)
+
+    # ----------------------------------------------------------------------
+    # Snapshot
+    # ----------------------------------------------------------------------
+
+    def save(self, path: str) -> int:
+        """Write every entry to a JSON snapshot (atomically); returns the entry count"""
+        snapshot = {
+            "version": SNAPSHOT_VERSION,
+            "entries": [[kind, key, entry.fetched_at, entry.value] for (kind, key), entry in self._entries.items()],
+        }
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(snapshot, f, separators=(",", ":"))
+        os.replace(tmp, path)
+        return len(snapshot["entries"])
+
+    def load(self, path: str) -> int:
+        """
+        Load a snapshot written by save(), keeping each entry's original
+        fetch time. Entries past TTL + max_stale are skipped. Unreadable
+        or other-version snapshots load nothing. Returns the entry count.
+        """
+        try:
+            with open(path) as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            return 0
+        if not isinstance(snapshot, dict) or snapshot.get("version") != SNAPSHOT_VERSION:
+            return 0
+        now = self.clock()
+        loaded = 0
+        # Saved oldest-used first, so replaying keeps the LRU order
+        for kind, key, fetched_at, value in snapshot.get("entries", ()):
+            if kind in self.ttls and now - fetched_at < self.ttls[kind] + self.max_stale:
+                self._put((kind, key), value, fetched_at)
+                loaded += 1
+        return loaded
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "tokens": len(self._tokens),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "refreshing": len(self._refreshing),
+            "refresh_errors": self.refresh_errors,
+            "last_error": self.last_error,
+        }
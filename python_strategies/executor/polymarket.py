@@ -0,0 +1,780 @@
+"""
+Async Polymarket API client.
+
+Python counterpart of PolymarketClient (lib/polymarket): ClobApi,
+GammaApi and DataApi over one shared HttpPool, so requests to each
+origin reuse keep-alive connections instead of opening one per call.
+
+GETs are single-flight: while a request for a URL is in flight,
+identical GETs wait for its response instead of sending their own, so
+concurrent strategies watching the same token share one /book fetch.
+Failed requests are retried as in withRetry (lib/utils/retry.ts), and
+a 429's Retry-After is honoured. With a RateLimiter, every request first
+awaits a token for its endpoint class, and a 429 pauses and slows that
+class's bucket rather than backing off blindly.
+"""
+
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import os
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+from urllib.parse import urlencode
+
+from .http import IDEMPOTENT_METHODS, HttpError, HttpPool, HttpResponse
+from .ratelimit import BOOKS, DATA, GAMMA, ORDERS, RateLimiter
+
+DEFAULT_CLOB_URL = os.environ.get("POLYMARKET_CLOB_URL", "https://clob.polymarket.com")
+DEFAULT_GAMMA_URL = os.environ.get("POLYMARKET_GAMMA_URL", "https://gamma-api.polymarket.com")
+DEFAULT_DATA_URL = os.environ.get("POLYMARKET_DATA_URL", "https://data-api.polymarket.com")
+
+DEFAULT_MAX_RETRIES = 3
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 30.0
+RETRYABLE_STATUSES = frozenset((408, 429, 500, 502, 503, 504))
+BOOKS_BATCH_SIZE = 100
+
+
+# ----------------------------------------------------------------------
+# Errors (lib/polymarket/types.ts)
+# ----------------------------------------------------------------------
+
+class PolymarketError(Exception):
+    """API error with the same code/status/details as the TS client"""
+
+    def __init__(self, message: str, code: str, status: Optional[int] = None, details: Any = None) -> None:
+        super().__init__(message)
+        self.code = code
+        self.status = status
+        self.details = details
+
+
+class RateLimitError(PolymarketError):
+    def __init__(self, retry_after: Optional[float] = None) -> None:
+        super().__init__(
+            f"Rate limit exceeded. Retry after {retry_after or 'unknown'} seconds",
+            "RATE_LIMIT",
+            429,
+            {"retry_after": retry_after},
+        )
+        self.retry_after = retry_after
+
+
+class OrderError(PolymarketError):
+    def __init__(self, message: str, details: Any = None) -> None:
+        super().__init__(message, "ORDER_ERROR", 400, details)
+
+
+# ----------------------------------------------------------------------
+# Helpers
+# ----------------------------------------------------------------------
+
+class SingleFlight:
+    """
+    Collapses concurrent calls with the same key into one.
+
+    The first caller for a key starts the call as a task; callers that
+    arrive while it runs await the same task. The key is released when
+    the call finishes, so the next caller starts a fresh one. Cancelling
+    one caller does not cancel the call for the others.
+    """
+
+    def __init__(self) -> None:
+        self._inflight: Dict[Hashable, "asyncio.Task[Any]"] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._start(key, fn())
+            self.calls += 1
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    async def do_many(
+        self,
+        keys: Iterable[Hashable],
+        fn: Callable[[List[Hashable]], Awaitable[Dict[Hashable, Any]]],
+    ) -> Dict[Hashable, Any]:
+        """
+        do() for several keys at once. The keys not already in flight go
+        to a single fn(missing) call, which returns a value per key.
+        Returns {key: value or exception}. A key missing from fn's
+        result gets a KeyError.
+        """
+        keys = list(dict.fromkeys(keys))
+        missing = [key for key in keys if key not in self._inflight]
+        self.coalesced += len(keys) - len(missing)
+        if missing:
+            batch = asyncio.ensure_future(fn(missing))
+            self.calls += 1
+            for key in missing:
+                self._start(key, self._pick(batch, key))
+        tasks = [asyncio.shield(self._inflight[key]) for key in keys]
+        return dict(zip(keys, await asyncio.gather(*tasks, return_exceptions=True)))
+
+    @staticmethod
+    async def _pick(batch: "asyncio.Future[Dict[Hashable, Any]]", key: Hashable) -> Any:
+        value = (await asyncio.shield(batch))[key]
+        if isinstance(value, BaseException):
+            raise value
+        return value
+
+    def _start(self, key: Hashable, call: Awaitable[Any]) -> "asyncio.Task[Any]":
+        task = asyncio.ensure_future(call)
+        self._inflight[key] = task
+        task.add_done_callback(lambda done: self._release(key, done))
+        return task
+
+    def _release(self, key: Hashable, task: "asyncio.Task[Any]") -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Mark the exception retrieved when every caller went away
+            task.exception()
+
+
+def l2_headers(
+    api_key: str,
+    api_secret: str,
+    passphrase: str,
+    method: str,
+    path: str,
+    body: Optional[str] = None,
+) -> Dict[str, str]:
+    """CLOB L2 authentication headers, as generateL2Headers (lib/polymarket/auth.ts)"""
+    timestamp = str(int(time.time()))
+    payload = timestamp + method.upper() + path + (body or "")
+    digest = hmac.new(base64.b64decode(api_secret), payload.encode("utf-8"), hashlib.sha256).digest()
+    return {
+        "POLY-API-KEY": api_key,
+        "POLY-SIGNATURE": base64.b64encode(digest).decode("ascii"),
+        "POLY-TIMESTAMP": timestamp,
+        "POLY-PASSPHRASE": passphrase,
+    }
+
+
+def _query(params: Optional[Dict[str, Any]]) -> str:
+    """Query string with None dropped and booleans spelled as in JS"""
+    if not params:
+        return ""
+    pairs = [
+        (key, ("true" if value else "false") if isinstance(value, bool) else str(value))
+        for key, value in params.items()
+        if value is not None
+    ]
+    return "?" + urlencode(pairs) if pairs else ""
+
+
+def _retry_delay(attempt: int, retry_after: Optional[float]) -> float:
+    if retry_after is not None:
+        return min(retry_after, RETRY_MAX_DELAY)
+    return min(RETRY_BASE_DELAY * 2 ** attempt + random.random(), RETRY_MAX_DELAY)
+
+
+class _Api:
+    """Base URL, pool, single-flight GETs and retries shared by the three APIs"""
+
+    name = "API"
+    code = "API_ERROR"
+    endpoint = GAMMA
+
+    def __init__(
+        self,
+        base_url: str,
+        pool: Optional[HttpPool] = None,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        coalesce: bool = True,
+        concurrency: Optional[int] = None,
+        limiter: Optional[RateLimiter] = None,
+    ) -> None:
+        self.base_url = base_url.rstrip("/")
+        self._owns_pool = pool is None
+        self.pool = pool or HttpPool()
+        self.max_retries = max_retries
+        self.coalesce = coalesce
+        self.inflight = SingleFlight()
+        # Bounds requests on the wire, not callers: waiting callers must
+        # already be registered in `inflight` to be coalesced
+        self._limit = asyncio.Semaphore(concurrency) if concurrency else None
+        self.limiter = limiter
+
+    async def __aenter__(self) -> "_Api":
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        if self._owns_pool:
+            await self.pool.close()
+
+    def _auth_headers(self, method: str, path: str, body: Optional[str]) -> Dict[str, str]:
+        return {}
+
+    def _endpoint(self, method: str, path: str) -> str:
+        """Rate limit class of a request"""
+        return self.endpoint
+
+    def _idempotent(self, method: str, path: str) -> bool:
+        """Whether a request may be sent again after a dropped connection"""
+        return method in IDEMPOTENT_METHODS
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        body: Any = None,
+    ) -> Any:
+        """Send a request and decode its JSON body; raises PolymarketError on failure"""
+        path += _query(params)
+        text = json.dumps(body) if body is not None else None
+        if method == "GET" and self.coalesce:
+            # Callers share the response bytes but each decodes its own copy
+            response = await self.inflight.do(path, lambda: self._send(method, path, None))
+        else:
+            response = await self._send(method, path, text)
+        return response.json()
+
+    async def _send(self, method: str, path: str, text: Optional[str]) -> HttpResponse:
+        body = text.encode("utf-8") if text is not None else None
+        endpoint = self._endpoint(method, path)
+        idempotent = self._idempotent(method, path)
+        attempt = 0
+        while True:
+            if self.limiter is not None:
+                await self.limiter.acquire(endpoint)
+            headers = {"Content-Type": "application/json"}
+            headers.update(self._auth_headers(method, path, text))
+            try:
+                if self._limit is None:
+                    return await self.pool.request(method, self.base_url + path, body, headers, idempotent)
+                async with self._limit:
+                    return await self.pool.request(method, self.base_url + path, body, headers, idempotent)
+            except HttpError as exc:
+                limited = exc.status == 429 and self.limiter is not None
+                if limited:
+                    self.limiter.throttle(endpoint, exc.retry_after)
+                if exc.status not in RETRYABLE_STATUSES or attempt >= self.max_retries:
+                    raise self._error(exc, path) from exc
+                if not limited:
+                    # A throttled bucket already holds the retry back
+                    await asyncio.sleep(_retry_delay(attempt, exc.retry_after))
+            attempt += 1
+
+    def _error(self, exc: HttpError, path: str) -> PolymarketError:
+        if exc.status == 429:
+            return RateLimitError(exc.retry_after)
+        error = exc.body.decode("utf-8", "replace")
+        return PolymarketError(f"{self.name} API error: {error}", self.code, exc.status, {"path": path, "error": error})
+
+    def stats(self) -> Dict[str, int]:
+        return {"gets": self.inflight.calls, "coalesced": self.inflight.coalesced, "in_flight": len(self.inflight)}
+
+
+# ----------------------------------------------------------------------
+# CLOB API
+# ----------------------------------------------------------------------
+
+class ClobApi(_Api):
+    """
+    Order books and trading (lib/polymarket/clob.ts).
+
+    Usage:
+        async with ClobApi(DEFAULT_CLOB_URL) as clob:
+            book = await clob.get_order_book(token_id)
+    """
+
+    name = "CLOB"
+    code = "CLOB_ERROR"
+    endpoint = ORDERS
+
+    def __init__(
+        self,
+        base_url: str = DEFAULT_CLOB_URL,
+        pool: Optional[HttpPool] = None,
+        api_key: Optional[str] = None,
+        api_secret: Optional[str] = None,
+        passphrase: Optional[str] = None,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        coalesce: bool = True,
+        concurrency: Optional[int] = None,
+        limiter: Optional[RateLimiter] = None,
+    ) -> None:
+        super().__init__(base_url, pool, max_retries, coalesce, concurrency, limiter)
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.passphrase = passphrase
+        # Cleared when the server has no POST /books; fan out /book instead
+        self.multi_book = True
+        self.books_inflight = SingleFlight()
+
+    def set_credentials(self, api_key: str, api_secret: str, passphrase: str) -> None:
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.passphrase = passphrase
+
+    @property
+    def is_authenticated(self) -> bool:
+        return bool(self.api_key and self.api_secret and self.passphrase)
+
+    def _auth_headers(self, method: str, path: str, body: Optional[str]) -> Dict[str, str]:
+        if not self.is_authenticated:
+            return {}
+        return l2_headers(self.api_key, self.api_secret, self.passphrase, method, path, body)
+
+    def _endpoint(self, method: str, path: str) -> str:
+        return BOOKS if path.startswith(("/book", "/midpoint", "/price", "/spread")) else ORDERS
+
+    def _idempotent(self, method: str, path: str) -> bool:
+        # POST /books only reads
+        return path == "/books" or super()._idempotent(method, path)
+
+    def _require_auth(self, action: str) -> None:
+        if not self.is_authenticated:
+            raise OrderError(f"Authentication required to {action}")
+
+    # Public endpoints
+
+    async def get_price(self, token_id: str) -> Dict[str, float]:
+        data = await self.request("GET", "/price", {"token_id": token_id})
+        return {"mid": float(data["price"]), "bid": 0.0, "ask": 0.0, "spread": 0.0}
+
+    async def get_midpoint(self, token_id: str) -> float:
+        data = await self.request("GET", "/midpoint", {"token_id": token_id})
+        return float(data["mid"])
+
+    async def get_order_book(self, token_id: str) -> Dict[str, Any]:
+        return await self.request("GET", "/book", {"token_id": token_id})
+
+    async def get_order_books(
+        self,
+        token_ids: Iterable[str],
+        errors: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Books for many tokens, keyed by token id.
+
+        Sends POST /books in batches of BOOKS_BATCH_SIZE. If the server
+        has no such endpoint, it sends concurrent /book requests instead.
+        Tokens another caller is already fetching are joined, not fetched
+        again, so the returned books are shared and must not be modified.
+        Tokens that fail are left out; pass `errors` to collect why.
+        """
+        if self.coalesce:
+            results = await self.books_inflight.do_many(token_ids, self._fetch_books)
+        else:
+            results = await self._fetch_books(list(dict.fromkeys(token_ids)))
+        books = {}
+        for token_id, result in results.items():
+            if isinstance(result, BaseException):
+                if errors is not None:
+                    errors[token_id] = str(result) or type(result).__name__
+            else:
+                books[token_id] = result
+        return books
+
+    async def _fetch_books(self, token_ids: List[str]) -> Dict[str, Any]:
+        if self.multi_book:
+            chunks = [token_ids[i:i + BOOKS_BATCH_SIZE] for i in range(0, len(token_ids), BOOKS_BATCH_SIZE)]
+            try:
+                pages = await asyncio.gather(*(
+                    self.request("POST", "/books", body=[{"token_id": token_id} for token_id in chunk])
+                    for chunk in chunks
+                ))
+            except PolymarketError as exc:
+                if exc.status not in (404, 405):
+                    raise
+                self.multi_book = False
+            else:
+                books = {book.get("asset_id"): book for page in pages for book in page}
+                return {
+                    token_id: books.get(token_id) or PolymarketError(
+                        f"No order book for token {token_id}", "NOT_FOUND", 404)
+                    for token_id in token_ids
+                }
+        results = await asyncio.gather(*(self.get_order_book(t) for t in token_ids), return_exceptions=True)
+        return dict(zip(token_ids, results))
+
+    async def get_spread(self, token_id: str) -> Dict[str, float]:
+        book = await self.get_order_book(token_id)
+        bid = float(book["bids"][0]["price"]) if book.get("bids") else 0.0
+        ask = float(book["asks"][0]["price"]) if book.get("asks") else 1.0
+        return {"bid": bid, "ask": ask, "spread": ask - bid}
+
+    # Authenticated endpoints
+
+    async def place_order(self, order: Dict[str, Any]) -> Dict[str, Any]:
+        self._require_auth("place orders")
+        return await self.request("POST", "/order", body={
+            "order": {
+                "tokenID": order["token_id"],
+                "price": str(order["price"]),
+                "size": str(order["size"]),
+                "side": order["side"],
+                "feeRateBps": order.get("fee_rate_bps") or 0,
+                "nonce": order.get("nonce") or int(time.time() * 1000),
+                "expiration": order.get("expiration") or 0,
+            },
+        })
+
+    async def cancel_order(self, order_id: str) -> Dict[str, Any]:
+        self._require_auth("cancel orders")
+        return await self.request("DELETE", "/order", body={"orderID": order_id})
+
+    async def cancel_all_orders(self) -> Dict[str, Any]:
+        self._require_auth("cancel orders")
+        return await self.request("DELETE", "/order-all")
+
+    async def get_open_orders(self) -> List[Dict[str, Any]]:
+        self._require_auth("view orders")
+        return await self.request("GET", "/orders")
+
+    async def get_order(self, order_id: str) -> Dict[str, Any]:
+        self._require_auth("view orders")
+        return await self.request("GET", f"/order/{order_id}")
+
+    async def get_trades(self, limit: int = 100) -> Dict[str, Any]:
+        self._require_auth("view trades")
+        return await self.request("GET", "/trades", {"limit": limit})
+
+    def stats(self) -> Dict[str, int]:
+        stats = super().stats()
+        stats.update(book_batches=self.books_inflight.calls, books_coalesced=self.books_inflight.coalesced)
+        return stats
+
+
+# ----------------------------------------------------------------------
+# Gamma API
+# ----------------------------------------------------------------------
+
+def market_condition_id(market: Dict[str, Any]) -> Optional[str]:
+    """Condition id of a Gamma market (snake_case as in lib/polymarket/types.ts, or camelCase)"""
+    return market.get("condition_id") or market.get("conditionId")
+
+
+def market_tokens(market: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """
+    (token id, outcome) pairs of a Gamma market, from `tokens` or from the
+    `clobTokenIds` and `outcomes` JSON strings
+    """
+    tokens = market.get("tokens")
+    if tokens:
+        return [(str(t["token_id"]), t.get("outcome") or "") for t in tokens if t.get("token_id")]
+    ids = _json_list(market.get("clobTokenIds") or market.get("clob_token_ids"))
+    outcomes = _json_list(market.get("outcomes"))
+    return [(str(token_id), str(outcomes[i]) if i < len(outcomes) else "") for i, token_id in enumerate(ids)]
+
+
+def market_token_ids(market: Dict[str, Any]) -> List[str]:
+    return [token_id for token_id, _ in market_tokens(market)]
+
+
+def _json_list(value: Any) -> List[Any]:
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return []
+    return list(value) if isinstance(value, (list, tuple)) else []
+
+
+class GammaApi(_Api):
+    """Market discovery and metadata (lib/polymarket/gamma.ts)"""
+
+    name = "Gamma"
+    code = "GAMMA_ERROR"
+
+    def __init__(
+        self,
+        base_url: str = DEFAULT_GAMMA_URL,
+        pool: Optional[HttpPool] = None,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        coalesce: bool = True,
+        concurrency: Optional[int] = None,
+        limiter: Optional[RateLimiter] = None,
+    ) -> None:
+        super().__init__(base_url, pool, max_retries, coalesce, concurrency, limiter)
+
+    async def get_markets(
+        self,
+        slug: Optional[str] = None,
+        active: Optional[bool] = None,
+        closed: Optional[bool] = None,
+        archived: Optional[bool] = None,
+        category: Optional[str] = None,
+        limit: int = 100,
+        offset: int = 0,
+        order: Optional[str] = None,
+        ascending: Optional[bool] = None,
+    ) -> List[Dict[str, Any]]:
+        return await self.request("GET", "/markets", {
+            "limit": limit or 100,
+            "offset": offset or 0,
+            "slug": slug or None,
+            "active": active,
+            "closed": closed,
+            "archived": archived,
+            "tag": category or None,
+            "order": order or None,
+            "ascending": ascending,
+        })
+
+    async def _first(self, path: str, params: Dict[str, Any], what: str, key: str) -> Dict[str, Any]:
+        rows = await self.request("GET", path, params)
+        if not rows:
+            raise PolymarketError(f"{what} not found: {key}", "NOT_FOUND", 404)
+        return rows[0]
+
+    async def get_market(self, condition_id: str) -> Dict[str, Any]:
+        return await self._first("/markets", {"condition_id": condition_id}, "Market", condition_id)
+
+    async def get_market_by_slug(self, slug: str) -> Dict[str, Any]:
+        return await self._first("/markets", {"slug": slug}, "Market", slug)
+
+    async def get_market_by_token(self, token_id: str) -> Dict[str, Any]:
+        return await self._first("/markets", {"clob_token_ids": token_id}, "Market", token_id)
+
+    async def search_markets(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """Gamma has no search endpoint, so this filters the active markets"""
+        needle = query.lower()
+        markets = await self.get_markets(limit=1000, active=True)
+        return [
+            m for m in markets
+            if needle in (m.get("question") or "").lower()
+            or needle in (m.get("description") or "").lower()
+            or needle in (m.get("slug") or "").lower()
+        ][:limit]
+
+    async def get_events(
+        self,
+        slug: Optional[str] = None,
+        active: Optional[bool] = None,
+        closed: Optional[bool] = None,
+        limit: int = 100,
+        offset: int = 0,
+    ) -> List[Dict[str, Any]]:
+        return await self.request("GET", "/events", {
+            "limit": limit or 100,
+            "offset": offset or 0,
+            "slug": slug or None,
+            "active": active,
+            "closed": closed,
+        })
+
+    async def get_event(self, event_id: str) -> Dict[str, Any]:
+        return await self.request("GET", f"/events/{event_id}")
+
+    async def get_event_by_slug(self, slug: str) -> Dict[str, Any]:
+        return await self._first("/events", {"slug": slug}, "Event", slug)
+
+    async def get_categories(self) -> List[str]:
+        markets = await self.get_markets(limit=1000)
+        return sorted({m["category"] for m in markets if m.get("category")})
+
+
+# ----------------------------------------------------------------------
+# Data API
+# ----------------------------------------------------------------------
+
+class DataApi(_Api):
+    """Positions, activity and trade history (lib/polymarket/data.ts)"""
+
+    name = "Data"
+    code = "DATA_ERROR"
+    endpoint = DATA
+
+    def __init__(
+        self,
+        base_url: str = DEFAULT_DATA_URL,
+        pool: Optional[HttpPool] = None,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        coalesce: bool = True,
+        concurrency: Optional[int] = None,
+        limiter: Optional[RateLimiter] = None,
+    ) -> None:
+        super().__init__(base_url, pool, max_retries, coalesce, concurrency, limiter)
+
+    async def get_positions(self, address: str) -> List[Dict[str, Any]]:
+        return await self.request("GET", "/positions", {"user": address})
+
+    async def get_open_positions(self, address: str) -> List[Dict[str, Any]]:
+        positions = await self.get_positions(address)
+        return [p for p in positions if not p.get("closed") and (p.get("size") or 0) > 0]
+
+    async def get_position(self, address: str, condition_id: str) -> Optional[Dict[str, Any]]:
+        positions = await self.get_positions(address)
+        return next((p for p in positions if p.get("condition_id") == condition_id), None)
+
+    async def get_position_summary(self, address: str) -> Dict[str, float]:
+        positions = await self.get_open_positions(address)
+        return {
+            "total_value": sum(p.get("current_value") or 0 for p in positions),
+            "total_pnl": sum(p.get("total_pnl") or 0 for p in positions),
+            "realized_pnl": sum(p.get("realized_pnl") or 0 for p in positions),
+            "unrealized_pnl": sum(p.get("unrealized_pnl") or 0 for p in positions),
+            "open_positions": len(positions),
+        }
+
+    async def get_activity(self, address: str, limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
+        return await self.request("GET", "/activity", {"user": address, "limit": limit or 100, "offset": offset or 0})
+
+    async def get_recent_trades(self, address: str, limit: int = 50) -> List[Dict[str, Any]]:
+        activity = await self.get_activity(address, limit)
+        return [a for a in activity if a.get("type") in ("BUY", "SELL")]
+
+    async def get_market_trades(self, condition_id: str, limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
+        return await self.request("GET", "/trades", {"market": condition_id, "limit": limit or 100, "offset": offset or 0})
+
+    async def get_recent_market_trades(self, condition_id: str, limit: int = 50) -> List[Dict[str, Any]]:
+        return await self.get_market_trades(condition_id, limit)
+
+
+# ----------------------------------------------------------------------
+# Client
+# ----------------------------------------------------------------------
+
+class PolymarketClient:
+    """
+    CLOB, Gamma and Data APIs over one keep-alive connection pool.
+
+    Mirrors PolymarketClient in lib/polymarket/client.ts. L2 credentials
+    are passed in (deriving them needs an EIP-712 signer, which stays on
+    the TS side); `address` is the wallet used for position lookups. The
+    three APIs share one RateLimiter, a default one unless given.
+
+    Usage:
+        async with PolymarketClient() as client:
+            book = await client.get_order_book(token_id)
+            markets = await client.get_markets(limit=50)
+    """
+
+    def __init__(
+        self,
+        clob_url: str = DEFAULT_CLOB_URL,
+        gamma_url: str = DEFAULT_GAMMA_URL,
+        data_url: str = DEFAULT_DATA_URL,
+        pool: Optional[HttpPool] = None,
+        api_key: Optional[str] = None,
+        api_secret: Optional[str] = None,
+        passphrase: Optional[str] = None,
+        address: Optional[str] = None,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        limiter: Optional[RateLimiter] = None,
+    ) -> None:
+        self._owns_pool = pool is None
+        self.pool = pool or HttpPool()
+        self.limiter = limiter or RateLimiter()
+        self.clob = ClobApi(clob_url, self.pool, api_key, api_secret, passphrase, max_retries, limiter=self.limiter)
+        self.gamma = GammaApi(gamma_url, self.pool, max_retries, limiter=self.limiter)
+        self.data = DataApi(data_url, self.pool, max_retries, limiter=self.limiter)
+        self.address = address
+
+    async def __aenter__(self) -> "PolymarketClient":
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        if self._owns_pool:
+            await self.pool.close()
+
+    @property
+    def is_authenticated(self) -> bool:
+        return self.clob.is_authenticated
+
+    def set_credentials(self, api_key: str, api_secret: str, passphrase: str, address: Optional[str] = None) -> None:
+        self.clob.set_credentials(api_key, api_secret, passphrase)
+        if address is not None:
+            self.address = address
+
+    def _require_address(self, action: str) -> str:
+        if not self.address:
+            raise PolymarketError(f"Wallet address required to get {action}", "NO_ADDRESS")
+        return self.address
+
+    # Markets (Gamma API)
+
+    async def get_markets(
+        self,
+        active: bool = True,
+        limit: int = 100,
+        offset: int = 0,
+        category: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        return await self.gamma.get_markets(active=active, limit=limit, offset=offset, category=category)
+
+    async def get_market(self, condition_id: str) -> Dict[str, Any]:
+        return await self.gamma.get_market(condition_id)
+
+    async def get_market_by_token(self, token_id: str) -> Dict[str, Any]:
+        return await self.gamma.get_market_by_token(token_id)
+
+    async def search_markets(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
+        return await self.gamma.search_markets(query, limit)
+
+    # Order book (CLOB API)
+
+    async def get_order_book(self, token_id: str) -> Dict[str, Any]:
+        return await self.clob.get_order_book(token_id)
+
+    async def get_order_books(
+        self,
+        token_ids: Iterable[str],
+        errors: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        return await self.clob.get_order_books(token_ids, errors)
+
+    async def get_price(self, token_id: str) -> float:
+        return await self.clob.get_midpoint(token_id)
+
+    async def get_spread(self, token_id: str) -> Dict[str, float]:
+        return await self.clob.get_spread(token_id)
+
+    # Trading (CLOB API)
+
+    async def place_order(self, order: Dict[str, Any]) -> Dict[str, Any]:
+        return await self.clob.place_order(order)
+
+    async def cancel_order(self, order_id: str) -> None:
+        await self.clob.cancel_order(order_id)
+
+    async def cancel_all_orders(self) -> None:
+        await self.clob.cancel_all_orders()
+
+    async def get_open_orders(self) -> List[Dict[str, Any]]:
+        return await self.clob.get_open_orders()
+
+    # Positions and activity (Data API)
+
+    async def get_positions(self) -> List[Dict[str, Any]]:
+        return await self.data.get_positions(self._require_address("positions"))
+
+    async def get_open_positions(self) -> List[Dict[str, Any]]:
+        return await self.data.get_open_positions(self._require_address("positions"))
+
+    async def get_position_summary(self) -> Dict[str, float]:
+        return await self.data.get_position_summary(self._require_address("position summary"))
+
+    async def get_activity(self, limit: int = 100) -> List[Dict[str, Any]]:
+        return await self.data.get_activity(self._require_address("activity"), limit)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pool": self.pool.stats(),
+            "clob": self.clob.stats(),
+            "gamma": self.gamma.stats(),
+            "data": self.data.stats(),
+            "limiter": self.limiter.stats(),
+        }
@@ -0,0 +1,95 @@
+"""
+Framing for the executor IPC channel.
+
+Every message is a 4-byte big-endian length prefix followed by a
+UTF-8 encoded JSON payload. The same framing is used in both
+directions so the Node.js side can parse responses incrementally.
+
+A frame whose length has the ATTACHMENT_FLAG bit set carries binary
+data after its JSON: the payload is a 4-byte big-endian JSON length,
+the JSON, then the attachment (e.g. a binary context, see codec.py),
+which read_frame returns under the message's "attachment" key as a
+memoryview over the frame.
+"""
+
+import json
+import struct
+from typing import Any, BinaryIO, Dict, Optional
+
+HEADER = struct.Struct(">I")
+MAX_FRAME_SIZE = 64 * 1024 * 1024  # 64MB hard cap per message
+ATTACHMENT_FLAG = 0x80000000
+
+
+class ProtocolError(Exception):
+    """Raised when a frame cannot be read or decoded"""
+
+
+def encode_frame(message: Dict[str, Any], attachment: Optional[bytes] = None) -> bytes:
+    """Serialize a message (and optional binary attachment) into a length-prefixed frame"""
+    payload = json.dumps(message, separators=(",", ":")).encode("utf-8")
+    if attachment is not None:
+        payload = HEADER.pack(len(payload)) + payload + attachment
+    if len(payload) > MAX_FRAME_SIZE:
+        raise ProtocolError(f"Frame too large: {len(payload)} bytes")
+    flag = ATTACHMENT_FLAG if attachment is not None else 0
+    return HEADER.pack(len(payload) | flag) + payload
+
+
+def _read_exact(stream: BinaryIO, size: int) -> Optional[bytes]:
+    """Read exactly `size` bytes, or None on a clean EOF"""
+    chunks = []
+    remaining = size
+    while remaining > 0:
+        chunk = stream.read(remaining)
+        if not chunk:
+            if remaining == size:
+                return None
+            raise ProtocolError("Unexpected EOF in the middle of a frame")
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(chunks)
+
+
+def read_frame(stream: BinaryIO) -> Optional[Dict[str, Any]]:
+    """
+    Read one message from the stream.
+    Returns None when the peer closed the channel.
+    """
+    header = _read_exact(stream, HEADER.size)
+    if header is None:
+        return None
+
+    (length,) = HEADER.unpack(header)
+    has_attachment = bool(length & ATTACHMENT_FLAG)
+    length &= ~ATTACHMENT_FLAG
+    if length > MAX_FRAME_SIZE:
+        raise ProtocolError(f"Frame too large: {length} bytes")
+
+    payload = _read_exact(stream, length) if length else b""
+    if payload is None:
+        raise ProtocolError("Unexpected EOF after frame header")
+
+    attachment = None
+    if has_attachment:
+        if length < HEADER.size:
+            raise ProtocolError("Attachment frame without a JSON length")
+        (json_length,) = HEADER.unpack_from(payload)
+        if HEADER.size + json_length > length:
+            raise ProtocolError(f"JSON length {json_length} exceeds frame size {length}")
+        attachment = memoryview(payload)[HEADER.size + json_length:]
+        payload = payload[HEADER.size:HEADER.size + json_length]
+
+    try:
+        message = json.loads(payload.decode("utf-8"))
+    except ValueError as e:
+        raise ProtocolError(f"Invalid frame payload: {e}") from e
+    if attachment is not None:
+        message["attachment"] = attachment
+    return message
+
+
+def write_frame(stream: BinaryIO, message: Dict[str, Any], attachment: Optional[bytes] = None) -> None:
+    """Write one message to the stream and flush it"""
+    stream.write(encode_frame(message, attachment))
+    stream.flush()
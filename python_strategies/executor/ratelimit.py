@@ -0,0 +1,193 @@
+"""
+Async token-bucket rate limiting per Polymarket endpoint class.
+
+Each endpoint class (books, orders, gamma, data) has a bucket that
+refills continuously at `rate` tokens per second up to `burst`. A
+caller awaits acquire() until a token is available, instead of failing
+like the fixed-window counter in lib/utils/rate-limiter.ts. Waiters are
+served in arrival order, so once the burst is spent requests leave
+evenly spaced at the refill rate.
+
+A 429 is treated as the server's statement of the real limit. The
+bucket empties and pauses for the Retry-After period. Its rate is
+halved, then climbs linearly back to the configured rate over
+`recover_seconds`. A limiter configured too high therefore settles near
+the sustainable rate, rather than bursting into 429s and stalling on
+backoff.
+"""
+
+import asyncio
+import math
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+BOOKS = "books"
+ORDERS = "orders"
+GAMMA = "gamma"
+DATA = "data"
+
+# (requests per second, burst), under Polymarket's published per-10s limits
+DEFAULT_LIMITS: Dict[str, Tuple[float, float]] = {
+    BOOKS: (15.0, 30.0),
+    ORDERS: (10.0, 20.0),
+    GAMMA: (10.0, 20.0),
+    DATA: (15.0, 30.0),
+}
+DEFAULT_RATE = (10.0, 20.0)
+DEFAULT_PAUSE = 1.0
+DEFAULT_RECOVER_SECONDS = 60.0
+DECREASE = 0.5
+
+
+class TokenBucket:
+    """
+    Token bucket with async waiting and 429 feedback.
+
+    Usage:
+        bucket = TokenBucket(rate=10, burst=20)
+        await bucket.acquire()
+        ...
+        bucket.throttle(retry_after=2.0)  # on a 429
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: float,
+        min_rate: Optional[float] = None,
+        recover_seconds: float = DEFAULT_RECOVER_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_rate = rate
+        self.burst = burst
+        self.min_rate = min_rate if min_rate is not None else rate / 16
+        self.recover_seconds = recover_seconds
+        self.clock = clock
+        now = clock()
+        self._tokens = burst
+        self._updated = now
+        self._paused_until = now
+        # Rate after the last throttle and when it starts climbing back
+        self._floor = rate
+        self._recover_start = -math.inf
+        self._lock = asyncio.Lock()
+        self.acquired = 0
+        self.throttled = 0
+        self.waited = 0.0
+
+    def rate(self, now: Optional[float] = None) -> float:
+        """Current refill rate, between the last throttle's floor and max_rate"""
+        now = self.clock() if now is None else now
+        if self._floor >= self.max_rate:
+            return self.max_rate
+        elapsed = now - self._recover_start
+        if elapsed <= 0:
+            return self._floor
+        if elapsed >= self.recover_seconds:
+            self._floor = self.max_rate
+            return self.max_rate
+        return self._floor + (self.max_rate - self._floor) * elapsed / self.recover_seconds
+
+    def _refill(self, now: float) -> None:
+        start = max(self._updated, self._paused_until)
+        if now > start:
+            self._tokens = min(self.burst, self._tokens + (now - start) * self.rate(now))
+            self._updated = now
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """Take tokens if available now, without waiting"""
+        now = self.clock()
+        self._refill(now)
+        if self._tokens >= tokens and not self._lock.locked():
+            self._tokens -= tokens
+            self.acquired += 1
+            return True
+        return False
+
+    async def acquire(self, tokens: float = 1.0) -> float:
+        """Wait until `tokens` are available and take them; returns seconds waited"""
+        started = self.clock()
+        async with self._lock:
+            while True:
+                now = self.clock()
+                self._refill(now)
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    self.acquired += 1
+                    waited = now - started
+                    self.waited += waited
+                    return waited
+                delay = max(self._paused_until - now, 0.0)
+                delay += (tokens - max(self._tokens, 0.0)) / self.rate(now + delay)
+                await asyncio.sleep(delay)
+
+    def throttle(self, retry_after: Optional[float] = None) -> None:
+        """
+        Record a 429: empty the bucket and pause it for `retry_after`
+        seconds. The first 429 after a pause ends also halves the rate;
+        429s from requests already in flight only extend the pause.
+        """
+        now = self.clock()
+        self._refill(now)
+        fresh = now >= self._paused_until
+        self._tokens = 0.0
+        self._updated = now
+        self._paused_until = max(self._paused_until, now + (retry_after if retry_after is not None else DEFAULT_PAUSE))
+        if fresh:
+            self._floor = max(self.min_rate, self.rate(now) * DECREASE)
+        self._recover_start = self._paused_until
+        self.throttled += 1
+
+    def stats(self) -> Dict[str, float]:
+        now = self.clock()
+        self._refill(now)
+        return {
+            "rate": self.rate(now),
+            "max_rate": self.max_rate,
+            "burst": self.burst,
+            "tokens": self._tokens,
+            "paused_for": max(self._paused_until - now, 0.0),
+            "acquired": self.acquired,
+            "throttled": self.throttled,
+            "waited": self.waited,
+        }
+
+
+class RateLimiter:
+    """
+    One TokenBucket per endpoint class, created on first use.
+
+    Usage:
+        limiter = RateLimiter({"books": (20, 40)})
+        await limiter.acquire("books")
+    """
+
+    def __init__(
+        self,
+        limits: Optional[Dict[str, Tuple[float, float]]] = None,
+        recover_seconds: float = DEFAULT_RECOVER_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.limits = dict(DEFAULT_LIMITS)
+        self.limits.update(limits or {})
+        self.recover_seconds = recover_seconds
+        self.clock = clock
+        self.buckets: Dict[str, TokenBucket] = {}
+
+    def bucket(self, endpoint: str) -> TokenBucket:
+        bucket = self.buckets.get(endpoint)
+        if bucket is None:
+            rate, burst = self.limits.get(endpoint, DEFAULT_RATE)
+            bucket = self.buckets[endpoint] = TokenBucket(
+                rate, burst, recover_seconds=self.recover_seconds, clock=self.clock
+            )
+        return bucket
+
+    async def acquire(self, endpoint: str, tokens: float = 1.0) -> float:
+        return await self.bucket(endpoint).acquire(tokens)
+
+    def throttle(self, endpoint: str, retry_after: Optional[float] = None) -> None:
+        self.bucket(endpoint).throttle(retry_after)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        return {endpoint: bucket.stats() for endpoint, bucket in self.buckets.items()}
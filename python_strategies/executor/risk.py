@@ -0,0 +1,202 @@
+"""
+Batch pre-trade risk checks.
+
+Evaluates every order a strategy proposed in one pass against a
+RiskSnapshot taken from the user's RiskConfig plus the state the live
+broker otherwise queries per order (open exposure, orders in the last
+minute, today's PnL). Per-order checks (validation, the strategy's own
+risk_check hook, max position size) run first; the limits that depend
+on earlier orders in the batch (cumulative exposure, orders per minute)
+are then resolved over NumPy cumulative sums, so the result matches
+checking the orders one by one in proposal order.
+
+Reasons use the same wording as LiveBroker.preTradeRiskCheck and
+PaperBroker.canTrade.
+"""
+
+import math
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from sdk import PositionBook
+
+# Price assumed for orders without a limit price, as in the live broker
+DEFAULT_ORDER_PRICE = 0.5
+
+RiskHook = Callable[[Dict[str, Any], Dict[str, Any]], bool]
+Validator = Callable[[Dict[str, Any]], Optional[str]]
+
+
+@dataclass(slots=True)
+class RiskSnapshot:
+    """RiskConfig limits plus the account state they are checked against"""
+    max_orders_per_minute: float = math.inf
+    max_daily_loss: float = math.inf
+    max_position_size: float = math.inf
+    max_total_exposure: float = math.inf
+    kill_switch_active: bool = False
+    kill_switch_reason: Optional[str] = None
+    orders_last_minute: int = 0
+    today_pnl: float = 0.0
+    # None: taken from the context's PositionBook
+    current_exposure: Optional[float] = None
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> "RiskSnapshot":
+        """Build from the `risk` entry of a run context (snake_case, nulls allowed)"""
+        snapshot = cls()
+        for name, value in (data or {}).items():
+            if name in cls.__dataclass_fields__ and value is not None:
+                setattr(snapshot, name, value)
+        return snapshot
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], **state: Any) -> "RiskSnapshot":
+        """Build from a RiskConfig row (camelCase, as returned by Prisma)"""
+        return cls(
+            max_orders_per_minute=config.get("maxOrdersPerMinute", math.inf),
+            max_daily_loss=config.get("maxDailyLoss", math.inf),
+            max_position_size=config.get("maxPositionSize", math.inf),
+            max_total_exposure=config.get("maxTotalExposure", math.inf),
+            kill_switch_active=bool(config.get("killSwitchActive", False)),
+            kill_switch_reason=config.get("killSwitchReason"),
+            **state,
+        )
+
+    def has_limits(self) -> bool:
+        """Whether any per-order limit is finite"""
+        return (
+            self.max_position_size != math.inf
+            or self.max_total_exposure != math.inf
+            or self.max_orders_per_minute != math.inf
+        )
+
+    def blocked_reason(self) -> Optional[str]:
+        """Reason no order may be placed at all, or None"""
+        if self.kill_switch_active:
+            return f"Kill switch active: {self.kill_switch_reason or 'No reason given'}"
+        if self.today_pnl < -self.max_daily_loss:
+            return "Daily loss limit exceeded"
+        return None
+
+
+class RiskEngine:
+    """
+    Usage:
+        engine = RiskEngine(RiskSnapshot.from_dict(context.get("risk")))
+        reasons = engine.evaluate(orders, context, hook=strategy.risk_check)
+        approved = [o for o, r in zip(orders, reasons) if r is None]
+    """
+
+    def __init__(self, snapshot: Optional[RiskSnapshot] = None, validator: Optional[Validator] = None) -> None:
+        self.snapshot = snapshot or RiskSnapshot()
+        self.validator = validator
+
+    def _current_exposure(self, context: Optional[Dict[str, Any]]) -> float:
+        if self.snapshot.current_exposure is not None:
+            return self.snapshot.current_exposure
+        positions = (context or {}).get("positions")
+        if isinstance(positions, PositionBook):
+            return positions.total_exposure
+        return PositionBook(positions or ()).total_exposure
+
+    def evaluate(
+        self,
+        orders: Sequence[Dict[str, Any]],
+        context: Optional[Dict[str, Any]] = None,
+        hook: Optional[RiskHook] = None,
+    ) -> List[Optional[str]]:
+        """Rejection reason per order (None = approved), in proposal order"""
+        n = len(orders)
+        if n == 0:
+            return []
+
+        blocked = self.snapshot.blocked_reason()
+        if blocked is not None:
+            return [blocked] * n
+
+        # Per-order checks: structure, then the strategy's hook
+        reasons: List[Optional[str]] = [None] * n
+        for i, order in enumerate(orders):
+            reason = self.validator(order) if self.validator is not None else None
+            if reason is None and hook is not None:
+                try:
+                    if not hook(order, context):
+                        reason = "Rejected by strategy risk_check"
+                except Exception as e:
+                    reason = f"risk_check raised {e!r}"
+            reasons[i] = reason
+
+        snap = self.snapshot
+        if not snap.has_limits():
+            return reasons
+
+        live = np.fromiter((r is None for r in reasons), dtype=bool, count=n)
+        if not live.any():
+            return reasons
+
+        size = np.fromiter((o["size"] if ok else 0.0 for o, ok in zip(orders, live)), dtype=np.float64, count=n)
+        price = np.fromiter(
+            (o.get("price") if ok and o.get("price") is not None else DEFAULT_ORDER_PRICE for o, ok in zip(orders, live)),
+            dtype=np.float64,
+            count=n,
+        )
+        is_buy = np.fromiter((ok and o["side"] == "BUY" for o, ok in zip(orders, live)), dtype=bool, count=n)
+        value = size * price
+
+        # Max position size
+        too_large = live & (value > snap.max_position_size)
+        for i in np.flatnonzero(too_large):
+            reasons[i] = f"Order value ${value[i]:.2f} exceeds max position size ${snap.max_position_size:g}"
+        live &= ~too_large
+
+        # Cumulative exposure: buys add their value, sells never breach. One
+        # running sum over the batch; each breach is found by a binary search
+        # on it. A rejected order does not consume the budget, so the search
+        # resumes after it with the running sum shifted by its value.
+        added = np.where(live & is_buy, value, 0.0)
+        accepted = live.copy()
+        limit = snap.max_total_exposure
+        base_exposure = self._current_exposure(context)
+        exposure = np.full(n, np.nan)  # Exposure a rejected buy would have reached
+        if limit != math.inf:
+            cumulative = np.cumsum(added)
+            base, offset, start = base_exposure, 0.0, 0
+            while start < n:
+                if base > limit:
+                    # Already over: every remaining buy breaches on its own
+                    rest = np.flatnonzero(added[start:] > 0) + start
+                    exposure[rest] = base + added[rest]
+                    break
+                j = start + int(np.searchsorted(cumulative[start:], limit - base + offset, side="right"))
+                if j == n:
+                    break
+                exposure[j] = base + cumulative[j] - offset
+                base += cumulative[j - 1] - offset if j > start else 0.0
+                offset, start = cumulative[j], j + 1
+            breached = ~np.isnan(exposure)
+            accepted &= ~breached
+            for i in np.flatnonzero(breached):
+                reasons[i] = f"Total exposure ${exposure[i]:.2f} would exceed limit ${limit:g}"
+
+        # Orders per minute: only the first `slots` orders that pass the
+        # exposure check are placed. Every live order after the last one
+        # placed is rejected: by exposure if it would breach the limit at
+        # the exposure reached by then, else by the rate limit.
+        if snap.max_orders_per_minute == math.inf:
+            return reasons
+        slots = max(0, math.ceil(snap.max_orders_per_minute) - snap.orders_last_minute)
+        placed = np.flatnonzero(accepted)
+        if placed.size > slots:
+            cut = placed[slots]
+            full = base_exposure + added[placed[:slots]].sum()
+            count = snap.orders_last_minute + slots
+            rest = np.flatnonzero(live[cut:]) + cut
+            reached = full + added[rest]
+            over = (added[rest] > 0) & (reached > limit)
+            rate = f"Rate limit: {count} orders in last minute (max: {snap.max_orders_per_minute:g})"
+            for i, total, breach in zip(rest.tolist(), reached.tolist(), over.tolist()):
+                reasons[i] = f"Total exposure ${total:.2f} would exceed limit ${limit:g}" if breach else rate
+        return reasons
@@ -0,0 +1,352 @@
+"""
+Strategy runner.
+
+Keeps loaded strategies warm between runs and drives the strategy
+interface (initialize -> on_tick -> propose_orders -> risk_check)
+against a context supplied by the caller. Proposed orders go through
+the batch RiskEngine, with the strategy's risk_check as a per-order
+hook and the limits from the context's `risk` snapshot, if any. With a
+TokenIndex, orders are also checked against their market's tick size
+and minimum size, and strategies can resolve tokens via
+context["tokens"].
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Tuple
+
+from sdk import MarketState, MarketStateBatch, Order, OrderBook, OrderSide, OrderType, PositionBook, TradingSession
+
+from .cache import DEFAULT_MAX_ENTRIES, DEFAULT_MAX_MEMORY_MB, StrategyCache
+from .loader import LoadedStrategy, config_key, load_strategy
+from .risk import RiskEngine, RiskSnapshot
+
+if TYPE_CHECKING:
+    # Only for annotations: importing it pulls in the HTTP client stack
+    from .tokens import TokenIndex
+
+
+class StrategyNotLoadedError(Exception):
+    """Raised when a run references a strategy that was never loaded"""
+
+
+class PhaseTimer:
+    """Accumulates wall-clock time per execution phase in milliseconds"""
+
+    def __init__(self) -> None:
+        self.timings: Dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            self.timings[name] = self.timings.get(name, 0.0) + elapsed
+
+
+@contextmanager
+def capture_logs(logs: List[str], session: Optional[TradingSession] = None) -> Iterator[TradingSession]:
+    """
+    Run strategy code inside a TradingSession and collect anything it
+    prints (including sdk.log) into `logs`. Output is routed per session,
+    so concurrent runs in threads or tasks do not mix their logs.
+    """
+    session = session if session is not None else TradingSession()
+    try:
+        with session.activate():
+            yield session
+    finally:
+        logs.extend(session.log_lines())
+
+
+def normalize_order(order: Any) -> Dict[str, Any]:
+    """Convert a proposed order (dict or sdk.Order) into a plain dict"""
+    if isinstance(order, Order):
+        return {
+            "market_id": order.market_id,
+            "token_id": order.token_id,
+            "side": order.side.value,
+            "type": order.type.value,
+            "size": order.size,
+            "price": order.price,
+        }
+    if isinstance(order, dict):
+        return {
+            "market_id": order.get("market_id"),
+            "token_id": order.get("token_id"),
+            "side": order.get("side"),
+            "type": order.get("type", "LIMIT"),
+            "size": order.get("size"),
+            "price": order.get("price"),
+        }
+    raise TypeError(f"Unsupported order type: {type(order).__name__}")
+
+
+def validate_order(order: Dict[str, Any]) -> Optional[str]:
+    """Return a rejection reason for malformed orders, or None"""
+    if not order.get("market_id") or not order.get("token_id"):
+        return "Order is missing market_id or token_id"
+    try:
+        OrderSide(order["side"])
+        OrderType(order["type"])
+    except ValueError:
+        return f"Invalid side/type: {order['side']}/{order['type']}"
+    size = order.get("size")
+    if not isinstance(size, (int, float)) or size <= 0:
+        return f"Invalid order size: {size}"
+    price = order.get("price")
+    if price is not None and not 0 <= price <= 1:
+        return f"Invalid order price: {price}"
+    return None
+
+
+def _market_state(market_id: str, data: Dict[str, Any]) -> MarketState:
+    return MarketState(
+        market_id=data.get("market_id") or market_id,
+        token_id=data.get("token_id", ""),
+        bid=data.get("bid", 0.0),
+        ask=data.get("ask", 0.0),
+        midpoint=data.get("midpoint", 0.0),
+        spread=data.get("spread", 0.0),
+        volume=data.get("volume", 0.0),
+        last_price=data.get("last_price"),
+    )
+
+
+class StrategyExecutor:
+    """
+    Hosts warm strategy modules and executes runs against them.
+    A strategy version is loaded (and initialized) once and cached;
+    subsequent runs only pay for the strategy's own work.
+
+    Safe to call from several threads. Runs of different strategies
+    proceed in parallel; runs, loads and re-initializations of the same
+    strategy id are serialised, since they share its module globals and
+    cached books.
+    """
+
+    def __init__(
+        self,
+        max_strategies: int = DEFAULT_MAX_ENTRIES,
+        max_memory_mb: Optional[float] = DEFAULT_MAX_MEMORY_MB,
+        token_index: Optional["TokenIndex"] = None,
+    ) -> None:
+        self.cache = StrategyCache(max_strategies, max_memory_mb)
+        self.token_index = token_index
+        # Runs may come from several threads; the cache is not thread-safe
+        self._lock = threading.Lock()
+        # One lock per strategy id, held for a whole load or run. Kept after
+        # unload, as a run may still hold it.
+        self._strategy_locks: Dict[str, threading.RLock] = {}
+
+    def _strategy_lock(self, strategy_id: str) -> threading.RLock:
+        with self._lock:
+            lock = self._strategy_locks.get(strategy_id)
+            if lock is None:
+                lock = self._strategy_locks[strategy_id] = threading.RLock()
+            return lock
+
+    def _validate(self, order: Dict[str, Any]) -> Optional[str]:
+        reason = validate_order(order)
+        if reason is None and self.token_index is not None:
+            reason = self.token_index.check_order(order)
+        return reason
+
+    def is_loaded(
+        self,
+        strategy_id: str,
+        version: Optional[int] = None,
+        config: Optional[Dict[str, Any]] = None,
+    ) -> bool:
+        """
+        Whether the version is cached; with `config`, also whether it was
+        initialized with that config
+        """
+        with self._lock:
+            if version is None:
+                version = self.cache.latest_version(strategy_id)
+            loaded = self.cache.peek((strategy_id, version)) if version is not None else None
+        if loaded is None:
+            return False
+        return config is None or loaded.config_key == config_key(config)
+
+    def _initialize(
+        self,
+        loaded: LoadedStrategy,
+        config: Optional[Dict[str, Any]],
+        timer: PhaseTimer,
+        logs: List[str],
+    ) -> None:
+        if loaded.initialize is not None:
+            with timer.phase("initialize"), capture_logs(logs):
+                loaded.initialize(dict(config or {}))
+        loaded.config_key = config_key(config)
+
+    def load(
+        self,
+        strategy_id: str,
+        version: int,
+        code: str,
+        config: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Compile a strategy and call its initialize hook"""
+        timer = PhaseTimer()
+        logs: List[str] = []
+
+        with self._strategy_lock(strategy_id):
+            with timer.phase("compile"):
+                loaded = load_strategy(strategy_id, version, code)
+
+            self._initialize(loaded, config, timer, logs)
+            size = self.cache.measure(loaded)
+
+            with self._lock:
+                evicted = self.cache.put(loaded, size)
+        return {
+            "strategy_id": strategy_id,
+            "version": version,
+            "evicted": evicted,
+            "logs": logs,
+            "timings": timer.timings,
+        }
+
+    def unload(self, strategy_id: str) -> bool:
+        with self._lock:
+            return self.cache.remove(strategy_id)
+
+    def _ensure_loaded(self, strategy: Optional[Dict[str, Any]], strategy_id: str) -> Tuple[LoadedStrategy, Optional[Dict[str, Any]]]:
+        """
+        Resolve the cached strategy, loading it if the request carries its
+        code. A cached strategy whose request carries a different config
+        (edited parameters, per-run overrides) is initialized again.
+        """
+        with self._lock:
+            version = strategy.get("version", 1) if strategy is not None else self.cache.latest_version(strategy_id)
+            loaded = self.cache.get((strategy_id, version)) if version is not None else None
+
+        load_result = None
+        if loaded is None and strategy is not None:
+            load_result = self.load(strategy_id, version, strategy["code"], strategy.get("config"))
+            with self._lock:
+                loaded = self.cache.peek((strategy_id, version))
+        elif loaded is not None and strategy is not None and loaded.config_key != config_key(strategy.get("config")):
+            timer = PhaseTimer()
+            logs: List[str] = []
+            self._initialize(loaded, strategy.get("config"), timer, logs)
+            load_result = {"evicted": [], "logs": logs, "timings": timer.timings, "reinitialized": True}
+
+        if loaded is None:
+            raise StrategyNotLoadedError(f"Strategy not loaded: {strategy_id}@{version}")
+        return loaded, load_result
+
+    def run(
+        self,
+        strategy_id: str,
+        context: Dict[str, Any],
+        strategy: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Execute one strategy cycle.
+        Returns the proposed orders, the orders that passed validation and
+        risk_check, the rejected orders with reasons, captured logs and
+        per-phase timings in milliseconds. Waits for any other run of the
+        same strategy id to finish first.
+        """
+        with self._strategy_lock(strategy_id):
+            return self._run(strategy_id, context, strategy)
+
+    def _run(
+        self,
+        strategy_id: str,
+        context: Dict[str, Any],
+        strategy: Optional[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        started = time.perf_counter()
+        loaded, load_result = self._ensure_loaded(strategy, strategy_id)
+
+        timer = PhaseTimer()
+        logs: List[str] = list(load_result["logs"]) if load_result else []
+        if load_result:
+            timer.timings.update(load_result["timings"])
+
+        with timer.phase("build_context"):
+            market_data = context.get("market_data") or {}
+            session = TradingSession(
+                # A binary context's MarketStateBatch already serves as the session's market data
+                market_data=market_data if isinstance(market_data, MarketStateBatch) else {
+                    market_id: _market_state(market_id, data)
+                    for market_id, data in market_data.items()
+                },
+                books=loaded.books,
+            )
+            book_changes = {}
+            for market_id, payload in (context.get("orderbooks") or {}).items():
+                book = loaded.books.get(market_id)
+                if book is None:
+                    book = loaded.books[market_id] = OrderBook()
+                changes = book.apply_snapshot(payload)
+                if changes:
+                    book_changes[market_id] = changes
+            strategy_context = {
+                "mode": context.get("mode", "PAPER"),
+                "positions": PositionBook(context.get("positions") or []),
+                "balance": context.get("balance", 0.0),
+                "market_data": market_data,
+                "parameters": context.get("parameters") or {},
+            }
+            if self.token_index is not None:
+                strategy_context["tokens"] = self.token_index
+
+        with capture_logs(logs, session):
+            if loaded.on_book_update is not None and book_changes:
+                with timer.phase("on_book_update"):
+                    for market_id, changes in book_changes.items():
+                        loaded.on_book_update(market_id, changes)
+
+            if loaded.on_tick is not None:
+                with timer.phase("on_tick"):
+                    for data in market_data.values():
+                        loaded.on_tick(data)
+
+            with timer.phase("propose_orders"):
+                returned = loaded.propose_orders(strategy_context) or []
+                proposed = [normalize_order(o) for o in returned]
+                proposed.extend(normalize_order(o) for o in session.drain())
+
+            approved: List[Dict[str, Any]] = []
+            rejected: List[Dict[str, Any]] = []
+            with timer.phase("risk_check"):
+                engine = RiskEngine(RiskSnapshot.from_dict(context.get("risk")), self._validate)
+                reasons = engine.evaluate(proposed, strategy_context, loaded.risk_check)
+                for order, reason in zip(proposed, reasons):
+                    if reason is None:
+                        approved.append(order)
+                    else:
+                        rejected.append({"order": order, "reason": reason})
+
+        # The run may have grown the strategy's state; measured outside the cache lock
+        size = self.cache.measure(loaded)
+        with self._lock:
+            evicted = self.cache.update((strategy_id, loaded.version), size)
+            recycle = self.cache.over_memory()
+        if load_result:
+            evicted = load_result["evicted"] + evicted
+
+        timer.timings["total"] = (time.perf_counter() - started) * 1000
+        return {
+            "strategy_id": strategy_id,
+            "version": loaded.version,
+            "cold_start": load_result is not None and not load_result.get("reinitialized"),
+            "reinitialized": bool(load_result and load_result.get("reinitialized")),
+            "books_changed": {market_id: len(c) for market_id, c in book_changes.items()},
+            "evicted": evicted,
+            "recycle": recycle,
+            "proposed": proposed,
+            "approved": approved,
+            "rejected": rejected,
+            "logs": logs,
+            "timings": timer.timings,
+        }
@@ -0,0 +1,180 @@
+"""
+Asyncio strategy runtime.
+
+Fetches the order books of every market a strategy watches in batched
+POST /books requests (or concurrent /book requests where the endpoint
+is unavailable) over a pooled HTTP connection set, derives top of book
+and midpoint locally, then runs one strategy cycle (on_tick per market,
+propose_orders once, risk checks) through the StrategyExecutor. A cycle
+over N markets costs about one round trip, as the batches go out
+concurrently, instead of 2N requests. Fetches go through ClobApi, so
+runs in flight at the same time share one request per book.
+
+Market ids are CLOB token ids, as in `Strategy.marketIds` and
+`buildContext` (lib/strategies/executor.ts).
+"""
+
+import asyncio
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sdk import OrderBook
+
+from .http import DEFAULT_TIMEOUT, HttpPool
+from .polymarket import DEFAULT_CLOB_URL, ClobApi
+from .ratelimit import RateLimiter
+from .runner import StrategyExecutor
+
+DEFAULT_CONCURRENCY = 16
+
+
+@dataclass
+class MarketSnapshot:
+    """Context entries for one fetch: market_data and orderbooks by market id"""
+    market_data: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    orderbooks: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+    elapsed_ms: float = 0.0
+
+
+def market_state(token_id: str, book: Dict[str, Any], midpoint: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Context market entry from a CLOB /book payload and, if available,
+    /midpoint. Like marketFromBook in lib/strategies/market-snapshot.ts,
+    market_id is the token id the snapshot is keyed by; the book's
+    condition id is kept as condition_id. An empty side is NaN, as are
+    the midpoint and spread it leaves undefined, so MarketStateBatch
+    hides the market rather than quoting it at 0 or 1.
+    """
+    parsed = OrderBook.from_clob(book)
+    bid = parsed.best_bid if parsed.best_bid is not None else math.nan
+    ask = parsed.best_ask if parsed.best_ask is not None else math.nan
+    last = book.get("last_trade_price")
+    return {
+        "market_id": token_id,
+        "token_id": token_id,
+        "condition_id": book.get("market"),
+        "bid": bid,
+        "ask": ask,
+        "midpoint": midpoint if midpoint is not None else (bid + ask) / 2,
+        "spread": ask - bid,
+        "volume": 0.0,
+        "last_price": float(last) if last not in (None, "") else None,
+    }
+
+
+class MarketFetcher:
+    """
+    Batched order book fetches against the CLOB API; the midpoint is
+    derived from each book rather than fetched separately.
+
+    Requests are not retried: a market that fails is reported in the
+    snapshot's `errors` and fetched again next cycle. With a RateLimiter,
+    requests wait for a "books" token first.
+
+    Usage:
+        async with HttpPool() as pool:
+            snapshot = await MarketFetcher(pool).fetch(token_ids)
+    """
+
+    def __init__(
+        self,
+        pool: HttpPool,
+        clob_url: str = DEFAULT_CLOB_URL,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        limiter: Optional[RateLimiter] = None,
+    ) -> None:
+        self.pool = pool
+        self.clob = ClobApi(clob_url, pool, max_retries=0, concurrency=concurrency, limiter=limiter)
+
+    async def fetch_market(self, token_id: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """(market state, raw book) for one token"""
+        book = await self.clob.get_order_book(token_id)
+        return market_state(token_id, book), book
+
+    async def fetch(self, market_ids: Iterable[str]) -> MarketSnapshot:
+        """
+        Fetch every market at once. Failed markets are left out and listed
+        in `errors`; so are books with an empty side, which keep their
+        `orderbooks` entry but have no market state to quote.
+        """
+        started = time.perf_counter()
+        snapshot = MarketSnapshot()
+        books = await self.clob.get_order_books(market_ids, snapshot.errors)
+        for market_id, book in books.items():
+            snapshot.orderbooks[market_id] = book
+            state = market_state(market_id, book)
+            empty = [side for side in ("bid", "ask") if math.isnan(state[side])]
+            if empty:
+                snapshot.errors[market_id] = f"Order book has no {' or '.join(s + 's' for s in empty)}"
+            else:
+                snapshot.market_data[market_id] = state
+        snapshot.elapsed_ms = (time.perf_counter() - started) * 1000
+        return snapshot
+
+
+class AsyncStrategyRuntime:
+    """
+    Runs strategy cycles on live CLOB data from an asyncio program.
+
+    The strategy itself runs in a worker thread, so the event loop keeps
+    serving other fetches meanwhile. StrategyExecutor serialises runs of
+    the same strategy id, which share its module and cached books; runs
+    of different strategies overlap, each in its own TradingSession.
+
+    Usage:
+        async with AsyncStrategyRuntime() as runtime:
+            result = await runtime.run("strat-1", context, strategy={"code": code, "version": 3})
+    """
+
+    def __init__(
+        self,
+        executor: Optional[StrategyExecutor] = None,
+        pool: Optional[HttpPool] = None,
+        clob_url: str = DEFAULT_CLOB_URL,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        timeout: float = DEFAULT_TIMEOUT,
+        limiter: Optional[RateLimiter] = None,
+    ) -> None:
+        self.executor = executor or StrategyExecutor()
+        self._owns_pool = pool is None
+        self.pool = pool or HttpPool(max_per_host=concurrency, timeout=timeout)
+        self.fetcher = MarketFetcher(self.pool, clob_url, concurrency, limiter)
+
+    async def __aenter__(self) -> "AsyncStrategyRuntime":
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        if self._owns_pool:
+            await self.pool.close()
+
+    async def run(
+        self,
+        strategy_id: str,
+        context: Dict[str, Any],
+        strategy: Optional[Dict[str, Any]] = None,
+        market_ids: Optional[List[str]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Fetch market data for `market_ids` (default: the context's
+        parameters.market_ids) and execute one cycle. The result is the
+        StrategyExecutor.run result plus a `fetch` timing and any
+        per-market `fetch_errors`.
+        """
+        if market_ids is None:
+            market_ids = list((context.get("parameters") or {}).get("market_ids") or ())
+        snapshot = await self.fetcher.fetch(market_ids)
+
+        run_context = dict(context)
+        run_context["market_data"] = {**(context.get("market_data") or {}), **snapshot.market_data}
+        run_context["orderbooks"] = {**(context.get("orderbooks") or {}), **snapshot.orderbooks}
+
+        result = await asyncio.to_thread(self.executor.run, strategy_id, run_context, strategy)
+        result["timings"]["fetch"] = snapshot.elapsed_ms
+        result["fetch_errors"] = snapshot.errors
+        return result
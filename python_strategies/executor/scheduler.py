@@ -0,0 +1,340 @@
+"""
+Cron scheduling for strategies.
+
+Each strategy's `schedule` (five-field cron expression, UTC, as accepted
+by strategySchema) is parsed once into a CronSchedule. The scheduler
+keeps a min-heap of (next due time, strategy) so that checking for work
+costs O(1) when nothing is due and O(log n) per strategy that is.
+Due strategies are dispatched in parallel to a thread pool; a strategy
+is skipped, not queued, while its previous run is still in progress,
+either in this scheduler or according to the caller's `is_running` check
+(e.g. a StrategyRun row still marked RUNNING).
+
+Runs missed while the scheduler was not ticking are coalesced into one.
+"""
+
+import heapq
+import threading
+import time
+from bisect import bisect_left
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+DEFAULT_MAX_WORKERS = 4
+
+# (low, high) per field: minute, hour, day of month, month, day of week
+FIELD_RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+FIELD_NAMES = ("minute", "hour", "day of month", "month", "day of week")
+
+# No valid time within this many field advances means the expression can never fire
+MAX_ADVANCES = 10_000
+
+
+class CronError(ValueError):
+    """Invalid or unsatisfiable cron expression"""
+
+
+def _parse_field(text: str, index: int) -> Tuple[int, ...]:
+    low, high = FIELD_RANGES[index]
+    values: Set[int] = set()
+    for part in text.split(","):
+        base, _, step_text = part.partition("/")
+        step = 1
+        if step_text:
+            if not step_text.isdigit() or int(step_text) == 0:
+                raise CronError(f"Invalid step in {FIELD_NAMES[index]} field: {part!r}")
+            step = int(step_text)
+
+        if base == "*":
+            start, end = low, high
+        elif "-" in base:
+            a, _, b = base.partition("-")
+            if not (a.isdigit() and b.isdigit()):
+                raise CronError(f"Invalid range in {FIELD_NAMES[index]} field: {part!r}")
+            start, end = int(a), int(b)
+        elif base.isdigit():
+            start = int(base)
+            # "5/15" means from 5 to the end of the range in steps of 15
+            end = high if step_text else start
+        else:
+            raise CronError(f"Invalid {FIELD_NAMES[index]} field: {part!r}")
+
+        if start < low or end > high or start > end:
+            raise CronError(f"{FIELD_NAMES[index]} out of range {low}-{high}: {part!r}")
+        values.update(range(start, end + 1, step))
+
+    if index == 4 and 7 in values:
+        values.discard(7)  # 7 and 0 are both Sunday
+        values.add(0)
+    return tuple(sorted(values))
+
+
+class CronSchedule:
+    """
+    A parsed five-field cron expression.
+
+    Usage:
+        schedule = CronSchedule.parse("*/5 9-17 * * 1-5")
+        schedule.next_after(datetime.now(timezone.utc))
+    """
+
+    __slots__ = ("expression", "minutes", "hours", "days", "months", "weekdays", "_any_day", "_any_weekday")
+
+    def __init__(self, expression: str) -> None:
+        fields = expression.split()
+        if len(fields) != 5:
+            raise CronError(f"Expected 5 fields in cron expression, got {len(fields)}: {expression!r}")
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, self.weekdays = (
+            _parse_field(text, i) for i, text in enumerate(fields)
+        )
+        self._any_day = fields[2] == "*"
+        self._any_weekday = fields[4] == "*"
+
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def parse(expression: str) -> "CronSchedule":
+        """Parse (and cache) an expression; many strategies share a few schedules"""
+        return CronSchedule(" ".join(expression.split()))
+
+    def _day_matches(self, dt: datetime) -> bool:
+        in_days = dt.day in self.days
+        in_weekdays = (dt.weekday() + 1) % 7 in self.weekdays
+        # As in cron: if both fields are restricted, either may match
+        if self._any_day:
+            return in_weekdays
+        if self._any_weekday:
+            return in_days
+        return in_days or in_weekdays
+
+    def matches(self, dt: datetime) -> bool:
+        return (
+            dt.minute in self.minutes
+            and dt.hour in self.hours
+            and dt.month in self.months
+            and self._day_matches(dt)
+        )
+
+    def next_after(self, dt: datetime) -> datetime:
+        """First matching minute strictly after `dt` (same tzinfo as `dt`)"""
+        t = dt.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        for _ in range(MAX_ADVANCES):
+            if t.month not in self.months:
+                year, month = (t.year + 1, 1) if t.month == 12 else (t.year, t.month + 1)
+                t = t.replace(year=year, month=month, day=1, hour=0, minute=0)
+                continue
+            if not self._day_matches(t):
+                t = t.replace(hour=0, minute=0) + timedelta(days=1)
+                continue
+            if t.hour not in self.hours:
+                t = t.replace(minute=0) + timedelta(hours=1)
+                continue
+            i = bisect_left(self.minutes, t.minute)
+            if i == len(self.minutes):
+                t = t.replace(minute=0) + timedelta(hours=1)
+                continue
+            return t.replace(minute=self.minutes[i])
+        raise CronError(f"Cron expression never fires: {self.expression!r}")
+
+    def __repr__(self) -> str:
+        return f"CronSchedule({self.expression!r})"
+
+
+class StrategyScheduler:
+    """
+    Dispatches strategies when their cron schedule comes due.
+
+    `dispatch(strategy_id)` performs one run (e.g. StrategyRun bookkeeping
+    plus StrategyExecutor.run) and is called on a worker thread.
+
+    Usage:
+        scheduler = StrategyScheduler(run_strategy, max_workers=8, is_running=has_running_run)
+        scheduler.sync(strategies)   # rows with id, schedule, isActive
+        scheduler.run_forever()      # or call scheduler.tick() from an existing loop
+    """
+
+    def __init__(
+        self,
+        dispatch: Callable[[str], Any],
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        is_running: Optional[Callable[[str], bool]] = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.dispatch = dispatch
+        self.is_running = is_running
+        self.clock = clock
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="strategy-scheduler")
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+
+        # Heap of (due timestamp, generation, strategy_id); entries whose
+        # generation is stale (strategy removed or rescheduled) are skipped
+        self._heap: List[Tuple[float, int, str]] = []
+        self._schedules: Dict[str, Tuple[CronSchedule, int]] = {}
+        self._generation = 0
+        self._running: Set[str] = set()
+        # Strategy id -> why its schedule could not be added
+        self.errors: Dict[str, str] = {}
+
+        self.dispatched = 0
+        self.skipped = 0
+        self.failed = 0
+
+    # ----------------------------------------------------------------------
+    # Schedules
+    # ----------------------------------------------------------------------
+
+    def _next_due(self, schedule: CronSchedule, after: float) -> float:
+        return schedule.next_after(datetime.fromtimestamp(after, tz=timezone.utc)).timestamp()
+
+    def add(self, strategy_id: str, expression: str, now: Optional[float] = None) -> float:
+        """Schedule (or reschedule) a strategy; returns its next due time"""
+        schedule = CronSchedule.parse(expression)
+        due = self._next_due(schedule, self.clock() if now is None else now)
+        with self._lock:
+            self._generation += 1
+            self._schedules[strategy_id] = (schedule, self._generation)
+            heapq.heappush(self._heap, (due, self._generation, strategy_id))
+        self._wakeup.set()
+        return due
+
+    def remove(self, strategy_id: str) -> bool:
+        with self._lock:
+            return self._schedules.pop(strategy_id, None) is not None
+
+    def sync(self, strategies: Iterable[Mapping[str, Any]], now: Optional[float] = None) -> None:
+        """
+        Match the scheduled set to Strategy rows (`id`, `schedule`,
+        `isActive`). Only new or changed schedules are re-parsed. A row
+        whose schedule is invalid or never fires is left unscheduled and
+        recorded in `errors`; the other rows are still scheduled.
+        """
+        wanted: Dict[str, str] = {}
+        for row in strategies:
+            if row.get("isActive", True) and row.get("schedule"):
+                wanted[row["id"]] = " ".join(row["schedule"].split())
+
+        for strategy_id in [s for s in self._schedules if s not in wanted]:
+            self.remove(strategy_id)
+        for strategy_id in [s for s in self.errors if s not in wanted]:
+            del self.errors[strategy_id]
+        for strategy_id, expression in wanted.items():
+            current = self._schedules.get(strategy_id)
+            if current is None or current[0].expression != expression:
+                try:
+                    self.add(strategy_id, expression, now)
+                except CronError as e:
+                    self.remove(strategy_id)
+                    self.errors[strategy_id] = str(e)
+                    continue
+            self.errors.pop(strategy_id, None)
+
+    def __len__(self) -> int:
+        return len(self._schedules)
+
+    def __contains__(self, strategy_id: str) -> bool:
+        return strategy_id in self._schedules
+
+    def _drop_stale(self) -> None:
+        heap = self._heap
+        while heap:
+            _, generation, strategy_id = heap[0]
+            current = self._schedules.get(strategy_id)
+            if current is not None and current[1] == generation:
+                return
+            heapq.heappop(heap)
+
+    def next_due(self) -> Optional[float]:
+        """Timestamp of the earliest due strategy, or None if nothing is scheduled"""
+        with self._lock:
+            self._drop_stale()
+            return self._heap[0][0] if self._heap else None
+
+    def due(self, now: Optional[float] = None) -> List[str]:
+        """Pop every strategy due at `now` and schedule its next occurrence"""
+        now = self.clock() if now is None else now
+        ready: List[str] = []
+        with self._lock:
+            heap = self._heap
+            while True:
+                self._drop_stale()
+                if not heap or heap[0][0] > now:
+                    return ready
+                _, generation, strategy_id = heapq.heappop(heap)
+                schedule = self._schedules[strategy_id][0]
+                # Next occurrence after now: missed occurrences collapse into this run
+                heapq.heappush(heap, (self._next_due(schedule, now), generation, strategy_id))
+                ready.append(strategy_id)
+
+    # ----------------------------------------------------------------------
+    # Dispatch
+    # ----------------------------------------------------------------------
+
+    def _run(self, strategy_id: str) -> Any:
+        try:
+            return self.dispatch(strategy_id)
+        except Exception:
+            with self._lock:
+                self.failed += 1
+            raise
+        finally:
+            with self._lock:
+                self._running.discard(strategy_id)
+
+    def tick(self, now: Optional[float] = None) -> Dict[str, Future]:
+        """Dispatch due strategies that are not already running"""
+        started: Dict[str, Future] = {}
+        for strategy_id in self.due(now):
+            with self._lock:
+                busy = strategy_id in self._running
+                if not busy:
+                    self._running.add(strategy_id)
+            if not busy and self.is_running is not None:
+                try:
+                    busy = self.is_running(strategy_id)
+                except Exception:
+                    busy = True  # Cannot tell; do not risk an overlapping run
+                if busy:
+                    with self._lock:
+                        self._running.discard(strategy_id)
+            if busy:
+                with self._lock:
+                    self.skipped += 1
+                continue
+
+            started[strategy_id] = self._pool.submit(self._run, strategy_id)
+            with self._lock:
+                self.dispatched += 1
+        return started
+
+    def run_forever(self) -> None:
+        """Tick whenever the next strategy is due, until stop() is called"""
+        self._stopped.clear()
+        while not self._stopped.is_set():
+            # Cleared before reading the heap so an add() from here on wakes us
+            self._wakeup.clear()
+            self.tick()
+            due = self.next_due()
+            timeout = None if due is None else max(due - self.clock(), 0.0)
+            self._wakeup.wait(timeout)
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._wakeup.set()
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._pool.shutdown(wait=wait)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "scheduled": len(self._schedules),
+                "running": sorted(self._running),
+                "dispatched": self.dispatched,
+                "skipped": self.skipped,
+                "failed": self.failed,
+                "errors": dict(self.errors),
+            }
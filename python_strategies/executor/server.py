@@ -0,0 +1,131 @@
+"""
+Executor server loop.
+
+Reads framed requests from stdin and writes framed responses to stdout.
+Strategy output is captured by the runner, so stdout carries nothing
+but protocol frames.
+
+Request:  {"id": 1, "type": "run", ...}
+          (a run's context may instead arrive as a binary attachment, see codec.py)
+Response: {"id": 1, "ok": true, "result": {...}}
+          {"id": 1, "ok": false, "error": "...", "error_type": "..."}
+"""
+
+import argparse
+import sys
+import time
+from typing import Any, BinaryIO, Callable, Dict
+
+from .cache import DEFAULT_MAX_ENTRIES, DEFAULT_MAX_MEMORY_MB
+from .codec import decode_context
+from .protocol import ProtocolError, read_frame, write_frame
+from .runner import StrategyExecutor
+
+
+class ExecutorServer:
+    """Dispatches protocol requests to a StrategyExecutor"""
+
+    def __init__(self, executor: StrategyExecutor = None) -> None:
+        self.executor = executor or StrategyExecutor()
+        self.started_at = time.time()
+        self._handlers: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+            "ping": self._ping,
+            "load": self._load,
+            "unload": self._unload,
+            "run": self._run,
+            "stats": self._stats,
+        }
+
+    def _ping(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        return {"pong": True, "uptime": time.time() - self.started_at}
+
+    def _stats(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        return {"uptime": time.time() - self.started_at, "cache": self.executor.cache.stats()}
+
+    def _load(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        return self.executor.load(
+            request["strategy_id"],
+            request.get("version", 1),
+            request["code"],
+            request.get("config"),
+        )
+
+    def _unload(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        return {"unloaded": self.executor.unload(request["strategy_id"])}
+
+    def _run(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        attachment = request.get("attachment")
+        if attachment is not None:
+            context = decode_context(attachment).to_dict()
+        else:
+            context = request.get("context") or {}
+        return self.executor.run(request["strategy_id"], context, request.get("strategy"))
+
+    def handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Handle a single request and build its response"""
+        request_id = request.get("id")
+        handler = self._handlers.get(request.get("type"))
+        if handler is None:
+            return {
+                "id": request_id,
+                "ok": False,
+                "error": f"Unknown request type: {request.get('type')}",
+                "error_type": "ProtocolError",
+            }
+
+        try:
+            return {"id": request_id, "ok": True, "result": handler(request)}
+        except Exception as e:
+            return {
+                "id": request_id,
+                "ok": False,
+                "error": str(e) or repr(e),
+                "error_type": type(e).__name__,
+            }
+
+    def serve(self, reader: BinaryIO, writer: BinaryIO) -> None:
+        """Serve requests until EOF or a shutdown request"""
+        while True:
+            try:
+                request = read_frame(reader)
+            except ProtocolError as e:
+                write_frame(writer, {"id": None, "ok": False, "error": str(e), "error_type": "ProtocolError"})
+                return
+
+            if request is None:
+                return
+
+            if request.get("type") == "shutdown":
+                write_frame(writer, {"id": request.get("id"), "ok": True, "result": {"shutdown": True}})
+                return
+
+            write_frame(writer, self.handle(request))
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m executor")
+    parser.add_argument(
+        "--max-strategies",
+        type=int,
+        default=DEFAULT_MAX_ENTRIES,
+        help="Maximum number of compiled strategy versions kept warm",
+    )
+    parser.add_argument(
+        "--max-memory-mb",
+        type=float,
+        default=DEFAULT_MAX_MEMORY_MB,
+        help="Cap on the estimated memory held by cached strategies; least recently used ones are evicted above it",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    executor = StrategyExecutor(args.max_strategies, args.max_memory_mb)
+
+    # Keep the real stdout for frames; anything printed outside the
+    # runner's capture goes to stderr instead of corrupting the channel.
+    reader = sys.stdin.buffer
+    writer = sys.stdout.buffer
+    sys.stdout = sys.stderr
+    ExecutorServer(executor).serve(reader, writer)
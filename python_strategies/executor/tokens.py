@@ -0,0 +1,242 @@
+"""
+Token -> market reverse index.
+
+Maps every CLOB token id to its market (condition id), outcome, tick
+size, minimum order size and neg-risk group, built by paginating
+GammaApi.get_markets. One row per token lives in typed arrays (28
+bytes), and the repeated strings (condition ids, outcomes, neg-risk
+market ids) are interned once in a shared table, so a token costs its
+id string and a dict slot rather than a dict of its own. refresh()
+re-reads only the markets updated since the last build or refresh.
+"""
+
+import asyncio
+import sys
+from array import array
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional
+
+from .polymarket import GammaApi, market_condition_id, market_tokens
+
+DEFAULT_PAGE_SIZE = 500
+DEFAULT_CONCURRENCY = 4
+DEFAULT_TICK_SIZE = 0.01
+NO_GROUP = -1
+
+
+class TokenInfo(NamedTuple):
+    token_id: str
+    condition_id: str
+    outcome: str
+    tick_size: float
+    min_order_size: float
+    # Neg-risk market id; None for markets that are not neg-risk
+    neg_risk_group: Optional[str]
+
+
+def _field(market: Dict[str, Any], *names: str) -> Any:
+    for name in names:
+        value = market.get(name)
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def _timestamp(value: Any) -> float:
+    """Epoch seconds of a Gamma ISO-8601 `updatedAt`; 0 if missing or unparsable"""
+    if not value:
+        return 0.0
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return 0.0
+
+
+class TokenIndex:
+    """
+    Array-backed token_id -> TokenInfo index over Gamma markets.
+
+    Usage:
+        index = TokenIndex(gamma)
+        await index.build(closed=False)
+        index.market_id(token_id)   # condition id, no I/O
+        await index.refresh()       # markets updated since the last build/refresh
+    """
+
+    def __init__(
+        self,
+        gamma: Optional[GammaApi] = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        concurrency: int = DEFAULT_CONCURRENCY,
+    ) -> None:
+        self.gamma = gamma or GammaApi()
+        self.page_size = page_size
+        self.concurrency = max(1, concurrency)
+        self.filters: Dict[str, Any] = {}
+        self._rows: Dict[str, int] = {}
+        self._token_ids: List[str] = []
+        self._strings: List[str] = []
+        self._string_ids: Dict[str, int] = {}
+        self._market = array("I")
+        self._outcome = array("I")
+        self._group = array("i")
+        self._tick_size = array("d")
+        self._min_size = array("d")
+        # Latest updatedAt seen; refresh() stops at markets not newer than this
+        self.updated_at = 0.0
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, token_id: object) -> bool:
+        return token_id in self._rows
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._token_ids)
+
+    # ----------------------------------------------------------------------
+    # Lookups
+    # ----------------------------------------------------------------------
+
+    def market_id(self, token_id: str) -> Optional[str]:
+        """Condition id of the token's market"""
+        row = self._rows.get(token_id)
+        return self._strings[self._market[row]] if row is not None else None
+
+    def resolve(self, token_id: str) -> Optional[TokenInfo]:
+        row = self._rows.get(token_id)
+        if row is None:
+            return None
+        group = self._group[row]
+        return TokenInfo(
+            token_id=self._token_ids[row],
+            condition_id=self._strings[self._market[row]],
+            outcome=self._strings[self._outcome[row]],
+            tick_size=self._tick_size[row],
+            min_order_size=self._min_size[row],
+            neg_risk_group=self._strings[group] if group != NO_GROUP else None,
+        )
+
+    def tick_size(self, token_id: str) -> Optional[float]:
+        row = self._rows.get(token_id)
+        return self._tick_size[row] if row is not None else None
+
+    def check_order(self, order: Dict[str, Any]) -> Optional[str]:
+        """
+        Rejection reason if an order's price is off its market's tick
+        grid or its size is below the market minimum. Tokens the index
+        does not know pass.
+        """
+        row = self._rows.get(order.get("token_id"))
+        if row is None:
+            return None
+        price = order.get("price")
+        tick = self._tick_size[row]
+        if price is not None and tick > 0 and abs(price / tick - round(price / tick)) > 1e-6:
+            return f"Price {price} is not a multiple of tick size {tick:g}"
+        minimum = self._min_size[row]
+        if order.get("size", 0) < minimum:
+            return f"Order size {order.get('size')} is below market minimum {minimum:g}"
+        return None
+
+    # ----------------------------------------------------------------------
+    # Building
+    # ----------------------------------------------------------------------
+
+    def _intern(self, value: str) -> int:
+        i = self._string_ids.get(value)
+        if i is None:
+            i = self._string_ids[value] = len(self._strings)
+            self._strings.append(sys.intern(value))
+        return i
+
+    def add_market(self, market: Dict[str, Any]) -> int:
+        """Insert or update the tokens of one Gamma market; returns how many"""
+        condition_id = market_condition_id(market)
+        if not condition_id:
+            return 0
+        market_ref = self._intern(condition_id)
+        tick = float(_field(market, "minimum_tick_size", "orderPriceMinTickSize") or DEFAULT_TICK_SIZE)
+        minimum = float(_field(market, "minimum_order_size", "orderMinSize") or 0.0)
+        group = NO_GROUP
+        if _field(market, "neg_risk", "negRisk"):
+            neg_risk_id = _field(market, "neg_risk_market_id", "negRiskMarketID")
+            group = self._intern(neg_risk_id) if neg_risk_id else NO_GROUP
+
+        tokens = market_tokens(market)
+        for token_id, outcome in tokens:
+            row = self._rows.get(token_id)
+            if row is None:
+                token_id = sys.intern(token_id)
+                self._rows[token_id] = len(self._token_ids)
+                self._token_ids.append(token_id)
+                self._market.append(market_ref)
+                self._outcome.append(self._intern(outcome))
+                self._group.append(group)
+                self._tick_size.append(tick)
+                self._min_size.append(minimum)
+            else:
+                self._market[row] = market_ref
+                self._outcome[row] = self._intern(outcome)
+                self._group[row] = group
+                self._tick_size[row] = tick
+                self._min_size[row] = minimum
+        self.updated_at = max(self.updated_at, _timestamp(_field(market, "updated_at", "updatedAt")))
+        return len(tokens)
+
+    async def build(self, **filters: Any) -> int:
+        """
+        Index every market matching `filters` (GammaApi.get_markets
+        arguments), fetching `concurrency` pages at a time. The filters
+        are kept for refresh(). Returns the number of markets read.
+        """
+        self.filters = filters
+        count = 0
+        offset = 0
+        while True:
+            pages = await asyncio.gather(*(
+                self.gamma.get_markets(limit=self.page_size, offset=offset + i * self.page_size, **filters)
+                for i in range(self.concurrency)
+            ))
+            offset += self.concurrency * self.page_size
+            for page in pages:
+                for market in page:
+                    self.add_market(market)
+                count += len(page)
+                if len(page) < self.page_size:
+                    return count
+
+    async def refresh(self) -> int:
+        """
+        Apply the markets updated since the last build or refresh, read
+        newest first until reaching an older one. Returns how many
+        markets were applied.
+        """
+        since = self.updated_at
+        filters = {k: v for k, v in self.filters.items() if k not in ("order", "ascending")}
+        changed = 0
+        offset = 0
+        while True:
+            page = await self.gamma.get_markets(
+                limit=self.page_size, offset=offset, order="updatedAt", ascending=False, **filters
+            )
+            for market in page:
+                # Markets stamped exactly `since` are re-applied; upserts are idempotent
+                if _timestamp(_field(market, "updated_at", "updatedAt")) < since:
+                    return changed
+                self.add_market(market)
+                changed += 1
+            if len(page) < self.page_size:
+                return changed
+            offset += self.page_size
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "tokens": len(self._rows),
+            "strings": len(self._strings),
+            "array_bytes": sum(
+                a.itemsize * len(a)
+                for a in (self._market, self._outcome, self._group, self._tick_size, self._min_size)
+            ),
+            "updated_at": self.updated_at,
+        }
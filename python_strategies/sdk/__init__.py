@@ -5,10 +5,15 @@ This SDK provides a safe interface for strategies to interact
 with market data and trading functionality.
 """
 
-from typing import Dict, List, Optional, Any
-from dataclasses import dataclass
+from typing import Dict, List, Mapping, Optional, Any
+from dataclasses import dataclass, field, fields, make_dataclass
 from enum import Enum
 
+from .batch import MarketStateBatch, MarketStateView
+from .orderbook import BookSide, LevelChange, OrderBook
+from .positions import PositionBook
+from .session import TradingSession, current_session
+
 class TradingMode(Enum):
     PAPER = "PAPER"
     LIVE = "LIVE"  
@@ -26,7 +31,8 @@ class OrderType(Enum):
     FOK = "FOK"  # Fill or Kill
     FAK = "FAK"  # Fill and Kill
 
-@dataclass
+# Slotted: these are rebuilt for every market on every tick
+@dataclass(slots=True)
 class MarketState:
     """Current state of a market"""
     market_id: str
@@ -38,7 +44,7 @@ class MarketState:
     volume: float
     last_price: Optional[float] = None
 
-@dataclass 
+@dataclass(slots=True)
 class Position:
     """User's position in a market"""
     market_id: str
@@ -49,7 +55,7 @@ class Position:
     realized_pnl: float = 0.0
     unrealized_pnl: float = 0.0
 
-@dataclass
+@dataclass(slots=True)
 class Order:
     """Order to be placed"""
     market_id: str
@@ -59,50 +65,67 @@ class Order:
     size: float
     price: Optional[float] = None
 
-@dataclass
+@dataclass(slots=True)
 class Context:
     """Context passed to strategy functions"""
     mode: TradingMode
-    positions: List[Position]
+    positions: List[Position]  # list or PositionBook
     balance: float
-    market_data: Dict[str, MarketState]
+    market_data: Mapping[str, MarketState]  # dict or MarketStateBatch
     parameters: Dict[str, Any]
 
+def _frozen(cls: type) -> type:
+    """Immutable, slotted copy of a dataclass with the same fields"""
+    frozen = make_dataclass(
+        f"Frozen{cls.__name__}",
+        [(f.name, f.type, field(default=f.default, default_factory=f.default_factory)) for f in fields(cls)],
+        frozen=True,
+        slots=True,
+    )
+    frozen.__module__ = __name__
+    return frozen
+
+# Hashable, read-only variants for state that is shared or cached
+FrozenMarketState = _frozen(MarketState)
+FrozenPosition = _frozen(Position)
+FrozenOrder = _frozen(Order)
+
 class MarketData:
     """
     Interface for fetching market data.
-    This is a stub that will be populated by the executor.
+    Reads from the current TradingSession, populated by the executor.
     """
-    _data: Dict[str, MarketState] = {}
     
     @classmethod
     def get(cls, market_id: str) -> Optional[MarketState]:
         """Get market state for a specific market"""
-        return cls._data.get(market_id)
+        return current_session().market_data.get(market_id)
     
     @classmethod
     def get_all(cls) -> Dict[str, MarketState]:
         """Get all available market data"""
-        return cls._data.copy()
+        return dict(current_session().market_data)
     
     @classmethod
-    def orderbook(cls, market_id: str) -> Dict[str, List]:
-        """Get order book for a market (simplified)"""
-        market = cls._data.get(market_id)
-        if not market:
-            return {"bids": [], "asks": []}
-        return {
-            "bids": [[market.bid, 100]],  # Simplified
-            "asks": [[market.ask, 100]],
-        }
+    def orderbook(cls, market_id: str) -> OrderBook:
+        """
+        Get the full-depth order book for a market.
+        Returns an empty book if no book was supplied for this market.
+        `book["bids"]` / `book["asks"]` still return [[price, size], ...].
+        """
+        session = current_session()
+        book = session.books.get(market_id)
+        if book is None:
+            market = session.market_data.get(market_id)
+            return OrderBook(market=market_id, asset_id=market.token_id if market else "")
+        return book
 
 class Trading:
     """
     Interface for trading operations.
-    This is a stub that will be populated by the executor.
+    Orders are queued on the current TradingSession and drained by the
+    executor once per cycle.
     """
-    _broker = None
-    _pending_orders: List[Order] = []
     
     @classmethod
     def place_order(
@@ -126,7 +149,7 @@ class Trading:
             size=size,
             price=price,
         )
-        cls._pending_orders.append(order)
+        current_session().submit(order)
         return {
             "queued": True,
             "order": {
@@ -147,12 +170,12 @@ class Trading:
     @classmethod
     def get_pending_orders(cls) -> List[Order]:
         """Get list of pending orders"""
-        return cls._pending_orders.copy()
+        return current_session().pending()
     
     @classmethod
     def clear_pending_orders(cls) -> None:
         """Clear pending orders (called by executor after processing)"""
-        cls._pending_orders = []
+        current_session().drain()
 
 # Convenience functions for strategies
 def log(message: str) -> None:
@@ -163,10 +186,16 @@ def get_market(market_id: str) -> Optional[MarketState]:
     """Get market data for a specific market"""
     return MarketData.get(market_id)
 
-def get_position(positions: List[Position], market_id: str) -> Optional[Position]:
-    """Find a position for a specific market"""
+def get_position(positions: List[Position], market_id: str, token_id: Optional[str] = None) -> Optional[Position]:
+    """
+    Find a position for a specific market (accepts Position objects or dicts).
+    O(1) when `positions` is a PositionBook, as in executor and backtest contexts.
+    """
+    if isinstance(positions, PositionBook):
+        return positions.get(market_id, token_id)
     for pos in positions:
-        if pos.market_id == market_id:
+        pos_market_id, pos_token_id = PositionBook.key(pos)
+        if pos_market_id == market_id and (token_id is None or pos_token_id == token_id):
             return pos
     return None
 
@@ -0,0 +1,224 @@
+"""
+Struct-of-arrays market state for many markets at once.
+
+A MarketStateBatch holds one NumPy column per MarketState field and
+presents itself as a read-only mapping of market_id -> market state, so
+it can stand in for the `market_data` dict in a strategy context.
+Rows are MarketStateView objects created on access; building a batch
+for N markets allocates a handful of arrays, not N dicts.
+"""
+
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+FIELDS = ("market_id", "token_id", "bid", "ask", "midpoint", "spread", "volume", "last_price")
+
+
+class MarketStateView(Mapping):
+    """
+    One market of a batch. Supports attribute access like MarketState
+    (`view.midpoint`) and dict access like the context dicts
+    (`view["midpoint"]`, `view.get("spread")`).
+    """
+
+    __slots__ = ("_batch", "_i")
+
+    def __init__(self, batch: "MarketStateBatch", i: int) -> None:
+        self._batch = batch
+        self._i = i
+
+    @property
+    def market_id(self) -> str:
+        return self._batch.market_ids[self._i]
+
+    @property
+    def token_id(self) -> str:
+        return self._batch.token_ids[self._i]
+
+    @property
+    def bid(self) -> float:
+        return float(self._batch.bid[self._i])
+
+    @property
+    def ask(self) -> float:
+        return float(self._batch.ask[self._i])
+
+    @property
+    def midpoint(self) -> float:
+        midpoint = self._batch._midpoint
+        if midpoint is not None:
+            return float(midpoint[self._i])
+        return (self.bid + self.ask) / 2
+
+    @property
+    def spread(self) -> float:
+        spread = self._batch._spread
+        if spread is not None:
+            return float(spread[self._i])
+        return self.ask - self.bid
+
+    @property
+    def volume(self) -> float:
+        volume = self._batch.volume
+        if volume is None:
+            return 0.0
+        value = float(volume[self._i])
+        return 0.0 if value != value else value
+
+    @property
+    def last_price(self) -> Optional[float]:
+        last = self._batch.last_price
+        if last is None:
+            return None
+        value = float(last[self._i])
+        return None if value != value else value
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key) if key in FIELDS else default
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(FIELDS)
+
+    def __len__(self) -> int:
+        return len(FIELDS)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in FIELDS}
+
+    def to_state(self):
+        """Materialize as a MarketState"""
+        from . import MarketState
+
+        return MarketState(**self.to_dict())
+
+    def __repr__(self) -> str:
+        return f"MarketStateView(market_id={self.market_id!r}, bid={self.bid}, ask={self.ask})"
+
+
+class MarketStateBatch(Mapping):
+    """
+    Market state for many markets as NumPy columns.
+
+    Markets whose bid or ask is NaN have no data yet and are hidden from
+    the mapping interface. `index` (market_id -> row) can be shared
+    between batches over the same markets to skip rebuilding it.
+    `midpoint` and `spread` default to values derived from bid and ask;
+    pass them when they come from elsewhere (e.g. CLOB /midpoint).
+
+    Usage:
+        batch = MarketStateBatch(ids, token_ids, bid, ask, volume)
+        batch.midpoint          # vectorized, one array for all markets
+        batch["0xabc"].spread   # single market view
+    """
+
+    __slots__ = ("market_ids", "token_ids", "bid", "ask", "volume", "last_price", "_index", "_midpoint", "_spread")
+
+    def __init__(
+        self,
+        market_ids: Sequence[str],
+        token_ids: Sequence[str],
+        bid: np.ndarray,
+        ask: np.ndarray,
+        volume: Optional[np.ndarray] = None,
+        last_price: Optional[np.ndarray] = None,
+        index: Optional[Mapping[str, int]] = None,
+        midpoint: Optional[np.ndarray] = None,
+        spread: Optional[np.ndarray] = None,
+    ) -> None:
+        self.market_ids = market_ids
+        self.token_ids = token_ids
+        self.bid = np.asarray(bid, dtype=np.float64)
+        self.ask = np.asarray(ask, dtype=np.float64)
+        self.volume = None if volume is None else np.asarray(volume, dtype=np.float64)
+        self.last_price = None if last_price is None else np.asarray(last_price, dtype=np.float64)
+        self._index = index if index is not None else {m: i for i, m in enumerate(market_ids)}
+        self._midpoint = None if midpoint is None else np.asarray(midpoint, dtype=np.float64)
+        self._spread = None if spread is None else np.asarray(spread, dtype=np.float64)
+
+    @classmethod
+    def from_states(cls, states: Iterable[Union[Dict[str, Any], Any]]) -> "MarketStateBatch":
+        """Build from MarketState objects or market state dicts"""
+        rows = [s if isinstance(s, dict) else _state_dict(s) for s in states]
+        nan = float("nan")
+        return cls(
+            [r["market_id"] for r in rows],
+            [r.get("token_id", "") for r in rows],
+            np.array([r["bid"] for r in rows], dtype=np.float64),
+            np.array([r["ask"] for r in rows], dtype=np.float64),
+            np.array([r.get("volume") or 0.0 for r in rows], dtype=np.float64),
+            np.array([nan if r.get("last_price") is None else r["last_price"] for r in rows], dtype=np.float64),
+        )
+
+    # Vectorized columns
+
+    @property
+    def midpoint(self) -> np.ndarray:
+        return self._midpoint if self._midpoint is not None else (self.bid + self.ask) / 2
+
+    @property
+    def spread(self) -> np.ndarray:
+        return self._spread if self._spread is not None else self.ask - self.bid
+
+    @property
+    def valid(self) -> np.ndarray:
+        """Rows with both a bid and an ask"""
+        return ~(np.isnan(self.bid) | np.isnan(self.ask))
+
+    # Mapping interface
+
+    def _row(self, market_id: str) -> Optional[int]:
+        i = self._index.get(market_id)
+        if i is None or self.bid[i] != self.bid[i] or self.ask[i] != self.ask[i]:
+            return None
+        return i
+
+    def row(self, i: int) -> MarketStateView:
+        return MarketStateView(self, i)
+
+    def __getitem__(self, market_id: str) -> MarketStateView:
+        i = self._row(market_id)
+        if i is None:
+            raise KeyError(market_id)
+        return MarketStateView(self, i)
+
+    def get(self, market_id: str, default: Any = None) -> Any:
+        i = self._row(market_id)
+        return default if i is None else MarketStateView(self, i)
+
+    def __contains__(self, market_id: object) -> bool:
+        return isinstance(market_id, str) and self._row(market_id) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        ids = self.market_ids
+        return (ids[i] for i in np.flatnonzero(self.valid))
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self.valid))
+
+    # Row-wise iteration without a key lookup per market
+    def values(self) -> List[MarketStateView]:  # type: ignore[override]
+        return [MarketStateView(self, i) for i in np.flatnonzero(self.valid).tolist()]
+
+    def items(self) -> List[Tuple[str, MarketStateView]]:  # type: ignore[override]
+        ids = self.market_ids
+        return [(ids[i], MarketStateView(self, i)) for i in np.flatnonzero(self.valid).tolist()]
+
+    def copy(self) -> Dict[str, MarketStateView]:
+        return dict(self.items())
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        return [self.row(i).to_dict() for i in np.flatnonzero(self.valid)]
+
+    def __repr__(self) -> str:
+        return f"MarketStateBatch({len(self)} markets)"
+
+
+def _state_dict(state: Any) -> Dict[str, Any]:
+    return {name: getattr(state, name, None) for name in FIELDS}
@@ -0,0 +1,419 @@
+"""
+Order book model for strategies.
+
+Built from the CLOB `/book` payload (price/size strings per level).
+Prices and sizes are parsed once and kept in compact float arrays,
+ordered best-first on each side, so that:
+
+- best bid/ask is O(1)
+- looking up a price level is O(log n) (binary search)
+- cumulative depth queries are O(log n) after a one-off O(n) prefix sum
+
+Books are long-lived: new `/book` snapshots are applied as diffs
+against the previous state (skipped entirely when the `hash` is
+unchanged) and only the levels that moved are reported as LevelChange
+records, both as a return value and to subscribed listeners.
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+BID = "BUY"
+ASK = "SELL"
+
+
+class LevelChange(NamedTuple):
+    """A change in resting size at one price level"""
+    side: str
+    price: float
+    old_size: float
+    new_size: float
+
+    @property
+    def delta(self) -> float:
+        return self.new_size - self.old_size
+
+    @property
+    def removed(self) -> bool:
+        return self.new_size <= 0
+
+    @property
+    def added(self) -> bool:
+        return self.old_size <= 0 < self.new_size
+
+
+BookListener = Callable[["OrderBook", List[LevelChange]], None]
+
+
+class BookSide:
+    """
+    One side of an order book.
+
+    Levels are stored best-first. Internally each level is keyed so that
+    keys ascend from the best level: the price itself for asks and the
+    negated price for bids. That lets both sides share one bisect-based
+    lookup.
+    """
+
+    __slots__ = ("is_bid", "_keys", "_sizes", "_cum_size", "_cum_notional")
+
+    def __init__(self, is_bid: bool, levels: Iterable[Tuple[float, float]] = ()) -> None:
+        self.is_bid = is_bid
+        sign = -1.0 if is_bid else 1.0
+        ordered = sorted((sign * price, size) for price, size in levels if size > 0)
+        self._keys = array("d", (k for k, _ in ordered))
+        self._sizes = array("d", (s for _, s in ordered))
+        self._cum_size: Optional[array] = None
+        self._cum_notional: Optional[array] = None
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __bool__(self) -> bool:
+        return len(self._keys) > 0
+
+    def _key(self, price: float) -> float:
+        return -price if self.is_bid else price
+
+    def _price(self, index: int) -> float:
+        key = self._keys[index]
+        return -key if self.is_bid else key
+
+    def _invalidate(self) -> None:
+        self._cum_size = None
+        self._cum_notional = None
+
+    # ----------------------------------------------------------------------
+    # Level access
+    # ----------------------------------------------------------------------
+
+    @property
+    def best_price(self) -> Optional[float]:
+        return self._price(0) if self._keys else None
+
+    @property
+    def best_size(self) -> float:
+        return self._sizes[0] if self._sizes else 0.0
+
+    def level(self, index: int) -> Tuple[float, float]:
+        """Price and size of the n-th best level"""
+        return self._price(index), self._sizes[index]
+
+    def levels(self, depth: Optional[int] = None) -> List[Tuple[float, float]]:
+        """The best `depth` levels as (price, size), best first"""
+        n = len(self._keys) if depth is None else min(depth, len(self._keys))
+        return [self.level(i) for i in range(n)]
+
+    def prices(self) -> array:
+        """Level prices, best first"""
+        if self.is_bid:
+            return array("d", (-k for k in self._keys))
+        return array("d", self._keys)
+
+    def sizes(self) -> array:
+        """Level sizes, best first"""
+        return array("d", self._sizes)
+
+    def index_of(self, price: float) -> Optional[int]:
+        """Index of the level at exactly `price`, or None (O(log n))"""
+        key = self._key(price)
+        i = bisect_left(self._keys, key)
+        if i < len(self._keys) and self._keys[i] == key:
+            return i
+        return None
+
+    def size_at(self, price: float) -> float:
+        """Resting size at exactly `price`"""
+        i = self.index_of(price)
+        return self._sizes[i] if i is not None else 0.0
+
+    # ----------------------------------------------------------------------
+    # Updates
+    # ----------------------------------------------------------------------
+
+    @property
+    def side(self) -> str:
+        return BID if self.is_bid else ASK
+
+    def update(self, price: float, size: float) -> Optional[LevelChange]:
+        """
+        Set the resting size at one price level (size <= 0 removes it).
+        Returns the change, or None if the level did not move.
+        """
+        key = self._key(price)
+        i = bisect_left(self._keys, key)
+        exists = i < len(self._keys) and self._keys[i] == key
+        old_size = self._sizes[i] if exists else 0.0
+
+        if size <= 0:
+            if not exists:
+                return None
+            del self._keys[i]
+            del self._sizes[i]
+        elif exists:
+            if old_size == size:
+                return None
+            self._sizes[i] = size
+        else:
+            self._keys.insert(i, key)
+            self._sizes.insert(i, size)
+
+        self._invalidate()
+        return LevelChange(self.side, price, old_size, max(size, 0.0))
+
+    def replace(self, levels: Iterable[Tuple[float, float]]) -> List[LevelChange]:
+        """
+        Replace this side with a new snapshot and return the levels that
+        changed. Both sides are walked once in key order (O(n + m)).
+        """
+        sign = -1.0 if self.is_bid else 1.0
+        new = sorted((sign * price, size) for price, size in levels if size > 0)
+        side = self.side
+        changes: List[LevelChange] = []
+
+        old_keys, old_sizes = self._keys, self._sizes
+        i = j = 0
+        while i < len(old_keys) or j < len(new):
+            if j >= len(new) or (i < len(old_keys) and old_keys[i] < new[j][0]):
+                changes.append(LevelChange(side, sign * old_keys[i], old_sizes[i], 0.0))
+                i += 1
+            elif i >= len(old_keys) or new[j][0] < old_keys[i]:
+                changes.append(LevelChange(side, sign * new[j][0], 0.0, new[j][1]))
+                j += 1
+            else:
+                if old_sizes[i] != new[j][1]:
+                    changes.append(LevelChange(side, sign * new[j][0], old_sizes[i], new[j][1]))
+                i += 1
+                j += 1
+
+        if changes:
+            self._keys = array("d", (k for k, _ in new))
+            self._sizes = array("d", (s for _, s in new))
+            self._invalidate()
+        return changes
+
+    # ----------------------------------------------------------------------
+    # Depth queries
+    # ----------------------------------------------------------------------
+
+    def _ensure_cumulative(self) -> None:
+        if self._cum_size is not None:
+            return
+        cum_size = array("d", bytes(8 * len(self._sizes)))
+        cum_notional = array("d", bytes(8 * len(self._sizes)))
+        total_size = 0.0
+        total_notional = 0.0
+        for i, size in enumerate(self._sizes):
+            total_size += size
+            total_notional += size * self._price(i)
+            cum_size[i] = total_size
+            cum_notional[i] = total_notional
+        self._cum_size = cum_size
+        self._cum_notional = cum_notional
+
+    def cumulative_sizes(self) -> array:
+        """Running total of size from the best level outwards"""
+        self._ensure_cumulative()
+        return self._cum_size
+
+    def cumulative_notional(self) -> array:
+        """Running total of price * size from the best level outwards"""
+        self._ensure_cumulative()
+        return self._cum_notional
+
+    @property
+    def total_size(self) -> float:
+        self._ensure_cumulative()
+        return self._cum_size[-1] if self._cum_size else 0.0
+
+    def depth_to_price(self, price: float) -> float:
+        """Total size at `price` or better"""
+        self._ensure_cumulative()
+        i = bisect_right(self._keys, self._key(price))
+        return self._cum_size[i - 1] if i > 0 else 0.0
+
+    def depth_levels(self, depth: int) -> float:
+        """Total size in the best `depth` levels"""
+        self._ensure_cumulative()
+        n = min(depth, len(self._keys))
+        return self._cum_size[n - 1] if n > 0 else 0.0
+
+    def levels_to_fill(self, size: float) -> int:
+        """Number of levels (from the best) needed to fill `size`"""
+        self._ensure_cumulative()
+        i = bisect_left(self._cum_size, size)
+        return min(i + 1, len(self._keys))
+
+    def sweep(self, size: float, limit: Optional[float] = None) -> Tuple[float, float, int]:
+        """
+        Take up to `size` from the best level outwards without going past
+        `limit`. Returns (filled size, notional, levels touched) in
+        O(log n) from the cumulative depth arrays.
+        """
+        self._ensure_cumulative()
+        n = len(self._keys) if limit is None else bisect_right(self._keys, self._key(limit))
+        if n == 0 or size <= 0:
+            return 0.0, 0.0, 0
+        cum_size, cum_notional = self._cum_size, self._cum_notional
+        if size >= cum_size[n - 1]:
+            return cum_size[n - 1], cum_notional[n - 1], n
+        # First level whose cumulative size covers the order; it fills partially
+        i = bisect_left(cum_size, size, 0, n)
+        before_size = cum_size[i - 1] if i else 0.0
+        before_notional = cum_notional[i - 1] if i else 0.0
+        return size, before_notional + (size - before_size) * self._price(i), i + 1
+
+
+class OrderBook:
+    """
+    Full-depth order book for one token.
+
+    Supports dict-style access (`book["bids"]`, `book["asks"]`) returning
+    [[price, size], ...] best first, for strategies written against the
+    older `MarketData.orderbook` shape.
+    """
+
+    __slots__ = ("market", "asset_id", "bids", "asks", "hash", "timestamp", "last_changes", "_listeners")
+
+    def __init__(
+        self,
+        market: str = "",
+        asset_id: str = "",
+        bids: Iterable[Tuple[float, float]] = (),
+        asks: Iterable[Tuple[float, float]] = (),
+        hash: Optional[str] = None,
+        timestamp: Optional[str] = None,
+    ) -> None:
+        self.market = market
+        self.asset_id = asset_id
+        self.bids = BookSide(True, bids)
+        self.asks = BookSide(False, asks)
+        self.hash = hash
+        self.timestamp = timestamp
+        self.last_changes: List[LevelChange] = []
+        self._listeners: List[BookListener] = []
+
+    @classmethod
+    def from_clob(cls, payload: Dict[str, Any]) -> "OrderBook":
+        """Build a book from a CLOB `/book` response"""
+        return cls(
+            market=payload.get("market", ""),
+            asset_id=payload.get("asset_id", ""),
+            bids=parse_levels(payload.get("bids") or []),
+            asks=parse_levels(payload.get("asks") or []),
+            hash=payload.get("hash"),
+            timestamp=payload.get("timestamp"),
+        )
+
+    # ----------------------------------------------------------------------
+    # Incremental updates
+    # ----------------------------------------------------------------------
+
+    def subscribe(self, listener: BookListener) -> Callable[[], None]:
+        """
+        Register a callback for level changes.
+        Returns a function that removes the listener.
+        """
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
+
+    def _emit(self, changes: List[LevelChange]) -> List[LevelChange]:
+        self.last_changes = changes
+        if changes:
+            for listener in list(self._listeners):
+                listener(self, changes)
+        return changes
+
+    def apply_snapshot(self, payload: Dict[str, Any]) -> List[LevelChange]:
+        """
+        Apply a CLOB `/book` snapshot as a diff against the current state.
+        Returns only the levels that changed; an unchanged `hash` skips
+        parsing altogether.
+        """
+        new_hash = payload.get("hash")
+        if new_hash is not None and new_hash == self.hash:
+            return self._emit([])
+
+        self.market = payload.get("market", self.market)
+        self.asset_id = payload.get("asset_id", self.asset_id)
+        self.hash = new_hash
+        self.timestamp = payload.get("timestamp", self.timestamp)
+
+        changes = self.bids.replace(parse_levels(payload.get("bids") or []))
+        changes.extend(self.asks.replace(parse_levels(payload.get("asks") or [])))
+        return self._emit(changes)
+
+    def apply_deltas(self, deltas: Iterable[Dict[str, Any]]) -> List[LevelChange]:
+        """
+        Apply individual level updates ({side, price, size}, as in CLOB
+        price-change events). A size of 0 removes the level.
+        """
+        changes: List[LevelChange] = []
+        for delta in deltas:
+            change = self.side(delta["side"]).update(float(delta["price"]), float(delta["size"]))
+            if change is not None:
+                changes.append(change)
+        return self._emit(changes)
+
+    def side(self, side: str) -> BookSide:
+        """The book side an order on `side` would rest on"""
+        return self.bids if side == BID else self.asks
+
+    def opposite(self, side: str) -> BookSide:
+        """The book side an order on `side` would trade against"""
+        return self.asks if side == BID else self.bids
+
+    @property
+    def best_bid(self) -> Optional[float]:
+        return self.bids.best_price
+
+    @property
+    def best_ask(self) -> Optional[float]:
+        return self.asks.best_price
+
+    @property
+    def midpoint(self) -> Optional[float]:
+        if not self.bids or not self.asks:
+            return None
+        return (self.bids.best_price + self.asks.best_price) / 2
+
+    @property
+    def spread(self) -> Optional[float]:
+        if not self.bids or not self.asks:
+            return None
+        return self.asks.best_price - self.bids.best_price
+
+    def __getitem__(self, key: str) -> List[List[float]]:
+        if key == "bids":
+            return [list(level) for level in self.bids.levels()]
+        if key == "asks":
+            return [list(level) for level in self.asks.levels()]
+        raise KeyError(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "market": self.market,
+            "asset_id": self.asset_id,
+            "bids": self["bids"],
+            "asks": self["asks"],
+            "hash": self.hash,
+            "timestamp": self.timestamp,
+        }
+
+    def __repr__(self) -> str:
+        return (
+            f"OrderBook(asset_id={self.asset_id!r}, bid={self.best_bid}, "
+            f"ask={self.best_ask}, levels={len(self.bids)}/{len(self.asks)})"
+        )
+
+
+def parse_levels(levels: Iterable[Dict[str, Any]]) -> List[Tuple[float, float]]:
+    """Parse CLOB `OrderBookLevel` entries ({price, size} strings) once"""
+    return [(float(level["price"]), float(level["size"])) for level in levels]
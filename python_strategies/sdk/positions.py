@@ -0,0 +1,218 @@
+"""
+Position index for strategies.
+
+A PositionBook keys positions by (market_id, token_id), the same key as
+the Prisma `@@unique([userId, marketId, tokenId, mode])` constraint, so
+lookups are O(1) instead of a scan of the context's `positions` list.
+It keeps per-market net size and exposure (size * (current_price or
+avg_entry_price), as in the live broker's pre-trade check) up to date
+as fills and marks are applied, so aggregate queries are O(1) too.
+
+The book holds the position objects it was given (context dicts or
+Position dataclasses) and iterates like the list it replaces.
+"""
+
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+EPSILON = 1e-9
+
+PositionKey = Tuple[str, str]
+
+
+def _get(position: Any, name: str, default: Any = None) -> Any:
+    if isinstance(position, dict):
+        return position.get(name, default)
+    return getattr(position, name, default)
+
+
+def _set(position: Any, name: str, value: Any) -> None:
+    if isinstance(position, dict):
+        position[name] = value
+    else:
+        setattr(position, name, value)
+
+
+def _exposure(position: Any) -> float:
+    price = _get(position, "current_price") or _get(position, "avg_entry_price", 0.0) or 0.0
+    return (_get(position, "size", 0.0) or 0.0) * price
+
+
+class PositionBook:
+    """
+    Positions keyed by (market_id, token_id).
+
+    Usage:
+        book = PositionBook(context["positions"])
+        book.get(market_id)            # first position in the market, like get_position
+        book.get(market_id, token_id)  # exact position
+        book.net_size(market_id)
+        book.total_exposure
+        book.apply_fill(market_id, token_id, "BUY", 10, 0.45)
+    """
+
+    __slots__ = ("_positions", "_by_market", "_market_size", "_market_exposure", "_total_exposure", "_as_dicts")
+
+    def __init__(self, positions: Iterable[Any] = ()) -> None:
+        self._positions: Dict[PositionKey, Any] = {}
+        self._by_market: Dict[str, List[PositionKey]] = {}
+        self._market_size: Dict[str, float] = {}
+        self._market_exposure: Dict[str, float] = {}
+        self._total_exposure = 0.0
+        self._as_dicts = True
+
+        for i, position in enumerate(positions):
+            if i == 0:
+                self._as_dicts = isinstance(position, dict)
+            self.add(position)
+
+    @staticmethod
+    def key(position: Any) -> PositionKey:
+        return _get(position, "market_id", ""), _get(position, "token_id", "") or ""
+
+    # ----------------------------------------------------------------------
+    # Aggregates
+    # ----------------------------------------------------------------------
+
+    def _account(self, position: Any, sign: float) -> None:
+        market_id = _get(position, "market_id", "")
+        size = (_get(position, "size", 0.0) or 0.0) * sign
+        exposure = _exposure(position) * sign
+        self._market_size[market_id] = self._market_size.get(market_id, 0.0) + size
+        self._market_exposure[market_id] = self._market_exposure.get(market_id, 0.0) + exposure
+        self._total_exposure += exposure
+
+    @property
+    def total_exposure(self) -> float:
+        """Sum of size * (current_price or avg_entry_price) over all positions"""
+        return self._total_exposure
+
+    def exposure(self, market_id: str) -> float:
+        return self._market_exposure.get(market_id, 0.0)
+
+    def net_size(self, market_id: str) -> float:
+        """Total size held across the market's tokens"""
+        return self._market_size.get(market_id, 0.0)
+
+    # ----------------------------------------------------------------------
+    # Lookup
+    # ----------------------------------------------------------------------
+
+    def get(self, market_id: str, token_id: Optional[str] = None) -> Optional[Any]:
+        """Exact position, or the first position in the market if token_id is None"""
+        if token_id is not None:
+            return self._positions.get((market_id, token_id))
+        keys = self._by_market.get(market_id)
+        return self._positions[keys[0]] if keys else None
+
+    def for_market(self, market_id: str) -> List[Any]:
+        return [self._positions[key] for key in self._by_market.get(market_id, ())]
+
+    def __contains__(self, key: Union[str, PositionKey]) -> bool:
+        if isinstance(key, tuple):
+            return key in self._positions
+        return key in self._by_market
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._positions.values())
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        return list(self._positions.values())[index]
+
+    def __bool__(self) -> bool:
+        return bool(self._positions)
+
+    def to_list(self) -> List[Any]:
+        return list(self._positions.values())
+
+    def __repr__(self) -> str:
+        return f"PositionBook({len(self)} positions, exposure={self._total_exposure:.2f})"
+
+    # ----------------------------------------------------------------------
+    # Updates
+    # ----------------------------------------------------------------------
+
+    def add(self, position: Any) -> None:
+        """Insert or replace a position"""
+        key = self.key(position)
+        self.remove(*key)
+        self._positions[key] = position
+        self._by_market.setdefault(key[0], []).append(key)
+        self._account(position, 1.0)
+
+    def remove(self, market_id: str, token_id: str) -> Optional[Any]:
+        key = (market_id, token_id)
+        position = self._positions.pop(key, None)
+        if position is None:
+            return None
+        self._account(position, -1.0)
+        keys = self._by_market[market_id]
+        keys.remove(key)
+        if not keys:
+            del self._by_market[market_id]
+            self._market_size.pop(market_id, None)
+            self._market_exposure.pop(market_id, None)
+        return position
+
+    def _new_position(self, market_id: str, token_id: str) -> Any:
+        if self._as_dicts:
+            return {
+                "market_id": market_id,
+                "token_id": token_id,
+                "size": 0.0,
+                "avg_entry_price": 0.0,
+                "current_price": None,
+                "realized_pnl": 0.0,
+                "unrealized_pnl": 0.0,
+            }
+        from . import Position
+
+        return Position(market_id=market_id, token_id=token_id, size=0.0, avg_entry_price=0.0)
+
+    def apply_fill(self, market_id: str, token_id: str, side: str, size: float, price: float) -> Optional[Any]:
+        """
+        Apply a fill at average cost, as the brokers do. Returns the updated
+        position, or None once it is fully closed (it is then removed).
+        """
+        key = (market_id, token_id)
+        position = self._positions.get(key)
+        if position is None:
+            if side != "BUY":
+                return None
+            position = self._new_position(market_id, token_id)
+            self._positions[key] = position
+            self._by_market.setdefault(market_id, []).append(key)
+        else:
+            self._account(position, -1.0)
+
+        held = _get(position, "size", 0.0) or 0.0
+        avg = _get(position, "avg_entry_price", 0.0) or 0.0
+        if side == "BUY":
+            held_after = held + size
+            _set(position, "avg_entry_price", (held * avg + size * price) / held_after)
+        else:
+            closed = min(size, held)
+            _set(position, "realized_pnl", (_get(position, "realized_pnl", 0.0) or 0.0) + (price - avg) * closed)
+            held_after = held - closed
+
+        _set(position, "size", held_after)
+        _set(position, "current_price", price)
+        _set(position, "unrealized_pnl", held_after * (price - _get(position, "avg_entry_price", 0.0)))
+
+        self._account(position, 1.0)
+        if held_after <= EPSILON:
+            self.remove(market_id, token_id)
+            return None
+        return position
+
+    def mark(self, market_id: str, token_id: str, price: float) -> None:
+        """Update a position's current price and unrealized PnL"""
+        position = self._positions.get((market_id, token_id))
+        if position is None:
+            return
+        self._account(position, -1.0)
+        _set(position, "current_price", price)
+        _set(position, "unrealized_pnl", (_get(position, "size", 0.0) or 0.0) * (price - (_get(position, "avg_entry_price", 0.0) or 0.0)))
+        self._account(position, 1.0)
@@ -0,0 +1,125 @@
+"""
+Per-run trading sessions.
+
+A TradingSession holds everything one strategy run reads and writes
+through the SDK: market data, order books, the queue of orders placed
+with buy()/sell()/Trading.place_order(), and the run's log output. The
+active session lives in a context variable, so runs in different threads
+or asyncio tasks each see their own session and one process can host
+many strategies at once.
+
+Queued orders go into a deque, whose append and popleft are atomic, so
+strategy code never takes a lock; the runner drains the queue once per
+cycle.
+"""
+
+import io
+import sys
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, Iterator, List, Mapping, Optional, TextIO
+
+
+class TradingSession:
+    """
+    State of one strategy run.
+
+    Usage:
+        session = TradingSession(market_data, books)
+        with session.activate():
+            strategy.propose_orders(context)  # buy()/sell() queue here
+        orders = session.drain()
+        session.log_lines()
+    """
+
+    __slots__ = ("market_data", "books", "log_stream", "_orders")
+
+    def __init__(
+        self,
+        market_data: Optional[Mapping[str, Any]] = None,
+        books: Optional[Dict[str, Any]] = None,
+        log_stream: Optional[TextIO] = None,
+    ) -> None:
+        self.market_data: Mapping[str, Any] = market_data if market_data is not None else {}
+        self.books: Dict[str, Any] = books if books is not None else {}
+        self.log_stream: TextIO = log_stream if log_stream is not None else io.StringIO()
+        self._orders: Deque[Any] = deque()
+
+    # Orders
+
+    def submit(self, order: Any) -> None:
+        self._orders.append(order)
+
+    def pending(self) -> List[Any]:
+        """Queued orders, without removing them"""
+        return list(self._orders)
+
+    def drain(self) -> List[Any]:
+        """Remove and return every queued order"""
+        orders = []
+        popleft = self._orders.popleft
+        while True:
+            try:
+                orders.append(popleft())
+            except IndexError:
+                return orders
+
+    # Logs
+
+    def write(self, text: str) -> int:
+        return self.log_stream.write(text)
+
+    def log_lines(self) -> List[str]:
+        """Captured output as lines (for the default StringIO stream)"""
+        if isinstance(self.log_stream, io.StringIO):
+            return [line for line in self.log_stream.getvalue().splitlines() if line]
+        return []
+
+    # Activation
+
+    @contextmanager
+    def activate(self) -> Iterator["TradingSession"]:
+        """Make this the current session and route stdout to its log"""
+        install_stdout_router()
+        token = _current.set(self)
+        try:
+            yield self
+        finally:
+            _current.reset(token)
+
+
+_current: ContextVar[Optional[TradingSession]] = ContextVar("polytrader_trading_session", default=None)
+
+# Used when no session is active (e.g. a strategy imported in a script)
+_default_session = TradingSession()
+
+
+def current_session() -> TradingSession:
+    session = _current.get()
+    return session if session is not None else _default_session
+
+
+class _SessionStdout(io.TextIOBase):
+    """sys.stdout replacement that writes to the active session's log"""
+
+    def __init__(self, fallback: TextIO) -> None:
+        self.fallback = fallback
+
+    def write(self, text: str) -> int:
+        session = _current.get()
+        if session is None:
+            return self.fallback.write(text)
+        return session.write(text)
+
+    def flush(self) -> None:
+        self.fallback.flush()
+
+    def writable(self) -> bool:
+        return True
+
+
+def install_stdout_router() -> None:
+    """Route print() to the active session; output outside a session is unchanged"""
+    if not isinstance(sys.stdout, _SessionStdout):
+        sys.stdout = _SessionStdout(sys.stdout)
@@ -0,0 +1,43 @@
+"""
+Simulation for PolyTrader strategies
+
+Backtesting, parameter sweeps, tick storage, execution simulation,
+paper order matching and performance metrics for strategies written
+against the SDK. Mirrors lib/simulation on the TypeScript side.
+"""
+
+from .backtest import (
+    BacktestConfig,
+    BacktestResult,
+    Backtester,
+    MarketHistory,
+)
+from .execution import Execution, execute_order
+from .matching import MatchFill, MatchingEngine, QueueEstimate, RestingOrder
+from .metrics import PerformanceMetrics
+from .streaming import MetricsAccumulator
+from .sweep import ParameterGrid, ParameterSweep, RandomSearch, SweepResult, SweepTable
+from .tickstore import ColumnSet, TickStore, TickStoreError
+
+__all__ = [
+    "BacktestConfig",
+    "BacktestResult",
+    "Backtester",
+    "ColumnSet",
+    "Execution",
+    "MarketHistory",
+    "MatchFill",
+    "MatchingEngine",
+    "MetricsAccumulator",
+    "ParameterGrid",
+    "ParameterSweep",
+    "PerformanceMetrics",
+    "QueueEstimate",
+    "RandomSearch",
+    "RestingOrder",
+    "SweepResult",
+    "SweepTable",
+    "TickStore",
+    "TickStoreError",
+    "execute_order",
+]
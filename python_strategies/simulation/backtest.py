@@ -0,0 +1,695 @@
+"""
+Event-driven backtester for SDK strategies.
+
+Replays recorded ticks (and optionally order book snapshots) through the
+unchanged strategy interface: initialize -> on_tick -> propose_orders ->
+risk_check. Market state, positions and cash are kept in NumPy arrays;
+per-cycle state lookup, resting-order matching and equity marking are
+vectorized across markets, and each cycle's market data is a single
+MarketStateBatch over the gathered columns, so the Python work per
+cycle is essentially the strategy's own code.
+
+Fills follow the paper broker: market-style orders (MARKET/FOK/FAK)
+take the touch, limit orders fill at their limit price when they cross
+and otherwise rest for `order_ttl_cycles` cycles. Markets with recorded
+book snapshots fill market-style orders against the book's depth
+instead (VWAP over the consumed levels, with partial fills and FOK
+kills; see execution.py).
+
+A resting BUY holds its cost out of the balance strategies see until
+it fills or expires, so the same cash cannot back two orders. A resting
+order whose fill fails (e.g. a SELL whose position was sold meanwhile)
+is dropped and counted in `rejection_reasons`.
+
+With `queue_model` on, resting limit orders go through a MatchingEngine
+instead: each queues behind the public size at its price (from the
+recorded books, else the tick's touch sizes) and fills only once
+recorded trades and shrinking levels have worked through the queue
+ahead of it, or the book crosses it (see matching.py). This is what a
+passive strategy such as the market maker should be judged on.
+"""
+
+import io
+import time
+import types
+from collections import Counter, deque
+from dataclasses import dataclass, field, replace
+from typing import Any, Deque, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from sdk import MarketStateBatch, OrderBook, PositionBook, TradingSession
+from executor.loader import LoadedStrategy, load_strategy, wrap_module
+from executor.risk import RiskEngine, RiskSnapshot
+from executor.runner import normalize_order, validate_order
+
+from .execution import execute_order
+from .matching import MAKER, MatchFill, MatchingEngine
+from .metrics import (
+    BUY,
+    DEFAULT_INITIAL_BALANCE,
+    FILL_DTYPE,
+    MS_PER_DAY,
+    OPEN,
+    POSITION_DTYPE,
+    SELL,
+    PerformanceMetrics,
+    calculate_metrics,
+)
+
+# Fee schedule from lib/trading/types.ts
+DEFAULT_MAKER_FEE_BPS = 0
+DEFAULT_TAKER_FEE_BPS = 60
+
+TAKER_TYPES = ("MARKET", "FOK", "FAK")
+
+
+@dataclass
+class MarketHistory:
+    """Recorded top-of-book history for one market"""
+    market_id: str
+    token_id: str
+    timestamps: np.ndarray  # int64 ms, ascending
+    bid: np.ndarray
+    ask: np.ndarray
+    volume: Optional[np.ndarray] = None
+    last_price: Optional[np.ndarray] = None
+    # Optional full-depth snapshots as (timestamp ms, /book payload), ascending
+    books: Sequence[Tuple[int, Dict[str, Any]]] = ()
+    # Optional size at the touch, per tick
+    bid_size: Optional[np.ndarray] = None
+    ask_size: Optional[np.ndarray] = None
+    # Optional trade prints: columns timestamp (ms, ascending), price, size
+    # and side (+1 buy, -1 sell, the taker's side), as in TickStore
+    trades: Optional[Mapping[str, np.ndarray]] = None
+
+    def __post_init__(self) -> None:
+        self.timestamps = np.asarray(self.timestamps, dtype=np.int64)
+        self.bid = np.asarray(self.bid, dtype=np.float64)
+        self.ask = np.asarray(self.ask, dtype=np.float64)
+        n = self.timestamps.size
+        if self.bid.size != n or self.ask.size != n:
+            raise ValueError(f"{self.market_id}: timestamps, bid and ask must have the same length")
+        if n > 1 and np.any(np.diff(self.timestamps) < 0):
+            raise ValueError(f"{self.market_id}: timestamps must be sorted ascending")
+        if self.volume is not None:
+            self.volume = np.asarray(self.volume, dtype=np.float64)
+        if self.last_price is not None:
+            self.last_price = np.asarray(self.last_price, dtype=np.float64)
+        for name in ("bid_size", "ask_size"):
+            column = getattr(self, name)
+            if column is not None:
+                column = np.asarray(column, dtype=np.float64)
+                if column.size != n:
+                    raise ValueError(f"{self.market_id}: {name} must have the same length as timestamps")
+                setattr(self, name, column)
+        if self.trades is not None:
+            trades = {
+                "timestamp": np.asarray(self.trades["timestamp"], dtype=np.int64),
+                "price": np.asarray(self.trades["price"], dtype=np.float64),
+                "size": np.asarray(self.trades["size"], dtype=np.float64),
+                "side": np.asarray(self.trades["side"], dtype=np.int8),
+            }
+            if len({c.size for c in trades.values()}) > 1:
+                raise ValueError(f"{self.market_id}: trade columns must have the same length")
+            if trades["timestamp"].size > 1 and np.any(np.diff(trades["timestamp"]) < 0):
+                raise ValueError(f"{self.market_id}: trade timestamps must be sorted ascending")
+            self.trades = trades
+
+    @property
+    def mid(self) -> np.ndarray:
+        return (self.bid + self.ask) / 2
+
+
+@dataclass
+class BacktestConfig:
+    """Backtest settings"""
+    initial_balance: float = DEFAULT_INITIAL_BALANCE
+    parameters: Dict[str, Any] = field(default_factory=dict)
+    mode: str = "PAPER"
+    # Cycle spacing in ms; None runs one cycle per distinct tick timestamp
+    interval_ms: Optional[int] = None
+    start: Optional[int] = None
+    end: Optional[int] = None
+    order_ttl_cycles: int = 1
+    # Queue resting limit orders behind the public size at their price
+    # (needs touch sizes or book snapshots; recorded trades advance the queue)
+    queue_model: bool = False
+    maker_fee_bps: float = DEFAULT_MAKER_FEE_BPS
+    taker_fee_bps: float = DEFAULT_TAKER_FEE_BPS
+    # Applied to the touch for markets without recorded book depth
+    slippage_bps: float = 0.0
+    # RiskConfig limits; orders per minute and today's PnL are tracked in simulated time
+    risk: Optional[RiskSnapshot] = None
+    # Cycles whose state is materialized at once (bounds memory)
+    chunk_size: int = 4096
+    max_log_lines: int = 1000
+
+
+@dataclass
+class BacktestResult:
+    """Outcome of a backtest"""
+    metrics: PerformanceMetrics
+    timestamps: np.ndarray
+    equity: np.ndarray
+    fills: np.ndarray
+    positions: Dict[str, Dict[str, float]]
+    orders_proposed: int
+    # Includes resting orders dropped when their fill failed
+    orders_rejected: int
+    rejection_reasons: Dict[str, int]
+    logs: List[str]
+    elapsed_ms: float
+
+
+class _TailLog(io.TextIOBase):
+    """stdout replacement that keeps only the last N lines"""
+
+    def __init__(self, max_lines: int) -> None:
+        self.lines: Deque[str] = deque(maxlen=max_lines)
+        self._partial = ""
+
+    def write(self, text: str) -> int:
+        parts = (self._partial + text).split("\n")
+        self._partial = parts.pop()
+        self.lines.extend(p for p in parts if p)
+        return len(text)
+
+
+StrategyLike = Union[LoadedStrategy, types.ModuleType, str]
+
+
+def resolve_strategy(strategy: StrategyLike) -> LoadedStrategy:
+    """Accept a loaded strategy, an imported module or source code"""
+    if isinstance(strategy, LoadedStrategy):
+        return strategy
+    if isinstance(strategy, types.ModuleType):
+        return wrap_module(strategy)
+    if isinstance(strategy, str):
+        return load_strategy("backtest", 1, strategy)
+    raise TypeError(f"Unsupported strategy: {type(strategy).__name__}")
+
+
+class Backtester:
+    """
+    Replays market history through a strategy.
+
+    Usage:
+        bt = Backtester(strategy_module, histories, BacktestConfig(interval_ms=60_000))
+        result = bt.run()
+        result.metrics.to_dict()
+    """
+
+    def __init__(
+        self,
+        strategy: StrategyLike,
+        markets: Sequence[MarketHistory],
+        config: Optional[BacktestConfig] = None,
+    ) -> None:
+        if not markets:
+            raise ValueError("Backtest needs at least one market")
+        self.strategy = resolve_strategy(strategy)
+        self.markets = list(markets)
+        self.config = config or BacktestConfig()
+        self.market_index = {m.market_id: i for i, m in enumerate(self.markets)}
+
+    # ----------------------------------------------------------------------
+    # Timeline
+    # ----------------------------------------------------------------------
+
+    def cycle_times(self) -> np.ndarray:
+        """Timestamps at which the strategy is invoked"""
+        cfg = self.config
+        non_empty = [m.timestamps for m in self.markets if m.timestamps.size]
+        if not non_empty:
+            return np.empty(0, dtype=np.int64)
+
+        start = cfg.start if cfg.start is not None else min(int(t[0]) for t in non_empty)
+        end = cfg.end if cfg.end is not None else max(int(t[-1]) for t in non_empty)
+
+        if cfg.interval_ms:
+            return np.arange(start, end + 1, cfg.interval_ms, dtype=np.int64)
+
+        times = np.unique(np.concatenate(non_empty))
+        return times[(times >= start) & (times <= end)]
+
+    def _state_indices(self, times: np.ndarray) -> np.ndarray:
+        """(cycles, markets) index of the latest tick at or before each cycle"""
+        out = np.empty((times.size, len(self.markets)), dtype=np.int64)
+        for j, m in enumerate(self.markets):
+            out[:, j] = np.searchsorted(m.timestamps, times, side="right") - 1
+        return out
+
+    def _gather(self, idx: np.ndarray, attr: str) -> np.ndarray:
+        """Gather a per-market column at the given tick indices (NaN before data)"""
+        out = np.full(idx.shape, np.nan)
+        for j, m in enumerate(self.markets):
+            column = getattr(m, attr)
+            if column is None or column.size == 0:
+                continue
+            valid = idx[:, j] >= 0
+            out[valid, j] = column[idx[valid, j]]
+        return out
+
+    # ----------------------------------------------------------------------
+    # Run
+    # ----------------------------------------------------------------------
+
+    def run(self) -> BacktestResult:
+        started = time.perf_counter()
+        cfg = self.config
+        strategy = self.strategy
+        n_markets = len(self.markets)
+        times = self.cycle_times()
+        self._times = times
+
+        if cfg.queue_model:
+            for m in self.markets:
+                sizes = (m.bid_size, m.ask_size)
+                if not m.books and any(c is None or (c.size and np.isnan(c).all()) for c in sizes):
+                    raise ValueError(f"{m.market_id}: queue_model needs bid_size/ask_size or book snapshots")
+        self.engine = MatchingEngine(cfg.maker_fee_bps, cfg.taker_fee_bps) if cfg.queue_model else None
+
+        # Portfolio state; `reserved` is the cash held by resting BUYs
+        self.cash = float(cfg.initial_balance)
+        self.reserved = 0.0
+        self.pos = np.zeros(n_markets)
+        self.avg = np.zeros(n_markets)
+        self.realized = np.zeros(n_markets)
+        self.round_trip = np.zeros(n_markets)
+        self.opened_at = np.full(n_markets, OPEN, dtype=np.int64)
+        self.closed_positions: List[Tuple[int, int, int, float, float, float, float, float]] = []
+        self.fills: List[Tuple[int, int, int, float, float, float]] = []
+
+        # Resting limit orders (parallel arrays)
+        self.rest_market = np.empty(0, dtype=np.int64)
+        self.rest_side = np.empty(0, dtype=np.int8)
+        self.rest_price = np.empty(0)
+        self.rest_size = np.empty(0)
+        self.rest_expiry = np.empty(0, dtype=np.int64)
+        self._new_rest: List[Tuple[int, int, float, float, int]] = []
+        # Cost per share held for each resting BUY in the matching engine
+        self._held: Dict[str, float] = {}
+
+        # Risk state in simulated time
+        self._placed_at: Deque[int] = deque()
+        self._pnl_day = -1
+        self._day_pnl = 0.0
+
+        equity = np.empty(times.size)
+        last_idx = np.full(n_markets, -1, dtype=np.int64)
+        book_cursor = [0] * n_markets
+        market_ids = [m.market_id for m in self.markets]
+        token_ids = [m.token_id for m in self.markets]
+        self._rejections = rejections = Counter()
+        proposed_count = 0
+
+        log_sink = _TailLog(cfg.max_log_lines)
+        session = TradingSession(books=strategy.books, log_stream=log_sink)
+
+        with session.activate():
+            if strategy.initialize is not None:
+                strategy.initialize(dict(cfg.parameters))
+
+            for chunk_start in range(0, times.size, cfg.chunk_size):
+                chunk_times = times[chunk_start:chunk_start + cfg.chunk_size]
+                idx = self._state_indices(chunk_times)
+                bids = self._gather(idx, "bid")
+                asks = self._gather(idx, "ask")
+                volumes = self._gather(idx, "volume")
+                lasts = self._gather(idx, "last_price")
+                if self.engine is not None:
+                    bid_sizes = self._gather(idx, "bid_size")
+                    ask_sizes = self._gather(idx, "ask_size")
+
+                for k, now in enumerate(chunk_times):
+                    cycle = chunk_start + k
+                    bid, ask = bids[k], asks[k]
+                    self._bid_size = bid_sizes[k] if self.engine is not None else None
+                    self._ask_size = ask_sizes[k] if self.engine is not None else None
+
+                    if self.engine is None:
+                        self._match_resting(cycle, int(now), bid, ask)
+
+                    changed = np.nonzero(idx[k] != last_idx)[0]
+                    last_idx = idx[k]
+                    market_data = MarketStateBatch(
+                        market_ids, token_ids, bid, ask, volumes[k], lasts[k], index=self.market_index,
+                    )
+                    session.market_data = market_data
+
+                    self._replay_books(int(now), book_cursor)
+                    if self.engine is not None:
+                        self._match_queue(int(times[cycle - 1]) if cycle else None, int(now), bid, ask)
+
+                    if strategy.on_tick is not None:
+                        for j in changed:
+                            if idx[k, j] >= 0:
+                                strategy.on_tick(market_data.row(j))
+
+                    context = {
+                        "mode": cfg.mode,
+                        "positions": PositionBook(self._position_dicts(bid, ask)),
+                        "balance": self.cash - self.reserved,
+                        "market_data": market_data,
+                        "parameters": cfg.parameters,
+                    }
+                    returned = strategy.propose_orders(context) or []
+                    orders = [normalize_order(o) for o in returned]
+                    orders.extend(normalize_order(o) for o in session.drain())
+                    proposed_count += len(orders)
+
+                    engine = RiskEngine(self._risk_snapshot(int(now)), validate_order)
+                    reasons = engine.evaluate(orders, context, strategy.risk_check)
+                    for order, reason in zip(orders, reasons):
+                        if reason is None:
+                            reason = self._execute(order, cycle, int(now), bid, ask)
+                        if reason is None:
+                            self._placed_at.append(int(now))
+                        else:
+                            rejections[reason] += 1
+                    self._flush_resting()
+
+                    mid = (bid + ask) / 2
+                    marked = np.where(np.isnan(mid), self.avg, mid)
+                    equity[cycle] = self.cash + float(self.pos @ marked)
+
+        # Final marks
+        if times.size:
+            final_idx = self._state_indices(times[-1:])
+            final_mid = ((self._gather(final_idx, "bid") + self._gather(final_idx, "ask")) / 2)[0]
+        else:
+            final_mid = np.full(n_markets, np.nan)
+        final_mark = np.where(np.isnan(final_mid), self.avg, final_mid)
+
+        fills = np.array(self.fills, dtype=FILL_DTYPE) if self.fills else np.empty(0, dtype=FILL_DTYPE)
+        metrics = self._metrics(times, equity, fills, final_mark)
+        positions = {
+            self.markets[j].market_id: {
+                "size": float(self.pos[j]),
+                "avg_entry_price": float(self.avg[j]),
+                "current_price": float(final_mark[j]),
+                "realized_pnl": float(self.realized[j]),
+                "unrealized_pnl": float(self.pos[j] * (final_mark[j] - self.avg[j])),
+            }
+            for j in np.nonzero((self.pos > 0) | (self.realized != 0))[0]
+        }
+
+        return BacktestResult(
+            metrics=metrics,
+            timestamps=times,
+            equity=equity,
+            fills=fills,
+            positions=positions,
+            orders_proposed=proposed_count,
+            orders_rejected=sum(rejections.values()),
+            rejection_reasons=dict(rejections),
+            logs=list(log_sink.lines),
+            elapsed_ms=(time.perf_counter() - started) * 1000,
+        )
+
+    # ----------------------------------------------------------------------
+    # Helpers
+    # ----------------------------------------------------------------------
+
+    def _position_dicts(self, bid: np.ndarray, ask: np.ndarray) -> List[Dict[str, Any]]:
+        held = np.nonzero(self.pos > 0)[0]
+        if held.size == 0:
+            return []
+        mid = (bid[held] + ask[held]) / 2
+        price = np.where(np.isnan(mid), self.avg[held], mid)
+        unrealized = self.pos[held] * (price - self.avg[held])
+        return [
+            {
+                "market_id": self.markets[j].market_id,
+                "token_id": self.markets[j].token_id,
+                "size": float(self.pos[j]),
+                "avg_entry_price": float(self.avg[j]),
+                "current_price": float(price[n]),
+                "realized_pnl": float(self.realized[j]),
+                "unrealized_pnl": float(unrealized[n]),
+            }
+            for n, j in enumerate(held)
+        ]
+
+    def _risk_snapshot(self, now: int) -> RiskSnapshot:
+        risk = self.config.risk
+        if risk is None:
+            return RiskSnapshot()
+        placed = self._placed_at
+        while placed and placed[0] <= now - 60_000:
+            placed.popleft()
+        return replace(
+            risk,
+            orders_last_minute=len(placed),
+            today_pnl=self._day_pnl if now // MS_PER_DAY == self._pnl_day else 0.0,
+        )
+
+    def _book_pnl(self, now: int, flow: float) -> None:
+        """Today's cash-flow PnL, as PaperBroker.canTrade computes it"""
+        day = now // MS_PER_DAY
+        if day != self._pnl_day:
+            self._pnl_day = day
+            self._day_pnl = 0.0
+        self._day_pnl += flow
+
+    def _replay_books(self, now: int, cursor: List[int]) -> None:
+        """Apply the latest book snapshot at or before `now` for each market"""
+        strategy = self.strategy
+        for j, m in enumerate(self.markets):
+            books = m.books
+            i = cursor[j]
+            if i >= len(books) or books[i][0] > now:
+                continue
+            while i + 1 < len(books) and books[i + 1][0] <= now:
+                i += 1
+            cursor[j] = i + 1
+
+            book = strategy.books.get(m.market_id)
+            if book is None:
+                book = strategy.books[m.market_id] = OrderBook()
+            changes = book.apply_snapshot(books[i][1])
+            if changes and strategy.on_book_update is not None:
+                strategy.on_book_update(m.market_id, changes)
+
+    def _fill(self, j: int, side: int, size: float, price: float, fee_bps: float, now: int) -> Optional[str]:
+        """Apply a fill to cash and positions; returns a rejection reason or None"""
+        notional = size * price
+        fee = notional * fee_bps / 10000
+
+        if side == BUY:
+            if notional + fee > self.cash - self.reserved + 1e-9:
+                return "Insufficient balance"
+            if self.pos[j] <= 0:
+                self.opened_at[j] = now
+            new_size = self.pos[j] + size
+            self.avg[j] = (self.pos[j] * self.avg[j] + notional) / new_size
+            self.pos[j] = new_size
+            self.cash -= notional + fee
+            self._book_pnl(now, -(notional + fee))
+        else:
+            if size > self.pos[j] + 1e-9:
+                return "Insufficient position"
+            pnl = (price - self.avg[j]) * size
+            self.realized[j] += pnl
+            self.round_trip[j] += pnl
+            self.pos[j] -= size
+            self.cash += notional - fee
+            self._book_pnl(now, notional - fee)
+            if self.pos[j] <= 1e-9:
+                self.pos[j] = 0.0
+                self.closed_positions.append((
+                    j, int(self.opened_at[j]), now, 0.0, float(self.avg[j]), price, float(self.round_trip[j]), 0.0,
+                ))
+                self.round_trip[j] = 0.0
+                self.opened_at[j] = OPEN
+
+        self.fills.append((now, j, side, size, price, fee))
+        return None
+
+    def _execute(self, order: Dict[str, Any], cycle: int, now: int, bid: np.ndarray, ask: np.ndarray) -> Optional[str]:
+        """Execute or rest a validated order against the current state"""
+        cfg = self.config
+        j = self.market_index.get(order["market_id"])
+        if j is None:
+            return "Unknown market"
+        if np.isnan(bid[j]) or np.isnan(ask[j]):
+            return "No market data"
+
+        side = BUY if order["side"] == "BUY" else SELL
+        size = float(order["size"])
+
+        if order["type"] in TAKER_TYPES:
+            book = self.strategy.books.get(order["market_id"])
+            if book is not None and book.opposite(order["side"]):
+                # Walk the recorded depth: VWAP price, partial fills, FOK kills
+                execution = execute_order(book, order["side"], size, order["type"], order.get("price"))
+                if execution.filled <= 0:
+                    return "Not enough liquidity"
+                return self._fill(j, side, execution.filled, execution.avg_price, cfg.taker_fee_bps, now)
+            touch = ask[j] if side == BUY else bid[j]
+            price = float(touch) * (1 + side * cfg.slippage_bps / 10000)
+            return self._fill(j, side, size, price, cfg.taker_fee_bps, now)
+
+        limit = order.get("price")
+        if limit is None:
+            return "Limit order without price"
+        crosses = limit >= ask[j] if side == BUY else limit <= bid[j]
+        if crosses:
+            return self._fill(j, side, size, float(limit), cfg.maker_fee_bps, now)
+
+        cost = self._cost(float(limit))
+        if side == BUY and size * cost > self.cash - self.reserved + 1e-9:
+            return "Insufficient balance"
+
+        if self.engine is not None:
+            # GTD through the last cycle of the TTL, so it is matched on that cycle and dropped after
+            expiry = cycle + cfg.order_ttl_cycles
+            resting, fills = self.engine.submit(
+                {"market_id": order["market_id"], "token_id": order["market_id"], "side": order["side"],
+                 "type": "GTD", "size": size, "price": float(limit)},
+                self._queue_book(j, bid, ask),
+                now,
+                expires_at=int(self._times[expiry]) + 1 if expiry < self._times.size else None,
+            )
+            for f in fills:
+                reason = self._fill(j, side, f.size, f.price, cfg.taker_fee_bps, now)
+                if reason is not None:
+                    if resting is not None:
+                        self.engine.cancel(resting.id)
+                    return reason
+            if resting is not None and side == BUY:
+                self._held[resting.id] = cost
+                self.reserved += resting.remaining * cost
+            return None
+
+        if side == BUY:
+            self.reserved += size * cost
+        self._new_rest.append((j, side, float(limit), size, cycle + cfg.order_ttl_cycles))
+        return None
+
+    def _cost(self, price: float) -> float:
+        """Cash per share a resting order at `price` needs, maker fee included"""
+        return price * (1 + self.config.maker_fee_bps / 10000)
+
+    def _flush_resting(self) -> None:
+        """Append this cycle's new resting orders in one concatenation"""
+        if not self._new_rest:
+            return
+        markets, sides, prices, sizes, expiries = zip(*self._new_rest)
+        self._new_rest = []
+        self.rest_market = np.concatenate((self.rest_market, np.array(markets, dtype=np.int64)))
+        self.rest_side = np.concatenate((self.rest_side, np.array(sides, dtype=np.int8)))
+        self.rest_price = np.concatenate((self.rest_price, prices))
+        self.rest_size = np.concatenate((self.rest_size, sizes))
+        self.rest_expiry = np.concatenate((self.rest_expiry, np.array(expiries, dtype=np.int64)))
+
+    def _match_resting(self, cycle: int, now: int, bid: np.ndarray, ask: np.ndarray) -> None:
+        """Fill resting limit orders the new state crosses and drop expired ones"""
+        if self.rest_market.size == 0:
+            return
+
+        m = self.rest_market
+        is_buy = self.rest_side == BUY
+        crossed = np.where(is_buy, self.rest_price >= ask[m], self.rest_price <= bid[m])
+        crossed &= ~np.isnan(bid[m]) & ~np.isnan(ask[m])
+        keep = ~crossed & (self.rest_expiry > cycle)
+
+        # Release the cash of every BUY leaving the book before filling any of them
+        if is_buy.any():
+            held = is_buy & keep
+            cost = self.rest_price[held] * (1 + self.config.maker_fee_bps / 10000)
+            self.reserved = float(cost @ self.rest_size[held])
+
+        for i in np.nonzero(crossed)[0]:
+            reason = self._fill(int(m[i]), int(self.rest_side[i]), float(self.rest_size[i]),
+                                float(self.rest_price[i]), self.config.maker_fee_bps, now)
+            if reason is not None:
+                self._rejections[reason] += 1
+
+        self.rest_market = m[keep]
+        self.rest_side = self.rest_side[keep]
+        self.rest_price = self.rest_price[keep]
+        self.rest_size = self.rest_size[keep]
+        self.rest_expiry = self.rest_expiry[keep]
+
+    def _queue_book(self, j: int, bid: np.ndarray, ask: np.ndarray) -> OrderBook:
+        """Recorded book for market j, else one built from the tick's touch and sizes"""
+        market_id = self.markets[j].market_id
+        book = self.strategy.books.get(market_id)
+        if book is not None and (book.bids or book.asks):
+            return book
+        # Only the touch is known, so crossing fills are capped at its size
+        return OrderBook(
+            bids=[(float(bid[j]), float(self._bid_size[j]))] if not np.isnan(self._bid_size[j]) else (),
+            asks=[(float(ask[j]), float(self._ask_size[j]))] if not np.isnan(self._ask_size[j]) else (),
+        )
+
+    def _release(self, order_id: str, shares: float) -> None:
+        """Return the cash held for `shares` of a resting engine BUY"""
+        cost = self._held.get(order_id)
+        if cost is None:
+            return
+        self.reserved -= shares * cost
+        if self.engine.get(order_id) is None:
+            del self._held[order_id]
+        if not self._held:
+            self.reserved = 0.0
+
+    def _apply_fills(self, fills: List[MatchFill], now: int) -> None:
+        """Apply engine fills of resting orders; an order whose fill fails is cancelled"""
+        cfg = self.config
+        for f in fills:
+            self._release(f.order_id, f.size)
+            reason = self._fill(
+                self.market_index[f.market_id], BUY if f.side == "BUY" else SELL, f.size, f.price,
+                cfg.maker_fee_bps if f.liquidity == MAKER else cfg.taker_fee_bps, now,
+            )
+            if reason is not None:
+                self._rejections[reason] += 1
+                order = self.engine.cancel(f.order_id)
+                if order is not None:
+                    self._release(order.id, order.remaining)
+
+    def _match_queue(self, prev: Optional[int], now: int, bid: np.ndarray, ask: np.ndarray) -> None:
+        """Feed the trades since the previous cycle and the new books to the matching engine"""
+        engine = self.engine
+        for order in engine.expire(now):
+            self._release(order.id, order.remaining)
+        for m in self.markets:
+            trades = m.trades
+            if trades is None or trades["timestamp"].size == 0:
+                continue
+            ts = trades["timestamp"]
+            lo = 0 if prev is None else int(np.searchsorted(ts, prev, side="right"))
+            hi = int(np.searchsorted(ts, now, side="right"))
+            for i in range(lo, hi):
+                self._apply_fills(engine.on_trade(
+                    m.market_id, float(trades["price"][i]), float(trades["size"][i]),
+                    "BUY" if trades["side"][i] > 0 else "SELL", int(ts[i]),
+                ), now)
+
+        for market_id in engine.active_tokens():
+            j = self.market_index[market_id]
+            if np.isnan(bid[j]) or np.isnan(ask[j]):
+                continue
+            self._apply_fills(engine.on_book(market_id, self._queue_book(j, bid, ask), now), now)
+
+    def _metrics(self, times: np.ndarray, equity: np.ndarray, fills: np.ndarray, final_mark: np.ndarray) -> PerformanceMetrics:
+        held = np.nonzero(self.pos > 0)[0]
+        open_positions = [
+            (j, int(self.opened_at[j]), OPEN, float(self.pos[j]), float(self.avg[j]), float(final_mark[j]),
+             float(self.round_trip[j]), float(self.pos[j] * (final_mark[j] - self.avg[j])))
+            for j in held
+        ]
+        positions = np.array(self.closed_positions + open_positions, dtype=POSITION_DTYPE)
+        if times.size == 0:
+            return calculate_metrics(fills, positions, initial_balance=self.config.initial_balance)
+        return calculate_metrics(
+            fills,
+            positions,
+            start=int(times[0]),
+            end=int(times[-1]),
+            initial_balance=self.config.initial_balance,
+            equity=(times, equity),
+        )
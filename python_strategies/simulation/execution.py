@@ -0,0 +1,113 @@
+"""
+Depth-aware order execution.
+
+Simulates an order against a full-depth OrderBook instead of the touch
+price plus a slippage guess: the order walks the opposite side from the
+best level outwards and fills at the volume-weighted average price of
+the levels it consumes. Each book side keeps cumulative size and
+notional arrays, so an execution is two binary searches (O(log levels))
+however deep it goes.
+
+Order types follow the CLOB:
+  MARKET          fill what the book holds, cancel the rest
+  FOK             fill the whole size within the limit price or nothing
+  FAK             fill what is available within the limit price, cancel the rest
+  LIMIT/GTC/GTD   fill the marketable part at or better than the limit;
+                  the remainder is left to rest
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from sdk import OrderBook
+
+FILLED = "FILLED"
+PARTIAL = "PARTIAL"
+KILLED = "KILLED"  # FOK that could not fill completely, or nothing to take
+RESTING = "RESTING"  # Limit order with an unfilled remainder
+
+RESTING_TYPES = ("LIMIT", "GTC", "GTD")
+
+
+@dataclass(slots=True)
+class Execution:
+    """Outcome of one simulated order"""
+    side: str
+    order_type: str
+    requested: float
+    filled: float
+    notional: float
+    levels: int
+    touch: Optional[float]
+    worst_price: Optional[float]
+    status: str
+
+    @property
+    def remaining(self) -> float:
+        return self.requested - self.filled
+
+    @property
+    def avg_price(self) -> Optional[float]:
+        """Volume-weighted fill price"""
+        return self.notional / self.filled if self.filled > 0 else None
+
+    @property
+    def slippage(self) -> float:
+        """Adverse distance of the average price from the touch (>= 0)"""
+        if self.filled <= 0 or self.touch is None:
+            return 0.0
+        avg = self.notional / self.filled
+        return avg - self.touch if self.side == "BUY" else self.touch - avg
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "status": self.status,
+            "requested": self.requested,
+            "filled_size": self.filled,
+            "filled_price": self.avg_price,
+            "notional": self.notional,
+            "levels": self.levels,
+            "worst_price": self.worst_price,
+            "slippage": self.slippage,
+        }
+
+
+def execute_order(
+    book: OrderBook,
+    side: str,
+    size: float,
+    order_type: str = "MARKET",
+    price: Optional[float] = None,
+) -> Execution:
+    """
+    Simulate an order against `book` without modifying it. `price` is the
+    limit (worst acceptable) price; MARKET orders ignore it, as the paper
+    broker does.
+    """
+    levels = book.opposite(side)
+    limit = None if order_type == "MARKET" else price
+    filled, notional, touched = levels.sweep(size, limit)
+
+    if order_type == "FOK" and filled < size:
+        filled, notional, touched = 0.0, 0.0, 0
+
+    if filled >= size:
+        status = FILLED
+    elif order_type in RESTING_TYPES:
+        status = RESTING
+    elif filled > 0:
+        status = PARTIAL
+    else:
+        status = KILLED
+
+    return Execution(
+        side=side,
+        order_type=order_type,
+        requested=size,
+        filled=filled,
+        notional=notional,
+        levels=touched,
+        touch=levels.best_price,
+        worst_price=levels.level(touched - 1)[0] if touched else None,
+        status=status,
+    )
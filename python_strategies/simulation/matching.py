@@ -0,0 +1,728 @@
+"""
+Price-time-priority matching for paper orders.
+
+Resting paper orders are held per token in price levels (best first,
+binary-searchable keys as in sdk.orderbook) with a FIFO queue per level.
+Each order queues behind the public size shown at its price when it
+joined, and later observations move it up or fill it:
+
+- a trade print at the order's price consumes the shares ahead of it,
+  then the order; prints through its price fill it outright;
+- a public level that shrinks by more than what traded there lost the
+  difference to cancellations, assumed spread evenly over the queue;
+- a book whose opposite side crosses the order's price fills it as a
+  maker, against the crossing depth (better-priced orders first).
+
+Shares ahead are kept per level as one lazy affine map over all queued
+orders, so a trade or a size change costs O(1) per level however many
+orders rest there, and a tick visits only the levels it touches.
+
+The taker flow seen on each side gives every resting order an expected
+time to fill and a fill probability over a horizon (see estimate()).
+
+Order types follow the CLOB: LIMIT/GTC rest until filled or cancelled,
+GTD rests until its expiry, FOK and FAK never rest (see execution.py).
+"""
+
+import heapq
+import itertools
+import math
+from bisect import bisect_left, bisect_right
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from sdk import BookSide, LevelChange, OrderBook
+
+from .execution import RESTING_TYPES, execute_order
+from .metrics import to_ms
+
+# Fee schedule from lib/trading/types.ts
+DEFAULT_MAKER_FEE_BPS = 0
+DEFAULT_TAKER_FEE_BPS = 60
+
+EPSILON = 1e-9
+
+# Taker flow rates decay with this time constant
+DEFAULT_FLOW_WINDOW_MS = 300_000
+# Fill probability horizon for orders without an expiry
+DEFAULT_HORIZON_MS = 3_600_000
+# Poisson tails beyond this many trades use the normal approximation
+POISSON_EXACT_MAX = 200
+
+# Bounds on a level's lazy queue map before it is folded into the orders
+RENORMALIZE_SCALE = 1e-9
+RENORMALIZE_SHIFT = 1e12
+
+MAKER = "MAKER"
+TAKER = "TAKER"
+
+
+class MatchFill(NamedTuple):
+    """One (partial) fill of a paper order"""
+    order_id: str
+    market_id: str
+    token_id: str
+    side: str
+    size: float
+    price: float
+    fee: float
+    liquidity: str
+    timestamp: int
+
+
+class RestingOrder:
+    """A paper order resting in the engine"""
+
+    __slots__ = (
+        "id", "market_id", "token_id", "side", "price", "size", "remaining",
+        "order_type", "created_at", "expires_at", "active", "_ahead", "_level",
+    )
+
+    FIELDS = (
+        "id", "market_id", "token_id", "side", "price", "size", "remaining",
+        "order_type", "created_at", "expires_at", "shares_ahead", "active",
+    )
+
+    def __init__(
+        self,
+        id: str,
+        market_id: str,
+        token_id: str,
+        side: str,
+        price: float,
+        size: float,
+        order_type: str = "GTC",
+        created_at: int = 0,
+        expires_at: Optional[int] = None,
+        shares_ahead: float = 0.0,
+    ) -> None:
+        self.id = id
+        self.market_id = market_id
+        self.token_id = token_id
+        self.side = side
+        self.price = price
+        self.size = size
+        self.remaining = size
+        self.order_type = order_type
+        self.created_at = created_at
+        self.expires_at = expires_at
+        self.active = True
+        # While queued, the level maps _ahead to the current shares ahead
+        self._ahead = shares_ahead
+        self._level: Optional["_Level"] = None
+
+    @property
+    def filled(self) -> float:
+        return self.size - self.remaining
+
+    @property
+    def shares_ahead(self) -> float:
+        """Estimated public shares ahead of this order at its price"""
+        level = self._level
+        return level.ahead(self) if level is not None else self._ahead
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+    def __repr__(self) -> str:
+        return (
+            f"RestingOrder({self.id!r}, {self.side} {self.remaining:g}/{self.size:g} "
+            f"@ {self.price}, ahead={self.shares_ahead:g})"
+        )
+
+
+class _Level:
+    """
+    FIFO queue of our orders at one price, plus what is known of the public
+    queue there. Shares ahead are stored per order as a base value and read
+    through one affine map, ahead = max(scale * base - shift, 0): a trade
+    adds to `shift` and a proportional cancellation multiplies both, so
+    either updates every queued order in O(1).
+    """
+
+    __slots__ = ("price", "orders", "public", "traded", "scale", "shift")
+
+    def __init__(self, price: float) -> None:
+        self.price = price
+        self.orders: Deque[RestingOrder] = deque()
+        self.public: Optional[float] = None  # Public size at the last observation
+        self.traded = 0.0  # Volume printed here since that observation
+        self.scale = 1.0
+        self.shift = 0.0
+
+    def ahead(self, order: RestingOrder) -> float:
+        return max(self.scale * order._ahead - self.shift, 0.0)
+
+    def join(self, order: RestingOrder) -> None:
+        order._ahead = (order._ahead + self.shift) / self.scale
+        order._level = self
+        self.orders.append(order)
+
+    def leave(self, order: RestingOrder) -> None:
+        """Detach an order, freezing its shares ahead"""
+        order._ahead = self.ahead(order)
+        order._level = None
+
+    def _materialize(self, factor: float = 1.0) -> None:
+        for order in self.orders:
+            order._ahead = factor * self.ahead(order)
+        self.scale = 1.0
+        self.shift = 0.0
+
+    def trade(self, printed: float, ours: float = 0.0) -> None:
+        """
+        A print at this price. The taker would have traded the same size
+        with our orders present, so the public queue ahead moves up by
+        what our own orders did not take.
+        """
+        self.shift += max(printed - ours, 0.0)
+        self.traded += printed
+        if self.shift > RENORMALIZE_SHIFT:
+            self._materialize()
+
+    def observe(self, size: float) -> None:
+        """
+        New public size at this price. Shrinkage not explained by trades is
+        taken as cancellations spread evenly over the queue, so the shares
+        ahead of each order shrink by the same fraction; growth joins
+        behind us and changes nothing.
+        """
+        if self.public is not None:
+            before = self.public - self.traded
+            if size < before - EPSILON:
+                factor = max(size, 0.0) / before
+                if self.scale * factor < RENORMALIZE_SCALE:
+                    self._materialize(factor)
+                else:
+                    self.scale *= factor
+                    self.shift *= factor
+        self.public = size
+        self.traded = 0.0
+
+    def __len__(self) -> int:
+        return len(self.orders)
+
+
+class _Side:
+    """Resting orders on one side of one token, best level first"""
+
+    __slots__ = ("is_bid", "keys", "levels")
+
+    def __init__(self, is_bid: bool) -> None:
+        self.is_bid = is_bid
+        self.keys: List[float] = []  # -price for bids, price for asks: ascending = best first
+        self.levels: Dict[float, _Level] = {}
+
+    def key(self, price: float) -> float:
+        return -price if self.is_bid else price
+
+    def level(self, price: float) -> _Level:
+        level = self.levels.get(price)
+        if level is None:
+            level = self.levels[price] = _Level(price)
+            key = self.key(price)
+            self.keys.insert(bisect_left(self.keys, key), key)
+        return level
+
+    def discard(self, order: RestingOrder) -> None:
+        level = self.levels.get(order.price)
+        if level is None:
+            return
+        try:
+            level.orders.remove(order)
+        except ValueError:
+            return
+        level.leave(order)
+        if not level.orders:
+            self.drop_level(order.price)
+
+    def drop_level(self, price: float) -> None:
+        del self.levels[price]
+        key = self.key(price)
+        del self.keys[bisect_left(self.keys, key)]
+
+    def marketable(self, price: float) -> int:
+        """Number of levels priced at or better than `price`, from the best"""
+        return bisect_right(self.keys, self.key(price))
+
+    def through(self, price: float) -> int:
+        """Number of levels priced strictly better than `price`"""
+        return bisect_left(self.keys, self.key(price))
+
+    def level_price(self, i: int) -> float:
+        key = self.keys[i]
+        return -key if self.is_bid else key
+
+    def __len__(self) -> int:
+        return sum(len(level) for level in self.levels.values())
+
+
+class _TokenOrders:
+    __slots__ = ("bids", "asks")
+
+    def __init__(self) -> None:
+        self.bids = _Side(True)
+        self.asks = _Side(False)
+
+    def side(self, side: str) -> _Side:
+        return self.bids if side == "BUY" else self.asks
+
+
+class _Flow:
+    """Exponentially decaying rate of taker volume and trade count (per ms)"""
+
+    __slots__ = ("volume", "count", "updated")
+
+    def __init__(self) -> None:
+        self.volume = 0.0
+        self.count = 0.0
+        self.updated: Optional[int] = None
+
+    def add(self, size: float, now: int, window_ms: float) -> None:
+        if self.updated is not None and now > self.updated:
+            decay = math.exp(-(now - self.updated) / window_ms)
+            self.volume *= decay
+            self.count *= decay
+        if self.updated is None or now > self.updated:
+            self.updated = now
+        self.volume += size / window_ms
+        self.count += 1.0 / window_ms
+
+    def rates(self, now: int, window_ms: float) -> Tuple[float, float]:
+        """(volume per ms, trades per ms) as of `now`"""
+        if self.updated is None:
+            return 0.0, 0.0
+        decay = math.exp(-max(now - self.updated, 0) / window_ms)
+        return self.volume * decay, self.count * decay
+
+
+class QueueEstimate(NamedTuple):
+    """Queue position and fill outlook of one resting order"""
+    order_id: str
+    shares_ahead: float
+    remaining: float
+    # Expected ms until enough volume trades to fill the order (None: no flow seen)
+    expected_fill_ms: Optional[float]
+    # Probability that the order fills completely within the horizon
+    fill_probability: float
+    horizon_ms: float
+
+
+def _poisson_tail(mean: float, k: int) -> float:
+    """P(N >= k) for N ~ Poisson(mean)"""
+    if k <= 0:
+        return 1.0
+    if mean <= 0:
+        return 0.0
+    if k > POISSON_EXACT_MAX:
+        # Normal approximation with continuity correction
+        z = (k - 0.5 - mean) / math.sqrt(mean)
+        return 0.5 * math.erfc(z / math.sqrt(2))
+    term = math.exp(-mean)
+    below = term
+    for i in range(1, k):
+        term *= mean / i
+        below += term
+    return min(max(1.0 - below, 0.0), 1.0)
+
+
+def _trade_time(value: Any) -> int:
+    """Epoch ms from a Data API `match_time` (epoch seconds or ISO-8601)"""
+    if isinstance(value, str) and value.isdigit():
+        value = int(value)
+    if isinstance(value, (int, float)):
+        return int(value * 1000) if value < 1e11 else int(value)
+    return to_ms(value)
+
+
+class MatchingEngine:
+    """
+    Resting paper orders per token, matched against observed books and trades.
+
+    Usage:
+        engine = MatchingEngine()
+        order, fills = engine.submit(order_dict, book, now)
+        fills = engine.on_book(token_id, book, now, changes)       # each /book update
+        fills = engine.on_trade(token_id, 0.45, 120, "SELL", now)  # each trade print
+        fills = engine.on_trades(data_api_trades)                  # or a page of them
+        engine.estimate(order.id, now).fill_probability
+        engine.cancel(order.id)
+    """
+
+    def __init__(
+        self,
+        maker_fee_bps: float = DEFAULT_MAKER_FEE_BPS,
+        taker_fee_bps: float = DEFAULT_TAKER_FEE_BPS,
+        flow_window_ms: float = DEFAULT_FLOW_WINDOW_MS,
+    ) -> None:
+        self.maker_fee_bps = maker_fee_bps
+        self.taker_fee_bps = taker_fee_bps
+        self.flow_window_ms = flow_window_ms
+        self._tokens: Dict[str, _TokenOrders] = {}
+        self._orders: Dict[str, RestingOrder] = {}
+        self._expiries: List[Tuple[int, int, RestingOrder]] = []
+        self._ids = itertools.count(1)
+        # Taker flow per (token, taker side); SELL takers fill our bids
+        self._flows: Dict[Tuple[str, str], _Flow] = {}
+        # Per token: newest trade time seen and the trade ids at that time
+        self._seen_trades: Dict[str, Tuple[int, set]] = {}
+
+    # ----------------------------------------------------------------------
+    # Orders
+    # ----------------------------------------------------------------------
+
+    def _token(self, token_id: str) -> _TokenOrders:
+        orders = self._tokens.get(token_id)
+        if orders is None:
+            orders = self._tokens[token_id] = _TokenOrders()
+        return orders
+
+    def _fill(self, order: RestingOrder, size: float, price: float, liquidity: str, now: int) -> MatchFill:
+        order.remaining -= size
+        fee_bps = self.maker_fee_bps if liquidity == MAKER else self.taker_fee_bps
+        return MatchFill(
+            order.id, order.market_id, order.token_id, order.side, size, price,
+            size * price * fee_bps / 10000, liquidity, now,
+        )
+
+    def _close(self, order: RestingOrder) -> None:
+        order.active = False
+        self._orders.pop(order.id, None)
+
+    def _rest(self, order: RestingOrder, book: Optional[OrderBook]) -> None:
+        """Queue an order behind the public size at its price in `book`"""
+        level = self._token(order.token_id).side(order.side).level(order.price)
+        if book is not None and _visible(book.side(order.side), order.price):
+            # Bring the queue up to date before measuring it
+            level.observe(book.side(order.side).size_at(order.price))
+            order._ahead = level.public
+        level.join(order)
+        self._orders[order.id] = order
+
+    def submit(
+        self,
+        order: Dict[str, Any],
+        book: Optional[OrderBook] = None,
+        now: int = 0,
+        order_id: Optional[str] = None,
+        expires_at: Optional[int] = None,
+    ) -> Tuple[Optional[RestingOrder], List[MatchFill]]:
+        """
+        Place an order ({market_id, token_id, side, type, size, price}).
+        The marketable part fills immediately against `book` as a taker;
+        a LIMIT/GTC/GTD remainder rests behind the size `book` shows at
+        its price. Returns the resting order (None if nothing rests) and
+        the immediate fills.
+        """
+        order_type = order.get("type") or "GTC"
+        side = order["side"]
+        price = order.get("price")
+        resting = RestingOrder(
+            order_id or f"paper-{next(self._ids)}",
+            order.get("market_id") or "",
+            order["token_id"],
+            side,
+            float(price) if price is not None else 0.0,
+            float(order["size"]),
+            order_type,
+            now,
+            expires_at if order_type == "GTD" else None,
+        )
+        if order_type in RESTING_TYPES and price is None:
+            raise ValueError(f"{order_type} order without price")
+
+        fills: List[MatchFill] = []
+        if book is not None and book.opposite(side):
+            execution = execute_order(book, side, resting.size, order_type, price)
+            if execution.filled > 0:
+                fills.append(self._fill(resting, execution.filled, execution.avg_price, TAKER, now))
+
+        if order_type not in RESTING_TYPES or resting.remaining <= EPSILON:
+            resting.active = False
+            return None, fills
+        if resting.expires_at is not None and resting.expires_at <= now:
+            resting.active = False
+            return None, fills
+
+        self._rest(resting, book)
+        if resting.expires_at is not None:
+            heapq.heappush(self._expiries, (resting.expires_at, id(resting), resting))
+        return resting, fills
+
+    def cancel(self, order_id: str) -> Optional[RestingOrder]:
+        order = self._orders.get(order_id)
+        if order is None:
+            return None
+        self._tokens[order.token_id].side(order.side).discard(order)
+        self._close(order)
+        return order
+
+    def get(self, order_id: str) -> Optional[RestingOrder]:
+        return self._orders.get(order_id)
+
+    def open_orders(self, token_id: Optional[str] = None) -> List[RestingOrder]:
+        """Resting orders in priority order per side (all tokens if None)"""
+        tokens = self._tokens.items() if token_id is None else [(token_id, self._tokens.get(token_id))]
+        out: List[RestingOrder] = []
+        for _, orders in tokens:
+            if orders is None:
+                continue
+            for side in (orders.bids, orders.asks):
+                for i in range(len(side.keys)):
+                    out.extend(side.levels[side.level_price(i)].orders)
+        return out
+
+    def active_tokens(self) -> List[str]:
+        """Tokens with at least one resting order"""
+        return [t for t, orders in self._tokens.items() if orders.bids.keys or orders.asks.keys]
+
+    def __len__(self) -> int:
+        return len(self._orders)
+
+    def __iter__(self) -> Iterator[RestingOrder]:
+        return iter(list(self._orders.values()))
+
+    # ----------------------------------------------------------------------
+    # Market events
+    # ----------------------------------------------------------------------
+
+    def expire(self, now: int) -> List[RestingOrder]:
+        """Remove GTD orders whose expiry is at or before `now`"""
+        expired: List[RestingOrder] = []
+        heap = self._expiries
+        while heap and heap[0][0] <= now:
+            _, _, order = heapq.heappop(heap)
+            if order.active:
+                self._tokens[order.token_id].side(order.side).discard(order)
+                self._close(order)
+                expired.append(order)
+        return expired
+
+    def on_book(
+        self,
+        token_id: str,
+        book: OrderBook,
+        now: int,
+        changes: Optional[Iterable[LevelChange]] = None,
+    ) -> List[MatchFill]:
+        """
+        Update queues from a new book for the token and match against it.
+
+        Level sizes feed the queue estimates: pass the LevelChange list
+        from OrderBook.apply_snapshot/apply_deltas to touch only the levels
+        that moved (one dict lookup each); without it every level we rest
+        at is compared with the book. Levels beyond the depth the book
+        shows are left as they were.
+
+        Orders the opposite side now crosses fill as makers at their own
+        price, up to the crossing depth, better-priced orders and earlier
+        orders first.
+        """
+        self.expire(now)
+        orders = self._tokens.get(token_id)
+        if orders is None:
+            return []
+
+        if changes is not None:
+            for change in changes:
+                level = orders.side(change.side).levels.get(change.price)
+                if level is not None:
+                    level.observe(change.new_size)
+        else:
+            for side, public in ((orders.bids, book.bids), (orders.asks, book.asks)):
+                for price, level in side.levels.items():
+                    if _visible(public, price):
+                        level.observe(public.size_at(price))
+
+        fills: List[MatchFill] = []
+        for side, opposite in ((orders.bids, book.asks), (orders.asks, book.bids)):
+            best = opposite.best_price
+            if best is None or not side.keys:
+                continue
+            crossed = side.marketable(best)
+            if crossed == 0:
+                continue
+            consumed = 0.0
+            for price in [side.level_price(i) for i in range(crossed)]:
+                available = opposite.depth_to_price(price) - consumed
+                consumed += self._fill_level(side, price, available, fills, now)
+        return fills
+
+    def _fill_level(self, side: _Side, price: float, volume: float, fills: List[MatchFill], now: int) -> float:
+        """Fill a level's queue FIFO with up to `volume`; returns the volume used"""
+        level = side.levels[price]
+        queue = level.orders
+        used = 0.0
+        while queue and volume - used > EPSILON:
+            order = queue[0]
+            size = min(order.remaining, volume - used)
+            fills.append(self._fill(order, size, price, MAKER, now))
+            used += size
+            if order.remaining <= EPSILON:
+                queue.popleft()
+                level.leave(order)
+                self._close(order)
+        if not queue:
+            side.drop_level(price)
+        return used
+
+    def on_trade(self, token_id: str, price: float, size: float, taker_side: str, now: int) -> List[MatchFill]:
+        """
+        Match resting orders against a trade print. A SELL taker trades
+        against bids: bids priced above the trade were passed through and
+        fill first; bids at the trade price fill once the shares ahead of
+        them have traded, and the print moves everyone at that price up
+        the queue.
+        """
+        flow = self._flows.get((token_id, taker_side))
+        if flow is None:
+            flow = self._flows[(token_id, taker_side)] = _Flow()
+        flow.add(size, now, self.flow_window_ms)
+
+        orders = self._tokens.get(token_id)
+        if orders is None:
+            return []
+        side = orders.bids if taker_side == "SELL" else orders.asks
+        fills: List[MatchFill] = []
+        volume = size
+
+        for level_price in [side.level_price(i) for i in range(side.through(price))]:
+            if volume <= EPSILON:
+                return fills
+            volume -= self._fill_level(side, level_price, volume, fills, now)
+
+        level = side.levels.get(price)
+        if level is None:
+            return fills
+        queue = level.orders
+        # At the trade price each order first waits for the public queue
+        # ahead of it; our own earlier orders at the level take volume too.
+        # Later orders have at least as much ahead, so stop at the first miss.
+        ours_ahead = 0.0
+        taken = 0.0
+        done: List[RestingOrder] = []
+        for order in queue:
+            reach = volume - level.ahead(order) - ours_ahead
+            if reach <= EPSILON:
+                break
+            before = order.remaining
+            fill = min(before, reach)
+            fills.append(self._fill(order, fill, price, MAKER, now))
+            taken += fill
+            if order.remaining <= EPSILON:
+                done.append(order)
+            ours_ahead += before
+        for order in done:
+            queue.remove(order)
+            level.leave(order)
+            self._close(order)
+        level.trade(size, size - volume + taken)
+        if not queue:
+            side.drop_level(price)
+        return fills
+
+    def on_trades(self, trades: Iterable[Dict[str, Any]]) -> List[MatchFill]:
+        """
+        Feed a page of Data API trades (DataApi.getMarketTrades: asset_id,
+        side, size, price, match_time; newest first) in time order. Trades
+        already seen are skipped, so overlapping polls are safe.
+        """
+        rows = sorted(
+            ((_trade_time(t["match_time"]), t) for t in trades if t.get("asset_id")),
+            key=lambda r: r[0],
+        )
+        fills: List[MatchFill] = []
+        for ts, trade in rows:
+            token_id = trade["asset_id"]
+            trade_id = trade.get("id")
+            last, ids = self._seen_trades.get(token_id, (-1, set()))
+            if ts < last or (ts == last and trade_id in ids):
+                continue
+            if ts > last:
+                ids = set()
+                self._seen_trades[token_id] = (ts, ids)
+            ids.add(trade_id)
+            fills.extend(self.on_trade(token_id, float(trade["price"]), float(trade["size"]), trade["side"], ts))
+        return fills
+
+    # ----------------------------------------------------------------------
+    # Queue estimates
+    # ----------------------------------------------------------------------
+
+    def estimate(self, order_id: str, now: int, horizon_ms: Optional[float] = None) -> Optional[QueueEstimate]:
+        """
+        Fill outlook of a resting order from the taker flow on its side.
+
+        Trades arrive as a Poisson process at the recent trade rate with
+        the recent mean size; the order fills once the shares ahead of it,
+        our earlier orders at its price and its own remainder have traded. `horizon_ms` defaults to the
+        time to a GTD order's expiry, else DEFAULT_HORIZON_MS.
+        """
+        order = self._orders.get(order_id)
+        if order is None:
+            return None
+        if horizon_ms is None:
+            horizon_ms = (order.expires_at - now) if order.expires_at is not None else DEFAULT_HORIZON_MS
+        horizon_ms = max(horizon_ms, 0.0)
+
+        taker_side = "SELL" if order.side == "BUY" else "BUY"
+        flow = self._flows.get((order.token_id, taker_side))
+        volume_rate, trade_rate = flow.rates(now, self.flow_window_ms) if flow is not None else (0.0, 0.0)
+        ahead = order.shares_ahead
+        need = ahead + order.remaining
+        if order._level is not None:
+            # Our own earlier orders at the price trade first too
+            for other in order._level.orders:
+                if other is order:
+                    break
+                need += other.remaining
+
+        if volume_rate <= 0 or trade_rate <= 0:
+            return QueueEstimate(order.id, ahead, order.remaining, None, 0.0, horizon_ms)
+        trades_needed = math.ceil(need / (volume_rate / trade_rate) - EPSILON)
+        return QueueEstimate(
+            order.id,
+            ahead,
+            order.remaining,
+            need / volume_rate,
+            _poisson_tail(trade_rate * horizon_ms, trades_needed),
+            horizon_ms,
+        )
+
+    def estimates(self, now: int, horizon_ms: Optional[float] = None, token_id: Optional[str] = None) -> List[QueueEstimate]:
+        """Estimates for every resting order (of one token if given)"""
+        return [self.estimate(o.id, now, horizon_ms) for o in self.open_orders(token_id)]
+
+    # ----------------------------------------------------------------------
+    # Persistence
+    # ----------------------------------------------------------------------
+
+    def load_orders(self, rows: Iterable[Dict[str, Any]], books: Optional[Dict[str, OrderBook]] = None) -> int:
+        """
+        Rebuild resting orders from OPEN paper Order rows (camelCase, as
+        returned by Prisma), oldest first. Returns the number loaded.
+        Order rows store no expiry, so GTD rows rest like GTC here.
+        """
+        loaded = 0
+        for row in sorted(rows, key=lambda r: to_ms(r["createdAt"]) if r.get("createdAt") else 0):
+            if row.get("status", "OPEN") != "OPEN" or row.get("price") is None:
+                continue
+            remaining = (row.get("size") or 0.0) - (row.get("filledSize") or 0.0)
+            if remaining <= EPSILON:
+                continue
+            order = RestingOrder(
+                row["id"], row.get("marketId", ""), row["tokenId"], row["side"], float(row["price"]),
+                remaining, row.get("type") or "GTC",
+                to_ms(row["createdAt"]) if row.get("createdAt") else 0,
+            )
+            self._rest(order, (books or {}).get(row["tokenId"]))
+            loaded += 1
+        return loaded
+
+
+def _visible(side: BookSide, price: float) -> bool:
+    """Whether `side` shows the size at `price`: at or better than its deepest level"""
+    if not side:
+        return False
+    worst = side.level(len(side) - 1)[0]
+    return price >= worst if side.is_bid else price <= worst
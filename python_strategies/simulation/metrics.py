@@ -0,0 +1,337 @@
+"""
+Performance metrics for simulated and live runs.
+
+Mirrors the `PerformanceMetrics` shape in lib/simulation/metrics.ts.
+Every calculation here works on NumPy arrays in vectorized passes:
+`calculate_metrics` takes fill and position arrays (FILL_DTYPE,
+POSITION_DTYPE) from either the backtester or live records converted
+with `fills_from_orders` / `positions_from_records`.
+"""
+
+import math
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+DEFAULT_INITIAL_BALANCE = 10000.0  # Matches the paper broker
+TRADING_DAYS_PER_YEAR = 252
+DEFAULT_RISK_FREE_RATE = 0.05  # 5% annual
+MS_PER_DAY = 86_400_000
+
+BUY, SELL = 1, -1
+OPEN = -1  # closed_at of a position that is still open
+
+FILL_DTYPE = np.dtype([
+    ("timestamp", "i8"),
+    ("market", "i4"),
+    ("side", "i1"),
+    ("size", "f8"),
+    ("price", "f8"),
+    ("fee", "f8"),
+])
+
+POSITION_DTYPE = np.dtype([
+    ("market", "i4"),
+    ("opened_at", "i8"),
+    ("closed_at", "i8"),
+    ("size", "f8"),
+    ("avg_entry_price", "f8"),
+    ("current_price", "f8"),
+    ("realized_pnl", "f8"),
+    ("unrealized_pnl", "f8"),
+])
+
+
+@dataclass
+class PerformanceMetrics:
+    """Same fields as PerformanceMetrics in lib/simulation/metrics.ts"""
+    total_pnl: float = 0.0
+    realized_pnl: float = 0.0
+    unrealized_pnl: float = 0.0
+    win_rate: float = 0.0
+    total_trades: int = 0
+    winning_trades: int = 0
+    losing_trades: int = 0
+    avg_win: float = 0.0
+    avg_loss: float = 0.0
+    profit_factor: float = 0.0
+    max_drawdown: float = 0.0
+    max_drawdown_percent: float = 0.0
+    sharpe_ratio: Optional[float] = None
+    exposure_time: float = 0.0  # Percentage of time with positions
+    total_fees: float = 0.0
+    net_pnl: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """camelCase dict matching the TypeScript interface"""
+        result = {}
+        for key, value in asdict(self).items():
+            head, *rest = key.split("_")
+            result[head + "".join(part.title() for part in rest)] = value
+        return result
+
+
+def max_drawdown(values: np.ndarray) -> Tuple[float, float]:
+    """
+    Largest peak-to-trough decline of a value series.
+    Returns (max_drawdown, max_drawdown_percent), where the percentage is
+    taken relative to the peak at the point of the largest drawdown.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if values.size == 0:
+        return 0.0, 0.0
+
+    peaks = np.maximum.accumulate(values)
+    drawdowns = peaks - values
+    i = int(np.argmax(drawdowns))
+    dd = float(drawdowns[i])
+    if dd <= 0:
+        return 0.0, 0.0
+    peak = float(peaks[i])
+    return dd, (dd / peak * 100 if peak > 0 else 0.0)
+
+
+def sharpe_ratio(
+    returns: np.ndarray,
+    risk_free_rate: float = DEFAULT_RISK_FREE_RATE,
+    periods_per_year: int = TRADING_DAYS_PER_YEAR,
+) -> Optional[float]:
+    """Annualized Sharpe ratio (port of calculateSharpeRatio)"""
+    returns = np.asarray(returns, dtype=np.float64)
+    if returns.size < 2:
+        return None
+
+    std = float(returns.std())  # Population std, as in the TS version
+    if std == 0:
+        return None
+
+    annualized_return = float(returns.mean()) * periods_per_year
+    annualized_std = std * math.sqrt(periods_per_year)
+    return (annualized_return - risk_free_rate) / annualized_std
+
+
+def daily_returns(timestamps: np.ndarray, equity: np.ndarray) -> np.ndarray:
+    """Day-over-day returns of an equity curve sampled at `timestamps` (ms)"""
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    equity = np.asarray(equity, dtype=np.float64)
+    if timestamps.size < 2:
+        return np.empty(0)
+
+    days = timestamps // MS_PER_DAY
+    # Last equity value of each day
+    last_of_day = np.nonzero(np.diff(days))[0]
+    closes = np.append(equity[last_of_day], equity[-1])
+    if closes.size < 2:
+        return np.empty(0)
+
+    prev = closes[:-1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = np.where(prev != 0, np.diff(closes) / prev, 0.0)
+    return returns
+
+
+def trade_statistics(pnls: np.ndarray) -> Dict[str, float]:
+    """Win/loss statistics over closed-trade PnLs"""
+    pnls = np.asarray(pnls, dtype=np.float64)
+    total = int(pnls.size)
+    wins = pnls[pnls > 0]
+    losses = pnls[pnls <= 0]
+
+    total_wins = float(wins.sum())
+    total_losses = float(abs(losses.sum()))
+    if total_losses > 0:
+        profit_factor = total_wins / total_losses
+    else:
+        profit_factor = math.inf if total_wins > 0 else 0.0
+
+    return {
+        "total_trades": total,
+        "winning_trades": int(wins.size),
+        "losing_trades": int(losses.size),
+        "win_rate": wins.size / total * 100 if total else 0.0,
+        "avg_win": total_wins / wins.size if wins.size else 0.0,
+        "avg_loss": total_losses / losses.size if losses.size else 0.0,
+        "profit_factor": profit_factor,
+    }
+
+
+def time_weighted_exposure(timestamps: np.ndarray, exposed: np.ndarray) -> float:
+    """
+    Percentage of elapsed time during which `exposed` was true.
+    `exposed[i]` describes the interval [timestamps[i], timestamps[i+1]).
+    """
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    if timestamps.size < 2:
+        return 0.0
+    durations = np.diff(timestamps)
+    total = durations.sum()
+    if total <= 0:
+        return 0.0
+    return float(durations[np.asarray(exposed[:-1], dtype=bool)].sum() / total * 100)
+
+
+def exposure_union(opened_at: np.ndarray, closed_at: np.ndarray, start: int, end: int) -> float:
+    """
+    Percentage of [start, end] covered by at least one position interval.
+    Overlapping positions are counted once (interval sweep over the union);
+    open positions (closed_at == OPEN) run to `end`.
+    """
+    total = end - start
+    if total <= 0 or len(opened_at) == 0:
+        return 0.0
+
+    starts = np.maximum(np.asarray(opened_at, dtype=np.int64), start)
+    ends = np.asarray(closed_at, dtype=np.int64)
+    ends = np.minimum(np.where(ends == OPEN, end, ends), end)
+    valid = ends > starts
+    starts, ends = starts[valid], ends[valid]
+    if starts.size == 0:
+        return 0.0
+
+    order = np.argsort(starts, kind="stable")
+    starts = starts[order]
+    reach = np.maximum.accumulate(ends[order])
+    # Each interval only adds what extends past everything before it
+    prev_reach = np.concatenate(([start], reach[:-1]))
+    covered = np.maximum(reach - np.maximum(starts, prev_reach), 0).sum()
+    return float(covered / total * 100)
+
+
+def cash_balance(fills: np.ndarray, initial_balance: float = DEFAULT_INITIAL_BALANCE) -> np.ndarray:
+    """Cash after each fill (the series calculateDrawdown walks), initial balance first"""
+    value = fills["size"] * fills["price"]
+    flows = np.where(fills["side"] == BUY, -(value + fills["fee"]), value - fills["fee"])
+    return np.concatenate(([initial_balance], initial_balance + np.cumsum(flows)))
+
+
+def calculate_metrics(
+    fills: np.ndarray,
+    positions: np.ndarray,
+    start: Optional[int] = None,
+    end: Optional[int] = None,
+    initial_balance: float = DEFAULT_INITIAL_BALANCE,
+    equity: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+) -> PerformanceMetrics:
+    """
+    Port of calculateMetrics over FILL_DTYPE / POSITION_DTYPE arrays.
+
+    Fills and closed trades are filtered to [start, end] (ms). Drawdown
+    and Sharpe come from the cash balance after each fill, as in the
+    TypeScript version, unless an `equity` curve (timestamps, values) is
+    given, in which case they are measured on that curve instead.
+    Exposure is the union of position intervals over [start, end].
+    """
+    fills = np.asarray(fills, dtype=FILL_DTYPE)
+    positions = np.asarray(positions, dtype=POSITION_DTYPE)
+
+    if start is not None or end is not None:
+        lo = -np.inf if start is None else start
+        hi = np.inf if end is None else end
+        ts = fills["timestamp"]
+        fills = fills[(ts >= lo) & (ts <= hi)]
+        closed_at = positions["closed_at"]
+        in_window = (closed_at == OPEN) | ((closed_at >= lo) & (closed_at <= hi))
+    else:
+        in_window = np.ones(positions.size, dtype=bool)
+
+    total_fees = float(fills["fee"].sum())
+    realized = float(positions["realized_pnl"].sum())
+    unrealized = float(positions["unrealized_pnl"].sum())
+    total = realized + unrealized
+
+    closed = positions[in_window & (positions["closed_at"] != OPEN)]
+    stats = trade_statistics(closed["realized_pnl"])
+
+    if equity is not None:
+        eq_times, eq_values = equity
+        dd, dd_pct = max_drawdown(np.concatenate(([initial_balance], eq_values)))
+        sharpe = sharpe_ratio(daily_returns(eq_times, eq_values))
+    else:
+        balance = cash_balance(fills, initial_balance)
+        dd, dd_pct = max_drawdown(balance)
+        sharpe = sharpe_ratio(daily_returns(fills["timestamp"], balance[1:]))
+
+    if start is None:
+        start = int(positions["opened_at"].min()) if positions.size else 0
+    if end is None:
+        candidates = [positions["closed_at"].max() if positions.size else 0]
+        if fills.size:
+            candidates.append(fills["timestamp"][-1])
+        end = int(max(candidates))
+    exposure = exposure_union(positions["opened_at"], positions["closed_at"], start, end)
+
+    return PerformanceMetrics(
+        total_pnl=total,
+        realized_pnl=realized,
+        unrealized_pnl=unrealized,
+        max_drawdown=dd,
+        max_drawdown_percent=dd_pct,
+        sharpe_ratio=sharpe,
+        exposure_time=exposure,
+        total_fees=total_fees,
+        net_pnl=total - total_fees,
+        **stats,
+    )
+
+
+# ----------------------------------------------------------------------
+# Live records
+# ----------------------------------------------------------------------
+
+def to_ms(value: Any) -> int:
+    """Epoch ms from an int, a datetime or an ISO-8601 string; OPEN for None"""
+    if value is None:
+        return OPEN
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return int(value.timestamp() * 1000)
+    raise TypeError(f"Unsupported timestamp: {value!r}")
+
+
+def _market_codes(ids: Sequence[str], markets: Dict[str, int]) -> np.ndarray:
+    return np.array([markets.setdefault(m, len(markets)) for m in ids], dtype=np.int32)
+
+
+def fills_from_orders(orders: Iterable[Dict[str, Any]], markets: Optional[Dict[str, int]] = None) -> np.ndarray:
+    """
+    FILLED Order rows (camelCase, as returned by Prisma) to a FILL_DTYPE
+    array sorted by fill time. `markets` maps market ids to codes and is
+    extended in place.
+    """
+    markets = {} if markets is None else markets
+    rows = [o for o in orders if o.get("filledAt") is not None]
+    fills = np.empty(len(rows), dtype=FILL_DTYPE)
+    if not rows:
+        return fills
+    fills["timestamp"] = [to_ms(o["filledAt"]) for o in rows]
+    fills["market"] = _market_codes([o.get("marketId", "") for o in rows], markets)
+    fills["side"] = [BUY if o["side"] == "BUY" else SELL for o in rows]
+    fills["size"] = [o.get("filledSize") or 0.0 for o in rows]
+    fills["price"] = [o.get("filledPrice") or 0.0 for o in rows]
+    fills["fee"] = [o.get("fees") or 0.0 for o in rows]
+    return fills[np.argsort(fills["timestamp"], kind="stable")]
+
+
+def positions_from_records(positions: Iterable[Dict[str, Any]], markets: Optional[Dict[str, int]] = None) -> np.ndarray:
+    """Position rows (camelCase, as returned by Prisma) to a POSITION_DTYPE array"""
+    markets = {} if markets is None else markets
+    rows = list(positions)
+    out = np.empty(len(rows), dtype=POSITION_DTYPE)
+    if not rows:
+        return out
+    out["market"] = _market_codes([p.get("marketId", "") for p in rows], markets)
+    out["opened_at"] = [to_ms(p["openedAt"]) for p in rows]
+    out["closed_at"] = [to_ms(p.get("closedAt")) for p in rows]
+    out["size"] = [p.get("size", 0.0) for p in rows]
+    out["avg_entry_price"] = [p.get("avgEntryPrice", 0.0) for p in rows]
+    out["current_price"] = [p.get("currentPrice") or 0.0 for p in rows]
+    out["realized_pnl"] = [p.get("realizedPnl", 0.0) for p in rows]
+    out["unrealized_pnl"] = [p.get("unrealizedPnl", 0.0) for p in rows]
+    return out
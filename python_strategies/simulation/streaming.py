@@ -0,0 +1,341 @@
+"""
+Streaming performance metrics for live runs.
+
+MetricsAccumulator folds fills in one at a time and keeps every
+PerformanceMetrics field (and the DailyMetrics buckets) current in O(1)
+per fill, so dashboards read a snapshot instead of re-reading every
+FILLED order. Its state is plain JSON (`to_dict` / `from_dict`) and can
+be checkpointed into `StrategyRun.metrics`.
+
+Fed the same fills, a snapshot agrees with `calculate_metrics`:
+drawdown and Sharpe are measured on the cash balance after each fill,
+Sharpe over day-to-day returns with a Welford running mean/variance.
+"""
+
+import math
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from .metrics import (
+    DEFAULT_INITIAL_BALANCE,
+    DEFAULT_RISK_FREE_RATE,
+    MS_PER_DAY,
+    TRADING_DAYS_PER_YEAR,
+    PerformanceMetrics,
+    to_ms,
+)
+
+STATE_VERSION = 1
+EPSILON = 1e-9
+
+
+class Welford:
+    """Running mean and population variance"""
+
+    __slots__ = ("n", "mean", "m2")
+
+    def __init__(self, n: int = 0, mean: float = 0.0, m2: float = 0.0) -> None:
+        self.n = n
+        self.mean = mean
+        self.m2 = m2
+
+    def add(self, x: float) -> None:
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+
+    def with_value(self, x: float) -> "Welford":
+        """Copy with one more observation (for provisional reads)"""
+        copy = Welford(self.n, self.mean, self.m2)
+        copy.add(x)
+        return copy
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / self.n if self.n else 0.0
+
+
+def _day_key(day: int) -> str:
+    return datetime.fromtimestamp(day * MS_PER_DAY / 1000, tz=timezone.utc).strftime("%Y-%m-%d")
+
+
+class MetricsAccumulator:
+    """
+    Online PerformanceMetrics for one run.
+
+    Usage:
+        acc = MetricsAccumulator()
+        acc.add_fill(ts, "0xabc", "BUY", 10, 0.45, fee=0.027, token_id="123")
+        acc.mark("0xabc", 0.47, token_id="123")
+        acc.snapshot().to_dict()
+        run.metrics = acc.to_dict()  # checkpoint; MetricsAccumulator.from_dict() resumes
+    """
+
+    def __init__(
+        self,
+        initial_balance: float = DEFAULT_INITIAL_BALANCE,
+        risk_free_rate: float = DEFAULT_RISK_FREE_RATE,
+        max_days: Optional[int] = None,
+    ) -> None:
+        self.initial_balance = initial_balance
+        self.risk_free_rate = risk_free_rate
+        self.max_days = max_days
+
+        self.cash = initial_balance
+        self.peak = initial_balance
+        self.max_drawdown = 0.0
+        self.max_drawdown_percent = 0.0
+        self.total_fees = 0.0
+        self.realized_pnl = 0.0
+        self.unrealized_pnl = 0.0
+
+        # (market_id, token_id) -> [size, avg_entry_price, mark, round_trip_pnl]
+        self.positions: Dict[Tuple[str, str], List[float]] = {}
+        self.open_positions = 0
+
+        self.winning_trades = 0
+        self.losing_trades = 0
+        self.total_wins = 0.0
+        self.total_losses = 0.0
+
+        # Day-over-day returns of the cash balance
+        self.returns = Welford()
+        self.day: Optional[int] = None
+        self.prev_close: Optional[float] = None
+        self.daily: Dict[str, Dict[str, float]] = {}
+
+        # Exposure
+        self.first_ts: Optional[int] = None
+        self.last_ts: Optional[int] = None
+        self.exposed_since: Optional[int] = None
+        self.exposed_ms = 0
+
+    # ----------------------------------------------------------------------
+    # Updates
+    # ----------------------------------------------------------------------
+
+    def _roll_day(self, day: int) -> None:
+        if self.day is not None and day > self.day:
+            if self.prev_close is not None:
+                self.returns.add(self._return(self.prev_close, self.cash))
+            self.prev_close = self.cash
+        if self.day is None or day > self.day:
+            self.day = day
+
+    @staticmethod
+    def _return(prev: float, close: float) -> float:
+        return (close - prev) / prev if prev != 0 else 0.0
+
+    def _bucket(self, day: int) -> Dict[str, float]:
+        key = _day_key(day)
+        bucket = self.daily.get(key)
+        if bucket is None:
+            bucket = self.daily[key] = {"pnl": 0.0, "trades": 0, "volume": 0.0, "fees": 0.0, "positions": 0}
+            if self.max_days is not None and len(self.daily) > self.max_days:
+                del self.daily[next(iter(self.daily))]  # Days arrive in order
+        return bucket
+
+    def add_fill(
+        self,
+        timestamp: int,
+        market_id: str,
+        side: str,
+        size: float,
+        price: float,
+        fee: float = 0.0,
+        token_id: str = "",
+    ) -> None:
+        """Apply one fill; timestamps are epoch ms and expected in order"""
+        timestamp = int(timestamp)
+        day = timestamp // MS_PER_DAY
+        self._roll_day(day)
+
+        if self.first_ts is None:
+            self.first_ts = timestamp
+        self.last_ts = timestamp if self.last_ts is None else max(self.last_ts, timestamp)
+
+        key = (market_id, token_id)
+        position = self.positions.get(key)
+        if position is None:
+            position = self.positions[key] = [0.0, 0.0, price, 0.0]
+        held, avg, mark, _ = position
+        self.unrealized_pnl -= held * (mark - avg)
+
+        value = size * price
+        if side == "BUY":
+            if held <= EPSILON:
+                self._open(timestamp)
+            position[1] = (held * avg + value) / (held + size)
+            position[0] = held + size
+            self.cash -= value + fee
+            flow = -(value + fee)
+        else:
+            closed = min(size, held)
+            pnl = (price - avg) * closed
+            self.realized_pnl += pnl
+            position[3] += pnl
+            position[0] = held - closed
+            self.cash += value - fee
+            flow = value - fee
+            if held > EPSILON and position[0] <= EPSILON:
+                self._close(key, position, timestamp)
+            elif held <= EPSILON:
+                del self.positions[key]  # Nothing was held
+
+        position[2] = price
+        if key in self.positions:
+            self.unrealized_pnl += position[0] * (price - position[1])
+
+        self.total_fees += fee
+        if self.cash > self.peak:
+            self.peak = self.cash
+        drawdown = self.peak - self.cash
+        if drawdown > self.max_drawdown:
+            self.max_drawdown = drawdown
+            self.max_drawdown_percent = drawdown / self.peak * 100 if self.peak > 0 else 0.0
+
+        bucket = self._bucket(day)
+        bucket["pnl"] += flow
+        bucket["trades"] += 1
+        bucket["volume"] += value
+        bucket["fees"] += fee
+        bucket["positions"] = self.open_positions
+
+    def add_order(self, order: Dict[str, Any]) -> None:
+        """Apply a FILLED Order row (camelCase, as returned by Prisma)"""
+        if order.get("filledAt") is None:
+            return
+        self.add_fill(
+            to_ms(order["filledAt"]),
+            order.get("marketId", ""),
+            order["side"],
+            order.get("filledSize") or 0.0,
+            order.get("filledPrice") or 0.0,
+            order.get("fees") or 0.0,
+            order.get("tokenId", ""),
+        )
+
+    def mark(self, market_id: str, price: float, token_id: str = "") -> None:
+        """Update the mark price of an open position"""
+        position = self.positions.get((market_id, token_id))
+        if position is None:
+            return
+        size, avg, mark, _ = position
+        self.unrealized_pnl += size * (price - mark)
+        position[2] = price
+
+    def _open(self, timestamp: int) -> None:
+        if self.open_positions == 0:
+            self.exposed_since = timestamp
+        self.open_positions += 1
+
+    def _close(self, key: Tuple[str, str], position: List[float], timestamp: int) -> None:
+        pnl = position[3]
+        if pnl > 0:
+            self.winning_trades += 1
+            self.total_wins += pnl
+        else:
+            self.losing_trades += 1
+            self.total_losses += -pnl
+        del self.positions[key]
+
+        self.open_positions -= 1
+        if self.open_positions == 0 and self.exposed_since is not None:
+            self.exposed_ms += timestamp - self.exposed_since
+            self.exposed_since = None
+
+    # ----------------------------------------------------------------------
+    # Reads
+    # ----------------------------------------------------------------------
+
+    def sharpe_ratio(self) -> Optional[float]:
+        """Annualized Sharpe over daily returns, including the current day"""
+        returns = self.returns
+        if self.prev_close is not None:
+            returns = returns.with_value(self._return(self.prev_close, self.cash))
+        if returns.n < 2:
+            return None
+        std = math.sqrt(returns.variance)
+        if std == 0:
+            return None
+        annualized_return = returns.mean * TRADING_DAYS_PER_YEAR
+        return (annualized_return - self.risk_free_rate) / (std * math.sqrt(TRADING_DAYS_PER_YEAR))
+
+    def exposure_time(self, now: Optional[int] = None) -> float:
+        """Percentage of time since the first fill with a position open"""
+        if self.first_ts is None:
+            return 0.0
+        now = self.last_ts if now is None else now
+        total = now - self.first_ts
+        if total <= 0:
+            return 0.0
+        exposed = self.exposed_ms
+        if self.exposed_since is not None:
+            exposed += max(now - self.exposed_since, 0)
+        return exposed / total * 100
+
+    def snapshot(self, now: Optional[int] = None) -> PerformanceMetrics:
+        total_trades = self.winning_trades + self.losing_trades
+        if self.total_losses > 0:
+            profit_factor = self.total_wins / self.total_losses
+        else:
+            profit_factor = math.inf if self.total_wins > 0 else 0.0
+        total = self.realized_pnl + self.unrealized_pnl
+
+        return PerformanceMetrics(
+            total_pnl=total,
+            realized_pnl=self.realized_pnl,
+            unrealized_pnl=self.unrealized_pnl,
+            win_rate=self.winning_trades / total_trades * 100 if total_trades else 0.0,
+            total_trades=total_trades,
+            winning_trades=self.winning_trades,
+            losing_trades=self.losing_trades,
+            avg_win=self.total_wins / self.winning_trades if self.winning_trades else 0.0,
+            avg_loss=self.total_losses / self.losing_trades if self.losing_trades else 0.0,
+            profit_factor=profit_factor,
+            max_drawdown=self.max_drawdown,
+            max_drawdown_percent=self.max_drawdown_percent,
+            sharpe_ratio=self.sharpe_ratio(),
+            exposure_time=self.exposure_time(now),
+            total_fees=self.total_fees,
+            net_pnl=total - self.total_fees,
+        )
+
+    def daily_metrics(self) -> List[Dict[str, Any]]:
+        """DailyMetrics rows (lib/simulation/metrics.ts), oldest first"""
+        return [{"date": date, **bucket} for date, bucket in self.daily.items()]
+
+    # ----------------------------------------------------------------------
+    # Checkpoints
+    # ----------------------------------------------------------------------
+
+    _SCALARS = (
+        "initial_balance", "risk_free_rate", "max_days", "cash", "peak",
+        "max_drawdown", "max_drawdown_percent", "total_fees", "realized_pnl",
+        "unrealized_pnl", "open_positions", "winning_trades", "losing_trades",
+        "total_wins", "total_losses", "day", "prev_close", "first_ts",
+        "last_ts", "exposed_since", "exposed_ms",
+    )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable state"""
+        state: Dict[str, Any] = {"version": STATE_VERSION}
+        for name in self._SCALARS:
+            state[name] = getattr(self, name)
+        state["returns"] = [self.returns.n, self.returns.mean, self.returns.m2]
+        state["positions"] = [[m, t, *values] for (m, t), values in self.positions.items()]
+        state["daily"] = self.daily
+        return state
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> "MetricsAccumulator":
+        if state.get("version") != STATE_VERSION:
+            raise ValueError(f"Unsupported accumulator state version: {state.get('version')}")
+        acc = cls()
+        for name in cls._SCALARS:
+            setattr(acc, name, state[name])
+        acc.returns = Welford(*state["returns"])
+        acc.positions = {(m, t): list(values) for m, t, *values in state["positions"]}
+        acc.daily = {date: dict(bucket) for date, bucket in state["daily"].items()}
+        return acc
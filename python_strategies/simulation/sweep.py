@@ -0,0 +1,380 @@
+"""
+Parallel parameter sweeps over backtests.
+
+A sweep takes a grid or a random search space of strategy parameters
+and fans one backtest per point out across a process pool. Market data
+is shared read-only: histories are spilled once to .npy files (or read
+straight from a TickStore) and every worker memory-maps them, so no
+price array is pickled per task. Results stream back as they finish and
+are kept ranked in a SweepTable.
+
+Usage:
+    space = ParameterGrid({"spread_percent": [0.01, 0.02, 0.03], "order_size": [5, 10]})
+    sweep = ParameterSweep(code, histories, space, BacktestConfig(interval_ms=60_000))
+    for result in sweep.iter_results():  # completion order
+        ...
+    table = sweep.run()  # ranked by net_pnl
+"""
+
+import bisect
+import itertools
+import math
+import os
+import random
+import shutil
+import tempfile
+import time
+import types
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import asdict, dataclass, field, replace
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from executor.loader import load_strategy
+
+from .backtest import BacktestConfig, Backtester, MarketHistory
+from .metrics import PerformanceMetrics
+from .tickstore import TickStore
+
+# Fields where smaller is better when ranking
+ASCENDING_FIELDS = ("max_drawdown", "max_drawdown_percent", "total_fees", "avg_loss", "losing_trades")
+
+
+# ----------------------------------------------------------------------
+# Search spaces
+# ----------------------------------------------------------------------
+
+class ParameterGrid:
+    """Cartesian product of candidate values per parameter"""
+
+    def __init__(self, grid: Dict[str, Sequence[Any]]) -> None:
+        self.names = list(grid)
+        self.values = [list(grid[name]) for name in self.names]
+
+    def __len__(self) -> int:
+        return math.prod(len(v) for v in self.values)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for combo in itertools.product(*self.values):
+            yield dict(zip(self.names, combo))
+
+
+Distribution = Union[Sequence[Any], Tuple[float, float], Callable[[random.Random], Any]]
+
+
+class RandomSearch:
+    """
+    `n` random points from a search space. Each parameter is one of:
+        list            uniform choice
+        (low, high)     uniform in [low, high]; integers if both ends are ints
+        callable(rng)   custom sampler
+    """
+
+    def __init__(self, space: Dict[str, Distribution], n: int, seed: Optional[int] = None) -> None:
+        self.space = space
+        self.n = n
+        self.seed = seed
+
+    def __len__(self) -> int:
+        return self.n
+
+    @staticmethod
+    def _sample(rng: random.Random, dist: Distribution) -> Any:
+        if callable(dist):
+            return dist(rng)
+        if isinstance(dist, tuple) and len(dist) == 2:
+            low, high = dist
+            if isinstance(low, int) and isinstance(high, int):
+                return rng.randint(low, high)
+            return rng.uniform(low, high)
+        return rng.choice(list(dist))
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        rng = random.Random(self.seed)
+        for _ in range(self.n):
+            yield {name: self._sample(rng, dist) for name, dist in self.space.items()}
+
+
+# ----------------------------------------------------------------------
+# Results
+# ----------------------------------------------------------------------
+
+@dataclass
+class SweepResult:
+    """Outcome of one sweep point"""
+    index: int
+    parameters: Dict[str, Any]
+    metrics: Optional[PerformanceMetrics] = None
+    error: Optional[str] = None
+    elapsed_ms: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        row: Dict[str, Any] = {"index": self.index, "parameters": self.parameters}
+        if self.metrics is not None:
+            row.update(asdict(self.metrics))
+        if self.error is not None:
+            row["error"] = self.error
+        row["elapsed_ms"] = self.elapsed_ms
+        return row
+
+
+@dataclass
+class SweepTable:
+    """Sweep results kept sorted by one PerformanceMetrics field"""
+    rank_by: str = "net_pnl"
+    ascending: Optional[bool] = None
+    results: List[SweepResult] = field(default_factory=list)
+    failed: List[SweepResult] = field(default_factory=list)
+    _keys: List[float] = field(default_factory=list, repr=False)
+
+    def __post_init__(self) -> None:
+        if self.rank_by not in PerformanceMetrics.__dataclass_fields__:
+            raise ValueError(f"Unknown metric: {self.rank_by}")
+        if self.ascending is None:
+            self.ascending = self.rank_by in ASCENDING_FIELDS
+
+    def _key(self, result: SweepResult) -> float:
+        value = getattr(result.metrics, self.rank_by)
+        if value is None or (isinstance(value, float) and math.isnan(value)):
+            return math.inf  # Unrankable values sort last
+        return float(value) if self.ascending else -float(value)
+
+    def add(self, result: SweepResult) -> int:
+        """Insert a result; returns its rank (0 = best), or -1 if it failed"""
+        if result.metrics is None:
+            self.failed.append(result)
+            return -1
+        key = self._key(result)
+        i = bisect.bisect_right(self._keys, key)
+        self._keys.insert(i, key)
+        self.results.insert(i, result)
+        return i
+
+    def __len__(self) -> int:
+        return len(self.results)
+
+    def __iter__(self) -> Iterator[SweepResult]:
+        return iter(self.results)
+
+    @property
+    def best(self) -> Optional[SweepResult]:
+        return self.results[0] if self.results else None
+
+    def top(self, n: int = 10) -> List[SweepResult]:
+        return self.results[:n]
+
+    def rows(self) -> List[Dict[str, Any]]:
+        """Ranked rows with parameters flattened next to the metrics"""
+        rows = []
+        for rank, result in enumerate(self.results, 1):
+            row = {"rank": rank, **result.parameters}
+            row.update(result.metrics.to_dict())
+            rows.append(row)
+        return rows
+
+
+# ----------------------------------------------------------------------
+# Shared market data
+# ----------------------------------------------------------------------
+
+_COLUMNS = ("timestamps", "bid", "ask", "volume", "last_price", "bid_size", "ask_size")
+
+# Per-worker state, set once by _init_worker
+_worker_code: str = ""
+_worker_histories: List[MarketHistory] = []
+_worker_base: Optional[BacktestConfig] = None
+
+
+def _spill(histories: Sequence[MarketHistory], directory: str) -> List[Dict[str, Any]]:
+    """Write history columns as .npy files; returns the manifest workers map"""
+    manifest = []
+    for i, history in enumerate(histories):
+        columns = {}
+        for name in _COLUMNS:
+            values = getattr(history, name)
+            if values is None:
+                continue
+            path = os.path.join(directory, f"{i}.{name}.npy")
+            np.save(path, np.ascontiguousarray(values))
+            columns[name] = path
+        trades = None
+        if history.trades is not None:
+            trades = {}
+            for name, values in history.trades.items():
+                path = os.path.join(directory, f"{i}.trades.{name}.npy")
+                np.save(path, np.ascontiguousarray(values))
+                trades[name] = path
+        manifest.append({
+            "market_id": history.market_id,
+            "token_id": history.token_id,
+            "columns": columns,
+            "trades": trades,
+            "books": list(history.books),
+        })
+    return manifest
+
+
+def _map_histories(source: Tuple[str, Any]) -> List[MarketHistory]:
+    kind, spec = source
+    if kind == "store":
+        store = TickStore(spec["root"])
+        return [store.history(m, spec["start"], spec["end"]) for m in spec["market_ids"]]
+
+    histories = []
+    for entry in spec:
+        columns = {name: np.load(path, mmap_mode="r") for name, path in entry["columns"].items()}
+        trades = entry["trades"]
+        histories.append(MarketHistory(
+            market_id=entry["market_id"],
+            token_id=entry["token_id"],
+            books=entry["books"],
+            trades={name: np.load(path, mmap_mode="r") for name, path in trades.items()} if trades else None,
+            **columns,
+        ))
+    return histories
+
+
+def _init_worker(code: str, source: Tuple[str, Any], base: BacktestConfig) -> None:
+    global _worker_code, _worker_histories, _worker_base
+    _worker_code = code
+    _worker_histories = _map_histories(source)
+    _worker_base = base
+
+
+def apply_parameters(module: types.ModuleType, parameters: Dict[str, Any]) -> None:
+    """Override module-level constants named after parameters (spread_percent -> SPREAD_PERCENT)"""
+    for name, value in parameters.items():
+        attr = name.upper()
+        if attr in module.__dict__ and not callable(module.__dict__[attr]):
+            setattr(module, attr, value)
+
+
+def _run_point(index: int, parameters: Dict[str, Any]) -> SweepResult:
+    """Backtest one point inside a worker, on a freshly loaded strategy"""
+    started = time.perf_counter()
+    try:
+        strategy = load_strategy("sweep", index + 1, _worker_code)
+        apply_parameters(strategy.module, parameters)
+        config = replace(_worker_base, parameters={**_worker_base.parameters, **parameters})
+        result = Backtester(strategy, _worker_histories, config).run()
+        metrics, error = result.metrics, None
+    except Exception as e:
+        metrics, error = None, f"{type(e).__name__}: {e}"
+    return SweepResult(
+        index=index,
+        parameters=parameters,
+        metrics=metrics,
+        error=error,
+        elapsed_ms=(time.perf_counter() - started) * 1000,
+    )
+
+
+# ----------------------------------------------------------------------
+# Sweep
+# ----------------------------------------------------------------------
+
+def _strategy_source(strategy: Union[str, types.ModuleType]) -> str:
+    if isinstance(strategy, types.ModuleType):
+        path = getattr(strategy, "__file__", None)
+        if not path or not os.path.exists(path):
+            raise ValueError("Strategy module has no source file; pass the code instead")
+        with open(path) as f:
+            return f.read()
+    return strategy
+
+
+class ParameterSweep:
+    """
+    Runs one backtest per parameter point across a process pool.
+
+    `strategy` is source code or an imported module with a source file;
+    every point gets a fresh module so state never leaks between runs.
+    Points are passed to initialize() via config["parameters"] and also
+    override module constants of the same name in upper case.
+    """
+
+    def __init__(
+        self,
+        strategy: Union[str, types.ModuleType],
+        markets: Sequence[MarketHistory],
+        space: Iterable[Dict[str, Any]],
+        config: Optional[BacktestConfig] = None,
+        max_workers: Optional[int] = None,
+    ) -> None:
+        self.code = _strategy_source(strategy)
+        self.markets = list(markets)
+        self.space = space
+        self.config = config or BacktestConfig()
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._store: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def from_store(
+        cls,
+        strategy: Union[str, types.ModuleType],
+        store: Union[str, TickStore],
+        market_ids: Sequence[str],
+        space: Iterable[Dict[str, Any]],
+        config: Optional[BacktestConfig] = None,
+        max_workers: Optional[int] = None,
+    ) -> "ParameterSweep":
+        """Sweep over TickStore data; workers map the store files directly"""
+        sweep = cls(strategy, [], space, config, max_workers)
+        cfg = sweep.config
+        sweep._store = {
+            "root": store.root if isinstance(store, TickStore) else store,
+            "market_ids": list(market_ids),
+            "start": cfg.start,
+            "end": cfg.end,
+        }
+        return sweep
+
+    def iter_results(self) -> Iterator[SweepResult]:
+        """Yield results in completion order"""
+        spill_dir = None
+        try:
+            if self._store is not None:
+                source: Tuple[str, Any] = ("store", self._store)
+            else:
+                if not self.markets:
+                    raise ValueError("Sweep needs at least one market")
+                spill_dir = tempfile.mkdtemp(prefix="polytrader-sweep-")
+                source = ("spill", _spill(self.markets, spill_dir))
+
+            with ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_init_worker,
+                initargs=(self.code, source, self.config),
+            ) as pool:
+                # Bounded in-flight window so results stream and large
+                # random searches are never fully materialized
+                points = enumerate(self.space)
+                window = self.max_workers * 4
+                pending: set = set()
+                for index, parameters in itertools.islice(points, window):
+                    pending.add(pool.submit(_run_point, index, parameters))
+
+                while pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+                    for index, parameters in itertools.islice(points, len(done)):
+                        pending.add(pool.submit(_run_point, index, parameters))
+        finally:
+            if spill_dir is not None:
+                shutil.rmtree(spill_dir, ignore_errors=True)
+
+    def run(
+        self,
+        rank_by: str = "net_pnl",
+        ascending: Optional[bool] = None,
+        on_result: Optional[Callable[[SweepResult, int], None]] = None,
+    ) -> SweepTable:
+        """Run the whole sweep; `on_result(result, rank)` sees each result as it lands"""
+        table = SweepTable(rank_by=rank_by, ascending=ascending)
+        for result in self.iter_results():
+            rank = table.add(result)
+            if on_result is not None:
+                on_result(result, rank)
+        return table
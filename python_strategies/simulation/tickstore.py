@@ -0,0 +1,374 @@
+"""
+Columnar on-disk tick store.
+
+Layout (one directory per market):
+
+    <root>/<market_id>/meta.json
+    <root>/<market_id>/ticks/timestamp.i8    int64 ms, ascending
+    <root>/<market_id>/ticks/bid.f8          float64
+    <root>/<market_id>/ticks/ask.f8
+    <root>/<market_id>/ticks/mid.f8
+    <root>/<market_id>/ticks/bid_size.f8
+    <root>/<market_id>/ticks/ask_size.f8
+    <root>/<market_id>/ticks/timestamp.idx   sparse time index
+    <root>/<market_id>/trades/...            timestamp, price, size, side
+
+Every column is an append-only file of fixed-width values, so a column
+is read back as a `numpy.memmap` and a time range is a zero-copy slice
+of it. The sparse index holds every INDEX_STRIDE-th timestamp; a range
+lookup binary-searches the index and then one stride of the timestamp
+column, so it touches a handful of pages however long the history is.
+"""
+
+import json
+import os
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .backtest import MarketHistory
+
+INDEX_STRIDE = 4096
+FORMAT_VERSION = 1
+
+TICK_COLUMNS: Tuple[Tuple[str, str], ...] = (
+    ("timestamp", "i8"),
+    ("bid", "f8"),
+    ("ask", "f8"),
+    ("mid", "f8"),
+    ("bid_size", "f8"),
+    ("ask_size", "f8"),
+)
+
+TRADE_COLUMNS: Tuple[Tuple[str, str], ...] = (
+    ("timestamp", "i8"),
+    ("price", "f8"),
+    ("size", "f8"),
+    ("side", "i1"),  # +1 buy, -1 sell
+)
+
+_UNSAFE = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+class TickStoreError(Exception):
+    """Raised on invalid appends or corrupt stores"""
+
+
+class ColumnSet:
+    """
+    Read-only view of a column group over a row range.
+    Column attributes are memmap slices (no copy).
+    """
+
+    def __init__(self, columns: Dict[str, np.ndarray]) -> None:
+        self._columns = columns
+
+    def __getattr__(self, name: str) -> np.ndarray:
+        try:
+            return self._columns[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self._columns[name]
+
+    def __len__(self) -> int:
+        return len(self._columns["timestamp"])
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self._columns)
+
+
+class _Table:
+    """An append-only group of column files sharing a timestamp column"""
+
+    def __init__(self, directory: str, schema: Tuple[Tuple[str, str], ...]) -> None:
+        self.directory = directory
+        self.schema = schema
+        self.codes = dict(schema)
+        self.dtypes = {name: np.dtype(code) for name, code in schema}
+        self._maps: Dict[str, np.ndarray] = {}
+        self._rows = -1
+        os.makedirs(directory, exist_ok=True)
+        self._recover()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, f"{name}.{self.codes[name]}")
+
+    @property
+    def _index_path(self) -> str:
+        return os.path.join(self.directory, "timestamp.idx")
+
+    def _file_rows(self, name: str) -> int:
+        path = self._path(name)
+        if not os.path.exists(path):
+            return 0
+        return os.path.getsize(path) // self.dtypes[name].itemsize
+
+    def _recover(self) -> None:
+        """Truncate columns to a common length after an interrupted append"""
+        rows = min(self._file_rows(name) for name, _ in self.schema)
+        for name, _ in self.schema:
+            path = self._path(name)
+            size = rows * self.dtypes[name].itemsize
+            # Also drops a torn partial value at the end of a column
+            if not os.path.exists(path) or os.path.getsize(path) != size:
+                with open(path, "ab") as f:
+                    f.truncate(size)
+
+        expected = (rows + INDEX_STRIDE - 1) // INDEX_STRIDE
+        if self._index_rows() != expected:
+            self._rebuild_index(rows)
+
+    def _index_rows(self) -> int:
+        if not os.path.exists(self._index_path):
+            return 0
+        return os.path.getsize(self._index_path) // 8
+
+    def _rebuild_index(self, rows: int) -> None:
+        ts = self._map("timestamp", rows) if rows else np.empty(0, dtype=np.int64)
+        with open(self._index_path, "wb") as f:
+            f.write(np.ascontiguousarray(ts[::INDEX_STRIDE], dtype=np.int64).tobytes())
+
+    @property
+    def rows(self) -> int:
+        return self._file_rows("timestamp")
+
+    def _map(self, name: str, rows: int) -> np.ndarray:
+        if rows == 0:
+            return np.empty(0, dtype=self.dtypes[name])
+        return np.memmap(self._path(name), dtype=self.dtypes[name], mode="r", shape=(rows,))
+
+    def _maps_for(self, rows: int) -> Dict[str, np.ndarray]:
+        """Memmaps of every column, remapped only when the table grew"""
+        if rows != self._rows:
+            self._maps = {name: self._map(name, rows) for name, _ in self.schema}
+            self._rows = rows
+        return self._maps
+
+    def last_timestamp(self) -> Optional[int]:
+        rows = self.rows
+        if rows == 0:
+            return None
+        return int(self._map("timestamp", rows)[rows - 1])
+
+    def append(self, columns: Dict[str, np.ndarray]) -> int:
+        ts = np.ascontiguousarray(columns["timestamp"], dtype=np.int64)
+        n = ts.size
+        if n == 0:
+            return 0
+        if n > 1 and np.any(np.diff(ts) < 0):
+            raise TickStoreError("Timestamps must be ascending")
+        last = self.last_timestamp()
+        if last is not None and ts[0] < last:
+            raise TickStoreError(f"Append at {int(ts[0])} is before last timestamp {last}")
+
+        # Check every column before writing any, so a bad append leaves the files aligned
+        data = {}
+        for name, _ in self.schema:
+            values = columns.get(name)
+            if values is None:
+                values = np.full(n, np.nan if self.dtypes[name].kind == "f" else 0)
+            data[name] = np.ascontiguousarray(values, dtype=self.dtypes[name])
+            if data[name].size != n:
+                raise TickStoreError(f"Column {name} has {data[name].size} values, expected {n}")
+
+        start = self.rows
+        for name, _ in self.schema:
+            with open(self._path(name), "ab") as f:
+                f.write(data[name].tobytes())
+
+        # Extend the sparse index with every stride boundary we crossed
+        first_entry = (start + INDEX_STRIDE - 1) // INDEX_STRIDE * INDEX_STRIDE
+        entries = ts[first_entry - start::INDEX_STRIDE] if first_entry < start + n else ts[:0]
+        if entries.size:
+            with open(self._index_path, "ab") as f:
+                f.write(entries.tobytes())
+        return n
+
+    def locate(self, start: Optional[int], end: Optional[int]) -> Tuple[int, int]:
+        """Row range [lo, hi) with start <= timestamp <= end"""
+        rows = self.rows
+        if rows == 0:
+            return 0, 0
+
+        ts = self._maps_for(rows)["timestamp"]
+        n_index = self._index_rows()
+        index = np.memmap(self._index_path, dtype=np.int64, mode="r", shape=(n_index,)) if n_index else None
+
+        def bound(value: int, side: str) -> int:
+            if index is None:
+                return int(np.searchsorted(ts, value, side=side))
+            block = max(int(np.searchsorted(index, value, side=side)) - 1, 0)
+            lo = block * INDEX_STRIDE
+            hi = min(lo + 2 * INDEX_STRIDE, rows)
+            return lo + int(np.searchsorted(ts[lo:hi], value, side=side))
+
+        lo = 0 if start is None else bound(start, "left")
+        hi = rows if end is None else bound(end, "right")
+        return lo, max(lo, hi)
+
+    def read(self, start: Optional[int] = None, end: Optional[int] = None) -> ColumnSet:
+        lo, hi = self.locate(start, end)
+        maps = self._maps_for(self.rows)
+        return ColumnSet({name: maps[name][lo:hi] for name, _ in self.schema})
+
+
+class TickStore:
+    """
+    Local store of ticks (top of book) and trades per market.
+
+    Usage:
+        store = TickStore("/var/lib/polytrader/ticks")
+        store.append_ticks("0xabc", ts, bid, ask, token_id="123")
+        ticks = store.read_ticks("0xabc", start=t0, end=t1)
+        ticks.mid  # memmap slice
+        history = store.history("0xabc")  # for the Backtester
+    """
+
+    def __init__(self, root: str) -> None:
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self._tables: Dict[Tuple[str, str], _Table] = {}
+
+    # ----------------------------------------------------------------------
+    # Layout
+    # ----------------------------------------------------------------------
+
+    @staticmethod
+    def _dirname(market_id: str) -> str:
+        return _UNSAFE.sub("_", market_id)
+
+    def _market_dir(self, market_id: str) -> str:
+        return os.path.join(self.root, self._dirname(market_id))
+
+    def _table(self, market_id: str, kind: str) -> _Table:
+        key = (market_id, kind)
+        table = self._tables.get(key)
+        if table is None:
+            schema = TICK_COLUMNS if kind == "ticks" else TRADE_COLUMNS
+            table = _Table(os.path.join(self._market_dir(market_id), kind), schema)
+            self._tables[key] = table
+        return table
+
+    def _write_meta(self, market_id: str, token_id: Optional[str]) -> None:
+        path = os.path.join(self._market_dir(market_id), "meta.json")
+        meta = self.meta(market_id) or {"market_id": market_id, "version": FORMAT_VERSION}
+        if token_id and meta.get("token_id") != token_id:
+            meta["token_id"] = token_id
+        elif os.path.exists(path):
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp, path)
+
+    def meta(self, market_id: str) -> Optional[Dict[str, object]]:
+        path = os.path.join(self._market_dir(market_id), "meta.json")
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return json.load(f)
+
+    def markets(self) -> List[str]:
+        """Market ids with data in the store"""
+        result = []
+        for name in sorted(os.listdir(self.root)):
+            meta_path = os.path.join(self.root, name, "meta.json")
+            if os.path.exists(meta_path):
+                with open(meta_path) as f:
+                    result.append(json.load(f)["market_id"])
+        return result
+
+    # ----------------------------------------------------------------------
+    # Writes
+    # ----------------------------------------------------------------------
+
+    def append_ticks(
+        self,
+        market_id: str,
+        timestamps: Iterable[int],
+        bid: Iterable[float],
+        ask: Iterable[float],
+        bid_size: Optional[Iterable[float]] = None,
+        ask_size: Optional[Iterable[float]] = None,
+        token_id: Optional[str] = None,
+    ) -> int:
+        """Append top-of-book ticks; timestamps must not go backwards"""
+        bid = np.asarray(bid, dtype=np.float64)
+        ask = np.asarray(ask, dtype=np.float64)
+        self._write_meta(market_id, token_id)
+        return self._table(market_id, "ticks").append({
+            "timestamp": np.asarray(timestamps, dtype=np.int64),
+            "bid": bid,
+            "ask": ask,
+            "mid": (bid + ask) / 2,
+            "bid_size": None if bid_size is None else np.asarray(bid_size),
+            "ask_size": None if ask_size is None else np.asarray(ask_size),
+        })
+
+    def append_book(self, market_id: str, timestamp: int, payload: Dict[str, object], token_id: Optional[str] = None) -> int:
+        """Record the top of a CLOB `/book` payload as one tick"""
+        from sdk import OrderBook
+
+        book = OrderBook.from_clob(payload)
+        if not book.bids or not book.asks:
+            return 0
+        return self.append_ticks(
+            market_id,
+            [timestamp],
+            [book.bids.best_price],
+            [book.asks.best_price],
+            [book.bids.best_size],
+            [book.asks.best_size],
+            token_id=token_id or book.asset_id or None,
+        )
+
+    def append_trades(
+        self,
+        market_id: str,
+        timestamps: Iterable[int],
+        price: Iterable[float],
+        size: Iterable[float],
+        side: Iterable[int],
+        token_id: Optional[str] = None,
+    ) -> int:
+        """Append trades (side: +1 buy, -1 sell); timestamps must not go backwards"""
+        self._write_meta(market_id, token_id)
+        return self._table(market_id, "trades").append({
+            "timestamp": np.asarray(timestamps, dtype=np.int64),
+            "price": np.asarray(price),
+            "size": np.asarray(size),
+            "side": np.asarray(side),
+        })
+
+    # ----------------------------------------------------------------------
+    # Reads
+    # ----------------------------------------------------------------------
+
+    def read_ticks(self, market_id: str, start: Optional[int] = None, end: Optional[int] = None) -> ColumnSet:
+        """Ticks with start <= timestamp <= end as memmap slices"""
+        return self._table(market_id, "ticks").read(start, end)
+
+    def read_trades(self, market_id: str, start: Optional[int] = None, end: Optional[int] = None) -> ColumnSet:
+        """Trades with start <= timestamp <= end as memmap slices"""
+        return self._table(market_id, "trades").read(start, end)
+
+    def history(self, market_id: str, start: Optional[int] = None, end: Optional[int] = None) -> MarketHistory:
+        """Backtester input for one market (touch sizes and trades included), backed by the memmaps"""
+        ticks = self.read_ticks(market_id, start, end)
+        meta = self.meta(market_id) or {}
+        has_trades = os.path.isdir(os.path.join(self._market_dir(market_id), "trades"))
+        return MarketHistory(
+            market_id=market_id,
+            token_id=str(meta.get("token_id", "")),
+            timestamps=ticks.timestamp,
+            bid=ticks.bid,
+            ask=ticks.ask,
+            bid_size=ticks.bid_size,
+            ask_size=ticks.ask_size,
+            trades=self.read_trades(market_id, start, end) if has_trades else None,
+        )
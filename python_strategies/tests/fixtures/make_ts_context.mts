@@ -0,0 +1,25 @@
+// Writes ts_context.bin with lib/strategies/context-codec.ts, for
+// tests/test_codec.py. Regenerate after changing the layout:
+//
+//   node --experimental-transform-types python_strategies/tests/fixtures/make_ts_context.mts
+
+import { writeFileSync } from 'fs';
+import { encodeContext } from '../../../lib/strategies/context-codec.ts';
+
+const context = {
+    mode: 'SHADOW',
+    balance: 1234.5,
+    market_data: {
+        'token-b': { token_id: 'token-b', bid: 0.41, ask: 0.45, midpoint: 0.43, spread: 0.04, volume: 1500 },
+        'token-a': { token_id: 'token-a', bid: 0.1, ask: 0.2, midpoint: 0.15, spread: 0.1, volume: 0, last_price: 0.12 },
+        'tökén-ü': { token_id: 'tökén-ü', bid: 0.5, ask: 0.6, midpoint: 0.55, spread: 0.1, volume: 7 },
+    },
+    positions: [
+        { market_id: 'cond-1', token_id: 'token-a', size: 10, avg_entry_price: 0.11, current_price: 0.15, realized_pnl: 1.5, unrealized_pnl: 0.4 },
+        { market_id: 'cond-2', token_id: 'token-c', size: 3, avg_entry_price: 0.7, realized_pnl: 0, unrealized_pnl: 0 },
+    ],
+    parameters: { order_size: 5 },
+    risk: { max_position_size: 100 },
+};
+
+writeFileSync(new URL('./ts_context.bin', import.meta.url), encodeContext(context as never));
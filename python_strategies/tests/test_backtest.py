@@ -0,0 +1,186 @@
+"""Backtester fills and PnL on small synthetic histories"""
+
+import types
+
+import numpy as np
+import pytest
+
+from simulation import BacktestConfig, Backtester, MarketHistory
+from simulation.metrics import BUY, SELL
+
+MINUTE = 60_000
+T0 = 1_700_000_000_000
+
+#         cycle:  0     1     2     3     4
+BID = np.array([0.40, 0.45, 0.50, 0.38, 0.55])
+ASK = np.array([0.42, 0.47, 0.52, 0.40, 0.57])
+
+
+def history(market_id="m1", bid=BID, ask=ASK, **kwargs):
+    ts = T0 + np.arange(len(bid), dtype=np.int64) * MINUTE
+    return MarketHistory(market_id, f"tok-{market_id}", ts, bid, ask, **kwargs)
+
+
+def scripted(plan):
+    """Strategy module proposing plan[cycle] and recording each context"""
+    module = types.ModuleType("scripted")
+    module.contexts = []
+
+    def propose_orders(context):
+        module.contexts.append(context)
+        return plan.get(len(module.contexts) - 1, [])
+
+    module.propose_orders = propose_orders
+    return module
+
+
+def order(side, size, type="MARKET", price=None, market_id="m1"):
+    return {"market_id": market_id, "token_id": f"tok-{market_id}", "side": side, "type": type,
+            "size": size, "price": price}
+
+
+def run(plan, markets=None, **config):
+    strategy = scripted(plan)
+    config.setdefault("initial_balance", 100.0)
+    result = Backtester(strategy, markets or [history()], BacktestConfig(**config)).run()
+    return result, strategy.contexts
+
+
+def test_round_trip_at_the_touch():
+    result, contexts = run({0: [order("BUY", 100)], 2: [order("SELL", 100)]})
+
+    fills = result.fills
+    assert list(fills["side"]) == [BUY, SELL]
+    assert list(fills["timestamp"]) == [T0, T0 + 2 * MINUTE]
+    np.testing.assert_allclose(fills["price"], [0.42, 0.50])
+    np.testing.assert_allclose(fills["fee"], [42 * 0.006, 50 * 0.006])
+
+    cash = 100 - 42 * 1.006 + 50 * 0.994
+    np.testing.assert_allclose(result.equity, [
+        100 - 42.252 + 100 * 0.41,
+        100 - 42.252 + 100 * 0.46,
+        cash, cash, cash,
+    ])
+    assert contexts[1]["balance"] == pytest.approx(100 - 42.252)
+    assert contexts[1]["positions"].get("m1")["size"] == 100
+    assert contexts[3]["positions"].get("m1") is None
+
+    m = result.metrics
+    assert m.realized_pnl == pytest.approx(8.0)
+    assert m.total_fees == pytest.approx(0.552)
+    assert m.net_pnl == pytest.approx(cash - 100)
+    assert (m.total_trades, m.winning_trades, m.win_rate) == (1, 1, 100.0)
+    assert result.positions == {"m1": {
+        "size": 0.0, "avg_entry_price": pytest.approx(0.42), "current_price": pytest.approx(0.56),
+        "realized_pnl": pytest.approx(8.0), "unrealized_pnl": 0.0,
+    }}
+
+
+def test_open_position_is_marked_at_the_last_mid():
+    result, _ = run({0: [order("BUY", 50)], 1: [order("BUY", 50)]}, taker_fee_bps=0)
+    np.testing.assert_allclose(result.fills["price"], [0.42, 0.47])
+    position = result.positions["m1"]
+    assert position["size"] == 100 and position["avg_entry_price"] == pytest.approx(0.445)
+    assert position["unrealized_pnl"] == pytest.approx(100 * (0.56 - 0.445))
+    assert result.metrics.unrealized_pnl == pytest.approx(position["unrealized_pnl"])
+    assert result.equity[-1] == pytest.approx(100 + position["unrealized_pnl"])
+
+
+def test_slippage_moves_the_touch():
+    result, _ = run({0: [order("BUY", 10)], 1: [order("SELL", 10)]}, slippage_bps=100, taker_fee_bps=0)
+    np.testing.assert_allclose(result.fills["price"], [0.42 * 1.01, 0.45 * 0.99])
+
+
+def test_crossing_limit_fills_at_its_price_as_maker():
+    result, _ = run({0: [order("BUY", 10, "LIMIT", 0.43)]})
+    assert result.fills[0]["price"] == 0.43 and result.fills[0]["fee"] == 0
+
+
+@pytest.mark.parametrize("ttl, filled", [(2, False), (3, True)])
+def test_resting_limit_fills_when_crossed_within_ttl(ttl, filled):
+    # Rests at 0.40 from cycle 0; the ask first reaches it on cycle 3
+    result, _ = run({0: [order("BUY", 10, "LIMIT", 0.40)]}, order_ttl_cycles=ttl)
+    if filled:
+        assert list(result.fills["timestamp"]) == [T0 + 3 * MINUTE]
+        assert result.fills[0]["price"] == 0.40
+    else:
+        assert result.fills.size == 0
+
+
+def test_market_orders_walk_recorded_depth():
+    book = {"bids": [{"price": "0.40", "size": "100"}],
+            "asks": [{"price": "0.42", "size": "10"}, {"price": "0.45", "size": "10"}]}
+    markets = [history(books=[(T0, book)])]
+    result, _ = run({0: [order("BUY", 15)], 1: [order("BUY", 50, "FOK")]}, markets, taker_fee_bps=0)
+    assert result.fills.size == 1
+    assert result.fills[0]["size"] == 15
+    assert result.fills[0]["price"] == pytest.approx((10 * 0.42 + 5 * 0.45) / 15)
+    assert result.rejection_reasons == {"Not enough liquidity": 1}
+
+
+def test_rejections_are_counted():
+    plan = {
+        0: [order("BUY", 1000), order("SELL", 5), order("BUY", 5, market_id="nope"), order("BUY", 5, "LIMIT")],
+        1: [order("BUY", -1)],
+    }
+    result, _ = run(plan)
+    assert result.orders_proposed == 5 and result.orders_rejected == 5
+    assert result.rejection_reasons == {
+        "Insufficient balance": 1,
+        "Insufficient position": 1,
+        "Unknown market": 1,
+        "Limit order without price": 1,
+        "Invalid order size: -1": 1,
+    }
+    assert result.fills.size == 0 and np.all(result.equity == 100)
+
+
+def test_markets_without_data_yet():
+    late = history("m2", BID[2:], ASK[2:])
+    late.timestamps += 2 * MINUTE
+    result, contexts = run({0: [order("BUY", 10, market_id="m2")], 2: [order("BUY", 10, market_id="m2")]},
+                           [history(), late])
+    assert result.rejection_reasons == {"No market data": 1}
+    assert list(result.fills["market"]) == [1]
+    assert contexts[0]["market_data"].get("m2") is None
+    assert contexts[2]["market_data"].get("m2")["bid"] == 0.50
+
+
+# ----------------------------------------------------------------------
+# Resting orders and cash
+# ----------------------------------------------------------------------
+
+SIZES = {"bid_size": np.full(5, 1000.0), "ask_size": np.full(5, 1000.0)}
+
+
+@pytest.mark.parametrize("queue_model", [False, True])
+def test_resting_buy_holds_its_cash(queue_model):
+    # 150 @ 0.40 holds 60 of the 100 until the ask reaches 0.40 on cycle 3
+    plan = {0: [order("BUY", 150, "LIMIT", 0.40)], 1: [order("BUY", 150, "LIMIT", 0.40), order("BUY", 100)]}
+    result, contexts = run(plan, [history(**SIZES)], order_ttl_cycles=5, queue_model=queue_model)
+    assert [c["balance"] for c in contexts] == pytest.approx([100, 40, 40, 40, 40])
+    assert result.rejection_reasons == {"Insufficient balance": 2}
+    assert list(result.fills["timestamp"]) == [T0 + 3 * MINUTE]
+    assert result.fills[0]["size"] == 150 and result.fills[0]["price"] == 0.40
+
+
+# The queue model keeps a GTD order through the last cycle of its TTL
+@pytest.mark.parametrize("queue_model, balances", [
+    (False, [100, 40, 100, 100, 100]),
+    (True, [100, 40, 40, 100, 100]),
+])
+def test_expired_buy_releases_its_cash(queue_model, balances):
+    plan = {0: [order("BUY", 150, "LIMIT", 0.40)]}
+    result, contexts = run(plan, [history(**SIZES)], order_ttl_cycles=2, queue_model=queue_model)
+    assert [c["balance"] for c in contexts] == pytest.approx(balances)
+    assert result.fills.size == 0 and result.orders_rejected == 0
+
+
+@pytest.mark.parametrize("queue_model", [False, True])
+def test_failed_resting_fill_is_rejected(queue_model):
+    # The resting SELL crosses on cycle 2, after its position was sold at market
+    plan = {0: [order("BUY", 10), order("SELL", 10, "LIMIT", 0.50)], 1: [order("SELL", 10)]}
+    result, _ = run(plan, [history(**SIZES)], order_ttl_cycles=3, queue_model=queue_model)
+    assert list(result.fills["side"]) == [BUY, SELL]
+    assert result.orders_rejected == 1
+    assert result.rejection_reasons == {"Insufficient position": 1}
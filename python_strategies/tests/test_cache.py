@@ -0,0 +1,212 @@
+"""Strategy cache eviction and warm re-use in StrategyExecutor"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from sdk import OrderBook
+from executor.cache import StrategyCache, estimate_size
+from executor.loader import load_strategy
+from executor.runner import StrategyExecutor
+
+CODE = """
+SIZE = 5
+calls = []
+
+def initialize(config):
+    global SIZE
+    calls.append(dict(config))
+    SIZE = config.get("order_size", 5)
+
+def propose_orders(context):
+    return [{"market_id": "m1", "token_id": "t1", "side": "BUY", "type": "LIMIT", "size": SIZE, "price": 0.5}]
+"""
+
+
+def _loaded(strategy_id, version=1):
+    return load_strategy(strategy_id, version, CODE)
+
+
+def _strategy(version=1, **config):
+    return {"version": version, "code": CODE, "config": config}
+
+
+def test_lru_eviction_by_entry_count():
+    cache = StrategyCache(max_entries=2, max_memory_mb=None)
+    assert cache.put(_loaded("a")) == []
+    assert cache.put(_loaded("b")) == []
+    assert cache.get(("a", 1)) is not None  # a is now most recently used
+    assert cache.put(_loaded("c")) == ["b@1"]
+    assert ("a", 1) in cache and ("c", 1) in cache and ("b", 1) not in cache
+    assert cache.latest_version("b") is None
+
+
+def test_peek_does_not_touch_lru_order():
+    cache = StrategyCache(max_entries=2, max_memory_mb=None)
+    cache.put(_loaded("a"))
+    cache.put(_loaded("b"))
+    assert cache.peek(("a", 1)) is not None
+    assert cache.put(_loaded("c")) == ["a@1"]
+
+
+def test_new_version_evicts_older_versions():
+    cache = StrategyCache(max_entries=8, max_memory_mb=None)
+    cache.put(_loaded("a", 1))
+    cache.put(_loaded("b", 1))
+    assert cache.put(_loaded("a", 2)) == ["a@1"]
+    assert ("a", 1) not in cache and ("a", 2) in cache
+    assert cache.latest_version("a") == 2
+    assert len(cache) == 2
+
+
+def test_remove_drops_every_version():
+    cache = StrategyCache(max_entries=8, max_memory_mb=None)
+    cache.put(_loaded("a", 3))
+    assert cache.remove("a")
+    assert not cache.remove("a")
+    assert cache.latest_version("a") is None
+
+
+def test_hit_and_miss_counters():
+    cache = StrategyCache(max_memory_mb=None)
+    cache.put(_loaded("a"))
+    cache.get(("a", 1))
+    cache.get(("a", 2))
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_warm_run_reuses_module():
+    executor = StrategyExecutor(max_memory_mb=None)
+    first = executor.run("s", {}, _strategy(order_size=7))
+    second = executor.run("s", {}, _strategy(order_size=7))
+    assert first["cold_start"] and not second["cold_start"] and not second["reinitialized"]
+    assert "compile" not in second["timings"]
+    assert executor.cache.peek(("s", 1)).module.calls == [{"order_size": 7}]
+
+
+def test_config_change_reinitializes_warm_strategy():
+    executor = StrategyExecutor(max_memory_mb=None)
+    executor.run("s", {}, _strategy(order_size=5))
+    module = executor.cache.peek(("s", 1)).module
+
+    result = executor.run("s", {}, _strategy(order_size=50))
+    assert not result["cold_start"] and result["reinitialized"]
+    assert [o["size"] for o in result["proposed"]] == [50]
+    # Same module object: initialize ran again, nothing was recompiled
+    assert executor.cache.peek(("s", 1)).module is module
+    assert module.calls == [{"order_size": 5}, {"order_size": 50}]
+
+    # Key order does not count as a change
+    again = executor.run("s", {}, {"version": 1, "code": CODE, "config": {"order_size": 50}})
+    assert not again["reinitialized"]
+
+
+def test_is_loaded_checks_config():
+    executor = StrategyExecutor(max_memory_mb=None)
+    assert not executor.is_loaded("s")
+    executor.load("s", 1, CODE, {"order_size": 5})
+    assert executor.is_loaded("s")
+    assert executor.is_loaded("s", 1, {"order_size": 5})
+    assert not executor.is_loaded("s", 1, {"order_size": 6})
+    assert not executor.is_loaded("s", 2)
+
+
+def test_new_version_is_loaded_cold():
+    executor = StrategyExecutor(max_memory_mb=None)
+    executor.run("s", {}, _strategy(version=1))
+    result = executor.run("s", {}, _strategy(version=2))
+    assert result["cold_start"] and result["evicted"] == ["s@1"]
+
+
+SLOW = """
+import time
+active = []
+overlaps = []
+
+def propose_orders(context):
+    active.append(1)
+    overlaps.append(len(active))
+    time.sleep(0.02)
+    active.pop()
+    return []
+"""
+
+
+def test_runs_of_one_strategy_are_serialised():
+    executor = StrategyExecutor(max_memory_mb=None)
+    strategies = {sid: {"version": 1, "code": SLOW} for sid in ("a", "b")}
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(lambda sid: executor.run(sid, {}, strategies[sid]), ["a", "b"] * 4))
+    for sid in ("a", "b"):
+        module = executor.cache.peek((sid, 1)).module
+        assert module.overlaps == [1] * 4
+
+
+# ----------------------------------------------------------------------
+# Memory accounting
+# ----------------------------------------------------------------------
+
+HOLDER = """
+state = []
+
+def initialize(config):
+    state.append(bytearray(config.get("kb", 0) * 1024))
+
+def propose_orders(context):
+    state.append(bytearray(context["parameters"].get("grow_kb", 0) * 1024))
+    return []
+"""
+
+
+def _holder(kb=0):
+    return {"version": 1, "code": HOLDER, "config": {"kb": kb}}
+
+
+def test_estimate_size_counts_module_state_and_books():
+    loaded = load_strategy("s", 1, HOLDER)
+    base = estimate_size(loaded)
+    loaded.initialize({"kb": 100})
+    assert 100 * 1024 < estimate_size(loaded) - base < 101 * 1024
+
+    loaded.books["m1"] = OrderBook(bids=[(i / 1000, 1.0) for i in range(1, 500)])
+    assert estimate_size(loaded) - base > 100 * 1024 + 500 * 8
+
+
+def test_small_strategies_stay_cached_whatever_the_process_rss():
+    # The process RSS is far above 1 MB; the strategies themselves are not
+    executor = StrategyExecutor(max_memory_mb=1)
+    results = [executor.run(f"s{i}", {}, _holder()) for i in range(5)]
+    assert all(not r["evicted"] and not r["recycle"] for r in results)
+    assert len(executor.cache) == 5 and executor.cache.memory_mb < 1
+
+
+def test_entries_are_evicted_by_their_estimated_size():
+    executor = StrategyExecutor(max_memory_mb=1)
+    executor.run("a", {}, _holder(400))
+    executor.run("b", {}, _holder(400))
+    result = executor.run("c", {}, _holder(400))
+    assert result["evicted"] == ["a@1"] and not result["recycle"]
+    assert executor.cache.stats()["entries"] == ["b@1", "c@1"]
+
+
+def test_state_grown_by_a_run_evicts_others_then_recycles():
+    executor = StrategyExecutor(max_memory_mb=1)
+    executor.run("a", {}, _holder(300))
+    executor.run("b", {}, _holder(300))
+
+    result = executor.run("b", {"parameters": {"grow_kb": 500}})
+    assert result["evicted"] == ["a@1"] and not result["recycle"]
+
+    # Nothing left to evict: only now should the worker be recycled
+    result = executor.run("b", {"parameters": {"grow_kb": 500}})
+    assert result["evicted"] == [] and result["recycle"]
+    assert executor.cache.stats()["entries"] == ["b@1"]
+
+
+def test_memory_accounting_follows_removals():
+    cache = StrategyCache(max_memory_mb=10)
+    for version in (1, 2):
+        loaded = load_strategy("s", version, HOLDER)
+        loaded.initialize({"kb": 64})
+        cache.put(loaded)
+    assert 64 < cache.memory_bytes / 1024 < 70
+    cache.remove("s")
+    assert cache.memory_bytes == 0
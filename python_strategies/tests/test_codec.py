@@ -0,0 +1,148 @@
+"""Binary run contexts (executor.codec, lib/strategies/context-codec.ts)"""
+
+import io
+import math
+from pathlib import Path
+
+import pytest
+
+from executor.codec import (
+    HEADER,
+    INDEX_AFTER_LOOKUPS,
+    MAGIC,
+    MARKET_DTYPE,
+    MODES,
+    POSITION_DTYPE,
+    VERSION,
+    CodecError,
+    decode_context,
+    encode_context,
+)
+from executor.protocol import ATTACHMENT_FLAG, HEADER as FRAME_HEADER, encode_frame, read_frame
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+# Same context as fixtures/make_ts_context.mts
+TS_CONTEXT = {
+    "mode": "SHADOW",
+    "balance": 1234.5,
+    "market_data": {
+        "token-b": {"token_id": "token-b", "bid": 0.41, "ask": 0.45, "midpoint": 0.43, "spread": 0.04, "volume": 1500},
+        "token-a": {"token_id": "token-a", "bid": 0.1, "ask": 0.2, "midpoint": 0.15, "spread": 0.1, "volume": 0,
+                    "last_price": 0.12},
+        "tökén-ü": {"token_id": "tökén-ü", "bid": 0.5, "ask": 0.6, "midpoint": 0.55, "spread": 0.1, "volume": 7},
+    },
+    "positions": [
+        {"market_id": "cond-1", "token_id": "token-a", "size": 10, "avg_entry_price": 0.11, "current_price": 0.15,
+         "realized_pnl": 1.5, "unrealized_pnl": 0.4},
+        {"market_id": "cond-2", "token_id": "token-c", "size": 3, "avg_entry_price": 0.7, "realized_pnl": 0,
+         "unrealized_pnl": 0},
+    ],
+    "parameters": {"order_size": 5},
+    "risk": {"max_position_size": 100},
+}
+
+
+def check_decoded(context, expected):
+    assert context["balance"] == expected["balance"]
+    markets = context["market_data"]
+    assert sorted(markets) == sorted(expected["market_data"])
+    for market_id, data in expected["market_data"].items():
+        state = markets[market_id]
+        assert state.market_id == market_id
+        for key, value in data.items():
+            assert state[key] == pytest.approx(value), (market_id, key)
+        if "last_price" not in data:
+            assert state.last_price is None
+    assert len(context["positions"]) == len(expected["positions"])
+    for got, want in zip(context["positions"], expected["positions"]):
+        assert got == {"current_price": None, **want}
+    assert context["parameters"] == expected.get("parameters", {})
+    assert context["risk"] == expected.get("risk")
+
+
+def test_layout_matches_typescript_constants():
+    # context-codec.ts: HEADER_SIZE, MARKET_SIZE, POSITION_SIZE
+    assert (HEADER.size, MARKET_DTYPE.itemsize, POSITION_DTYPE.itemsize) == (40, 56, 48)
+    assert MODES == ("PAPER", "LIVE", "SHADOW")
+
+
+def test_header_fields():
+    blob = encode_context(TS_CONTEXT)
+    magic, version, mode, markets, positions, strings, string_bytes, extra_bytes, _, balance = HEADER.unpack_from(blob)
+    assert (magic, version, MODES[mode]) == (MAGIC, VERSION, "SHADOW")
+    # The three market ids, then position ids not already in the table
+    names = ["token-a", "token-b", "tökén-ü", "cond-1", "cond-2", "token-c"]
+    assert (markets, positions, strings) == (3, 2, len(names))
+    assert string_bytes == sum(len(name.encode("utf-8")) for name in names)
+    assert balance == 1234.5
+
+    def pad(n):
+        return (n + 7) // 8 * 8
+
+    assert len(blob) == HEADER.size + 3 * 56 + 2 * 48 + pad((len(names) + 1) * 4) + pad(string_bytes) + extra_bytes
+
+
+@pytest.mark.parametrize("mode", MODES)
+def test_round_trip_every_mode(mode):
+    decoded = decode_context(encode_context({**TS_CONTEXT, "mode": mode}))
+    assert decoded.mode == mode
+    context = decoded.to_dict()
+    assert context["mode"] == mode
+    check_decoded(context, TS_CONTEXT)
+
+
+def test_unknown_mode_is_an_error():
+    with pytest.raises(CodecError):
+        encode_context({**TS_CONTEXT, "mode": "BACKTEST"})
+    blob = bytearray(encode_context(TS_CONTEXT))
+    fields = list(HEADER.unpack_from(blob))
+    fields[2] = len(MODES)
+    HEADER.pack_into(blob, 0, *fields)
+    with pytest.raises(CodecError):
+        decode_context(blob)
+
+
+def test_decodes_typescript_fixture():
+    blob = (FIXTURES / "ts_context.bin").read_bytes()
+    decoded = decode_context(blob)
+    assert decoded.mode == "SHADOW"
+    check_decoded(decoded.to_dict(), TS_CONTEXT)
+    # Both encoders write the same bytes
+    assert encode_context(TS_CONTEXT) == blob
+
+
+def test_records_are_views_into_the_frame():
+    blob = bytearray(encode_context(TS_CONTEXT))
+    decoded = decode_context(blob)
+    assert decoded.markets["bid"].base is not None
+    assert list(decoded.markets["bid"]) == [0.1, 0.41, 0.5]  # Sorted by UTF-8 market id
+    assert math.isnan(decoded.markets["last_price"][1])
+
+
+def test_market_lookup_before_and_after_index():
+    market_data = {f"m{i:04d}": {"token_id": f"t{i}", "bid": 0.4, "ask": 0.5} for i in range(50)}
+    batch = decode_context(encode_context({"mode": "PAPER", "market_data": market_data})).market_data()
+    for _ in range(INDEX_AFTER_LOOKUPS // 50 + 2):
+        for market_id in market_data:
+            assert batch[market_id].token_id == "t" + str(int(market_id[1:]))
+    assert "missing" not in batch and batch.get("missing") is None
+
+
+def test_malformed_contexts():
+    blob = encode_context(TS_CONTEXT)
+    with pytest.raises(CodecError):
+        decode_context(blob[:10])
+    with pytest.raises(CodecError):
+        decode_context(b"XXXX" + blob[4:])
+    with pytest.raises(CodecError):
+        decode_context(blob[:-5])
+
+
+def test_context_as_frame_attachment():
+    blob = encode_context(TS_CONTEXT)
+    frame = encode_frame({"id": 7, "type": "run", "binary_context": True}, blob)
+    (length,) = FRAME_HEADER.unpack_from(frame)
+    assert length & ATTACHMENT_FLAG
+    message = read_frame(io.BytesIO(frame))
+    check_decoded(decode_context(message["attachment"]).to_dict(), TS_CONTEXT)
@@ -0,0 +1,96 @@
+"""Depth-aware execute_order"""
+
+import random
+
+import pytest
+
+from sdk import OrderBook
+from simulation import execute_order
+from simulation.execution import FILLED, KILLED, PARTIAL, RESTING
+
+ASKS = [(0.50, 10), (0.52, 20), (0.55, 30)]
+BIDS = [(0.48, 5), (0.45, 15)]
+
+
+def make_book(bids=BIDS, asks=ASKS):
+    return OrderBook.from_clob({
+        "bids": [{"price": str(p), "size": str(s)} for p, s in bids],
+        "asks": [{"price": str(p), "size": str(s)} for p, s in asks],
+    })
+
+
+def test_vwap_across_levels():
+    execution = execute_order(make_book(), "BUY", 25)
+    assert execution.status == FILLED
+    assert execution.filled == 25 and execution.levels == 2
+    assert execution.notional == pytest.approx(10 * 0.50 + 15 * 0.52)
+    assert execution.avg_price == pytest.approx((5.0 + 7.8) / 25)
+    assert execution.worst_price == 0.52
+    assert execution.slippage == pytest.approx(execution.avg_price - 0.50)
+
+
+def test_sell_walks_bids():
+    execution = execute_order(make_book(), "SELL", 10)
+    assert execution.avg_price == pytest.approx((5 * 0.48 + 5 * 0.45) / 10)
+    assert execution.slippage == pytest.approx(0.48 - execution.avg_price)
+
+
+def test_partial_fill_on_thin_depth():
+    execution = execute_order(make_book(), "BUY", 100)
+    assert execution.status == PARTIAL
+    assert execution.filled == 60 and execution.remaining == 40
+    assert execution.levels == 3 and execution.worst_price == 0.55
+    # A FOK that cannot fill completely fills nothing
+    fok = execute_order(make_book(), "BUY", 100, "FOK", 0.99)
+    assert fok.status == KILLED and fok.filled == 0 and fok.avg_price is None
+
+
+def test_limit_price_cutoff():
+    fak = execute_order(make_book(), "BUY", 50, "FAK", 0.52)
+    assert fak.status == PARTIAL and fak.filled == 30 and fak.worst_price == 0.52
+
+    limit = execute_order(make_book(), "BUY", 50, "LIMIT", 0.51)
+    assert limit.status == RESTING and limit.filled == 10 and limit.remaining == 40
+
+    # Below the touch: nothing is marketable
+    passive = execute_order(make_book(), "BUY", 5, "GTC", 0.49)
+    assert passive.status == RESTING and passive.filled == 0 and passive.levels == 0
+
+    sell = execute_order(make_book(), "SELL", 50, "FAK", 0.46)
+    assert sell.filled == 5 and sell.avg_price == pytest.approx(0.48)
+
+    # MARKET ignores the price, as the paper broker does
+    assert execute_order(make_book(), "BUY", 25, "MARKET", 0.50).filled == 25
+
+
+def test_empty_side_kills_market_order():
+    execution = execute_order(make_book(asks=[]), "BUY", 5)
+    assert execution.status == KILLED and execution.touch is None and execution.slippage == 0.0
+
+
+def test_does_not_modify_book():
+    book = make_book()
+    execute_order(book, "BUY", 1000)
+    assert book["asks"] == [[p, float(s)] for p, s in ASKS]
+
+
+def test_matches_level_by_level_walk():
+    rng = random.Random(5)
+    for _ in range(500):
+        asks = sorted({round(rng.uniform(0.01, 0.99), 2): float(rng.randint(1, 50)) for _ in range(rng.randint(0, 12))}.items())
+        size = rng.uniform(1, 200)
+        limit = rng.choice([None, round(rng.uniform(0.01, 0.99), 2)])
+        execution = execute_order(make_book(bids=[], asks=asks), "BUY", size, "FAK" if limit else "MARKET", limit)
+
+        filled = notional = 0.0
+        levels = 0
+        for price, available in asks:
+            if filled >= size or (limit is not None and price > limit):
+                break
+            take = min(available, size - filled)
+            filled += take
+            notional += take * price
+            levels += 1
+        assert execution.filled == pytest.approx(filled)
+        assert execution.notional == pytest.approx(notional)
+        assert execution.levels == levels
@@ -0,0 +1,426 @@
+"""HttpPool, ClobApi and MarketFetcher against a local stub HTTP server"""
+
+import asyncio
+import gzip
+import json
+import math
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+import pytest
+
+from executor.codec import decode_context, encode_context
+from executor.http import HttpError, HttpPool
+from executor.polymarket import ClobApi
+from executor.runtime import AsyncStrategyRuntime, MarketFetcher, market_state
+
+
+class Reply(NamedTuple):
+    status: int = 200
+    body: Any = b""
+    headers: Dict[str, str] = {}
+    chunked: bool = False
+    gzip: bool = False
+    close: bool = False  # Close the connection after replying
+    drop: bool = False   # Close the connection instead of replying
+    delay: float = 0.0
+
+
+class Request(NamedTuple):
+    conn: int
+    seq: int  # Requests seen on this connection before this one
+    method: str
+    path: str
+    headers: Dict[str, str]
+    body: bytes
+
+
+class StubServer:
+    """HTTP/1.1 server on 127.0.0.1 answering each request with route(request)"""
+
+    def __init__(self, route: Callable[[Request], Reply]) -> None:
+        self.route = route
+        self.requests: List[Request] = []
+        self.connections = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def __aenter__(self) -> "StubServer":
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    def paths(self, method: Optional[str] = None) -> List[str]:
+        return [r.path for r in self.requests if method is None or r.method == method]
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        conn = self.connections
+        seq = 0
+        try:
+            while True:
+                try:
+                    line = await reader.readuntil(b"\r\n")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    return
+                method, path, _ = line.decode("latin-1").split(" ", 2)
+                headers: Dict[str, str] = {}
+                while (header := await reader.readuntil(b"\r\n")) != b"\r\n":
+                    name, _, value = header.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                request = Request(conn, seq, method, path, headers, body)
+                self.requests.append(request)
+                seq += 1
+
+                reply = self.route(request)
+                if reply.delay:
+                    await asyncio.sleep(reply.delay)
+                if reply.drop:
+                    return
+                writer.write(self._encode(reply))
+                await writer.drain()
+                if reply.close:
+                    return
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _encode(reply: Reply) -> bytes:
+        body = reply.body
+        if not isinstance(body, bytes):
+            body = json.dumps(body).encode("utf-8")
+        headers = dict(reply.headers)
+        if reply.gzip:
+            body = gzip.compress(body)
+            headers["Content-Encoding"] = "gzip"
+        if reply.close:
+            headers["Connection"] = "close"
+        if reply.chunked:
+            headers["Transfer-Encoding"] = "chunked"
+            pieces = [body[i:i + 7] for i in range(0, len(body), 7)]
+            payload = b"".join(b"%x;ext=1\r\n%s\r\n" % (len(p), p) for p in pieces) + b"0\r\nX-Trailer: 1\r\n\r\n"
+        elif "no-length" in headers:
+            del headers["no-length"]
+            payload = body
+        else:
+            headers["Content-Length"] = str(len(body))
+            payload = body
+        head = [f"HTTP/1.1 {reply.status} OK"] + [f"{k}: {v}" for k, v in headers.items()]
+        return ("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + payload
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def ok(request: Request) -> Reply:
+    return Reply(body={"path": request.path, "conn": request.conn})
+
+
+# ----------------------------------------------------------------------
+# HttpPool
+# ----------------------------------------------------------------------
+
+def test_keep_alive_reuses_one_connection():
+    async def main():
+        async with StubServer(ok) as server, HttpPool() as pool:
+            for i in range(5):
+                assert await pool.get_json(f"{server.url}/x?i={i}") == {"path": f"/x?i={i}", "conn": 1}
+            assert server.connections == 1
+            assert pool.stats() == {"connections_opened": 1, "requests_sent": 5, "idle": 1}
+            assert server.requests[0].headers["accept-encoding"] == "gzip"
+
+    run(main())
+
+
+def test_connection_close_is_not_reused():
+    async def main():
+        async with StubServer(lambda r: Reply(body=b"{}", close=True)) as server, HttpPool() as pool:
+            await pool.get(server.url + "/a")
+            await pool.get(server.url + "/b")
+            assert server.connections == 2 and pool.stats()["idle"] == 0
+
+    run(main())
+
+
+def test_concurrent_requests_open_up_to_max_per_host():
+    async def main():
+        async with StubServer(lambda r: Reply(body=b"{}", delay=0.02)) as server, HttpPool(max_per_host=3) as pool:
+            await asyncio.gather(*(pool.get(f"{server.url}/{i}") for i in range(9)))
+            assert server.connections == 3
+            assert pool.stats()["idle"] == 3
+
+    run(main())
+
+
+def drop_reused(request: Request) -> Reply:
+    # The server gives up on a kept-alive connection when its second request arrives
+    return Reply(drop=True) if request.seq == 1 else ok(request)
+
+
+def test_idempotent_request_is_resent_after_dropped_connection():
+    async def main():
+        async with StubServer(drop_reused) as server, HttpPool() as pool:
+            await pool.get(server.url + "/first")
+            assert (await pool.get_json(server.url + "/again"))["conn"] == 2
+            assert server.paths() == ["/first", "/again", "/again"]
+            assert pool.stats()["requests_sent"] == 3
+
+    run(main())
+
+
+def test_post_is_not_resent_after_dropped_connection():
+    async def main():
+        async with StubServer(drop_reused) as server, HttpPool() as pool:
+            await pool.get(server.url + "/first")
+            with pytest.raises((ConnectionError, asyncio.IncompleteReadError)):
+                await pool.request("POST", server.url + "/order", b'{"size": 1}')
+            assert server.paths("POST") == ["/order"]
+            # Unless the caller says it is safe to repeat
+            await pool.get(server.url + "/first")
+            await pool.request("POST", server.url + "/books", b"[]", idempotent=True)
+            assert server.paths("POST") == ["/order", "/books", "/books"]
+
+    run(main())
+
+
+def test_fresh_connection_failure_is_not_retried():
+    async def main():
+        async with StubServer(lambda r: Reply(drop=True)) as server, HttpPool() as pool:
+            with pytest.raises(asyncio.IncompleteReadError):
+                await pool.get(server.url + "/x")
+            assert len(server.requests) == 1
+
+    run(main())
+
+
+@pytest.mark.parametrize("chunked", [False, True])
+@pytest.mark.parametrize("gzipped", [False, True])
+def test_body_decoding(chunked, gzipped):
+    payload = {"bids": [{"price": "0.4", "size": str(i)} for i in range(200)]}
+
+    async def main():
+        route = lambda r: Reply(body=payload, chunked=chunked, gzip=gzipped)  # noqa: E731
+        async with StubServer(route) as server, HttpPool() as pool:
+            # Twice: the connection must be left at the start of the next response
+            assert await pool.get_json(server.url + "/book") == payload
+            assert await pool.get_json(server.url + "/book") == payload
+            assert server.connections == 1
+
+    run(main())
+
+
+def test_body_until_close():
+    async def main():
+        route = lambda r: Reply(body=b'{"a": 1}', headers={"no-length": "1"}, close=True)  # noqa: E731
+        async with StubServer(route) as server, HttpPool() as pool:
+            assert await pool.get_json(server.url + "/x") == {"a": 1}
+            assert pool.stats()["idle"] == 0
+
+    run(main())
+
+
+def test_error_status_raises_with_retry_after():
+    async def main():
+        route = lambda r: Reply(status=429, body=b"slow down", headers={"Retry-After": "2.5"})  # noqa: E731
+        async with StubServer(route) as server, HttpPool() as pool:
+            with pytest.raises(HttpError) as info:
+                await pool.get(server.url + "/x")
+            assert (info.value.status, info.value.retry_after, info.value.body) == (429, 2.5, b"slow down")
+            # The connection is still good after an error response
+            assert pool.stats()["idle"] == 1
+
+    run(main())
+
+
+# ----------------------------------------------------------------------
+# ClobApi
+# ----------------------------------------------------------------------
+
+def book(token_id: str) -> Dict[str, Any]:
+    """A one-level book; tokens named "no-bids" / "no-asks" have that side empty"""
+    return {"asset_id": token_id, "market": f"0xcond-{token_id}", "last_trade_price": "0.55",
+            "bids": [] if token_id == "no-bids" else [{"price": "0.4", "size": "10"}],
+            "asks": [] if token_id == "no-asks" else [{"price": "0.6", "size": "5"}]}
+
+
+def clob_route(post_books: Optional[int] = None, delay: float = 0.0) -> Callable[[Request], Reply]:
+    """/book per token; POST /books answers with `post_books` as the status, or books"""
+    def route(request: Request) -> Reply:
+        if request.method == "POST" and request.path == "/books":
+            if post_books is not None:
+                return Reply(status=post_books, body=b"not here")
+            wanted = [item["token_id"] for item in json.loads(request.body)]
+            return Reply(body=[book(t) for t in wanted if t != "missing"], delay=delay)
+        if request.path.startswith("/book?token_id="):
+            token_id = request.path.split("=", 1)[1]
+            if token_id == "missing":
+                return Reply(status=404, body=b'{"error": "No orderbook exists"}')
+            return Reply(body=book(token_id), delay=delay)
+        return Reply(status=404)
+    return route
+
+
+def test_concurrent_gets_share_one_request():
+    async def main():
+        async with StubServer(clob_route(delay=0.05)) as server, ClobApi(server.url, max_retries=0) as clob:
+            books = await asyncio.gather(*(clob.get_order_book("123") for _ in range(5)))
+            assert all(b == book("123") for b in books)
+            assert server.paths() == ["/book?token_id=123"]
+            stats = clob.stats()
+            assert (stats["gets"], stats["coalesced"], stats["in_flight"]) == (1, 4, 0)
+            # Finished calls are not cached
+            await clob.get_order_book("123")
+            assert len(server.requests) == 2
+
+    run(main())
+
+
+def test_get_order_books_uses_post_books():
+    async def main():
+        async with StubServer(clob_route()) as server, ClobApi(server.url, max_retries=0) as clob:
+            errors: Dict[str, str] = {}
+            books = await clob.get_order_books(["a", "b", "missing", "a"], errors)
+            assert books == {"a": book("a"), "b": book("b")}
+            assert list(errors) == ["missing"]
+            assert [(r.method, r.path) for r in server.requests] == [("POST", "/books")]
+            assert json.loads(server.requests[0].body) == [{"token_id": t} for t in ("a", "b", "missing")]
+
+    run(main())
+
+
+def test_concurrent_book_batches_join_tokens_in_flight():
+    async def main():
+        async with StubServer(clob_route(delay=0.05)) as server, ClobApi(server.url, max_retries=0) as clob:
+            first, second = await asyncio.gather(
+                clob.get_order_books(["a", "b"]),
+                clob.get_order_books(["b", "c"]),
+            )
+            assert first == {"a": book("a"), "b": book("b")} and second == {"b": book("b"), "c": book("c")}
+            fetched = [item["token_id"] for r in server.requests for item in json.loads(r.body)]
+            assert sorted(fetched) == ["a", "b", "c"]
+            assert clob.stats()["books_coalesced"] == 1
+
+    run(main())
+
+
+@pytest.mark.parametrize("status", [404, 405])
+def test_get_order_books_falls_back_to_book(status):
+    async def main():
+        async with StubServer(clob_route(post_books=status)) as server, ClobApi(server.url, max_retries=0) as clob:
+            errors: Dict[str, str] = {}
+            books = await clob.get_order_books(["a", "b", "missing"], errors)
+            assert books == {"a": book("a"), "b": book("b")} and list(errors) == ["missing"]
+            assert not clob.multi_book
+            assert server.paths("POST") == ["/books"]
+            assert sorted(server.paths("GET")) == ["/book?token_id=a", "/book?token_id=b", "/book?token_id=missing"]
+
+            # Later calls go straight to /book
+            await clob.get_order_books(["c"])
+            assert server.paths("POST") == ["/books"] and server.paths()[-1] == "/book?token_id=c"
+
+    run(main())
+
+
+def test_other_post_books_errors_are_reported_per_token():
+    async def main():
+        async with StubServer(clob_route(post_books=400)) as server, ClobApi(server.url, max_retries=0) as clob:
+            errors: Dict[str, str] = {}
+            assert await clob.get_order_books(["a", "b"], errors) == {}
+            assert sorted(errors) == ["a", "b"] and "not here" in errors["a"]
+            assert clob.multi_book and server.paths("GET") == []
+
+    run(main())
+
+
+def test_post_books_is_resent_after_dropped_connection():
+    def route(request: Request) -> Reply:
+        return Reply(drop=True) if request.seq == 1 else clob_route()(request)
+
+    async def main():
+        async with StubServer(route) as server, ClobApi(server.url, max_retries=0) as clob:
+            await clob.get_order_book("warm")
+            assert await clob.get_order_books(["a"]) == {"a": book("a")}
+            assert server.paths("POST") == ["/books", "/books"]
+
+    run(main())
+
+
+# ----------------------------------------------------------------------
+# MarketFetcher / AsyncStrategyRuntime
+# ----------------------------------------------------------------------
+
+def test_fetch_keys_market_state_by_token_id():
+    async def main():
+        async with StubServer(clob_route()) as server, HttpPool() as pool:
+            snapshot = await MarketFetcher(pool, server.url).fetch(["a", "missing", "b"])
+            assert list(snapshot.market_data) == ["a", "b"] and list(snapshot.orderbooks) == ["a", "b"]
+            assert snapshot.orderbooks["a"] == book("a")
+            assert list(snapshot.errors) == ["missing"]
+            assert snapshot.market_data["b"] == {
+                "market_id": "b",
+                "token_id": "b",
+                "condition_id": "0xcond-b",
+                "bid": 0.4,
+                "ask": 0.6,
+                "midpoint": 0.5,
+                "spread": pytest.approx(0.2),
+                "volume": 0.0,
+                "last_price": 0.55,
+            }
+            assert server.paths() == ["/books"]
+
+            state, raw = await MarketFetcher(pool, server.url).fetch_market("c")
+            assert state["market_id"] == "c" and state["condition_id"] == "0xcond-c" and raw == book("c")
+
+    run(main())
+
+
+def test_empty_book_side_is_nan_and_listed_in_errors():
+    state = market_state("t", {"bids": [], "asks": [{"price": "0.6", "size": "5"}]})
+    assert math.isnan(state["bid"]) and state["ask"] == 0.6
+    assert math.isnan(state["midpoint"]) and math.isnan(state["spread"])
+    batch = decode_context(encode_context({"market_data": {"t": state}})).market_data()
+    assert not batch.valid.any() and "t" not in batch
+
+    async def main():
+        async with StubServer(clob_route()) as server, HttpPool() as pool:
+            snapshot = await MarketFetcher(pool, server.url).fetch(["a", "no-bids", "no-asks"])
+            assert list(snapshot.market_data) == ["a"]
+            assert list(snapshot.orderbooks) == ["a", "no-bids", "no-asks"]
+            assert snapshot.errors == {"no-bids": "Order book has no bids", "no-asks": "Order book has no asks"}
+
+    run(main())
+
+
+STRATEGY = """
+def propose_orders(context):
+    return [
+        {"market_id": state["market_id"], "token_id": state["token_id"], "side": "BUY",
+         "type": "LIMIT", "size": 1, "price": state["bid"]}
+        for state in context["market_data"].values()
+    ]
+"""
+
+
+def test_runtime_orders_use_the_fetched_token_ids():
+    async def main():
+        async with StubServer(clob_route()) as server:
+            async with AsyncStrategyRuntime(clob_url=server.url) as runtime:
+                context = {"balance": 100.0, "parameters": {"market_ids": ["a", "b", "missing"]}}
+                result = await runtime.run("s1", context, strategy={"code": STRATEGY, "version": 1})
+            assert [(o["market_id"], o["token_id"], o["price"]) for o in result["approved"]] == [
+                ("a", "a", 0.4), ("b", "b", 0.4),
+            ]
+            assert result["books_changed"] == {"a": 2, "b": 2}
+            assert list(result["fetch_errors"]) == ["missing"]
+            assert result["timings"]["fetch"] > 0
+
+    run(main())
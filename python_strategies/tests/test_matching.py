@@ -0,0 +1,169 @@
+"""Queue position of resting paper orders in MatchingEngine"""
+
+import random
+
+import pytest
+
+from sdk import OrderBook
+from simulation import MatchingEngine
+
+
+TOKEN = "123"
+
+
+def make_book(bid_size, price=0.45, ask=0.50):
+    return OrderBook.from_clob({
+        "bids": [{"price": str(price), "size": str(bid_size)}],
+        "asks": [{"price": str(ask), "size": "100"}],
+    })
+
+
+def buy(engine, book, size, price=0.45, now=0):
+    order, fills = engine.submit(
+        {"market_id": "m", "token_id": TOKEN, "side": "BUY", "type": "GTC", "size": size, "price": price},
+        book, now,
+    )
+    assert fills == []
+    return order
+
+
+def test_order_queues_behind_visible_size():
+    engine = MatchingEngine()
+    order = buy(engine, make_book(100), 10)
+    assert order.shares_ahead == 100
+    assert engine.open_orders(TOKEN) == [order]
+
+
+def test_trades_at_price_decrement_queue_then_fill():
+    engine = MatchingEngine()
+    order = buy(engine, make_book(100), 10)
+
+    assert engine.on_trade(TOKEN, 0.45, 40, "SELL", 1) == []
+    assert order.shares_ahead == pytest.approx(60)
+
+    fills = engine.on_trade(TOKEN, 0.45, 70, "SELL", 2)
+    assert [(f.size, f.price, f.liquidity) for f in fills] == [(10, 0.45, "MAKER")]
+    assert order.remaining == pytest.approx(0) and not order.active
+    assert len(engine) == 0
+
+
+def test_buy_takers_do_not_move_bid_queue():
+    engine = MatchingEngine()
+    order = buy(engine, make_book(100), 10)
+    assert engine.on_trade(TOKEN, 0.45, 500, "BUY", 1) == []
+    assert order.shares_ahead == 100
+
+
+def test_trade_through_price_fills_regardless_of_queue():
+    engine = MatchingEngine()
+    order = buy(engine, make_book(100), 10)
+    fills = engine.on_trade(TOKEN, 0.44, 4, "SELL", 1)
+    assert [(f.size, f.price) for f in fills] == [(4, 0.45)]
+    assert order.remaining == pytest.approx(6)
+    assert order.shares_ahead == 100  # A print elsewhere leaves the queue alone
+
+
+def test_cancellations_shrink_queue_proportionally():
+    engine = MatchingEngine()
+    book = make_book(100)
+    order = buy(engine, book, 10)
+
+    # 20 trades and the level then shows 40: 40 of the remaining 80 cancelled
+    engine.on_trade(TOKEN, 0.45, 20, "SELL", 1)
+    changes = book.apply_deltas([{"side": "BUY", "price": 0.45, "size": 40}])
+    assert engine.on_book(TOKEN, book, 2, changes) == []
+    assert order.shares_ahead == pytest.approx(40)
+
+    # Growth joins behind us
+    changes = book.apply_deltas([{"side": "BUY", "price": 0.45, "size": 90}])
+    engine.on_book(TOKEN, book, 3, changes)
+    assert order.shares_ahead == pytest.approx(40)
+
+    # Without a change list every level we rest at is compared with the book
+    book.apply_deltas([{"side": "BUY", "price": 0.45, "size": 45}])
+    engine.on_book(TOKEN, book, 4)
+    assert order.shares_ahead == pytest.approx(20)
+
+
+def test_our_earlier_orders_fill_first():
+    engine = MatchingEngine()
+    book = make_book(100)
+    first = buy(engine, book, 10)
+    second = buy(engine, book, 10)
+    assert first.shares_ahead == second.shares_ahead == 100
+
+    fills = engine.on_trade(TOKEN, 0.45, 105, "SELL", 1)
+    assert [(f.order_id, f.size) for f in fills] == [(first.id, 5)]
+    fills = engine.on_trade(TOKEN, 0.45, 10, "SELL", 2)
+    # 5 more for the first order, then 5 for the second
+    assert [(f.order_id, f.size) for f in fills] == [(first.id, 5), (second.id, 5)]
+    assert engine.open_orders(TOKEN) == [second]
+
+
+def test_book_crossing_fills_as_maker():
+    engine = MatchingEngine()
+    book = make_book(100)
+    order = buy(engine, book, 10)
+    changes = book.apply_deltas([{"side": "SELL", "price": 0.45, "size": 6}])
+    fills = engine.on_book(TOKEN, book, 1, changes)
+    assert [(f.size, f.price, f.liquidity) for f in fills] == [(6, 0.45, "MAKER")]
+    assert order.remaining == pytest.approx(4)
+
+
+def test_queue_matches_per_order_reference():
+    """
+    The engine updates every order at a level in O(1); replay random trades
+    and book updates against a model that walks each order one by one.
+    """
+    rng = random.Random(11)
+    for _ in range(50):
+        engine = MatchingEngine()
+        public = float(rng.randint(0, 200))
+        book = make_book(public)
+        orders, ahead, remaining = [], [], []
+        traded = 0.0
+        now = 0
+        for _ in range(rng.randint(1, 5)):
+            size = float(rng.randint(1, 30))
+            orders.append(buy(engine, book, size))
+            ahead.append(public)
+            remaining.append(size)
+
+        for _ in range(40):
+            now += 1
+            if rng.random() < 0.6:
+                printed = float(rng.randint(1, 60))
+                fills = engine.on_trade(TOKEN, 0.45, printed, "SELL", now)
+                expected = []
+                ours = 0.0
+                taken = 0.0
+                for i in range(len(orders)):
+                    if remaining[i] <= 0:
+                        continue
+                    reach = printed - ahead[i] - ours
+                    if reach <= 0:
+                        break
+                    fill = min(remaining[i], reach)
+                    expected.append((orders[i].id, fill))
+                    ours += remaining[i]
+                    remaining[i] -= fill
+                    taken += fill
+                ahead = [max(a - (printed - taken), 0.0) for a in ahead]
+                traded += printed
+                assert [(f.order_id, f.size) for f in fills] == [
+                    (i, pytest.approx(s)) for i, s in expected
+                ]
+            else:
+                size = float(rng.randint(0, 200))
+                changes = book.apply_deltas([{"side": "BUY", "price": 0.45, "size": size}])
+                engine.on_book(TOKEN, book, now, changes)
+                before = public - traded
+                if size < before:
+                    ahead = [a * size / before for a in ahead]
+                public = size
+                traded = 0.0
+
+            for order, a, r in zip(orders, ahead, remaining):
+                if r > 0:
+                    assert order.shares_ahead == pytest.approx(a, abs=1e-9)
+                    assert order.remaining == pytest.approx(r)
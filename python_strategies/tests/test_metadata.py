@@ -0,0 +1,250 @@
+"""MarketMetadataCache TTLs, stale-while-revalidate, LRU and snapshots"""
+
+import asyncio
+import json
+
+import pytest
+
+from executor.metadata import SNAPSHOT_VERSION, MarketMetadataCache
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class Clock:
+    def __init__(self, now: float = 1_000_000.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def market(condition_id, version=1, tokens=None):
+    tokens = tokens or [f"{condition_id}-yes", f"{condition_id}-no"]
+    return {
+        "condition_id": condition_id,
+        "slug": f"slug-{condition_id}",
+        "clobTokenIds": json.dumps(tokens),
+        "outcomes": json.dumps(["Yes", "No"]),
+        "version": version,
+    }
+
+
+class FakeGamma:
+    """The GammaApi calls the cache makes, served from a dict of markets"""
+
+    def __init__(self, *markets) -> None:
+        self.markets = {m["condition_id"]: m for m in markets}
+        self.calls = []
+        self.fail = False
+        self.gate = None  # asyncio.Event holding requests back while unset
+
+    async def _answer(self, call, value):
+        self.calls.append(call)
+        if self.gate is not None:
+            await self.gate.wait()
+        if self.fail:
+            raise ConnectionError("gamma down")
+        return value
+
+    async def get_market(self, condition_id):
+        return await self._answer(("market", condition_id), self.markets[condition_id])
+
+    async def get_market_by_token(self, token_id):
+        found = next(m for m in self.markets.values() if token_id in json.loads(m["clobTokenIds"]))
+        return await self._answer(("token", token_id), found)
+
+    async def get_market_by_slug(self, slug):
+        found = next(m for m in self.markets.values() if m["slug"] == slug)
+        return await self._answer(("slug", slug), found)
+
+    async def get_markets(self, **filters):
+        return await self._answer(("markets", filters), list(self.markets.values()))
+
+    async def get_categories(self):
+        return await self._answer(("categories",), ["politics", "sports"])
+
+    async def close(self):
+        pass
+
+
+def test_fresh_entries_are_served_without_requests():
+    gamma = FakeGamma(market("c1"))
+    cache = MarketMetadataCache(gamma, clock=Clock())
+
+    async def main():
+        assert (await cache.get_market("c1"))["version"] == 1
+        assert await cache.get_market("c1") is gamma.markets["c1"]
+        assert await cache.get_categories() == ["politics", "sports"]
+        await cache.get_categories()
+
+    run(main())
+    assert gamma.calls == [("market", "c1"), ("categories",)]
+    assert (cache.hits, cache.misses, cache.stale_hits) == (2, 2, 0)
+
+
+def test_token_and_slug_lookups_use_the_index():
+    gamma = FakeGamma(market("c1"), market("c2"))
+    cache = MarketMetadataCache(gamma, clock=Clock())
+    assert cache.market_id_for_token("c1-no") is None
+
+    async def main():
+        assert (await cache.get_market_by_token("c1-no"))["condition_id"] == "c1"
+        assert cache.market_id_for_token("c1-yes") == "c1"
+        await cache.get_market_by_token("c1-yes")
+        await cache.get_market_by_slug("slug-c1")
+        await cache.get_market_by_slug("slug-c2")
+        await cache.get_market("c2")
+
+    run(main())
+    assert gamma.calls == [("token", "c1-no"), ("slug", "slug-c2")]
+    assert cache.stats()["tokens"] == 4
+
+
+def test_list_queries_warm_single_markets():
+    gamma = FakeGamma(market("c1"), market("c2"))
+    cache = MarketMetadataCache(gamma, clock=Clock())
+
+    async def main():
+        assert len(await cache.get_markets(active=True, limit=10)) == 2
+        await cache.get_markets(limit=10, active=True)
+        await cache.get_market_by_token("c2-yes")
+
+    run(main())
+    assert gamma.calls == [("markets", {"active": True, "limit": 10})]
+    assert len(cache) == 3
+
+
+def test_stale_entry_is_served_while_one_refresh_runs():
+    clock = Clock()
+    gamma = FakeGamma(market("c1"))
+    cache = MarketMetadataCache(gamma, clock=clock, ttls={"market": 10}, max_stale=100)
+
+    async def main():
+        await cache.get_market("c1")
+        gamma.markets["c1"] = market("c1", version=2)
+        gamma.gate = asyncio.Event()
+        clock.now += 50
+
+        # Both callers get the stale value at once; one refresh goes out
+        stale = await asyncio.gather(cache.get_market("c1"), cache.get_market("c1"))
+        assert [m["version"] for m in stale] == [1, 1]
+        assert cache.stats()["refreshing"] == 1
+
+        gamma.gate.set()
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        assert cache.stats()["refreshing"] == 0
+        assert (await cache.get_market("c1"))["version"] == 2
+
+    run(main())
+    assert gamma.calls == [("market", "c1")] * 2
+    assert (cache.hits, cache.stale_hits, cache.misses) == (1, 2, 1)
+
+
+def test_entry_past_max_stale_is_fetched_again():
+    clock = Clock()
+    gamma = FakeGamma(market("c1"))
+    cache = MarketMetadataCache(gamma, clock=clock, ttls={"market": 10}, max_stale=100)
+
+    async def main():
+        await cache.get_market("c1")
+        gamma.markets["c1"] = market("c1", version=2)
+        clock.now += 110
+        assert (await cache.get_market("c1"))["version"] == 2
+
+    run(main())
+    assert (cache.stale_hits, cache.misses) == (0, 2)
+
+
+def test_failed_refresh_keeps_the_stale_value():
+    clock = Clock()
+    gamma = FakeGamma(market("c1"))
+    cache = MarketMetadataCache(gamma, clock=clock, ttls={"market": 10})
+
+    async def main():
+        await cache.get_market("c1")
+        gamma.fail = True
+        clock.now += 20
+        assert (await cache.get_market("c1"))["version"] == 1
+        await asyncio.sleep(0)
+        # Still stale, so the next read tries again
+        assert (await cache.get_market("c1"))["version"] == 1
+        await asyncio.sleep(0)
+
+    run(main())
+    assert len(gamma.calls) == 3
+    assert cache.refresh_errors == 2
+    assert cache.last_error == "market c1: gamma down"
+
+
+def test_least_recently_used_entries_are_evicted():
+    gamma = FakeGamma(market("c1"), market("c2"), market("c3"))
+    cache = MarketMetadataCache(gamma, max_entries=2, clock=Clock())
+
+    async def main():
+        await cache.get_market("c1")
+        await cache.get_market("c2")
+        await cache.get_market("c1")  # c2 is now the oldest
+        await cache.get_market("c3")
+
+    run(main())
+    assert ("market", "c1") in cache and ("market", "c3") in cache
+    assert ("market", "c2") not in cache
+    # Its tokens and slug go with it
+    assert cache.market_id_for_token("c2-yes") is None
+    assert cache.market_id_for_token("c1-yes") == "c1"
+    assert cache.stats()["tokens"] == 4
+
+
+def test_updated_market_reindexes_its_tokens():
+    gamma = FakeGamma(market("c1", tokens=["t1", "t2"]))
+    cache = MarketMetadataCache(gamma, clock=Clock())
+    run(cache.get_market("c1"))
+    cache._put(("market", "c1"), market("c1", tokens=["t1", "t3"]))
+    assert [cache.market_id_for_token(t) for t in ("t1", "t2", "t3")] == ["c1", None, "c1"]
+    assert cache.invalidate(("market", "c1")) and not cache.invalidate(("market", "c1"))
+    assert cache.market_id_for_token("t1") is None
+
+
+def test_snapshot_round_trip_keeps_fetch_times(tmp_path):
+    path = str(tmp_path / "cache" / "gamma.json")
+    clock = Clock()
+    gamma = FakeGamma(market("c1"), market("c2"))
+    ttls = {"market": 10, "categories": 1000}
+
+    async def fill():
+        async with MarketMetadataCache(gamma, path=path, ttls=ttls, max_stale=100, clock=clock) as cache:
+            await cache.get_market("c1")
+            clock.now += 50
+            await cache.get_market("c2")
+            await cache.get_categories()
+
+    run(fill())
+    with open(path) as f:
+        snapshot = json.load(f)
+    assert snapshot["version"] == SNAPSHOT_VERSION and len(snapshot["entries"]) == 3
+
+    # 60s later c1 is past TTL + max_stale, c2 is stale, categories are fresh
+    clock.now += 60
+    gamma.calls.clear()
+    cache = MarketMetadataCache(gamma, path=path, ttls=ttls, max_stale=100, clock=clock)
+    assert len(cache) == 2 and ("market", "c1") not in cache
+    assert cache.market_id_for_token("c2-no") == "c2"
+
+    async def read():
+        await cache.get_categories()
+        await cache.get_market("c2")
+        await asyncio.sleep(0)
+
+    run(read())
+    assert (cache.hits, cache.stale_hits) == (1, 1)
+    assert gamma.calls == [("market", "c2")]
+
+
+@pytest.mark.parametrize("content", ["not json", '{"version": 99, "entries": []}', "[]"])
+def test_unreadable_snapshot_loads_nothing(tmp_path, content):
+    path = tmp_path / "gamma.json"
+    path.write_text(content)
+    assert MarketMetadataCache(FakeGamma(), clock=Clock()).load(str(path)) == 0
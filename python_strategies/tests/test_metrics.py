@@ -0,0 +1,139 @@
+"""MetricsAccumulator agrees with calculate_metrics"""
+
+import json
+import math
+import random
+
+import numpy as np
+import pytest
+
+from simulation import MetricsAccumulator
+from simulation.metrics import BUY, FILL_DTYPE, MS_PER_DAY, POSITION_DTYPE, SELL, calculate_metrics
+
+
+def round_trips(seed, steps=150):
+    """
+    Random fills over a few markets, each position built up with buys and
+    closed with one sell. Returns the fills in time order and the closed
+    positions as (market, opened_at, closed_at, realized_pnl).
+    """
+    rng = random.Random(seed)
+    markets = ["m0", "m1", "m2"]
+    held = {m: [0.0, 0.0, 0] for m in markets}  # size, avg price, opened_at
+    fills, positions = [], []
+    ts = 1_700_000_000_000
+
+    def sell_all(market, ts):
+        size, avg, opened = held[market]
+        price = round(rng.uniform(0.05, 0.95), 2)
+        fills.append((ts, market, "SELL", size, price, round(size * price * 0.002, 6)))
+        positions.append((market, opened, ts, (price - avg) * size))
+        held[market] = [0.0, 0.0, 0]
+
+    for _ in range(steps):
+        ts += rng.randint(1, MS_PER_DAY // 3)
+        market = rng.choice(markets)
+        size, avg, opened = held[market]
+        if size > 0 and rng.random() < 0.4:
+            sell_all(market, ts)
+            continue
+        qty = float(rng.randint(1, 100))
+        price = round(rng.uniform(0.05, 0.95), 2)
+        fills.append((ts, market, "BUY", qty, price, round(qty * price * 0.002, 6)))
+        held[market] = [size + qty, (size * avg + qty * price) / (size + qty), opened if size > 0 else ts]
+    for market in markets:
+        if held[market][0] > 0:
+            ts += 1000
+            sell_all(market, ts)
+    return fills, positions
+
+
+def as_arrays(fills, positions):
+    codes = {}
+    fill_array = np.empty(len(fills), dtype=FILL_DTYPE)
+    for i, (ts, market, side, size, price, fee) in enumerate(fills):
+        fill_array[i] = (ts, codes.setdefault(market, len(codes)), BUY if side == "BUY" else SELL, size, price, fee)
+    position_array = np.zeros(len(positions), dtype=POSITION_DTYPE)
+    for i, (market, opened, closed, pnl) in enumerate(positions):
+        position_array[i]["market"] = codes[market]
+        position_array[i]["opened_at"] = opened
+        position_array[i]["closed_at"] = closed
+        position_array[i]["realized_pnl"] = pnl
+    return fill_array, position_array
+
+
+def assert_same(streamed, batch):
+    for name, value in batch.to_dict().items():
+        other = streamed.to_dict()[name]
+        if value is None or other is None:
+            assert value is None and other is None, name
+        elif math.isinf(value):
+            assert other == value, name
+        else:
+            assert other == pytest.approx(value, rel=1e-9, abs=1e-6), name
+
+
+def test_two_round_trips_by_hand():
+    fills = np.array([
+        (0, 0, BUY, 10, 0.40, 0.0),
+        (100, 0, SELL, 10, 0.50, 0.0),
+        (200, 0, BUY, 10, 0.60, 0.0),
+        (400, 0, SELL, 10, 0.45, 0.0),
+    ], dtype=FILL_DTYPE)
+    positions = np.zeros(2, dtype=POSITION_DTYPE)
+    positions["opened_at"] = [0, 200]
+    positions["closed_at"] = [100, 400]
+    positions["realized_pnl"] = [1.0, -1.5]
+
+    metrics = calculate_metrics(fills, positions)
+    assert metrics.total_pnl == pytest.approx(-0.5)
+    assert (metrics.winning_trades, metrics.losing_trades) == (1, 1)
+    assert metrics.win_rate == 50
+    assert metrics.avg_win == pytest.approx(1.0) and metrics.avg_loss == pytest.approx(1.5)
+    assert metrics.profit_factor == pytest.approx(1 / 1.5)
+    # Cash: 10000, 9996, 10001, 9995, 9999.5
+    assert metrics.max_drawdown == pytest.approx(6.0)
+    assert metrics.max_drawdown_percent == pytest.approx(6 / 10001 * 100)
+    assert metrics.exposure_time == pytest.approx(75.0)
+    assert metrics.sharpe_ratio is None  # A single day has no daily returns
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_snapshot_matches_batch_metrics(seed):
+    fills, positions = round_trips(seed)
+    acc = MetricsAccumulator()
+    for fill in fills:
+        acc.add_fill(*fill)
+
+    snapshot = acc.snapshot()
+    batch = calculate_metrics(*as_arrays(fills, positions))
+    assert snapshot.total_trades == batch.total_trades == len(positions)
+    assert snapshot.sharpe_ratio is not None
+    assert_same(snapshot, batch)
+
+
+def test_checkpoint_resumes_mid_stream():
+    fills, positions = round_trips(3)
+    half = len(fills) // 2
+    acc = MetricsAccumulator()
+    for fill in fills[:half]:
+        acc.add_fill(*fill)
+
+    resumed = MetricsAccumulator.from_dict(json.loads(json.dumps(acc.to_dict())))
+    for fill in fills[half:]:
+        resumed.add_fill(*fill)
+    assert_same(resumed.snapshot(), calculate_metrics(*as_arrays(fills, positions)))
+
+
+def test_marks_move_unrealized_pnl():
+    acc = MetricsAccumulator()
+    acc.add_fill(0, "m", "BUY", 10, 0.40, token_id="t")
+    acc.mark("m", 0.50, token_id="t")
+    metrics = acc.snapshot()
+    assert metrics.unrealized_pnl == pytest.approx(1.0)
+    assert metrics.total_trades == 0
+    acc.add_fill(1000, "m", "SELL", 10, 0.45, token_id="t")
+    metrics = acc.snapshot()
+    assert metrics.unrealized_pnl == pytest.approx(0.0)
+    assert metrics.realized_pnl == pytest.approx(0.5)
+    assert metrics.winning_trades == 1 and metrics.profit_factor == math.inf
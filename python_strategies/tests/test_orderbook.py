@@ -0,0 +1,116 @@
+"""Incremental OrderBook updates"""
+
+import random
+
+from sdk import LevelChange, OrderBook
+
+
+def payload(bids, asks, hash=None):
+    return {
+        "market": "0xcond",
+        "asset_id": "123",
+        "bids": [{"price": str(p), "size": str(s)} for p, s in bids],
+        "asks": [{"price": str(p), "size": str(s)} for p, s in asks],
+        "hash": hash,
+    }
+
+
+def test_from_clob_orders_levels_best_first():
+    # The CLOB does not return the best level first on both sides
+    book = OrderBook.from_clob(payload([(0.40, 10), (0.45, 5), (0.42, 7)], [(0.60, 3), (0.55, 8)]))
+    assert book["bids"] == [[0.45, 5.0], [0.42, 7.0], [0.40, 10.0]]
+    assert book["asks"] == [[0.55, 8.0], [0.60, 3.0]]
+    assert book.best_bid == 0.45 and book.best_ask == 0.55
+    assert book.midpoint == 0.5
+    assert abs(book.spread - 0.10) < 1e-12
+
+
+def test_apply_snapshot_reports_only_changed_levels():
+    book = OrderBook()
+    first = book.apply_snapshot(payload([(0.45, 5), (0.40, 10)], [(0.55, 8)], hash="h1"))
+    assert sorted(first) == sorted([
+        LevelChange("BUY", 0.45, 0.0, 5.0),
+        LevelChange("BUY", 0.40, 0.0, 10.0),
+        LevelChange("SELL", 0.55, 0.0, 8.0),
+    ])
+
+    changes = book.apply_snapshot(payload([(0.45, 5), (0.41, 2)], [(0.55, 6), (0.57, 1)], hash="h2"))
+    assert sorted(changes) == sorted([
+        LevelChange("BUY", 0.40, 10.0, 0.0),
+        LevelChange("BUY", 0.41, 0.0, 2.0),
+        LevelChange("SELL", 0.55, 8.0, 6.0),
+        LevelChange("SELL", 0.57, 0.0, 1.0),
+    ])
+    removed = [c for c in changes if c.removed]
+    assert removed == [LevelChange("BUY", 0.40, 10.0, 0.0)]
+    assert book["bids"] == [[0.45, 5.0], [0.41, 2.0]]
+    assert book.hash == "h2"
+
+
+def test_unchanged_hash_skips_snapshot():
+    book = OrderBook()
+    book.apply_snapshot(payload([(0.45, 5)], [(0.55, 8)], hash="h1"))
+    # Same hash: the levels are not even parsed
+    assert book.apply_snapshot({"hash": "h1", "bids": [{"price": "bad"}]}) == []
+    assert book["bids"] == [[0.45, 5.0]]
+
+
+def test_apply_deltas():
+    book = OrderBook.from_clob(payload([(0.45, 5), (0.40, 10)], [(0.55, 8)]))
+    changes = book.apply_deltas([
+        {"side": "BUY", "price": "0.45", "size": "0"},
+        {"side": "BUY", "price": "0.46", "size": "3"},
+        {"side": "SELL", "price": "0.55", "size": "9"},
+        {"side": "SELL", "price": "0.70", "size": "0"},  # Removing a missing level is a no-op
+    ])
+    assert changes == [
+        LevelChange("BUY", 0.45, 5.0, 0.0),
+        LevelChange("BUY", 0.46, 0.0, 3.0),
+        LevelChange("SELL", 0.55, 8.0, 9.0),
+    ]
+    assert book["bids"] == [[0.46, 3.0], [0.40, 10.0]]
+    assert book.best_ask == 0.55 and book.asks.best_size == 9.0
+    assert book.last_changes == changes
+
+
+def test_listeners_see_changes_until_unsubscribed():
+    book = OrderBook()
+    seen = []
+    unsubscribe = book.subscribe(lambda b, changes: seen.append(list(changes)))
+    book.apply_deltas([{"side": "BUY", "price": 0.4, "size": 1}])
+    book.apply_deltas([{"side": "BUY", "price": 0.4, "size": 1}])  # No change, no callback
+    unsubscribe()
+    book.apply_deltas([{"side": "BUY", "price": 0.4, "size": 2}])
+    assert seen == [[LevelChange("BUY", 0.4, 0.0, 1.0)]]
+
+
+def test_depth_queries_follow_updates():
+    book = OrderBook.from_clob(payload([], [(0.50, 10), (0.52, 5), (0.55, 20)]))
+    assert book.asks.depth_to_price(0.52) == 15
+    book.apply_deltas([{"side": "SELL", "price": 0.51, "size": 4}])
+    assert book.asks.depth_to_price(0.52) == 19
+    assert book.asks.total_size == 39
+
+
+def test_random_snapshots_match_fresh_books():
+    rng = random.Random(7)
+    prices = [round(0.01 * i, 2) for i in range(1, 100)]
+    book = OrderBook()
+    previous = {"BUY": {}, "SELL": {}}
+    for _ in range(200):
+        bids = {p: float(rng.randint(1, 50)) for p in rng.sample(prices[:50], rng.randint(0, 10))}
+        asks = {p: float(rng.randint(1, 50)) for p in rng.sample(prices[50:], rng.randint(0, 10))}
+        changes = book.apply_snapshot(payload(bids.items(), asks.items()))
+
+        fresh = OrderBook.from_clob(payload(bids.items(), asks.items()))
+        assert book["bids"] == fresh["bids"] and book["asks"] == fresh["asks"]
+
+        expected = set()
+        for side, current in (("BUY", bids), ("SELL", asks)):
+            before = previous[side]
+            for price in set(before) | set(current):
+                old, new = before.get(price, 0.0), current.get(price, 0.0)
+                if old != new:
+                    expected.add(LevelChange(side, price, old, new))
+        assert set(changes) == expected and len(changes) == len(expected)
+        previous = {"BUY": bids, "SELL": asks}
@@ -0,0 +1,99 @@
+"""Executor IPC framing"""
+
+import io
+import os
+import subprocess
+import sys
+
+import pytest
+
+from executor.protocol import ATTACHMENT_FLAG, HEADER, MAX_FRAME_SIZE, ProtocolError, encode_frame, read_frame, write_frame
+
+
+def test_round_trip():
+    message = {"id": 1, "type": "run", "context": {"balance": 10.5, "markets": ["a", "b"]}}
+    frame = encode_frame(message)
+    (length,) = HEADER.unpack_from(frame)
+    assert not length & ATTACHMENT_FLAG
+    assert length == len(frame) - HEADER.size
+    assert read_frame(io.BytesIO(frame)) == message
+
+
+def test_round_trip_with_attachment():
+    attachment = bytes(range(256)) * 3
+    frame = encode_frame({"id": 2, "type": "run"}, attachment)
+    (length,) = HEADER.unpack_from(frame)
+    assert length & ATTACHMENT_FLAG
+    assert length & ~ATTACHMENT_FLAG == len(frame) - HEADER.size
+
+    message = read_frame(io.BytesIO(frame))
+    assert isinstance(message["attachment"], memoryview)
+    assert bytes(message.pop("attachment")) == attachment
+    assert message == {"id": 2, "type": "run"}
+
+
+def test_empty_attachment():
+    message = read_frame(io.BytesIO(encode_frame({"id": 3}, b"")))
+    assert bytes(message["attachment"]) == b""
+
+
+def test_consecutive_frames_then_eof():
+    stream = io.BytesIO()
+    write_frame(stream, {"id": 1})
+    write_frame(stream, {"id": 2}, b"\x00\x01")
+    write_frame(stream, {"id": 3})
+    stream.seek(0)
+    assert read_frame(stream) == {"id": 1}
+    assert bytes(read_frame(stream)["attachment"]) == b"\x00\x01"
+    assert read_frame(stream) == {"id": 3}
+    assert read_frame(stream) is None
+
+
+class _Trickle(io.RawIOBase):
+    """Returns at most one byte per read, like a pipe delivering a frame in pieces"""
+
+    def __init__(self, data: bytes) -> None:
+        self.data = io.BytesIO(data)
+
+    def read(self, size: int = -1) -> bytes:
+        return self.data.read(min(size, 1) if size > 0 else 1)
+
+
+def test_partial_reads():
+    assert read_frame(_Trickle(encode_frame({"id": 4, "text": "x" * 100}, b"abc")))["text"] == "x" * 100
+
+
+def test_truncated_frame():
+    frame = encode_frame({"id": 5, "type": "run"})
+    with pytest.raises(ProtocolError):
+        read_frame(io.BytesIO(frame[:-3]))
+    with pytest.raises(ProtocolError):
+        read_frame(io.BytesIO(frame[:2]))
+
+
+def test_invalid_payload():
+    with pytest.raises(ProtocolError):
+        read_frame(io.BytesIO(HEADER.pack(3) + b"{x}"))
+
+
+def test_attachment_json_length_exceeds_frame():
+    payload = HEADER.pack(100) + b"{}"
+    with pytest.raises(ProtocolError):
+        read_frame(io.BytesIO(HEADER.pack(len(payload) | ATTACHMENT_FLAG) + payload))
+
+
+def test_oversized_frame_header():
+    with pytest.raises(ProtocolError):
+        read_frame(io.BytesIO(HEADER.pack(MAX_FRAME_SIZE + 1)))
+
+
+def test_server_imports_skip_the_http_stack():
+    # A fresh interpreter: this test session has already imported the clients
+    code = (
+        "import sys, executor, executor.server\n"
+        "assert 'asyncio' not in sys.modules and 'executor.http' not in sys.modules\n"
+        "from executor import HttpPool, TokenIndex\n"
+        "assert HttpPool.__module__ == 'executor.http' and 'executor.tokens' in sys.modules\n"
+    )
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    subprocess.run([sys.executable, "-c", code], cwd=root, check=True)
@@ -0,0 +1,135 @@
+"""TokenBucket refill, 429 backoff and recovery on an injected clock"""
+
+import asyncio
+
+import pytest
+
+from executor.ratelimit import BOOKS, DEFAULT_LIMITS, DEFAULT_PAUSE, DEFAULT_RATE, RateLimiter, TokenBucket
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Fake clock; asyncio.sleep in the limiter advances it instead of waiting"""
+    clock = Clock()
+    real_sleep = asyncio.sleep
+    clock.sleeps = []
+
+    async def sleep(delay):
+        clock.sleeps.append(delay)
+        clock.now += delay
+        await real_sleep(0)
+
+    monkeypatch.setattr("executor.ratelimit.asyncio.sleep", sleep)
+    return clock
+
+
+def test_burst_then_refill_at_rate(clock):
+    bucket = TokenBucket(rate=2, burst=5, clock=clock)
+    assert all(bucket.try_acquire() for _ in range(5))
+    assert not bucket.try_acquire()
+    clock.now += 1
+    assert bucket.try_acquire() and bucket.try_acquire() and not bucket.try_acquire()
+    clock.now += 100
+    assert bucket.stats()["tokens"] == 5
+    assert bucket.acquired == 7
+
+
+def test_waiters_are_spaced_at_the_refill_rate(clock):
+    bucket = TokenBucket(rate=4, burst=2, clock=clock)
+    done = []
+
+    async def take(name):
+        await bucket.acquire()
+        done.append((name, clock.now))
+
+    async def main():
+        await asyncio.gather(*(take(n) for n in "abcde"))
+
+    asyncio.run(main())
+    assert done == [("a", 100.0), ("b", 100.0), ("c", 100.25), ("d", 100.5), ("e", 100.75)]
+    assert clock.sleeps == pytest.approx([0.25] * 3)
+
+
+def test_try_acquire_does_not_jump_the_queue(clock):
+    bucket = TokenBucket(rate=1, burst=1, clock=clock)
+
+    async def main():
+        bucket.try_acquire()
+        waiter = asyncio.ensure_future(bucket.acquire())
+        await asyncio.sleep(0)
+        clock.now += 5  # Tokens are back, but the waiter holds the lock
+        assert not bucket.try_acquire()
+        await waiter
+
+    asyncio.run(main())
+
+
+def test_throttle_pauses_halves_and_recovers_linearly(clock):
+    bucket = TokenBucket(rate=10, burst=10, recover_seconds=60, clock=clock)
+    bucket.throttle(retry_after=3)
+    assert bucket.stats()["tokens"] == 0 and bucket.stats()["paused_for"] == 3
+    clock.now += 2
+    assert not bucket.try_acquire()
+
+    # Nothing accrues during the pause; the rate is halved when it ends
+    clock.now += 1
+    assert bucket.rate() == 5 and bucket.stats()["tokens"] == 0
+    clock.now += 30
+    assert bucket.rate() == pytest.approx(7.5)
+    clock.now += 30
+    assert bucket.rate() == 10
+    clock.now += 1000
+    assert bucket.rate() == 10
+
+
+def test_acquire_waits_out_the_pause(clock):
+    bucket = TokenBucket(rate=10, burst=10, clock=clock)
+    bucket.throttle(retry_after=2)
+    waited = asyncio.run(bucket.acquire())
+    # Two seconds of pause, then one token at the halved rate
+    assert waited == pytest.approx(2 + 1 / 5)
+    assert clock.sleeps == [pytest.approx(2.2)]
+
+
+def test_in_flight_429s_only_extend_the_pause(clock):
+    bucket = TokenBucket(rate=16, burst=16, clock=clock)
+    bucket.throttle(retry_after=1)
+    clock.now += 0.5
+    bucket.throttle(retry_after=2)
+    bucket.throttle()
+    assert bucket.stats()["paused_for"] == 2
+    clock.now += 2
+    assert bucket.rate() == 8 and bucket.throttled == 3
+
+    # A 429 after the pause halves again, down to min_rate
+    for _ in range(6):
+        bucket.throttle()
+        clock.now += DEFAULT_PAUSE
+    assert bucket.rate() == bucket.min_rate == 1
+
+
+def test_limiter_keeps_one_bucket_per_endpoint(clock):
+    limiter = RateLimiter({"orders": (1, 1)}, clock=clock)
+    assert limiter.bucket(BOOKS) is limiter.bucket(BOOKS)
+    assert (limiter.bucket(BOOKS).max_rate, limiter.bucket(BOOKS).burst) == DEFAULT_LIMITS[BOOKS]
+    assert limiter.bucket("other").max_rate == DEFAULT_RATE[0]
+
+    async def main():
+        await limiter.acquire("orders")
+        await limiter.acquire("orders")
+        await limiter.acquire(BOOKS)
+
+    asyncio.run(main())
+    limiter.throttle(BOOKS, retry_after=5)
+    stats = limiter.stats()
+    assert stats["orders"]["waited"] == 1 and stats["orders"]["acquired"] == 2
+    assert stats[BOOKS]["throttled"] == 1 and stats[BOOKS]["paused_for"] == 5
+    assert sorted(stats) == [BOOKS, "orders", "other"]
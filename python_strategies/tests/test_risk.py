@@ -0,0 +1,125 @@
+"""Batch RiskEngine against checking orders one by one"""
+
+import math
+import random
+
+import pytest
+
+from executor.risk import DEFAULT_ORDER_PRICE, RiskEngine, RiskSnapshot
+from sdk import PositionBook
+
+
+def sequential(snapshot, orders, exposure, validator=None, hook=None, context=None):
+    """
+    Reference: the live broker's checks (max position size, then total
+    exposure, then orders per minute) applied to each order in turn,
+    where only approved orders count towards exposure and the rate
+    """
+    blocked = snapshot.blocked_reason()
+    if blocked is not None:
+        return [blocked] * len(orders)
+    reasons = []
+    count = snapshot.orders_last_minute
+    for order in orders:
+        reason = validator(order) if validator else None
+        if reason is None and hook is not None and not hook(order, context):
+            reason = "Rejected by strategy risk_check"
+        if reason is not None:
+            reasons.append(reason)
+            continue
+        price = order["price"] if order.get("price") is not None else DEFAULT_ORDER_PRICE
+        value = order["size"] * price
+        added = value if order["side"] == "BUY" else 0.0
+        if value > snapshot.max_position_size:
+            reasons.append(f"Order value ${value:.2f} exceeds max position size ${snapshot.max_position_size:g}")
+        elif added > 0 and exposure + added > snapshot.max_total_exposure:
+            reasons.append(
+                f"Total exposure ${exposure + added:.2f} would exceed limit ${snapshot.max_total_exposure:g}"
+            )
+        elif count >= snapshot.max_orders_per_minute:
+            reasons.append(f"Rate limit: {count} orders in last minute (max: {snapshot.max_orders_per_minute:g})")
+        else:
+            exposure += added
+            count += 1
+            reasons.append(None)
+    return reasons
+
+
+def random_case(rng):
+    snapshot = RiskSnapshot(
+        max_orders_per_minute=rng.choice([math.inf, rng.randint(0, 12)]),
+        max_position_size=rng.choice([math.inf, rng.uniform(5, 60)]),
+        max_total_exposure=rng.choice([math.inf, rng.uniform(20, 200)]),
+        orders_last_minute=rng.randint(0, 5),
+        current_exposure=rng.uniform(0, 50),
+    )
+    orders = [
+        {
+            "side": rng.choice(["BUY", "SELL"]),
+            "size": rng.uniform(1, 100),
+            "price": rng.choice([None, rng.uniform(0.01, 0.99)]),
+            "tag": i,
+        }
+        for i in range(rng.randint(1, 15))
+    ]
+    return snapshot, orders
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_matches_sequential_checks(seed):
+    rng = random.Random(seed)
+    for _ in range(200):
+        snapshot, orders = random_case(rng)
+        assert RiskEngine(snapshot).evaluate(orders) == sequential(snapshot, orders, snapshot.current_exposure)
+
+
+def test_matches_sequential_checks_with_hook_and_validator():
+    rng = random.Random(42)
+
+    def hook(order, context):
+        return order["tag"] % 4 != 1
+
+    def validator(order):
+        return "odd size" if order["tag"] % 5 == 3 else None
+
+    for _ in range(300):
+        snapshot, orders = random_case(rng)
+        expected = sequential(snapshot, orders, snapshot.current_exposure, validator, hook)
+        assert RiskEngine(snapshot, validator).evaluate(orders, {}, hook) == expected
+
+
+def test_rate_limited_orders_do_not_consume_exposure():
+    snapshot = RiskSnapshot(max_orders_per_minute=1, max_total_exposure=10, current_exposure=0)
+    orders = [
+        {"side": "BUY", "size": 10, "price": 0.5},  # 5 of exposure, placed
+        {"side": "BUY", "size": 8, "price": 0.5},   # 4 more would fit, but the rate limit is hit
+        {"side": "BUY", "size": 12, "price": 0.5},  # 6 more would breach exposure first
+    ]
+    assert RiskEngine(snapshot).evaluate(orders) == [
+        None,
+        "Rate limit: 1 orders in last minute (max: 1)",
+        "Total exposure $11.00 would exceed limit $10",
+    ]
+
+
+def test_exposure_from_positions():
+    positions = PositionBook([{"market_id": "m", "token_id": "t", "size": 40, "avg_entry_price": 0.5}])
+    snapshot = RiskSnapshot(max_total_exposure=25)
+    orders = [{"side": "BUY", "size": 12, "price": 0.5}, {"side": "BUY", "size": 2, "price": 0.5}]
+    expected = sequential(snapshot, orders, positions.total_exposure)
+    assert RiskEngine(snapshot).evaluate(orders, {"positions": positions}) == expected
+    assert expected[0] is not None and expected[1] is None
+
+
+def test_blocked_rejects_everything():
+    orders = [{"side": "SELL", "size": 1, "price": 0.5}] * 3
+    killed = RiskSnapshot(kill_switch_active=True, kill_switch_reason="manual")
+    assert RiskEngine(killed).evaluate(orders) == ["Kill switch active: manual"] * 3
+    losing = RiskSnapshot(max_daily_loss=100, today_pnl=-150)
+    assert RiskEngine(losing).evaluate(orders) == ["Daily loss limit exceeded"] * 3
+
+
+def test_from_dict_ignores_nulls_and_unknown_keys():
+    snapshot = RiskSnapshot.from_dict({"max_position_size": 50, "max_total_exposure": None, "other": 1})
+    assert snapshot.max_position_size == 50
+    assert snapshot.max_total_exposure == math.inf
@@ -0,0 +1,184 @@
+"""Cron parsing and StrategyScheduler dispatch"""
+
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from executor.scheduler import CronError, CronSchedule, StrategyScheduler
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+def next_after(expression, *args):
+    return CronSchedule.parse(expression).next_after(utc(*args))
+
+
+@pytest.mark.parametrize("expression, after, expected", [
+    # Strictly after: a matching minute moves on to the next one
+    ("*/15 * * * *", (2024, 9, 2, 10, 15), (2024, 9, 2, 10, 30)),
+    ("*/15 * * * *", (2024, 9, 2, 10, 7, 30), (2024, 9, 2, 10, 15)),
+    ("5/20 * * * *", (2024, 9, 2, 10, 46), (2024, 9, 2, 11, 5)),
+    ("0 9-17 * * *", (2024, 9, 2, 17, 30), (2024, 9, 3, 9, 0)),
+    # Month and year rollover
+    ("0 0 1 * *", (2024, 1, 31, 12, 0), (2024, 2, 1, 0, 0)),
+    ("30 23 31 * *", (2024, 1, 31, 23, 30), (2024, 3, 31, 23, 30)),
+    ("0 0 1 1 *", (2024, 6, 1, 0, 0), (2025, 1, 1, 0, 0)),
+    ("0 0 29 2 *", (2025, 1, 1, 0, 0), (2028, 2, 29, 0, 0)),
+    ("59 23 31 12 *", (2024, 12, 31, 23, 59), (2025, 12, 31, 23, 59)),
+    # Day of week only (2024-09-06 is a Friday)
+    ("0 9 * * 1-5", (2024, 9, 6, 10, 0), (2024, 9, 9, 9, 0)),
+    ("0 0 * * 7", (2024, 9, 6, 0, 0), (2024, 9, 8, 0, 0)),
+    ("0 0 * * 0", (2024, 9, 6, 0, 0), (2024, 9, 8, 0, 0)),
+    # Day of month only
+    ("0 12 13 * *", (2024, 9, 1, 0, 0), (2024, 9, 13, 12, 0)),
+    # Both restricted: either may match (the 13th, or any Friday)
+    ("0 12 13 * 5", (2024, 9, 1, 0, 0), (2024, 9, 6, 12, 0)),
+    ("0 12 13 * 5", (2024, 9, 6, 12, 0), (2024, 9, 13, 12, 0)),
+    ("0 12 13 * 5", (2024, 9, 13, 12, 0), (2024, 9, 20, 12, 0)),
+    ("0 0 15 * 1", (2024, 9, 30, 0, 0), (2024, 10, 7, 0, 0)),
+])
+def test_next_after(expression, after, expected):
+    assert next_after(expression, *after) == utc(*expected)
+
+
+def test_next_after_walks_every_minute():
+    schedule = CronSchedule.parse("* * * * *")
+    t = utc(2024, 2, 28, 23, 58)
+    for _ in range(5):
+        t = schedule.next_after(t)
+    assert t == utc(2024, 2, 29, 0, 3)
+
+
+def test_next_after_keeps_timezone():
+    plus2 = timezone(timedelta(hours=2))
+    result = CronSchedule.parse("0 * * * *").next_after(datetime(2024, 1, 1, 10, 30, tzinfo=plus2))
+    assert result == datetime(2024, 1, 1, 11, 0, tzinfo=plus2)
+
+
+def test_matches():
+    schedule = CronSchedule.parse("*/5 9-17 * * 1-5")
+    assert schedule.matches(utc(2024, 9, 6, 9, 5))
+    assert not schedule.matches(utc(2024, 9, 6, 9, 6))
+    assert not schedule.matches(utc(2024, 9, 7, 9, 5))  # Saturday
+
+
+def test_parse_normalizes_whitespace_and_caches():
+    assert CronSchedule.parse(" 0  9 * * 1 ").expression == "0 9 * * 1"
+    assert CronSchedule.parse("0 9 * * 1") is CronSchedule.parse("0 9 * * 1")
+
+
+@pytest.mark.parametrize("expression", [
+    "* * * *",
+    "60 * * * *",
+    "* 24 * * *",
+    "* * 0 * *",
+    "* * * 13 *",
+    "* * * * 8",
+    "*/0 * * * *",
+    "5-1 * * * *",
+    "a * * * *",
+])
+def test_invalid_expressions(expression):
+    with pytest.raises(CronError):
+        CronSchedule.parse(expression)
+
+
+def test_never_fires():
+    with pytest.raises(CronError):
+        next_after("0 0 31 2 *", 2024, 1, 1)
+
+
+# ----------------------------------------------------------------------
+# StrategyScheduler
+# ----------------------------------------------------------------------
+
+T0 = utc(2024, 9, 2, 10, 0).timestamp()
+
+
+def test_due_pops_in_time_order_and_coalesces_missed_runs():
+    scheduler = StrategyScheduler(lambda s: None)
+    scheduler.add("every-minute", "* * * * *", now=T0)
+    scheduler.add("hourly", "0 * * * *", now=T0)
+    assert scheduler.due(T0 + 30) == []
+    assert scheduler.due(T0 + 60) == ["every-minute"]
+    # Ten minutes missed: one run, next due a minute after `now`
+    assert scheduler.due(T0 + 11 * 60) == ["every-minute"]
+    assert scheduler.next_due() == T0 + 12 * 60
+    assert sorted(scheduler.due(T0 + 3600)) == ["every-minute", "hourly"]
+    scheduler.shutdown()
+
+
+def test_sync_removes_and_reschedules():
+    scheduler = StrategyScheduler(lambda s: None)
+    scheduler.sync([
+        {"id": "a", "schedule": "* * * * *", "isActive": True},
+        {"id": "b", "schedule": "0 * * * *", "isActive": True},
+        {"id": "c", "schedule": None, "isActive": True},
+    ], now=T0)
+    assert len(scheduler) == 2 and "c" not in scheduler
+    scheduler.sync([{"id": "b", "schedule": "*/5 * * * *", "isActive": True}], now=T0)
+    assert "a" not in scheduler
+    assert scheduler.due(T0 + 300) == ["b"]
+    scheduler.shutdown()
+
+
+def test_sync_skips_bad_rows_and_schedules_the_rest():
+    scheduler = StrategyScheduler(lambda s: None)
+    scheduler.sync([
+        {"id": "a", "schedule": "* * * * *"},
+        {"id": "bad", "schedule": "61 * * * *"},
+        {"id": "never", "schedule": "0 0 30 2 *"},
+        {"id": "b", "schedule": "0 * * * *"},
+    ], now=T0)
+    assert len(scheduler) == 2 and "a" in scheduler and "b" in scheduler
+    assert sorted(scheduler.errors) == ["bad", "never"]
+    assert "never fires" in scheduler.errors["never"]
+    assert scheduler.stats()["errors"] == scheduler.errors
+
+    # A scheduled strategy edited to a bad expression stops running
+    scheduler.sync([
+        {"id": "a", "schedule": "0 0 30 2 *"},
+        {"id": "bad", "schedule": "*/5 * * * *"},
+        {"id": "b", "schedule": "0 * * * *"},
+    ], now=T0)
+    assert "a" not in scheduler and "bad" in scheduler
+    assert list(scheduler.errors) == ["a"]
+    scheduler.sync([], now=T0)
+    assert scheduler.errors == {} and len(scheduler) == 0
+    scheduler.shutdown()
+
+
+def test_tick_skips_strategy_still_running():
+    release = threading.Event()
+    calls = []
+
+    def dispatch(strategy_id):
+        calls.append(strategy_id)
+        release.wait(5)
+
+    scheduler = StrategyScheduler(dispatch)
+    scheduler.add("a", "* * * * *", now=T0)
+    first = scheduler.tick(T0 + 60)
+    assert list(first) == ["a"]
+    assert scheduler.tick(T0 + 120) == {}
+    release.set()
+    first["a"].result(5)
+    assert list(scheduler.tick(T0 + 180)) == ["a"]
+    scheduler.shutdown()
+    assert calls == ["a", "a"]
+    assert scheduler.stats()["skipped"] == 1
+
+
+def test_tick_honours_is_running_hook():
+    running = {"a"}
+    scheduler = StrategyScheduler(lambda s: s, is_running=lambda s: s in running)
+    scheduler.add("a", "* * * * *", now=T0)
+    scheduler.add("b", "* * * * *", now=T0)
+    started = scheduler.tick(T0 + 60)
+    assert list(started) == ["b"]
+    assert started["b"].result(5) == "b"
+    scheduler.shutdown()
+    assert scheduler.stats()["running"] == []
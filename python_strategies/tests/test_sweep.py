@@ -0,0 +1,149 @@
+"""ParameterSweep against serial backtests"""
+
+import os
+import tempfile
+from dataclasses import asdict, replace
+
+import numpy as np
+import pytest
+
+from executor.loader import load_strategy
+from examples import market_maker
+from simulation import BacktestConfig, Backtester, MarketHistory, ParameterGrid, ParameterSweep, RandomSearch, TickStore
+from simulation.sweep import SweepResult, SweepTable, _map_histories, _spill, _strategy_source, apply_parameters
+
+CODE = _strategy_source(market_maker)
+GRID = ParameterGrid({"spread_percent": [0.005, 0.02, 0.05], "order_size": [5, 20]})
+
+
+def make_history(market_id, seed, n=400):
+    rng = np.random.default_rng(seed)
+    ts = 1_700_000_000_000 + np.arange(n, dtype=np.int64) * 60_000
+    mid = np.clip(0.5 + np.cumsum(rng.normal(0, 0.01, n)), 0.05, 0.95)
+    half = rng.uniform(0.002, 0.01, n)
+    trade_ts = np.sort(rng.choice(ts, n // 2))
+    return MarketHistory(
+        market_id=market_id,
+        token_id=f"tok-{market_id}",
+        timestamps=ts,
+        bid=mid - half,
+        ask=mid + half,
+        volume=rng.uniform(0, 1000, n),
+        bid_size=rng.uniform(1, 50, n),
+        ask_size=rng.uniform(1, 50, n),
+        trades={
+            "timestamp": trade_ts,
+            "price": np.interp(trade_ts, ts, mid),
+            "size": rng.uniform(1, 30, trade_ts.size),
+            "side": rng.choice([-1, 1], trade_ts.size),
+        },
+    )
+
+
+HISTORIES = [make_history("m1", 1), make_history("m2", 2)]
+CONFIG = BacktestConfig(parameters={"market_ids": ["m1", "m2"]}, order_ttl_cycles=3)
+
+
+def serial(parameters, histories=HISTORIES, config=CONFIG):
+    """What _run_point does, in this process"""
+    strategy = load_strategy("serial", 1, CODE)
+    apply_parameters(strategy.module, parameters)
+    config = replace(config, parameters={**config.parameters, **parameters})
+    return Backtester(strategy, histories, config).run().metrics
+
+
+def by_index(results):
+    return {r.index: r for r in results}
+
+
+def assert_same_metrics(a, b):
+    np.testing.assert_equal(asdict(a), asdict(b))
+
+
+@pytest.mark.parametrize("queue_model", [False, True])
+def test_grid_matches_serial_runs(queue_model):
+    config = replace(CONFIG, queue_model=queue_model)
+    results = by_index(ParameterSweep(CODE, HISTORIES, GRID, config, max_workers=2).iter_results())
+    assert sorted(results) == list(range(len(GRID)))
+    for index, parameters in enumerate(GRID):
+        result = results[index]
+        assert result.error is None and result.parameters == parameters
+        assert_same_metrics(result.metrics, serial(parameters, config=config))
+    # The grid actually moves the outcome
+    assert len({r.metrics.total_trades for r in results.values()}) > 1
+
+
+def test_spilled_histories_are_memory_mapped_copies(tmp_path):
+    manifest = _spill(HISTORIES, str(tmp_path))
+    mapped = _map_histories(("spill", manifest))
+    for original, history in zip(HISTORIES, mapped):
+        assert (history.market_id, history.token_id) == (original.market_id, original.token_id)
+        for name in ("timestamps", "bid", "ask", "volume", "bid_size", "ask_size"):
+            column = getattr(history, name)
+            assert isinstance(column.base, np.memmap) and not column.flags.owndata
+            np.testing.assert_array_equal(column, getattr(original, name))
+        assert history.last_price is None and "last_price" not in manifest[0]["columns"]
+        for name, column in original.trades.items():
+            np.testing.assert_array_equal(history.trades[name], column)
+
+    # Backtests over the mapped files match the in-memory ones
+    assert_same_metrics(serial({"order_size": 5}, mapped), serial({"order_size": 5}))
+
+
+def test_spill_directory_is_removed(monkeypatch, tmp_path):
+    made = []
+    real = tempfile.mkdtemp
+
+    def mkdtemp(**kwargs):
+        made.append(real(dir=tmp_path, **kwargs))
+        return made[-1]
+
+    monkeypatch.setattr("simulation.sweep.tempfile.mkdtemp", mkdtemp)
+    list(ParameterSweep(CODE, HISTORIES, [{"order_size": 5}], CONFIG, max_workers=1).iter_results())
+    assert len(made) == 1 and not os.path.exists(made[0])
+
+
+def test_from_store_matches_serial_runs(tmp_path):
+    store = TickStore(str(tmp_path / "ticks"))
+    for h in HISTORIES:
+        store.append_ticks(h.market_id, h.timestamps, h.bid, h.ask, token_id=h.token_id)
+    config = replace(CONFIG, start=int(HISTORIES[0].timestamps[50]), end=int(HISTORIES[0].timestamps[300]))
+    histories = [store.history(h.market_id, config.start, config.end) for h in HISTORIES]
+
+    points = list(RandomSearch({"spread_percent": (0.001, 0.05), "order_size": (1, 20)}, n=4, seed=7))
+    table = ParameterSweep.from_store(CODE, store, ["m1", "m2"], points, config, max_workers=2).run()
+    assert len(table) == 4 and not table.failed
+    for result in table:
+        assert result.parameters == points[result.index]
+        assert_same_metrics(result.metrics, serial(result.parameters, histories, config))
+
+
+def test_failed_points_are_reported():
+    code = CODE + "\n\ndef initialize(config):\n    if config['order_size'] > 10:\n        raise RuntimeError('too big')\n"
+    table = ParameterSweep(code, HISTORIES, GRID, CONFIG, max_workers=2).run()
+    assert len(table) == 3 and len(table.failed) == 3
+    assert all(r.parameters["order_size"] == 20 for r in table.failed)
+    assert table.failed[0].error == "RuntimeError: too big"
+
+
+def test_table_ranks_as_results_land():
+    table = SweepTable(rank_by="max_drawdown")
+    assert table.ascending
+    metrics = serial({"order_size": 5})
+    ranks = [
+        table.add(SweepResult(i, {}, replace(metrics, max_drawdown=d)))
+        for i, d in enumerate([3.0, 1.0, float("nan"), 2.0])
+    ]
+    assert ranks == [0, 0, 2, 1]
+    assert [r.index for r in table] == [1, 3, 0, 2]
+    assert table.best.index == 1 and [row["rank"] for row in table.rows()] == [1, 2, 3, 4]
+    with pytest.raises(ValueError):
+        SweepTable(rank_by="nope")
+
+
+def test_random_search_is_seeded():
+    space = {"a": (0, 10), "b": (0.0, 1.0), "c": ["x", "y"], "d": lambda rng: rng.random() < 2}
+    points = list(RandomSearch(space, n=20, seed=3))
+    assert points == list(RandomSearch(space, n=20, seed=3))
+    assert all(isinstance(p["a"], int) and 0 <= p["a"] <= 10 and 0 <= p["b"] <= 1 for p in points)
+    assert {p["c"] for p in points} == {"x", "y"} and all(p["d"] for p in points)
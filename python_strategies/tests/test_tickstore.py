@@ -0,0 +1,144 @@
+"""Columnar TickStore"""
+
+import os
+
+import numpy as np
+import pytest
+
+from simulation import TickStore, TickStoreError
+from simulation.tickstore import INDEX_STRIDE
+
+
+def ticks(n, start=1_000, step=10):
+    ts = start + step * np.arange(n, dtype=np.int64)
+    bid = 0.40 + 0.0001 * np.arange(n)
+    return ts, bid, bid + 0.02
+
+
+def index_of(store, market_id):
+    path = os.path.join(store.root, market_id, "ticks", "timestamp.idx")
+    return np.fromfile(path, dtype=np.int64)
+
+
+def test_append_and_read_range(tmp_path):
+    store = TickStore(str(tmp_path))
+    ts, bid, ask = ticks(100)
+    assert store.append_ticks("m1", ts, bid, ask, bid_size=np.full(100, 5.0), token_id="123") == 100
+
+    window = store.read_ticks("m1", start=1_105, end=1_200)
+    assert list(window.timestamp) == list(range(1_110, 1_201, 10))
+    assert isinstance(window.timestamp.base, np.memmap)
+    np.testing.assert_allclose(window.mid, (window.bid + window.ask) / 2)
+    assert np.all(window.bid_size == 5.0) and np.all(np.isnan(window.ask_size))
+    assert len(store.read_ticks("m1", start=5_000)) == 0
+    assert len(store.read_ticks("m1")) == 100
+    assert store.meta("m1") == {"market_id": "m1", "version": 1, "token_id": "123"}
+
+
+def test_reopen_and_continue(tmp_path):
+    ts, bid, ask = ticks(3 * INDEX_STRIDE + 17)
+    store = TickStore(str(tmp_path))
+    store.append_ticks("0x:a/b", ts[:1000], bid[:1000], ask[:1000])
+
+    reopened = TickStore(str(tmp_path))
+    assert reopened.markets() == ["0x:a/b"]
+    assert len(reopened.read_ticks("0x:a/b")) == 1000
+    # Appends of odd sizes extend the sparse index as if built in one go
+    for lo, hi in ((1000, 5000), (5000, 5001), (5001, len(ts))):
+        reopened.append_ticks("0x:a/b", ts[lo:hi], bid[lo:hi], ask[lo:hi])
+    assert np.array_equal(index_of(reopened, "0x_a_b"), ts[::INDEX_STRIDE])
+    assert np.array_equal(TickStore(str(tmp_path)).read_ticks("0x:a/b").timestamp, ts)
+
+
+def test_out_of_order_appends_are_rejected(tmp_path):
+    store = TickStore(str(tmp_path))
+    store.append_ticks("m", [10, 20], [0.4, 0.4], [0.5, 0.5])
+    with pytest.raises(TickStoreError):
+        store.append_ticks("m", [15], [0.4], [0.5])
+    with pytest.raises(TickStoreError):
+        store.append_ticks("m", [30, 25], [0.4, 0.4], [0.5, 0.5])
+    # A short column fails before anything is written
+    with pytest.raises(TickStoreError):
+        store.append_ticks("m", [30, 40], [0.4], [0.5, 0.5])
+    # An equal timestamp is allowed
+    assert store.append_ticks("m", [20], [0.41], [0.5]) == 1
+    assert len(store.read_ticks("m")) == 3
+
+
+def test_recovers_from_truncated_column(tmp_path):
+    ts, bid, ask = ticks(INDEX_STRIDE + 10)
+    store = TickStore(str(tmp_path))
+    store.append_ticks("m", ts, bid, ask)
+
+    # An append interrupted after some columns: ask is short by 2.5 rows
+    # (a torn value at its end), timestamp has an extra row
+    ask_path = os.path.join(str(tmp_path), "m", "ticks", "ask.f8")
+    with open(ask_path, "r+b") as f:
+        f.truncate(os.path.getsize(ask_path) - 20)
+    with open(os.path.join(str(tmp_path), "m", "ticks", "timestamp.i8"), "ab") as f:
+        f.write(np.int64(99_999_999).tobytes())
+
+    recovered = TickStore(str(tmp_path))
+    rows = recovered.read_ticks("m")
+    assert len(rows) == len(ts) - 3
+    assert np.array_equal(rows.timestamp, ts[:-3])
+    np.testing.assert_allclose(rows.ask, ask[:-3])
+    for name in ("timestamp.i8", "bid.f8", "ask.f8", "mid.f8", "bid_size.f8", "ask_size.f8"):
+        assert os.path.getsize(os.path.join(str(tmp_path), "m", "ticks", name)) == (len(ts) - 3) * 8
+
+    recovered.append_ticks("m", ts[-3:], bid[-3:], ask[-3:])
+    assert np.array_equal(recovered.read_ticks("m").timestamp, ts)
+    assert np.array_equal(index_of(recovered, "m"), ts[::INDEX_STRIDE])
+
+
+def test_lost_index_is_rebuilt(tmp_path):
+    ts, bid, ask = ticks(2 * INDEX_STRIDE + 1)
+    TickStore(str(tmp_path)).append_ticks("m", ts, bid, ask)
+    os.remove(os.path.join(str(tmp_path), "m", "ticks", "timestamp.idx"))
+    store = TickStore(str(tmp_path))
+    assert len(store.read_ticks("m", start=int(ts[INDEX_STRIDE]))) == INDEX_STRIDE + 1
+    assert np.array_equal(index_of(store, "m"), ts[::INDEX_STRIDE])
+
+
+def test_locate_matches_searchsorted_with_duplicates_across_strides(tmp_path):
+    rng = np.random.default_rng(3)
+    # Runs of equal timestamps, some longer than a stride and some
+    # straddling the stride boundaries
+    runs = rng.integers(1, 50, size=600)
+    runs[[5, 100, 250]] = [INDEX_STRIDE + 7, 2 * INDEX_STRIDE, 3]
+    ts = np.repeat(np.cumsum(rng.integers(1, 4, size=runs.size)), runs).astype(np.int64)
+    store = TickStore(str(tmp_path))
+    store.append_ticks("m", ts, np.full(ts.size, 0.4), np.full(ts.size, 0.5))
+    table = store._table("m", "ticks")
+
+    boundaries = ts[::INDEX_STRIDE]
+    probes = np.concatenate((boundaries, boundaries - 1, boundaries + 1, rng.integers(ts[0] - 5, ts[-1] + 5, 300)))
+    for value in probes:
+        value = int(value)
+        lo = int(np.searchsorted(ts, value, "left"))
+        hi = int(np.searchsorted(ts, value, "right"))
+        assert table.locate(value, value) == (lo, max(lo, hi)), value
+        assert table.locate(value, None) == (lo, ts.size)
+        assert table.locate(None, value) == (0, hi)
+
+
+def test_trades_and_history(tmp_path):
+    store = TickStore(str(tmp_path))
+    ts, bid, ask = ticks(50)
+    store.append_book("m", 500, {
+        "asset_id": "123",
+        "bids": [{"price": "0.39", "size": "7"}, {"price": "0.40", "size": "3"}],
+        "asks": [{"price": "0.42", "size": "9"}],
+    })
+    store.append_book("m", 600, {"bids": [], "asks": [{"price": "0.5", "size": "1"}]})  # One-sided: skipped
+    store.append_ticks("m", ts, bid, ask)
+    store.append_trades("m", [1_005, 1_015, 1_500], [0.41, 0.42, 0.43], [5, 6, 7], [1, -1, 1])
+
+    first = store.read_ticks("m", end=500)
+    assert (first.bid[0], first.ask[0], first.bid_size[0], first.ask_size[0]) == (0.40, 0.42, 3.0, 9.0)
+
+    history = store.history("m", start=1_000, end=1_100)
+    assert history.token_id == "123"
+    assert len(history.timestamps) == 11
+    assert list(history.trades["side"]) == [1, -1] and list(history.trades["size"]) == [5.0, 6.0]
+    assert store.history("other").trades is None
@@ -0,0 +1,116 @@
+"""TokenIndex build, refresh and order checks"""
+
+import asyncio
+import json
+
+import pytest
+
+from executor.tokens import DEFAULT_TICK_SIZE, TokenIndex, TokenInfo
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def market(n, updated="2024-09-01T00:00:00Z", **fields):
+    return {
+        "conditionId": f"0xc{n}",
+        "clobTokenIds": json.dumps([f"{n}1", f"{n}2"]),
+        "outcomes": json.dumps(["Yes", "No"]),
+        "orderPriceMinTickSize": 0.01,
+        "orderMinSize": 5,
+        "updatedAt": updated,
+        **fields,
+    }
+
+
+class FakeGamma:
+    """GammaApi.get_markets over a list, recording each page request"""
+
+    def __init__(self, markets) -> None:
+        self.markets = list(markets)
+        self.requests = []
+
+    async def get_markets(self, limit=100, offset=0, order=None, ascending=None, **filters):
+        self.requests.append({"limit": limit, "offset": offset, "order": order, "ascending": ascending, **filters})
+        markets = self.markets
+        if order == "updatedAt":
+            markets = sorted(markets, key=lambda m: m["updatedAt"], reverse=not ascending)
+        return markets[offset:offset + limit]
+
+
+def test_build_pages_concurrently_until_a_short_page():
+    gamma = FakeGamma(market(n) for n in range(23))
+    index = TokenIndex(gamma, page_size=5, concurrency=2)
+    assert run(index.build(closed=False)) == 23
+    assert len(index) == 46 and "221" in index and "99" not in index
+    # Two pages at a time; the batch with the short page (offset 20) is the last
+    assert [r["offset"] for r in gamma.requests] == [0, 5, 10, 15, 20, 25]
+    assert all(r["closed"] is False and r["limit"] == 5 for r in gamma.requests)
+    assert index.filters == {"closed": False}
+    assert list(index)[:3] == ["01", "02", "11"]
+
+
+def test_resolve_reads_both_field_spellings():
+    index = TokenIndex(FakeGamma([]))
+    index.add_market(market(1, negRisk=True, negRiskMarketID="0xgroup"))
+    index.add_market({
+        "condition_id": "0xsnake",
+        "tokens": [{"token_id": "s1", "outcome": "Up"}, {"token_id": "s2", "outcome": "Down"}],
+        "minimum_tick_size": "0.001",
+        "minimum_order_size": "15",
+    })
+    index.add_market({"conditionId": "0xbare", "clobTokenIds": '["b1"]', "outcomes": '["Yes"]'})
+    index.add_market({"clobTokenIds": '["orphan"]'})
+
+    assert index.resolve("12") == TokenInfo("12", "0xc1", "No", 0.01, 5.0, "0xgroup")
+    assert index.resolve("s1") == TokenInfo("s1", "0xsnake", "Up", 0.001, 15.0, None)
+    assert index.resolve("b1") == TokenInfo("b1", "0xbare", "Yes", DEFAULT_TICK_SIZE, 0.0, None)
+    assert index.resolve("orphan") is None and index.market_id("orphan") is None
+    assert index.market_id("s2") == "0xsnake" and index.tick_size("s2") == 0.001
+    # Outcomes and condition ids are interned once
+    assert index.stats()["strings"] == len({"0xc1", "Yes", "No", "0xgroup", "0xsnake", "Up", "Down", "0xbare"})
+    assert index.stats()["array_bytes"] == 5 * 28
+
+
+def test_refresh_reads_newest_first_until_an_older_market():
+    markets = [market(n, updated=f"2024-09-01T00:00:{n:02d}Z") for n in range(10)]
+    gamma = FakeGamma(markets)
+    index = TokenIndex(gamma, page_size=4, concurrency=1)
+    run(index.build(active=True, order="volume", ascending=False))
+
+    # Two markets change and one is added; market 9 is re-read as it matches `since`
+    gamma.markets[3] = market(3, updated="2024-09-02T00:00:00Z", orderPriceMinTickSize=0.001)
+    gamma.markets[5] = market(5, updated="2024-09-02T00:00:01Z", clobTokenIds='["51", "53"]')
+    gamma.markets.append(market(10, updated="2024-09-02T00:00:02Z"))
+    gamma.requests.clear()
+
+    assert run(index.refresh()) == 4
+    assert [(r["offset"], r["order"], r["ascending"], r["active"]) for r in gamma.requests] == [
+        (0, "updatedAt", False, True), (4, "updatedAt", False, True),
+    ]
+    assert index.tick_size("31") == 0.001
+    assert index.market_id("53") == "0xc5" and index.market_id("101") == "0xc10"
+    # A token dropped from its market keeps its row until the next build
+    assert "52" in index
+
+    gamma.requests.clear()
+    assert run(index.refresh()) == 1
+    assert len(gamma.requests) == 1
+
+
+@pytest.mark.parametrize("order, reason", [
+    ({"token_id": "11", "price": 0.55, "size": 5}, None),
+    ({"token_id": "11", "price": 0.555, "size": 10}, "Price 0.555 is not a multiple of tick size 0.01"),
+    ({"token_id": "11", "price": 0.29, "size": 10}, None),
+    ({"token_id": "11", "price": None, "size": 5}, None),
+    ({"token_id": "11", "price": 0.5, "size": 4.9}, "Order size 4.9 is below market minimum 5"),
+    ({"token_id": "21", "price": 0.123, "size": 1}, None),
+    ({"token_id": "21", "price": 0.1235, "size": 1}, "Price 0.1235 is not a multiple of tick size 0.001"),
+    ({"token_id": "unknown", "price": 0.12345, "size": 0.1}, None),
+])
+def test_check_order(order, reason):
+    index = TokenIndex(FakeGamma([]))
+    index.add_market(market(1))
+    index.add_market(market(2, orderPriceMinTickSize=0.001, orderMinSize=None))
+    assert index.check_order(order) == reason